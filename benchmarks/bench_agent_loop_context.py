@@ -0,0 +1,121 @@
+"""Benchmark: prompt tokens per agentic loop iteration.
+
+Usage:
+    python benchmarks/bench_agent_loop_context.py
+    python benchmarks/bench_agent_loop_context.py --file-lines 400 --budget 2048
+
+Runs a scripted executor session (reads, a repeated read, a grep, an edit
+and a re-read of the edited file, then more reads) through
+``BaseAgent.agentic_loop`` against a stand-in model that records the
+prompt each iteration sends. "before" resends every tool round verbatim
+and never marks a result stale, as the loop used to; "after" uses the
+compacting history. Prompt tokens are estimated at 4 characters per token;
+their sum is what prompt evaluation costs over the run.
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+from penguincode_cli.agents.base import AgentConfig, BaseAgent, Permission
+from penguincode_cli.agents.loop_history import LoopHistory
+from penguincode_cli.ollama import TokenBudget
+from penguincode_cli.ollama.types import ChatResponse, Message
+
+
+class LoopAgent(BaseAgent):
+    async def run(self, task, **kwargs):
+        return await self.agentic_loop(task)
+
+
+class ScriptedModel:
+    """Replays a fixed list of tool calls and records each prompt's size."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.prompt_tokens = []
+        self.counter = TokenBudget(None)
+
+    async def chat(self, model, messages, tools=None, stream=True, **kwargs):
+        tokens = self.counter.estimate_messages("bench-estimate", messages)
+        self.prompt_tokens.append(tokens)
+        calls = [self.script.pop(0)] if self.script else None
+        message = Message(role="assistant", content="" if calls else "All done.", tool_calls=calls)
+        yield ChatResponse(
+            model=model, created_at="", message=message, done=True, prompt_eval_count=tokens
+        )
+
+
+def make_script(root: Path, file_lines: int):
+    for name in "abcdef":
+        body = "".join(f"def {name}_{i}(value):\n    return value * {i}\n" for i in range(file_lines // 2))
+        (root / f"{name}.py").write_text(body)
+
+    def read(name):
+        return {"name": "read", "arguments": {"path": str(root / f"{name}.py")}}
+
+    return [
+        read("a"),
+        read("b"),
+        {"name": "grep", "arguments": {"pattern": "return value \\* 7$", "path": str(root)}},
+        read("c"),
+        read("a"),  # Repeated read
+        {"name": "edit", "arguments": {
+            "path": str(root / "a.py"), "old_text": "def a_1(value):", "new_text": "def a_one(value):",
+        }},
+        read("a"),  # Re-read after the edit
+        read("d"),
+        read("e"),
+        read("f"),
+        read("b"),
+    ]
+
+
+async def run_loop(root: Path, file_lines: int, budget):
+    model = ScriptedModel(make_script(root, file_lines))
+    config = AgentConfig(
+        name="executor",
+        model="bench-model",
+        description="",
+        permissions=[Permission.READ, Permission.SEARCH, Permission.WRITE],
+        max_iterations=20,
+        history_budget_tokens=budget,
+    )
+    agent = LoopAgent(config, model, working_dir=str(root))
+    agent.token_budget.max_window = 1_000_000  # Only the history budget limits "after"
+    result = await agent.agentic_loop("Rename a_1 and survey the package")
+    assert result.success, result.error
+    return model.prompt_tokens
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file-lines", type=int, default=200, help="Lines per source file")
+    parser.add_argument("--budget", type=int, default=AgentConfig.history_budget_tokens,
+                        help="history_budget_tokens for the 'after' run")
+    args = parser.parse_args()
+
+    runs = {}
+    mark_stale = LoopHistory.__dict__["_mark_stale"]
+    for label, budget in (("before", None), ("after", args.budget)):
+        # The old loop kept every result verbatim
+        LoopHistory._mark_stale = staticmethod(lambda *a: None) if budget is None else mark_stale
+        tmp = Path(tempfile.mkdtemp(prefix="bench_loop_"))
+        try:
+            runs[label] = await run_loop(tmp, args.file_lines, budget)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    LoopHistory._mark_stale = mark_stale
+
+    before, after = runs["before"], runs["after"]
+    print(f"{'iteration':>9} {'before':>8} {'after':>8}")
+    for i, (b, a) in enumerate(zip(before, after), 1):
+        print(f"{i:>9} {b:>8} {a:>8}")
+    print(f"{'total':>9} {sum(before):>8} {sum(after):>8}  ({sum(before) / sum(after):.1f}x fewer prompt tokens)")
+    print(f"{'max':>9} {max(before):>8} {max(after):>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
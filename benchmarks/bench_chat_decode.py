@@ -0,0 +1,172 @@
+"""Benchmark: client-side cost of decoding a streamed chat reply.
+
+Usage:
+    python benchmarks/bench_chat_decode.py
+    python benchmarks/bench_chat_decode.py --tokens 10000 --runs 20
+    python benchmarks/bench_chat_decode.py --record reply.ndjson
+
+Replays a recorded ``/api/chat`` NDJSON stream (by default a synthetic one
+shaped like Ollama's: one JSON line per token, then a done line with the
+counters) through httpx, one line per network read as Ollama flushes them.
+"before" is the previous decode path: ``aiter_lines`` + ``json.loads``, a
+fresh ``known_fields`` set and filtered dict per line, and the reply built
+with ``text += content``. "after" is ``OllamaClient.chat`` drained with
+``accumulate``. The middle row is "after" with the stdlib ``json`` backend,
+to separate the effect of ``orjson``. Reports ms per stream and lines/sec.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+import httpx
+
+from penguincode_cli.ollama import client as client_module
+from penguincode_cli.ollama import accumulate
+from penguincode_cli.ollama.client import OllamaClient
+from penguincode_cli.ollama.types import ChatResponse, Message, ToolCall, UsageStats
+
+WORDS = ["def", " parse", "(", "self", ",", " data", ")", ":", "\n", "    ", "return", " value", ".", "strip", "()"]
+
+
+def record_stream(tokens: int) -> list:
+    """NDJSON lines of a chat reply ``tokens`` long."""
+    lines = []
+    for i in range(tokens):
+        lines.append(json.dumps({
+            "model": "qwen2.5-coder:7b",
+            "created_at": f"2024-11-05T10:00:{i % 60:02d}.{i:06d}Z",
+            "message": {"role": "assistant", "content": WORDS[i % len(WORDS)]},
+            "done": False,
+        }).encode() + b"\n")
+    lines.append(json.dumps({
+        "model": "qwen2.5-coder:7b",
+        "created_at": "2024-11-05T10:01:00.000000Z",
+        "message": {"role": "assistant", "content": ""},
+        "done": True,
+        "done_reason": "stop",
+        "total_duration": 98_000_000_000,
+        "load_duration": 12_000_000,
+        "prompt_eval_count": 812,
+        "prompt_eval_duration": 310_000_000,
+        "eval_count": tokens,
+        "eval_duration": 97_000_000_000,
+    }).encode() + b"\n")
+    return lines
+
+
+class ReplayClient(OllamaClient):
+    """OllamaClient whose HTTP client replays a recorded stream."""
+
+    def __init__(self, lines):
+        super().__init__(base_url="http://ollama.test")
+        self.lines = lines
+
+        async def body():
+            for line in self.lines:
+                yield line
+
+        self._http = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body()))
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._http
+
+    async def legacy_chat(self, model, messages):
+        """The decode loop OllamaClient.chat used before."""
+        request = {"model": model, "messages": [{"role": m.role, "content": m.content} for m in messages]}
+        async with self.client.stream("POST", self._url("/api/chat"), json=request) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    data = json.loads(line)
+                    if "message" in data:
+                        msg_data = data["message"]
+                        tool_calls = None
+                        if "tool_calls" in msg_data and msg_data["tool_calls"]:
+                            tool_calls = [
+                                ToolCall(function=tc.get("function", {}))
+                                for tc in msg_data["tool_calls"]
+                            ]
+                        data["message"] = Message(
+                            role=msg_data.get("role", "assistant"),
+                            content=msg_data.get("content", ""),
+                            images=msg_data.get("images"),
+                            tool_calls=tool_calls,
+                        )
+                    known_fields = {
+                        "model", "created_at", "message", "done", "done_reason",
+                        "total_duration", "load_duration", "prompt_eval_count",
+                        "prompt_eval_duration", "eval_count", "eval_duration",
+                    }
+                    filtered_data = {k: v for k, v in data.items() if k in known_fields}
+                    yield ChatResponse(**filtered_data)
+
+
+async def before(client, messages):
+    response_text = ""
+    usage = UsageStats()
+    async for chunk in client.legacy_chat("qwen2.5-coder:7b", messages):
+        if chunk.message and chunk.message.content:
+            response_text += chunk.message.content
+        if chunk.done:
+            usage.add(UsageStats.from_chat_response(chunk))
+    return response_text, usage
+
+
+async def after(client, messages):
+    reply = await accumulate(client.chat("qwen2.5-coder:7b", messages))
+    return reply.text, reply.usage
+
+
+async def measure(run, client, runs):
+    messages = [Message(role="user", content="Write the parser")]
+    text, usage = await run(client, messages)  # Warm-up, and the result to compare
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await run(client, messages)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, text, usage
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10_000, help="Tokens in the synthetic stream")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per path (median reported)")
+    parser.add_argument("--record", type=Path, help="Replay this NDJSON recording instead")
+    args = parser.parse_args()
+
+    if args.record:
+        lines = [line + b"\n" for line in args.record.read_bytes().splitlines() if line.strip()]
+    else:
+        lines = record_stream(args.tokens)
+    client = ReplayClient(lines)
+
+    fast_loads = client_module._loads
+    results = {"before": await measure(before, client, args.runs)}
+    client_module._loads = json.loads
+    results["after (json)"] = await measure(after, client, args.runs)
+    client_module._loads = fast_loads
+    results["after"] = await measure(after, client, args.runs)
+    await client.client.aclose()
+
+    reference = results["before"]
+    for label, (_, text, usage) in results.items():
+        assert text == reference[1] and usage.to_dict() == reference[2].to_dict(), label
+
+    backend = "orjson" if fast_loads is not json.loads else "json (orjson not installed)"
+    print(f"{len(lines)} lines, {len(reference[1])} characters; fast backend: {backend}")
+    print(f"{'path':>13} {'ms/stream':>10} {'lines/sec':>11}")
+    for label, (ms, _, _) in results.items():
+        print(f"{label:>13} {ms:>10.1f} {len(lines) / ms * 1000:>11,.0f}")
+    print(f"speedup: {reference[0] / results['after'][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""Benchmark: GrepTool full scan vs. trigram code index.
+
+Usage:
+    python benchmarks/bench_code_index.py                 # synthetic tree
+    python benchmarks/bench_code_index.py --files 20000   # bigger synthetic tree
+    python benchmarks/bench_code_index.py --path ~/src/monorepo --pattern "def handle_\\w+"
+
+Reports cold index build, incremental refresh and per-query times for
+indexed vs. full-scan grep (same results, fewer files opened).
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from penguincode_cli.tools.code_index import CodeIndex
+from penguincode_cli.tools.file_ops import GrepTool
+
+DEFAULT_PATTERNS = ["needle_symbol_42", r"class \w+Handler", "TODO|FIXME", r"import\s+os"]
+
+
+def make_tree(root: Path, files: int, seed: int = 7) -> None:
+    """Generate a synthetic source tree with a few rare needles."""
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(5000)]
+    for i in range(files):
+        directory = root / f"pkg{i % 100}" / f"mod{i % 7}"
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for _ in range(rng.randint(40, 200)):
+            a, b, c = rng.sample(words, 3)
+            lines.append(f"    {a}_{b} = {c}({rng.randint(0, 999)})")
+        if i % 50 == 0:
+            lines.insert(0, "import os")
+        if i % 200 == 0:
+            lines.append(f"class {words[i % len(words)].title()}Handler:\n    pass")
+        if i % 500 == 0:
+            lines.append("    # TODO: tidy up")
+        if i == files // 2:
+            lines.append("needle_symbol_42 = True")
+        (directory / f"file{i}.py").write_text("\n".join(lines) + "\n")
+
+
+async def time_grep(tool: GrepTool, pattern: str, path: Path, repeat: int) -> tuple:
+    """Run a grep several times; return (best seconds, result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await tool.execute(pattern, path=str(path), max_results=10_000)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", help="Existing tree to search (default: synthetic)")
+    parser.add_argument("--files", type=int, default=5000, help="Synthetic tree size")
+    parser.add_argument("--pattern", action="append", help="Pattern(s) to query")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = None
+    if args.path:
+        root = Path(args.path).expanduser().resolve()
+    else:
+        tmp = Path(tempfile.mkdtemp(prefix="pc-index-bench-"))
+        root = tmp
+        print(f"Generating {args.files} files in {root} ...")
+        make_tree(root, args.files)
+
+    try:
+        index = CodeIndex(str(root), index_path=str(Path(tempfile.mkdtemp()) / "bench.db"))
+        start = time.perf_counter()
+        stats = index.refresh()
+        print(f"Cold build: {time.perf_counter() - start:.2f}s ({stats['files']} files)")
+
+        index.mark_dirty()
+        start = time.perf_counter()
+        index.refresh()
+        print(f"No-change refresh (stat walk): {time.perf_counter() - start:.3f}s")
+
+        # Register the prepared index for the tool
+        CodeIndex._registry[root] = index
+        indexed_tool = GrepTool(index_root=str(root))
+        full_tool = GrepTool()
+
+        print(f"\n{'pattern':<22} {'full scan':>10} {'indexed':>10} {'speedup':>8} {'scanned':>14}")
+        for pattern in args.pattern or DEFAULT_PATTERNS:
+            full_s, full = await time_grep(full_tool, pattern, root, args.repeat)
+            idx_s, idx = await time_grep(indexed_tool, pattern, root, args.repeat)
+            if full.metadata["matches"] != idx.metadata["matches"]:
+                print(f"  ! result mismatch for {pattern!r}: {full.metadata['matches']} vs {idx.metadata['matches']}")
+            scanned = f"{idx.metadata['files_searched']}/{idx.metadata.get('files_total', '?')}"
+            print(
+                f"{pattern:<22} {full_s:>9.3f}s {idx_s:>9.3f}s {full_s / idx_s:>7.1f}x {scanned:>14}"
+            )
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
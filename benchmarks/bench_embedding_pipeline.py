@@ -0,0 +1,137 @@
+"""Benchmark: per-chunk embedding vs. the batched embedding pipeline.
+
+Usage:
+    python benchmarks/bench_embedding_pipeline.py                  # simulated Ollama
+    python benchmarks/bench_embedding_pipeline.py --chunks 2000 --latency-ms 40
+    python benchmarks/bench_embedding_pipeline.py --url http://localhost:11434 --model nomic-embed-text
+
+"before" mirrors the old indexer loop: a new HTTP session and one
+/api/embeddings request per chunk, and one collection.add per row.
+"after" is DocumentationIndexer's pipeline. Both write to an in-memory
+collection so only the embedding path is measured. Reports chunks/sec.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from penguincode_cli.docs_rag import DocumentationIndexer
+
+
+class MemoryCollection:
+    """Stands in for ChromaDB so only embedding throughput is measured."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.rows += len(ids)
+
+    upsert = add
+
+    def get(self, where=None, include=None):
+        return {"ids": []}
+
+    def delete(self, ids):
+        self.rows -= len(ids)
+
+
+def simulated_ollama(latency_ms: float, per_text_ms: float, dims: int = 768) -> web.Application:
+    """Embed server with a fixed per-request cost plus a per-text cost."""
+    vector = [0.0] * dims
+
+    async def embed(request):
+        texts = (await request.json())["input"]
+        await asyncio.sleep((latency_ms + per_text_ms * len(texts)) / 1000)
+        return web.json_response({"embeddings": [vector] * len(texts)})
+
+    async def embeddings(request):
+        await request.json()
+        await asyncio.sleep((latency_ms + per_text_ms) / 1000)
+        return web.json_response({"embedding": vector})
+
+    app = web.Application()
+    app.router.add_post("/api/embed", embed)
+    app.router.add_post("/api/embeddings", embeddings)
+    return app
+
+
+async def legacy_index(url: str, model: str, texts: list) -> float:
+    """The pre-pipeline loop; returns chunks/sec."""
+    collection = MemoryCollection()
+    start = time.perf_counter()
+    for i, text in enumerate(texts):
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{url}/api/embeddings", json={"model": model, "prompt": text}, timeout=30
+            ) as response:
+                embedding = (await response.json()).get("embedding", [])
+        collection.add(ids=[str(i)], embeddings=[embedding], documents=[text], metadatas=[{}])
+    return len(texts) / (time.perf_counter() - start)
+
+
+async def pipeline_index(url: str, model: str, texts: list, batch: int, concurrency: int) -> float:
+    """The batched pipeline; returns chunks/sec."""
+    with tempfile.TemporaryDirectory() as tmp:
+        indexer = DocumentationIndexer(
+            embedding_model=model,
+            persist_directory=tmp,
+            ollama_base_url=url,
+            embed_batch_size=batch,
+            embed_concurrency=concurrency,
+        )
+        indexer._collection = MemoryCollection()
+        chunks = [
+            indexer._chunk_text(text, {"library": "bench", "doc_index": str(i)})[0]
+            for i, text in enumerate(texts)
+        ]
+        try:
+            await indexer._index_chunks(chunks, "bench")
+        finally:
+            await indexer.close()
+        return indexer.last_index_stats["chunks_per_sec"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Real Ollama URL (default: simulated server)")
+    parser.add_argument("--model", default="nomic-embed-text")
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated per-request cost")
+    parser.add_argument("--per-text-ms", type=float, default=2.0, help="Simulated per-text cost")
+    parser.add_argument("--batch", type=int, action="append", help="Batch size(s) to try")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    texts = [f"chunk {i} " + "lorem ipsum dolor sit amet " * 30 for i in range(args.chunks)]
+
+    server = None
+    url = args.url
+    if not url:
+        server = TestServer(simulated_ollama(args.latency_ms, args.per_text_ms))
+        await server.start_server()
+        url = str(server.make_url("")).rstrip("/")
+        print(
+            f"Simulated Ollama: {args.latency_ms:.0f}ms/request + {args.per_text_ms:.0f}ms/text"
+        )
+
+    try:
+        before = await legacy_index(url, args.model, texts)
+        print(f"\n{'mode':<28} {'chunks/sec':>12} {'speedup':>8}")
+        print(f"{'before (1 per request)':<28} {before:>12.1f} {'1.0x':>8}")
+        for batch in args.batch or [8, 32, 64]:
+            after = await pipeline_index(url, args.model, texts, batch, args.concurrency)
+            label = f"after (batch={batch}, c={args.concurrency})"
+            print(f"{label:<28} {after:>12.1f} {after / before:>7.1f}x")
+    finally:
+        if server:
+            await server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Benchmark: event-loop stalls from HTML→markdown conversion.
+
+Usage:
+    python benchmarks/bench_html_parsing.py
+    python benchmarks/bench_html_parsing.py --pages 20 --sections 800
+
+Converts synthetic documentation pages (sized like large MDN / Python
+reference pages) while a ticker coroutine measures how late the event loop
+wakes it. "before" converts inline on the loop with ``html.parser``, as the
+fetcher used to; "after" goes through ``parse_html`` (worker pool, fastest
+installed parser). The middle row isolates the parser backend's effect. Reports the worst and total stall and pages/sec.
+"""
+
+import argparse
+import asyncio
+import time
+
+from penguincode_cli.shared import html_extract
+from penguincode_cli.shared.html_extract import html_to_markdown, parse_html, shutdown_parser_pool
+
+TICK = 0.001
+
+
+def fixture_page(index: int, sections: int) -> str:
+    body = "".join(
+        f"<h2 id='s{i}'>Section {i}</h2>"
+        f"<p>{'The quick reference describes every parameter in detail. ' * 12}</p>"
+        f"<pre><code>result = module_{index}.function_{i}(arg, *, flag=True)</code></pre>"
+        f"<ul><li>Item one</li><li>Item two</li><li>Item three</li></ul>"
+        for i in range(sections)
+    )
+    nav = "".join(f"<a href='/docs/page{j}.html'>Page {j}</a>" for j in range(300))
+    return (
+        f"<html><head><style>body{{}}</style></head><body><nav>{nav}</nav>"
+        f"<main><h1>Page {index}</h1>{body}</main></body></html>"
+    )
+
+
+async def measure(convert, pages) -> dict:
+    """Convert pages one after another while sampling event-loop lag."""
+    wakeups = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            wakeups.append(time.perf_counter())
+            await asyncio.sleep(TICK)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for i, html in enumerate(pages):
+        await convert(html, f"https://docs.example/docs/page{i}.html")
+        await asyncio.sleep(0)  # The fetcher awaits the network between pages
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    # Time the ticker was kept waiting beyond its own sleep
+    stalls = [max(0.0, b - a - TICK) for a, b in zip(wakeups, wakeups[1:])]
+    return {
+        "max_stall_ms": max(stalls, default=0.0) * 1000,
+        "total_stall_ms": sum(stalls) * 1000,
+        "pages_per_sec": len(pages) / elapsed,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--sections", type=int, default=400, help="Sections per page (size)")
+    args = parser.parse_args()
+
+    pages = [fixture_page(i, args.sections) for i in range(args.pages)]
+    print(f"{args.pages} pages, {len(pages[0]) / 1024:.0f} KiB each; backends: {html_extract.parser_backends()}")
+
+    fast_parser = html_extract.bs4_parser()
+
+    async def before(html, url):
+        # The pre-change path: html.parser on the event loop
+        html_extract.bs4_parser = lambda: "html.parser"
+        try:
+            html_to_markdown(html, url)
+        finally:
+            html_extract.bs4_parser = original_parser
+
+    async def inline_fast(html, url):
+        html_to_markdown(html, url)
+
+    async def after(html, url):
+        await parse_html(html_to_markdown, html, url)
+
+    original_parser = html_extract.bs4_parser
+    await after(pages[0], "warmup")  # Start the worker pool outside the measurement
+    try:
+        print(f"\n{'mode':<30} {'max stall ms':>13} {'total stall ms':>15} {'pages/s':>8}")
+        for label, convert in [
+            ("before (inline, html.parser)", before),
+            (f"inline ({fast_parser})", inline_fast),
+            ("after (worker pool)", after),
+        ]:
+            r = await measure(convert, pages)
+            print(
+                f"{label:<30} {r['max_stall_ms']:>13.1f} {r['total_stall_ms']:>15.1f} "
+                f"{r['pages_per_sec']:>8.1f}"
+            )
+    finally:
+        shutdown_parser_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
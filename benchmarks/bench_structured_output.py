@@ -0,0 +1,133 @@
+"""Benchmark: loop iterations per task with and without schema-constrained replies.
+
+Usage:
+    python benchmarks/bench_structured_output.py
+    python benchmarks/bench_structured_output.py --tasks 50 --files 4 --malformed 0.3
+
+Each task asks an executor to read ``--files`` files and report. The
+stand-in model has no native tool calling and writes its calls as JSON in
+the text; without a ``format`` schema a fraction (``--malformed``) of them
+come out the way small models get them wrong (single quotes, a missing
+brace, a trailing comma, a call in prose). A call that doesn't parse ends
+the loop early, so the task is sent again with the files still unread, as
+the orchestrator's review round does. With a schema, Ollama's grammar keeps
+every reply valid, which the stand-in models by never malforming when
+``format`` is passed. "before" has structured output switched off, "after"
+on. Reports LLM calls (loop iterations) and agent runs per task.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+from penguincode_cli.agents.base import AgentConfig, BaseAgent, Permission
+from penguincode_cli.config.settings import StructuredOutputConfig
+from penguincode_cli.ollama import configure_structured_output
+from penguincode_cli.ollama.types import ChatResponse, Message
+
+MODEL = "deepseek-coder:6.7b"  # No native tool calling
+
+MALFORMED = [
+    "{{'name': 'read', 'arguments': {{'path': '{path}'}}}}",
+    '{{"name": "read", "arguments": {{"path": "{path}"}}',
+    '{{"name": "read", "arguments": {{"path": "{path}",}}}}',
+    "Next I will call read with path {path} to check it.",
+]
+
+# Per-run retry cap, so a pathological run can't spin forever
+MAX_RUNS_PER_TASK = 10
+
+
+class LoopAgent(BaseAgent):
+    async def run(self, task, **kwargs):
+        return await self.agentic_loop(task)
+
+
+class SloppyModel:
+    """Reads each file named in the task, sometimes writing the call badly."""
+
+    def __init__(self, markers, malformed: float, seed: int):
+        self.markers = markers  # path -> text only that file contains
+        self.malformed = malformed
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def chat(self, model, messages, tools=None, stream=True, **kwargs):
+        self.calls += 1
+        constrained = kwargs.get("format") is not None
+        task = messages[1].content
+        prompt = "".join(m.content for m in messages[2:])
+        pending = [p for p in task.split()[1:] if self.markers[p] not in prompt]
+        if not pending:
+            text = json.dumps({"answer": "Read them all."}) if constrained else "Read them all."
+        elif not constrained and self.random.random() < self.malformed:
+            text = self.random.choice(MALFORMED).format(path=pending[0])
+        else:
+            text = json.dumps({"name": "read", "arguments": {"path": pending[0]}})
+        yield ChatResponse(model=model, created_at="", done=False, message=Message(role="assistant", content=text))
+        yield ChatResponse(model=model, created_at="", done=True, eval_count=len(text) // 4,
+                           message=Message(role="assistant", content=""))
+
+
+async def run_tasks(root: Path, tasks: int, files: int, malformed: float, seed: int, structured: bool):
+    configure_structured_output(StructuredOutputConfig(enabled=structured))
+    markers = {}
+    task_files = []
+    for t in range(tasks):
+        paths = []
+        for f in range(files):
+            path = root / f"task{t}_file{f}.py"
+            markers[str(path)] = f"MARKER_{t}_{f}"
+            path.write_text(f"VALUE = '{markers[str(path)]}'\n")
+            paths.append(str(path))
+        task_files.append(paths)
+
+    model = SloppyModel(markers, malformed, seed)
+    config = AgentConfig(name="executor", model=MODEL, description="", permissions=[Permission.READ],
+                         max_iterations=files + 2)
+    agent = LoopAgent(config, model, working_dir=str(root))
+    runs = unfinished = 0
+    for paths in task_files:
+        remaining = list(paths)
+        for _ in range(MAX_RUNS_PER_TASK):
+            runs += 1
+            result = await agent.agentic_loop("Read: " + " ".join(remaining))
+            read = {tc["arguments"].get("path") for tc in result.tool_calls if tc["tool"] == "read"}
+            remaining = [p for p in remaining if p not in read]
+            if not remaining:
+                break
+        unfinished += bool(remaining)
+    return model.calls, runs, unfinished
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=30, help="Tasks to run")
+    parser.add_argument("--files", type=int, default=4, help="Files each task reads")
+    parser.add_argument("--malformed", type=float, default=0.25, help="Share of unconstrained calls that don't parse")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    runs = {}
+    for label, structured in (("before", False), ("after", True)):
+        tmp = Path(tempfile.mkdtemp(prefix="bench_structured_"))
+        try:
+            runs[label] = await run_tasks(tmp, args.tasks, args.files, args.malformed, args.seed, structured)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    configure_structured_output(StructuredOutputConfig())
+
+    print(f"{args.tasks} tasks x {args.files} reads, {args.malformed:.0%} of unconstrained calls malformed")
+    print(f"{'run':>7} {'LLM calls':>10} {'calls/task':>11} {'runs/task':>10} {'unfinished':>11}")
+    for label, (calls, agent_runs, unfinished) in runs.items():
+        print(f"{label:>7} {calls:>10} {calls / args.tasks:>11.2f} {agent_runs / args.tasks:>10.2f} {unfinished:>11}")
+    before, after = runs["before"], runs["after"]
+    print(f"{before[0] / after[0]:.2f}x fewer loop iterations per task")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
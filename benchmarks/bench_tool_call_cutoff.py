@@ -0,0 +1,107 @@
+"""Benchmark: tokens generated after a JSON tool call is already complete.
+
+Usage:
+    python benchmarks/bench_tool_call_cutoff.py
+    python benchmarks/bench_tool_call_cutoff.py --chatter 300 --token-ms 20 --steps 5
+
+Runs a scripted executor session through ``BaseAgent.agentic_loop``
+against a stand-in model that streams like a local model without native
+tool calling: each step is a JSON ``read`` call written into the text,
+followed by ``--chatter`` tokens explaining it, one token every
+``--token-ms`` ms. "before" reads every reply to the end
+(``stop_at_tool_call=False``), as the loop used to; "after" closes the
+stream once the call is complete and prose follows. Reports the tokens
+generated, how many of those came after a complete call, and wall time.
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from penguincode_cli.agents.base import AgentConfig, BaseAgent, Permission
+from penguincode_cli.ollama.types import ChatResponse, Message
+
+CHATTER = [" This", " reads", " the", " file", " so", " I", " can", " see", " how", " it", " works", "."]
+
+
+class LoopAgent(BaseAgent):
+    async def run(self, task, **kwargs):
+        return await self.agentic_loop(task)
+
+
+class TalkativeModel:
+    """Streams a JSON tool call per step, then keeps explaining it."""
+
+    def __init__(self, paths, chatter: int, token_seconds: float):
+        self.calls = [json.dumps({"name": "read", "arguments": {"path": str(p)}}) for p in paths]
+        self.chatter = chatter
+        self.token_seconds = token_seconds
+        self.generated = 0  # Tokens the model actually produced
+
+    async def _token(self, text):
+        await asyncio.sleep(self.token_seconds)
+        self.generated += 1
+        return ChatResponse(model="m", created_at="", done=False,
+                            message=Message(role="assistant", content=text))
+
+    async def chat(self, model, messages, tools=None, stream=True, **kwargs):
+        if not self.calls:
+            yield await self._token("All done.")
+            yield ChatResponse(model=model, created_at="", done=True, eval_count=1,
+                               message=Message(role="assistant", content=""))
+            return
+        call = self.calls.pop(0)
+        # JSON arrives a few characters per token
+        for i in range(0, len(call), 4):
+            yield await self._token(call[i:i + 4])
+        tokens = (len(call) + 3) // 4
+        for i in range(self.chatter):
+            yield await self._token(CHATTER[i % len(CHATTER)])
+        yield ChatResponse(model=model, created_at="", done=True, eval_count=tokens + self.chatter,
+                           message=Message(role="assistant", content=""))
+
+
+async def run_loop(root: Path, steps: int, chatter: int, token_ms: float, stop: bool):
+    paths = []
+    for i in range(steps):
+        paths.append(root / f"module_{i}.py")
+        paths[-1].write_text(f"def handler_{i}(value):\n    return value\n")
+    model = TalkativeModel(paths, chatter, token_ms / 1000)
+    config = AgentConfig(name="bench", model="m", description="", permissions=[Permission.READ],
+                         max_iterations=steps + 1, stop_at_tool_call=stop)
+    start = time.perf_counter()
+    result = await LoopAgent(config, model, working_dir=str(root)).agentic_loop("survey the modules")
+    elapsed = time.perf_counter() - start
+    assert result.success and len(result.tool_calls) == steps, result.error
+    return model.generated, result.usage.wasted_tokens, elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=5, help="Tool calls in the session")
+    parser.add_argument("--chatter", type=int, default=300, help="Tokens of explanation after each call")
+    parser.add_argument("--token-ms", type=float, default=5.0, help="Milliseconds per generated token")
+    args = parser.parse_args()
+
+    runs = {}
+    for label, stop in (("before", False), ("after", True)):
+        tmp = Path(tempfile.mkdtemp(prefix="bench_cutoff_"))
+        try:
+            runs[label] = await run_loop(tmp, args.steps, args.chatter, args.token_ms, stop)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{args.steps} steps, {args.chatter} tokens of chatter per call, {args.token_ms} ms/token")
+    print(f"{'run':>7} {'generated':>10} {'wasted':>7} {'seconds':>8}")
+    for label, (generated, wasted, elapsed) in runs.items():
+        print(f"{label:>7} {generated:>10} {wasted:>7} {elapsed:>8.2f}")
+    before, after = runs["before"], runs["after"]
+    print(f"{before[0] / after[0]:.1f}x fewer tokens generated, {before[2] / after[2]:.1f}x faster")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
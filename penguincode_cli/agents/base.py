@@ -1,5 +1,6 @@
 """Base agent class with tool access, permissions, and agentic loop."""
 
+import asyncio
 import json
 import time
 from abc import ABC, abstractmethod
@@ -7,7 +8,21 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from penguincode_cli.ollama import Message, OllamaClient
+from penguincode_cli.ollama import (
+    ChatAccumulator,
+    Message,
+    OllamaClient,
+    ROLE_AGENT,
+    TokenBudget,
+    UsageStats,
+    get_generation,
+    get_structured_output,
+    structured_answer,
+    supports_native_tools,
+    tool_call_schema,
+)
+from penguincode_cli.ollama.structured import ANSWER_INSTRUCTION
+from penguincode_cli.shared.interfaces import IToolExecutor
 from penguincode_cli.tools import (
     BashTool,
     EditFileTool,
@@ -15,8 +30,10 @@ from penguincode_cli.tools import (
     GrepTool,
     ReadFileTool,
     ToolResult,
+    ToolResultCache,
     WriteFileTool,
 )
+from penguincode_cli.tools.result_cache import CACHEABLE_TOOLS
 from penguincode_cli.ui import console
 
 
@@ -39,9 +56,18 @@ class AgentConfig:
     description: str
     permissions: List[Permission] = field(default_factory=list)
     system_prompt: Optional[str] = None
-    temperature: float = 0.7
-    max_tokens: int = 4096
+    # Generation options (None: `agents.<name>`, then `generation`/`defaults`
+    # in the settings)
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
     max_iterations: int = 10  # Max tool calling iterations
+    max_parallel_tools: int = 4  # Read-only tool calls run at once
+    # Tokens of tool history resent each iteration; older results are elided
+    # past this (None = resend everything the context window allows)
+    history_budget_tokens: Optional[int] = 3072
+    # Close the reply stream once a JSON tool call is complete and the model
+    # has moved on to prose (what follows is discarded anyway)
+    stop_at_tool_call: bool = True
 
 
 @dataclass
@@ -55,6 +81,7 @@ class AgentResult:
     tool_calls: List[Dict[str, Any]] = field(default_factory=list)
     tokens_used: int = 0
     duration_ms: float = 0.0
+    usage: UsageStats = field(default_factory=UsageStats)  # Summed over all LLM calls
     # Escalation support - when agent gets stuck, ask orchestrator for help
     needs_escalation: bool = False
     escalation_context: Optional[str] = None  # Details for the orchestrator
@@ -62,16 +89,27 @@ class AgentResult:
 
 # Import tool definitions from dedicated module
 from .tool_defs import TOOL_DEFINITIONS
+from .loop_history import LoopHistory, ToolOutcome
+from .tool_stream import ToolCallDetector, parse_tool_calls, read_reply
+
+# Prefixed to tool output served from the result cache
+CACHED_RESULT_NOTE = "(cached: nothing has changed since this call last ran)"
 
 
 class BaseAgent(ABC):
     """Base agent with tool access, permission management, and agentic loop."""
 
+    # Tools with no side effects; calls to these may run concurrently
+    READ_ONLY_TOOLS = frozenset({"read", "grep", "glob", "web_search", "web_fetch"})
+
     def __init__(
         self,
         config: AgentConfig,
         ollama_client: OllamaClient,
         working_dir: Optional[str] = None,
+        tool_executor: Optional[IToolExecutor] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        token_budget: Optional[TokenBudget] = None,
     ):
         """
         Initialize agent.
@@ -80,10 +118,22 @@ class BaseAgent(ABC):
             config: Agent configuration
             ollama_client: Ollama client instance
             working_dir: Working directory for file operations
+            tool_executor: Runs the tools it provides instead of the in-process
+                ones (server mode: the client executes them)
+            tool_cache: Result cache for read/grep/glob, usually shared by a
+                session's agents
+            token_budget: Sizes the loop's prompts to the model's context
+                window (default: a budget with the default window)
         """
         self.config = config
         self.client = ollama_client
         self.working_dir = working_dir or "."
+        self.tool_executor = tool_executor
+        self.tool_cache = tool_cache
+        self.token_budget = token_budget or TokenBudget(ollama_client)
+
+        # Caps concurrent read-only tool calls for this agent
+        self._tool_slots = asyncio.Semaphore(max(1, config.max_parallel_tools))
 
         # Initialize tools based on permissions
         self._init_tools()
@@ -101,8 +151,8 @@ class BaseAgent(ABC):
             self.tool_definitions.append(TOOL_DEFINITIONS["read"])
 
         if Permission.SEARCH in self.config.permissions:
-            self.tools["grep"] = GrepTool()
-            self.tools["glob"] = GlobTool()
+            self.tools["grep"] = GrepTool(index_root=self.working_dir)
+            self.tools["glob"] = GlobTool(index_root=self.working_dir)
             self.tool_definitions.append(TOOL_DEFINITIONS["grep"])
             self.tool_definitions.append(TOOL_DEFINITIONS["glob"])
 
@@ -138,8 +188,54 @@ class BaseAgent(ABC):
                 error=f"Tool '{tool_name}' not available for this agent",
             )
 
-        tool = self.tools[tool_name]
-        return await tool.execute(**kwargs)
+        if self.tool_cache is not None:
+            return await self.tool_cache.run(
+                tool_name, kwargs, lambda: self._run_tool(tool_name, kwargs)
+            )
+        return await self._run_tool(tool_name, kwargs)
+
+    async def _run_tool(self, tool_name: str, kwargs: Dict[str, Any]) -> ToolResult:
+        """Run a tool in-process or through the tool executor."""
+        try:
+            if self.tool_executor and tool_name in self.tool_executor.get_available_tools():
+                result = await self.tool_executor.execute(tool_name, kwargs)
+                return ToolResult(
+                    success=result.success,
+                    data=result.data,
+                    error=result.error or None,
+                )
+
+            tool = self.tools[tool_name]
+            return await tool.execute(**kwargs)
+        finally:
+            if tool_name not in self.READ_ONLY_TOOLS:
+                self._report_change(tool_name, kwargs)
+
+    def _report_change(self, tool_name: str, kwargs: Dict[str, Any]) -> None:
+        """Tell this session's result cache what a modifying tool may have changed."""
+        if self.tool_cache is None:
+            return
+        if tool_name in ("write", "edit") and "path" in kwargs:
+            self.tool_cache.mark_changed(str(kwargs["path"]))
+        else:
+            self.tool_cache.mark_all_changed()
+
+    def _tool_calls_from_json(self, data: Any) -> List[Dict]:
+        """
+        Tool calls in a JSON value the model wrote into its reply.
+
+        Accepts ``{"name": ..., "arguments": {...}}`` and the shorthand
+        ``{tool_name: {args}}``; anything else is not a call.
+        """
+        if not isinstance(data, dict):
+            return []
+        if "name" in data and ("arguments" in data or "parameters" in data):
+            return [data]
+        return [
+            {"name": name, "arguments": args if isinstance(args, dict) else {}}
+            for name, args in data.items()
+            if name in self.tools
+        ]
 
     def _parse_tool_calls(self, response_text: str) -> List[Dict]:
         """
@@ -148,57 +244,7 @@ class BaseAgent(ABC):
         Some models return tool calls as JSON in the response instead of
         using the structured tool_calls field.
         """
-        tool_calls = []
-
-        try:
-            # Look for JSON blocks that might be tool calls
-            if "{" in response_text and "}" in response_text:
-                # Try to find JSON objects
-                start = 0
-                while True:
-                    start = response_text.find("{", start)
-                    if start == -1:
-                        break
-
-                    # Find matching closing brace
-                    brace_count = 0
-                    end = start
-                    for i, char in enumerate(response_text[start:], start):
-                        if char == "{":
-                            brace_count += 1
-                        elif char == "}":
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end = i + 1
-                                break
-
-                    if end > start:
-                        try:
-                            json_str = response_text[start:end]
-                            data = json.loads(json_str)
-
-                            # Check if this looks like a tool call
-                            if "name" in data and ("arguments" in data or "parameters" in data):
-                                tool_calls.append(data)
-                            elif isinstance(data, dict) and any(
-                                key in self.tools for key in data.keys()
-                            ):
-                                # Handle {tool_name: {args}}
-                                for name, args in data.items():
-                                    if name in self.tools:
-                                        tool_calls.append({
-                                            "name": name,
-                                            "arguments": args if isinstance(args, dict) else {}
-                                        })
-                        except json.JSONDecodeError:
-                            pass
-
-                    start = end
-
-        except Exception:
-            pass
-
-        return tool_calls
+        return parse_tool_calls(response_text, self._tool_calls_from_json)
 
     def _detect_tool_intent(self, response_text: str, task: str) -> List[Dict]:
         """
@@ -473,6 +519,60 @@ class BaseAgent(ABC):
         # Return None to fall back to normal flow
         return None
 
+    @staticmethod
+    def _tool_call_name(tool_call: Any) -> Optional[str]:
+        """Tool name of a dict- or object-style tool call."""
+        if isinstance(tool_call, dict):
+            return tool_call.get("name") or tool_call.get("function", {}).get("name")
+        return getattr(tool_call, "name", None)
+
+    @staticmethod
+    def _tool_call_arguments(arguments: Any) -> Dict[str, Any]:
+        """Tool call arguments as a dict (they may arrive JSON-encoded)."""
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments)
+            except json.JSONDecodeError:
+                return {}
+        return arguments if isinstance(arguments, dict) else {}
+
+    async def _execute_tool_calls(self, tool_calls: List[Dict]) -> List[str]:
+        """
+        Execute one turn's tool calls, running independent reads concurrently.
+
+        Consecutive read-only calls run together (at most
+        ``config.max_parallel_tools`` at once). Any other call waits for
+        everything before it and finishes before anything after it starts,
+        so writes, edits and commands keep the order the model gave them.
+
+        Args:
+            tool_calls: Tool calls from one LLM response
+
+        Returns:
+            String results, in the same order as the calls
+        """
+        results: List[str] = [""] * len(tool_calls)
+        reads: List[int] = []
+
+        async def run_read(index: int) -> None:
+            async with self._tool_slots:
+                results[index] = await self._execute_tool_call(tool_calls[index])
+
+        async def flush_reads() -> None:
+            if reads:
+                await asyncio.gather(*(run_read(index) for index in reads))
+                reads.clear()
+
+        for index, tool_call in enumerate(tool_calls):
+            if self._tool_call_name(tool_call) in self.READ_ONLY_TOOLS:
+                reads.append(index)
+            else:
+                await flush_reads()
+                results[index] = await self._execute_tool_call(tool_call)
+        await flush_reads()
+
+        return results
+
     async def _execute_tool_call(self, tool_call: Dict) -> str:
         """
         Execute a single tool call and return the result.
@@ -516,6 +616,8 @@ class BaseAgent(ABC):
             if result.success:
                 # Truncate very long outputs
                 data_str = str(result.data)
+                if result.metadata and result.metadata.get("cached"):
+                    data_str = f"{CACHED_RESULT_NOTE}\n{data_str}"
                 if len(data_str) > 3000:
                     data_str = data_str[:3000] + f"\n... (truncated, {len(data_str)} chars total)"
                 return data_str
@@ -530,6 +632,9 @@ class BaseAgent(ABC):
         Run the agentic loop: LLM decides tools to call, we execute them,
         repeat until LLM provides final answer.
 
+        Tool rounds are kept in a LoopHistory, so each prompt resends at
+        most ``history_budget_tokens`` of them (older results elided).
+
         Args:
             task: The task to complete
 
@@ -538,17 +643,28 @@ class BaseAgent(ABC):
         """
         start_time = time.time()
         tool_calls_log: List[Dict] = []
+        usage = UsageStats()
 
-        # Build initial messages
-        messages = []
+        model = self.config.model
+        tools = self.tool_definitions if self.tool_definitions else None
+        # Context length and tool support (probed once per model digest)
+        await self.token_budget.load(model)
 
-        # System prompt
+        # Models without native tool calling get replies constrained to one
+        # call or an answer, instead of tools they would ignore
+        schema = None
+        if tools and not supports_native_tools(model) and get_structured_output().constrained(model):
+            schema, tools = tool_call_schema(tools), None
+
+        # System prompt and task, sent first on every iteration
         system_prompt = self.config.system_prompt or self._default_system_prompt()
+        if schema is not None:
+            system_prompt += f"\n\n{ANSWER_INSTRUCTION}"
         system_prompt += f"\n\nWorking directory: {self.working_dir}"
-        messages.append(Message(role="system", content=system_prompt))
-
-        # Add the task
-        messages.append(Message(role="user", content=task))
+        head = [
+            Message(role="system", content=system_prompt),
+            Message(role="user", content=task),
+        ]
 
         iteration = 0
         final_response = ""
@@ -559,61 +675,100 @@ class BaseAgent(ABC):
         max_consecutive_errors = 3
         max_repeat_detection = 3
 
+        tools_chars = len(json.dumps(tools)) if tools else 0
+        tools_tokens = self.token_budget.chars_to_tokens(model, tools_chars)
+        options = self._generation_options()
+        reserve = self._response_reserve(tools_chars, options)
+
+        # Tool rounds are compacted so every prompt stays within a fixed size
+        history_budget = self.config.history_budget_tokens
+        if history_budget is not None:
+            room = (
+                self.token_budget.budget(model, reserve)
+                - self.token_budget.estimate_messages(model, head)
+            )
+            history_budget = max(0, min(history_budget, room))
+        history = LoopHistory(head, self.token_budget, model, budget_tokens=history_budget)
+
         while iteration < self.config.max_iterations:
             iteration += 1
 
             # Call the LLM with tools
             try:
-                response_text = ""
-                tool_calls = []
-
-                async for chunk in self.client.chat(
-                    model=self.config.model,
-                    messages=messages,
-                    tools=self.tool_definitions if self.tool_definitions else None,
-                    stream=True,
-                ):
-                    if chunk.message and chunk.message.content:
-                        response_text += chunk.message.content
-
-                    # Check for tool calls in response metadata
-                    # Note: Ollama may include tool_calls in the final chunk
-                    if chunk.done and hasattr(chunk, "message"):
-                        msg = chunk.message
-                        if hasattr(msg, "tool_calls") and msg.tool_calls:
-                            tool_calls.extend(msg.tool_calls)
-
-                # If no structured tool calls, try parsing from response text
-                if not tool_calls:
-                    tool_calls = self._parse_tool_calls(response_text)
+                # Still guarded against the window (a huge task or latest round)
+                prompt = self.token_budget.fit_messages(
+                    model, history.messages(), reserve_tokens=reserve
+                )
+                # num_ctx sized to this prompt (see ollama/generation.py)
+                prompt_tokens = self.token_budget.estimate_messages(model, prompt) + tools_tokens
+                call_options = get_generation().sized(
+                    model, options, prompt_tokens, self.token_budget.window(model)
+                )
+
+                # JSON calls in the text are picked up as they stream, and
+                # the stream is closed once the model moves on to prose
+                reply = ChatAccumulator()
+                detector = ToolCallDetector(self._tool_calls_from_json, allowed=self.tools)
+                call_usage = await read_reply(
+                    self.client.chat(
+                        model=model,
+                        messages=prompt,
+                        tools=tools,
+                        stream=True,
+                        format=schema,
+                        options=call_options,
+                    ),
+                    reply,
+                    detector,
+                    stop_early=self.config.stop_at_tool_call,
+                )
+                usage.add(call_usage)
+                get_generation().record(ROLE_AGENT, model, call_options, prompt_tokens, call_usage)
+                if reply.done:
+                    self.token_budget.observe(
+                        model, prompt, reply.usage.prompt_tokens, extra_chars=tools_chars
+                    )
+                response_text = reply.text
+
+                # Structured tool calls first, then JSON calls from the text
+                tool_calls = reply.tool_calls or detector.calls
+                answer = None
+                if schema is not None and not tool_calls:
+                    answer = structured_answer(response_text)
+                    response_text = answer if answer is not None else response_text
 
                 # If still no tool calls, try detecting intent from natural language
                 # BUT only on first iteration - after that, if LLM isn't calling tools
                 # explicitly, it's likely done or confused. This prevents infinite loops.
-                if not tool_calls and iteration == 1:
+                # A constrained reply that answered chose not to call a tool.
+                if not tool_calls and iteration == 1 and answer is None:
                     tool_calls = self._detect_tool_intent(response_text, task)
 
                 # If we have tool calls, execute them
                 if tool_calls:
-                    # Add assistant message with the response
-                    messages.append(Message(role="assistant", content=response_text or "Executing tools..."))
-
-                    # Execute each tool call
-                    tool_results = []
+                    # Execute the tool calls (reads concurrently), then record
+                    # them in call order so loop detection is deterministic
+                    tool_results = await self._execute_tool_calls(tool_calls)
                     has_error = False
-                    for tc in tool_calls:
+                    outcomes: List[ToolOutcome] = []
+                    for tc, result in zip(tool_calls, tool_results):
                         # Create a signature for this tool call to detect repeats
                         tool_name = tc.get("name") or tc.get("function", {}).get("name")
                         tool_args = tc.get("arguments") or tc.get("function", {}).get("arguments", {})
                         tool_signature = f"{tool_name}:{json.dumps(tool_args, sort_keys=True)}"
 
-                        result = await self._execute_tool_call(tc)
+                        cached = result.startswith(CACHED_RESULT_NOTE)
                         tool_calls_log.append({
                             "tool": tool_name,
                             "arguments": tool_args,
-                            "result": result[:500] if len(result) > 500 else result
+                            "result": result[:500] if len(result) > 500 else result,
+                            "cached": cached,
                         })
-                        tool_results.append(result)
+                        outcomes.append(ToolOutcome(
+                            name=tool_name or "unknown",
+                            arguments=self._tool_call_arguments(tool_args),
+                            output=result,
+                        ))
 
                         # Track if this result is an error
                         if result.startswith("Error") or "error" in result.lower()[:100]:
@@ -621,6 +776,15 @@ class BaseAgent(ABC):
                             consecutive_errors += 1
                         else:
                             consecutive_errors = 0
+                            # A repeated read that missed the cache saw changed
+                            # files, so it is progress rather than a loop; only
+                            # cache hits count as repeats
+                            if (
+                                self.tool_cache is not None
+                                and tool_name in CACHEABLE_TOOLS
+                                and not cached
+                            ):
+                                tool_signature += f"#{len(tool_calls_log)}"
 
                         # Track recent tool calls for loop detection
                         recent_tool_calls.append(tool_signature)
@@ -634,12 +798,6 @@ class BaseAgent(ABC):
                         if len(set(last_calls)) == 1:  # All same
                             is_looping = True
 
-                    # Build tool response message
-                    tool_response = "\n\n".join(
-                        f"[Tool: {tc.get('name', 'unknown')}]\n{result}"
-                        for tc, result in zip(tool_calls, tool_results)
-                    )
-
                     # If we detect a loop or repeated errors, escalate to orchestrator
                     if is_looping:
                         console.print("  [yellow]⚠️ Loop detected - escalating to orchestrator[/yellow]")
@@ -681,16 +839,19 @@ The executor attempted the same operation {max_repeat_detection} times without s
                             error=f"Executor stuck in loop. Last error: {last_error[:200]}",
                             tool_calls=tool_calls_log,
                             duration_ms=duration_ms,
+                            tokens_used=usage.total_tokens,
+                            usage=usage,
                             needs_escalation=True,
                             escalation_context=escalation_context,
                         )
 
-                    elif consecutive_errors >= max_consecutive_errors:
-                        tool_response += f"\n\n⚠️ REPEATED ERRORS ({consecutive_errors}): Stop and analyze the errors before continuing.\n"
-                        tool_response += "What is the actual problem? Fix it before retrying the same approach.\n"
+                    guidance = ""
+                    if consecutive_errors >= max_consecutive_errors:
+                        guidance = f"\n\n⚠️ REPEATED ERRORS ({consecutive_errors}): Stop and analyze the errors before continuing.\n"
+                        guidance += "What is the actual problem? Fix it before retrying the same approach.\n"
                         console.print(f"  [yellow]⚠️ {consecutive_errors} consecutive errors - injecting guidance[/yellow]")
 
-                    messages.append(Message(role="user", content=f"Tool results:\n{tool_response}"))
+                    history.add_round(response_text, outcomes, note=guidance)
                     continue
 
                 # No tool calls - this is the final response
@@ -706,6 +867,8 @@ The executor attempted the same operation {max_repeat_detection} times without s
                     error=f"LLM error: {str(e)}",
                     tool_calls=tool_calls_log,
                     duration_ms=duration_ms,
+                    tokens_used=usage.total_tokens,
+                    usage=usage,
                 )
 
         duration_ms = (time.time() - start_time) * 1000
@@ -719,6 +882,8 @@ The executor attempted the same operation {max_repeat_detection} times without s
                 error=f"Agent reached max iterations ({self.config.max_iterations}) without completing",
                 tool_calls=tool_calls_log,
                 duration_ms=duration_ms,
+                tokens_used=usage.total_tokens,
+                usage=usage,
             )
 
         return AgentResult(
@@ -727,8 +892,29 @@ The executor attempted the same operation {max_repeat_detection} times without s
             output=final_response,
             tool_calls=tool_calls_log,
             duration_ms=duration_ms,
+            tokens_used=usage.total_tokens,
+            usage=usage,
         )
 
+    def _generation_options(self) -> Dict[str, Any]:
+        """Ollama options for this agent's loop (``num_ctx`` is sized per call)."""
+        return get_generation().resolve(
+            ROLE_AGENT,
+            agent=self.config.name,
+            temperature=self.config.temperature,
+            num_predict=self.config.max_tokens,
+        )
+
+    def _response_reserve(
+        self, tools_chars: int = 0, options: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Tokens kept free in the window for tool definitions and the response."""
+        model = self.config.model
+        default_reserve = self.token_budget.window(model) - self.token_budget.budget(model)
+        num_predict = (options or self._generation_options()).get("num_predict") or 0
+        response = min(num_predict, default_reserve) if num_predict > 0 else default_reserve
+        return response + self.token_budget.chars_to_tokens(model, tools_chars)
+
     def _default_system_prompt(self) -> str:
         """Return default system prompt for this agent type."""
         tools_available = ", ".join(self.tools.keys()) if self.tools else "none"
@@ -11,17 +11,47 @@ execute multiple agents in parallel (up to max_concurrent_agents).
 """
 
 import asyncio
+import contextlib
 import json
 import re
-from typing import Dict, List, Optional, Tuple
-
-from penguincode_cli.ollama import Message, OllamaClient
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from penguincode_cli.ollama import (
+    ChatAccumulator,
+    ContextSection,
+    Message,
+    OllamaClient,
+    PRIORITY_AGENT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    ROLE_MEMORY,
+    ROLE_REVIEW,
+    ROLE_ROUTING,
+    ROLE_SUMMARY,
+    request_priority,
+    TokenBudget,
+    UsageStats,
+    get_generation,
+    get_model_registry,
+    get_structured_output,
+    structured_answer,
+    supports_native_tools,
+    tool_call_schema,
+)
+from penguincode_cli.ollama.prompt_cache import assemble_messages
+from penguincode_cli.ollama.structured import ANSWER_INSTRUCTION
+from penguincode_cli.ollama.token_budget import MESSAGE_OVERHEAD_TOKENS
+from penguincode_cli.shared.interfaces import IToolExecutor
+from penguincode_cli.shared.transport import get_transport
+from penguincode_cli.tools.result_cache import ToolResultCache
 from penguincode_cli.config.settings import Settings
 from penguincode_cli.ui import console
 from penguincode_cli.core.debug import (
     log_llm_request, log_llm_response, log_agent_spawn,
     log_agent_result, log_intent_detection, log_error, warning, debug
 )
+from penguincode_cli.core.usage import ORCHESTRATOR, UsageTracker
 
 from .prompts import (
     CHAT_SYSTEM_PROMPT,
@@ -30,6 +60,22 @@ from .prompts import (
     AGENT_TOOLS,
 )
 from .intent import detect_user_intent, estimate_complexity
+from .tool_stream import ToolCallDetector, parse_tool_calls, read_reply
+from .events import (
+    AgentResultEvent,
+    AgentSpawnEvent,
+    ChatEvent,
+    ErrorEvent,
+    StatusEvent,
+    TextDeltaEvent,
+    coalesce_text,
+)
+
+# Tools the orchestrator may call
+SPAWN_TOOLS = frozenset({"spawn_explorer", "spawn_executor", "spawn_planner", "spawn_researcher"})
+
+# Replies of orchestrator models without native tool calling
+ROUTING_SCHEMA = tool_call_schema(AGENT_TOOLS)
 
 
 class AgentSemaphore:
@@ -90,8 +136,8 @@ class ChatAgent:
     CONTEXT_THRESHOLD_PERCENT = 70  # Compact when history exceeds this % of context
     CONTEXT_RESERVE_PERCENT = 30    # Reserve this % for new messages + response
     MAX_MEMORY_RESULTS = 5          # Max memories to inject
-    # Approximate chars per token (for estimation)
-    CHARS_PER_TOKEN = 4
+    # Events buffered for a slow process_stream consumer before the turn blocks
+    EVENT_QUEUE_SIZE = 64
 
     def __init__(
         self,
@@ -100,6 +146,7 @@ class ChatAgent:
         project_dir: str,
         memory_manager=None,
         session_id: str = None,
+        tool_executor: Optional[IToolExecutor] = None,
     ):
         self.client = ollama_client
         self.settings = settings
@@ -114,6 +161,22 @@ class ChatAgent:
         self.memory_manager = memory_manager
         self.session_id = session_id or "default"
 
+        # Where spawned agents run file/shell tools (None: in-process)
+        self.tool_executor = tool_executor
+        # Read/search results shared by the agents of a turn (cleared each turn;
+        # a remote client's files can't be stat'ed here, and its relative paths
+        # are relative to its project dir, not this process's cwd)
+        self.tool_cache = ToolResultCache(
+            check_files=tool_executor is None,
+            base_dir=project_dir if tool_executor is not None else None,
+        )
+        # Model context windows and token estimates, shared with the agents
+        self.token_budget = TokenBudget(
+            ollama_client, max_window=settings.defaults.context_window
+        )
+        # How the last routing prompt was packed (see _build_turn_messages)
+        self.last_context: Optional[Dict] = None
+
         # Lazy-loaded specialized agents
         self._explorer_agent = None
         self._executor_agent = None
@@ -126,11 +189,23 @@ class ChatAgent:
         # Max supervision iterations (prevent infinite loops)
         self.max_supervision_rounds = 3
 
+        # Close routing replies once a spawn call is complete (see _call_llm)
+        self.stop_at_tool_call = True
+
         # Agent concurrency control
         max_agents = settings.regulators.max_concurrent_agents
         self.agent_semaphore = AgentSemaphore(max_concurrent=max_agents)
         self.agent_timeout = settings.regulators.agent_timeout_seconds
 
+        # Ollama model swaps caused by the most recent plan execution
+        self.last_plan_model_swaps: Optional[int] = None
+
+        # Token/latency accounting (per agent, plan step, turn and session)
+        self.usage = UsageTracker()
+
+        # Event sink while a process_stream consumer is attached
+        self._events: Optional[asyncio.Queue] = None
+
     def _get_explorer_agent(self, lite: bool = False):
         """
         Get explorer agent, optionally using lightweight model.
@@ -145,6 +220,9 @@ class ChatAgent:
             return ExplorerAgent(
                 ollama_client=self.client,
                 working_dir=self.project_dir,
+                tool_executor=self.tool_executor,
+                tool_cache=self.tool_cache,
+                token_budget=self.token_budget,
                 model=model,
             )
 
@@ -155,6 +233,9 @@ class ChatAgent:
             self._explorer_agent = ExplorerAgent(
                 ollama_client=self.client,
                 working_dir=self.project_dir,
+                tool_executor=self.tool_executor,
+                tool_cache=self.tool_cache,
+                token_budget=self.token_budget,
                 model=model,
             )
         return self._explorer_agent
@@ -174,6 +255,9 @@ class ChatAgent:
             return ExecutorAgent(
                 ollama_client=self.client,
                 working_dir=self.project_dir,
+                tool_executor=self.tool_executor,
+                tool_cache=self.tool_cache,
+                token_budget=self.token_budget,
                 model=model,
             )
 
@@ -183,6 +267,9 @@ class ChatAgent:
             self._executor_agent = ExecutorAgent(
                 ollama_client=self.client,
                 working_dir=self.project_dir,
+                tool_executor=self.tool_executor,
+                tool_cache=self.tool_cache,
+                token_budget=self.token_budget,
                 model=self.settings.models.execution,
             )
         return self._executor_agent
@@ -194,6 +281,7 @@ class ChatAgent:
             self._planner_agent = PlannerAgent(
                 ollama_client=self.client,
                 model=self.settings.models.planning,
+                token_budget=self.token_budget,
             )
         return self._planner_agent
 
@@ -207,6 +295,9 @@ class ChatAgent:
                 ollama_client=self.client,
                 research_config=self.settings.research,
                 working_dir=self.project_dir,
+                tool_executor=self.tool_executor,
+                tool_cache=self.tool_cache,
+                token_budget=self.token_budget,
                 model=model,
             )
         return self._researcher_agent
@@ -217,6 +308,7 @@ class ChatAgent:
         task: str,
         force_lite: bool = False,
         force_full: bool = False,
+        step_num: Optional[int] = None,
     ) -> Tuple[bool, str]:
         """
         Spawn a specialized agent to handle a task.
@@ -229,6 +321,7 @@ class ChatAgent:
             task: Task description
             force_lite: Force use of lightweight model
             force_full: Force use of full model
+            step_num: Plan step this agent is executing (for usage accounting)
 
         Returns:
             Tuple of (success, output)
@@ -258,6 +351,9 @@ class ChatAgent:
             warning(f"Unknown agent type requested: {agent_type}")
             return False, f"Unknown agent type: {agent_type}"
 
+        await self._emit(AgentSpawnEvent(agent_type=agent_type, task=task))
+        start = time.monotonic()
+
         try:
             # Acquire semaphore slot
             await self.agent_semaphore.acquire()
@@ -267,10 +363,17 @@ class ChatAgent:
                     agent.run(task),
                     timeout=self.agent_timeout
                 )
+                self.usage.record_agent_run(
+                    agent_type, result.success, result.duration_ms, result.usage, step_num
+                )
 
                 # Check for escalation request
                 if result.needs_escalation:
                     console.print("[yellow]> Agent requesting orchestrator help[/yellow]")
+                    await self._emit(AgentResultEvent(
+                        agent_type, False, "Escalated to orchestrator",
+                        result.duration_ms, result.usage,
+                    ))
                     # Return special escalation result
                     return False, f"ESCALATION_NEEDED:{result.escalation_context}"
 
@@ -279,25 +382,34 @@ class ChatAgent:
 
                 # Log the result
                 log_agent_result(agent_type, success, output)
+                await self._emit(AgentResultEvent(
+                    agent_type, success, output, result.duration_ms, result.usage
+                ))
                 return success, output
             finally:
                 self.agent_semaphore.release()
         except asyncio.TimeoutError:
             warning(f"Agent {agent_type} timed out after {self.agent_timeout}s")
-            return False, f"Agent timed out after {self.agent_timeout} seconds"
+            output = f"Agent timed out after {self.agent_timeout} seconds"
         except Exception as e:
             log_error(f"_spawn_agent({agent_type})", e)
-            return False, f"Agent failed: {str(e)}"
+            output = f"Agent failed: {str(e)}"
+        await self._emit(AgentResultEvent(
+            agent_type, False, output, (time.monotonic() - start) * 1000
+        ))
+        return False, output
 
     async def _spawn_agents_parallel(
         self,
-        tasks: List[Tuple[str, str]]  # List of (agent_type, task)
+        tasks: List[Tuple[str, str]],  # List of (agent_type, task)
+        step_nums: Optional[List[int]] = None,
     ) -> List[Tuple[bool, str]]:
         """
         Spawn multiple agents in parallel, respecting max_concurrent_agents.
 
         Args:
             tasks: List of (agent_type, task_description) tuples
+            step_nums: Optional plan step number for each task
 
         Returns:
             List of (success, output) tuples in same order as input
@@ -305,7 +417,8 @@ class ChatAgent:
         console.print(f"[cyan]> Spawning {len(tasks)} agents (max {self.agent_semaphore._max} concurrent)...[/cyan]")
 
         async def run_task(agent_type: str, task: str, index: int) -> Tuple[int, bool, str]:
-            success, output = await self._spawn_agent(agent_type, task)
+            step_num = step_nums[index] if step_nums else None
+            success, output = await self._spawn_agent(agent_type, task, step_num=step_num)
             return index, success, output
 
         # Create tasks
@@ -346,10 +459,15 @@ class ChatAgent:
         from .planner import Plan
 
         console.print(f"\n[bold cyan]Executing plan ({len(plan.steps)} steps)...[/bold cyan]")
+        await self._emit(StatusEvent("executing_plan", f"Executing plan ({len(plan.steps)} steps)"))
 
         step_results: Dict[int, Tuple[bool, str]] = {}
         all_outputs = []
 
+        # Model swaps are counted by the GPU scheduler (absent on a plain client)
+        swaps_before = getattr(self.client, "model_swaps", None)
+        self.usage.start_plan()
+
         for group_num, group in enumerate(plan.parallel_groups, 1):
             # Get steps for this group
             group_steps = [s for s in plan.steps if s.step_num in group]
@@ -363,15 +481,27 @@ class ChatAgent:
             tasks = [(step.agent_type, step.description) for step in group_steps]
 
             # Execute in parallel
-            results = await self._spawn_agents_parallel(tasks)
+            results = await self._spawn_agents_parallel(
+                tasks, step_nums=[step.step_num for step in group_steps]
+            )
 
             # Store results
             for step, (success, output) in zip(group_steps, results):
                 step_results[step.step_num] = (success, output)
                 status = "[green]✓[/green]" if success else "[red]✗[/red]"
-                console.print(f"  {status} Step {step.step_num}: {step.description[:50]}...")
+                step_usage = self.usage.by_step.get(step.step_num, UsageStats())
+                console.print(
+                    f"  {status} Step {step.step_num}: {step.description[:50]}... "
+                    f"[dim]({step_usage.total_tokens} tokens)[/dim]"
+                )
                 all_outputs.append(f"### Step {step.step_num}: {step.description}\n{output}")
 
+        if swaps_before is not None:
+            swaps = self.client.model_swaps - swaps_before
+            self.last_plan_model_swaps = swaps
+            debug(f"Plan execution caused {swaps} model swap(s)")
+            console.print(f"[dim]Model swaps during plan: {swaps}[/dim]")
+
         # Combine outputs
         combined = "\n\n".join(all_outputs)
 
@@ -400,105 +530,119 @@ class ChatAgent:
             round_num=1
         )
 
+    @staticmethod
+    def _with_answer_instruction(messages: List[Message]) -> List[Message]:
+        """Messages whose system prompt says how to answer without a tool."""
+        if messages and messages[0].role == "system":
+            system, rest = messages[0].content, messages[1:]
+        else:
+            system, rest = "", messages
+        content = f"{system}\n\n{ANSWER_INSTRUCTION}" if system else ANSWER_INSTRUCTION
+        return [Message(role="system", content=content), *rest]
+
+    @staticmethod
+    def _tool_calls_from_json(data) -> List[Dict]:
+        """A spawn_* call written as JSON in the reply, if ``data`` is one."""
+        if isinstance(data, dict) and data.get("name") in SPAWN_TOOLS:
+            return [data]
+        return []
+
     def _parse_tool_calls(self, response_text: str) -> List[Dict]:
         """Parse tool calls from response text."""
-        tool_calls = []
-        valid_tools = {"spawn_explorer", "spawn_executor", "spawn_planner", "spawn_researcher"}
-
-        try:
-            if "{" in response_text and "}" in response_text:
-                start = 0
-                while True:
-                    start = response_text.find("{", start)
-                    if start == -1:
-                        break
+        return parse_tool_calls(response_text, self._tool_calls_from_json)
 
-                    brace_count = 0
-                    end = start
-                    for i, char in enumerate(response_text[start:], start):
-                        if char == "{":
-                            brace_count += 1
-                        elif char == "}":
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end = i + 1
-                                break
-
-                    if end > start:
-                        try:
-                            json_str = response_text[start:end]
-                            data = json.loads(json_str)
-                            if "name" in data and data["name"] in valid_tools:
-                                tool_calls.append(data)
-                        except json.JSONDecodeError:
-                            pass
-                    start = end
-        except Exception:
-            pass
+    async def _call_llm(
+        self,
+        messages: List[Message],
+        use_tools: bool = True,
+        timeout: float = 60.0,
+        priority: int = PRIORITY_AGENT,
+        stream_text: bool = False,
+        role: str = ROLE_ROUTING,
+    ) -> Tuple[str, List[Dict]]:
+        """Call the LLM and return response text and tool calls.
 
-        return tool_calls
+        ``priority`` is the GPU scheduler priority for this call; it has no
+        effect when the client is a plain OllamaClient. ``role`` picks the
+        generation options (``generation.roles`` in the settings), e.g. a
+        short ``num_predict`` for summaries.
 
-    async def _call_llm(self, messages: List[Message], use_tools: bool = True, timeout: float = 60.0) -> Tuple[str, List[Dict]]:
-        """Call the LLM and return response text and tool calls.
+        With ``stream_text`` the response is emitted as TextDeltaEvents while
+        it generates. Text that opens like a JSON tool call is held back and
+        only emitted at the end if it turns out not to be one.
 
         Note: Most local models don't support Ollama's native tool calling API.
         We don't pass tools to avoid empty responses, and instead rely on
         JSON parsing from the text response. The system prompt instructs the
-        model to output JSON tool calls.
+        model to output JSON tool calls, and unless structured output is
+        switched off for the model, ``format`` constrains the reply to a
+        spawn call or ``{"answer": ...}`` (see ollama/structured.py).
 
         Models that DO support native tools: llama3.1, mistral-nemo, firefunction-v2, command-r+
-        Models that DON'T: llama3.2, qwen2.5-coder, codellama, deepseek-coder
+        Models that DON'T: codellama, deepseek-coder
         """
-        response_text = ""
-        tool_calls = []
-
-        # Check if model supports native tool calling
-        # See: https://ollama.com/search?c=tools for full list
-        # See: https://ollama.com/blog/tool-support for implementation details
-        native_tool_models = {
-            # Llama family
-            "llama3.1", "llama3.2", "llama3.3", "llama4",
-            # Mistral family
-            "mistral", "mistral-nemo", "mistral-small", "mistral-large", "mixtral",
-            # Cohere Command-R family
-            "command-r", "command-r-plus", "command-r7b",
-            # Qwen family
-            "qwen2.5", "qwen2.5-coder", "qwen3",
-            # Others
-            "firefunction-v2", "hermes3",
-        }
-        model_base = self.model.split(":")[0].lower()
-        supports_native_tools = any(m in model_base for m in native_tool_models)
-
-        # Only pass tools if model supports them AND caller wants tools
-        pass_tools = use_tools and supports_native_tools
+        reply = ChatAccumulator()
+        show_text: Optional[bool] = None  # Decided once the response has started
+        streamed = 0  # Characters of response_text already emitted
+
+        # Only pass tools if model supports them AND caller wants tools;
+        # other models get replies constrained to a spawn call or an answer
+        native_tools = supports_native_tools(self.model)
+        pass_tools = use_tools and native_tools
+        schema = None
+        if use_tools and not native_tools and get_structured_output().constrained(self.model):
+            schema = ROUTING_SCHEMA
+            messages = self._with_answer_instruction(messages)
+
+        # Response cap and temperature for the role; num_ctx fits the prompt
+        prompt_tokens = self.token_budget.estimate_messages(self.model, messages)
+        if pass_tools:
+            prompt_tokens += self.token_budget.estimate(self.model, json.dumps(AGENT_TOOLS))
+        options = get_generation().options(
+            role, self.model, prompt_tokens, self.token_budget.window(self.model)
+        )
 
         # Debug logging
         log_llm_request(self.model, messages, AGENT_TOOLS if pass_tools else None)
 
+        async def show(delta: str) -> None:
+            nonlocal show_text, streamed
+            if show_text is None:
+                show_text = self._streamable(reply.text)
+                delta = reply.text  # Everything held back so far
+            if show_text:
+                await self._emit(TextDeltaEvent(delta))
+                streamed = reply.length
+
+        # Spawn calls in the text are picked up while streaming; once one is
+        # complete and followed by prose, the rest of the reply isn't generated
+        detector = ToolCallDetector(self._tool_calls_from_json)
+        usage: Optional[UsageStats] = None
         try:
             async with asyncio.timeout(timeout):
-                async for chunk in self.client.chat(
-                    model=self.model,
-                    messages=messages,
-                    tools=AGENT_TOOLS if pass_tools else None,
-                    stream=True,
-                ):
-                    if chunk.message and chunk.message.content:
-                        response_text += chunk.message.content
-
-                    # Check for tool_calls in ANY chunk, not just done=true
-                    # Ollama sends tool_calls in early chunks with done=false
-                    if hasattr(chunk, "message") and chunk.message:
-                        msg = chunk.message
-                        if hasattr(msg, "tool_calls") and msg.tool_calls:
-                            # Convert ToolCall objects to dict format
-                            for tc in msg.tool_calls:
-                                func = tc.function if hasattr(tc, 'function') else tc
-                                tool_calls.append({
-                                    "name": func.get("name", "") if isinstance(func, dict) else getattr(func, "name", ""),
-                                    "arguments": func.get("arguments", {}) if isinstance(func, dict) else getattr(func, "arguments", {}),
-                                })
+                with request_priority(priority):
+                    usage = await read_reply(
+                        self.client.chat(
+                            model=self.model,
+                            messages=messages,
+                            tools=AGENT_TOOLS if pass_tools else None,
+                            stream=True,
+                            format=schema,
+                            options=options,
+                        ),
+                        reply,
+                        detector,
+                        stop_early=self.stop_at_tool_call,
+                        # A constrained answer is JSON until unwrapped below
+                        on_text=show if stream_text and schema is None else None,
+                    )
+            if reply.done:
+                self.token_budget.observe(
+                    self.model,
+                    messages,
+                    reply.final.prompt_eval_count or 0,
+                    extra_chars=len(json.dumps(AGENT_TOOLS)) if pass_tools else 0,
+                )
         except asyncio.TimeoutError:
             warning("LLM response timed out after %s seconds", timeout)
             console.print("[yellow]LLM response timed out[/yellow]")
@@ -507,16 +651,28 @@ class ChatAgent:
             log_error("_call_llm", e)
             console.print(f"[red]LLM error: {e}[/red]")
             return "", []
+        finally:
+            usage = usage if usage is not None else reply.usage
+            self.usage.record(ORCHESTRATOR, usage)
+            get_generation().record(role, self.model, options, prompt_tokens, usage)
+
+        response_text = reply.text
+        # Structured tool calls first, then JSON calls from the text
+        tool_calls = reply.tool_calls or detector.calls
+        answer = structured_answer(response_text) if schema is not None and not tool_calls else None
+        if answer is not None:
+            response_text = answer
 
         # Debug log the response
         log_llm_response(response_text, tool_calls)
 
-        # Try parsing tool calls from text if none structured
-        if not tool_calls:
-            tool_calls = self._parse_tool_calls(response_text)
+        # Release held-back text that wasn't a tool call after all
+        if stream_text and not tool_calls and streamed < len(response_text):
+            await self._emit(TextDeltaEvent(response_text[streamed:]))
 
         # Check for agent keywords in response - more robust detection
-        if not tool_calls:
+        # (a constrained reply that answered chose not to call a tool)
+        if not tool_calls and answer is None:
             response_lower = response_text.lower()
 
             # Check for explicit function mentions
@@ -590,9 +746,12 @@ class ChatAgent:
         ]
 
         console.print("[dim]Reviewing work...[/dim]", end="\r")
+        await self._emit(StatusEvent("reviewing", f"Reviewing {agent_type} output"))
 
         try:
-            response_text, tool_calls = await self._call_llm(messages)
+            response_text, tool_calls = await self._call_llm(
+                messages, stream_text=True, role=ROLE_REVIEW
+            )
             console.print("                  ", end="\r")
 
             # Extract tool call info
@@ -655,8 +814,12 @@ class ChatAgent:
             Message(role="user", content=escalation_content),
         ]
 
+        await self._emit(StatusEvent("escalating", "Orchestrator analyzing escalation"))
+
         try:
-            response_text, tool_calls = await self._call_llm(messages)
+            response_text, tool_calls = await self._call_llm(
+                messages, stream_text=True, role=ROLE_REVIEW
+            )
 
             # Extract tool call info
             if tool_calls:
@@ -711,9 +874,9 @@ class ChatAgent:
             log_error("_handle_escalation", e)
             return f"Escalation handling failed: {str(e)}"
 
-    async def process(self, user_message: str) -> str:
+    async def process(self, user_message: str, docs_context: str = "") -> str:
         """
-        Process a user message.
+        Process a user message (one turn for usage accounting).
 
         The chat agent will either:
         1. Respond directly (knowledge base role)
@@ -725,7 +888,24 @@ class ChatAgent:
         - Includes conversation summary if history was compacted
         - Auto-compacts history when approaching context window limit
         - Extracts and stores important facts after each exchange
+        - Packs all of it into the model's context window by priority
+
+        Args:
+            user_message: The user's message
+            docs_context: Documentation retrieved for the message, if any
         """
+        self.usage.start_turn()
+        self.tool_cache.clear()
+        try:
+            return await self._process_turn(user_message, docs_context)
+        finally:
+            self.usage.end_turn()
+
+    async def _process_turn(self, user_message: str, docs_context: str = "") -> str:
+        """Route a user message and produce the response (see process)."""
+        # Learn the model's real context window (and tool support) before sizing anything
+        await self.token_budget.load(self.model)
+
         # Check if we need to compact history before processing
         if self._needs_compaction():
             await self._compact_history()
@@ -733,24 +913,15 @@ class ChatAgent:
         # Search long-term memory for relevant context
         memories = await self._search_memories(user_message)
 
-        # Build context from memories and summary
-        context = self._build_context_with_memories(memories, self.conversation_summary)
-
-        # Build system prompt with context
-        system_content = self.system_prompt
-        if context:
-            system_content = f"{context}---\n\n{self.system_prompt}"
-
-        messages = [
-            Message(role="system", content=system_content),
-        ]
-        messages.extend(self.conversation_history[-10:])
-        messages.append(Message(role="user", content=user_message))
+        messages = self._build_turn_messages(user_message, memories, docs_context)
 
         console.print("[dim]Routing request...[/dim]")
+        await self._emit(StatusEvent("routing", "Routing request"))
 
         try:
-            response_text, tool_calls = await self._call_llm(messages)
+            response_text, tool_calls = await self._call_llm(
+                messages, priority=PRIORITY_INTERACTIVE, stream_text=True
+            )
 
             # Debug: show what we got back
             if response_text:
@@ -836,6 +1007,68 @@ class ChatAgent:
             console.print("            ", end="\r")
             return f"Error: {str(e)}"
 
+    async def process_stream(self, user_message: str) -> AsyncIterator[ChatEvent]:
+        """
+        Process a user message, yielding events as the turn progresses.
+
+        Runs ``process`` in a task that pushes events into a bounded queue,
+        so a consumer that stops reading (a slow gRPC client) pauses the
+        turn rather than letting events pile up. Closing the iterator early
+        cancels the turn.
+
+        Args:
+            user_message: The user's message
+
+        Yields:
+            ChatEvents, ending with a final TextDeltaEvent (or an ErrorEvent)
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.EVENT_QUEUE_SIZE)
+
+        async def run_turn() -> None:
+            try:
+                last: ChatEvent = TextDeltaEvent(await self.process(user_message), is_final=True)
+            except Exception as e:
+                log_error("process_stream", e)
+                last = ErrorEvent("CHAT_ERROR", str(e))
+            await queue.put(last)
+            await queue.put(None)  # End of turn (not sent if cancelled)
+
+        self._events = queue
+        task = asyncio.create_task(run_turn())
+        try:
+            while True:
+                batch = [await queue.get()]
+                # Coalesce tokens that queued up while the consumer was busy
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                for event in coalesce_text(batch):
+                    if event is None:
+                        return
+                    yield event
+        finally:
+            self._events = None
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+    async def _emit(self, event: ChatEvent) -> None:
+        """Send an event to the attached process_stream consumer, if any."""
+        if self._events is not None:
+            await self._events.put(event)
+
+    @staticmethod
+    def _streamable(text: str) -> Optional[bool]:
+        """Whether response text can be shown as it generates.
+
+        Returns None until enough text has arrived to tell, and False when
+        it opens like a JSON tool call.
+        """
+        head = text.lstrip()
+        if len(head) < 3:
+            return None
+        return not (head.startswith("{") or head.startswith("```"))
+
     def reset_conversation(self) -> None:
         """Reset the conversation history."""
         self.conversation_history = []
@@ -843,21 +1076,98 @@ class ChatAgent:
 
     def get_agent_status(self) -> Dict:
         """Get current agent concurrency status."""
-        return {
+        status = {
             "active_agents": self.agent_semaphore.active_agents,
             "available_slots": self.agent_semaphore.available_slots,
             "max_concurrent": self.agent_semaphore._max,
         }
+        status["usage"] = self.usage.to_dict()
+        status["tool_cache"] = self.tool_cache.get_stats()
+        if self.last_context is not None:
+            status["context"] = self.last_context
+        # Include GPU queue stats when running behind the request scheduler
+        if hasattr(self.client, "get_stats"):
+            status["llm_queue"] = self.client.get_stats()
+        status["http"] = get_transport().get_stats()
+        status["models"] = get_model_registry().to_dict()
+        status["generation"] = get_generation().to_dict()
+        return status
 
     # ==================== Context Management ====================
 
     def _estimate_tokens(self, text: str) -> int:
-        """Estimate token count from text (rough approximation)."""
-        return len(text) // self.CHARS_PER_TOKEN
+        """Estimate token count from text (calibrated for the model)."""
+        return self.token_budget.estimate(self.model, text)
 
     def _get_context_window(self) -> int:
         """Get the context window size for the current model."""
-        return self.settings.defaults.context_window
+        return self.token_budget.window(self.model)
+
+    def _build_turn_messages(
+        self, user_message: str, memories: List[str], docs_context: str = ""
+    ) -> List[Message]:
+        """Pack the routing prompt for a turn into the model's context window.
+
+        The system prompt and the user message always go in. The rest of
+        the window, less CONTEXT_RESERVE_PERCENT for the response, is filled
+        in priority order with the conversation summary, documentation,
+        memories and then as much recent history as fits (newest first).
+        Summary, documentation and memories are sent with the user message,
+        after the history, so they don't change the prompt's prefix.
+
+        Args:
+            user_message: The user's message
+            memories: Relevant memories
+            docs_context: Documentation context, if any
+
+        Returns:
+            Messages to send
+        """
+        window = self._get_context_window()
+        reserve = int(window * self.CONTEXT_RESERVE_PERCENT / 100)
+        required = self.token_budget.estimate_messages(
+            self.model,
+            [Message(role="system", content=self.system_prompt),
+             Message(role="user", content=user_message)],
+        )
+        newest_first = [msg.content for msg in reversed(self.conversation_history)]
+        summary = self.conversation_summary
+        packed = self.token_budget.pack(self.model, window - reserve - required, [
+            ContextSection("summary", [summary] if summary else [], priority=1, truncate=True),
+            ContextSection("docs", [docs_context] if docs_context else [], priority=2, truncate=True),
+            ContextSection("memories", memories[:self.MAX_MEMORY_RESULTS], priority=3),
+            ContextSection(
+                "history", newest_first, priority=4, item_overhead=MESSAGE_OVERHEAD_TOKENS
+            ),
+        ])
+        if packed.dropped:
+            debug(f"Context window {window}: left out {packed.dropped}")
+
+        kept_summary = packed.kept("summary")
+        context = self._build_context_with_memories(
+            packed.kept("memories"), kept_summary[0] if kept_summary else ""
+        )
+        for docs in packed.kept("docs"):
+            context += (
+                f"{docs}\n\nUse the above documentation context to help answer "
+                "questions accurately. Cite specific documentation when relevant.\n"
+            )
+
+        # The system prompt and history stay a byte-stable prefix across
+        # turns (Ollama reuses its KV cache for it); context rides with the
+        # new message
+        history_count = len(packed.kept("history"))
+        history = self.conversation_history[-history_count:] if history_count else []
+        messages = assemble_messages(self.system_prompt, history, user_message, context)
+
+        self.last_context = {
+            "window": window,
+            "prompt_tokens": required + packed.used_tokens,
+            "history_messages": history_count,
+            "dropped": packed.dropped,
+            "truncated": packed.truncated,
+        }
+        return messages
 
     def _get_history_tokens(self) -> int:
         """Estimate total tokens in conversation history."""
@@ -904,7 +1214,13 @@ Provide a brief summary (2-4 sentences) of what was discussed and any important
 
         try:
             messages = [Message(role="user", content=summary_prompt)]
-            response_text, _ = await self._call_llm(messages, use_tools=False, timeout=30.0)
+            response_text, _ = await self._call_llm(
+                messages,
+                use_tools=False,
+                timeout=30.0,
+                priority=PRIORITY_BACKGROUND,
+                role=ROLE_SUMMARY,
+            )
 
             if response_text:
                 # Combine with existing summary if any
@@ -988,7 +1304,13 @@ If there are important facts (e.g., user preferences, project decisions, file lo
 
         try:
             messages = [Message(role="user", content=extract_prompt)]
-            response_text, _ = await self._call_llm(messages, use_tools=False, timeout=20.0)
+            response_text, _ = await self._call_llm(
+                messages,
+                use_tools=False,
+                timeout=20.0,
+                priority=PRIORITY_BACKGROUND,
+                role=ROLE_MEMORY,
+            )
 
             if response_text and "none" not in response_text.lower()[:20]:
                 await self._store_memory(
@@ -1008,7 +1330,7 @@ If there are important facts (e.g., user preferences, project decisions, file lo
             summary: Conversation summary if any
 
         Returns:
-            Context string to prepend to system prompt
+            Context string sent with the user's message
         """
         parts = []
 
@@ -0,0 +1,78 @@
+"""Events emitted by ChatAgent while it processes a turn.
+
+``ChatAgent.process_stream`` yields these as they happen so callers (the
+gRPC ChatService, a UI) can show live progress instead of waiting for the
+whole agent tree. They mirror the ``ChatResponse`` message types in
+``penguincode.proto``.
+
+Text deltas are provisional: a routing call's preamble may be followed by
+agent work and a reviewed answer. The last event of a turn is always a
+``TextDeltaEvent`` with ``is_final=True`` carrying the complete response.
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Union
+
+from penguincode_cli.ollama import UsageStats
+
+
+@dataclass
+class TextDeltaEvent:
+    """Response text as it is generated (or the full response when final)."""
+
+    content: str
+    is_final: bool = False
+
+
+@dataclass
+class AgentSpawnEvent:
+    """A specialized agent was started."""
+
+    agent_type: str
+    task: str
+
+
+@dataclass
+class AgentResultEvent:
+    """A specialized agent finished."""
+
+    agent_type: str
+    success: bool
+    output: str = ""
+    duration_ms: float = 0.0
+    usage: UsageStats = field(default_factory=UsageStats)
+
+
+@dataclass
+class StatusEvent:
+    """Coarse progress (routing, planning, reviewing...)."""
+
+    status: str
+    message: str = ""
+
+
+@dataclass
+class ErrorEvent:
+    """The turn failed."""
+
+    code: str
+    message: str
+    recoverable: bool = True
+
+
+ChatEvent = Union[TextDeltaEvent, AgentSpawnEvent, AgentResultEvent, StatusEvent, ErrorEvent]
+
+
+def coalesce_text(events: Iterable[Optional[ChatEvent]]) -> List[Optional[ChatEvent]]:
+    """Merge runs of adjacent non-final text deltas, keeping everything else in order."""
+    merged: List[Optional[ChatEvent]] = []
+    for event in events:
+        previous = merged[-1] if merged else None
+        if (
+            isinstance(event, TextDeltaEvent) and not event.is_final
+            and isinstance(previous, TextDeltaEvent) and not previous.is_final
+        ):
+            merged[-1] = TextDeltaEvent(previous.content + event.content)
+        else:
+            merged.append(event)
+    return merged
@@ -3,7 +3,9 @@
 from typing import Optional
 
 from .base import AgentConfig, AgentResult, BaseAgent, Permission
-from penguincode_cli.ollama import OllamaClient
+from penguincode_cli.ollama import OllamaClient, TokenBudget
+from penguincode_cli.shared.interfaces import IToolExecutor
+from penguincode_cli.tools.result_cache import ToolResultCache
 
 
 EXECUTOR_SYSTEM_PROMPT = """You are an Executor agent. You execute tasks by calling tools.
@@ -79,6 +81,8 @@ Response:
 IMPORTANT:
 - Always read a file before editing it to understand the current state
 - Use edit for small, targeted changes (provides old_text and new_text)
+- For several changes to one file, make ONE edit call with an edits list:
+  {"name": "edit", "arguments": {"path": "file.py", "edits": [{"old_text": "...", "new_text": "..."}, {"old_text": "...", "new_text": "..."}]}}
 - Use write for creating new files or completely rewriting existing ones
 - When editing, make sure old_text matches EXACTLY (including whitespace)
 
@@ -196,6 +200,9 @@ class ExecutorAgent(BaseAgent):
         working_dir: Optional[str] = None,
         model: str = "qwen2.5-coder:7b",
         config: Optional[AgentConfig] = None,
+        tool_executor: Optional[IToolExecutor] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        token_budget: Optional[TokenBudget] = None,
     ):
         """
         Initialize executor agent with full permissions.
@@ -205,6 +212,9 @@ class ExecutorAgent(BaseAgent):
             working_dir: Working directory for file operations
             model: Model to use (default: qwen2.5-coder:7b)
             config: Optional custom config
+            tool_executor: Optional executor for file/shell tools (server mode)
+            tool_cache: Optional read/search result cache shared across agents
+            token_budget: Optional context budget shared across agents
         """
         if config is None:
             config = AgentConfig(
@@ -225,6 +235,9 @@ class ExecutorAgent(BaseAgent):
             config=config,
             ollama_client=ollama_client,
             working_dir=working_dir,
+            tool_executor=tool_executor,
+            tool_cache=tool_cache,
+            token_budget=token_budget,
         )
 
     async def run(self, task: str, **kwargs) -> AgentResult:
@@ -3,7 +3,9 @@
 from typing import Optional
 
 from .base import AgentConfig, AgentResult, BaseAgent, Permission
-from penguincode_cli.ollama import OllamaClient
+from penguincode_cli.ollama import OllamaClient, TokenBudget
+from penguincode_cli.shared.interfaces import IToolExecutor
+from penguincode_cli.tools.result_cache import ToolResultCache
 
 
 EXPLORER_SYSTEM_PROMPT = """You are an Explorer agent responsible for navigating and understanding codebases.
@@ -42,6 +44,9 @@ class ExplorerAgent(BaseAgent):
         working_dir: Optional[str] = None,
         model: str = "llama3.2:3b",
         config: Optional[AgentConfig] = None,
+        tool_executor: Optional[IToolExecutor] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        token_budget: Optional[TokenBudget] = None,
     ):
         """
         Initialize explorer agent with read-only permissions.
@@ -51,6 +56,9 @@ class ExplorerAgent(BaseAgent):
             working_dir: Working directory for file operations
             model: Model to use (default: llama3.2:3b)
             config: Optional custom config
+            tool_executor: Optional executor for file/shell tools (server mode)
+            tool_cache: Optional read/search result cache shared across agents
+            token_budget: Optional context budget shared across agents
         """
         if config is None:
             config = AgentConfig(
@@ -66,6 +74,9 @@ class ExplorerAgent(BaseAgent):
             config=config,
             ollama_client=ollama_client,
             working_dir=working_dir,
+            tool_executor=tool_executor,
+            tool_cache=tool_cache,
+            token_budget=token_budget,
         )
 
     async def run(self, task: str, **kwargs) -> AgentResult:
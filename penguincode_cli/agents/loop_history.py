@@ -0,0 +1,235 @@
+"""Bounded, compacting message history for the agentic loop.
+
+Every loop iteration adds an assistant turn plus the results of the tools
+it called. Resent verbatim, each prompt is longer than the last and prompt
+evaluation over a run grows quadratically. ``LoopHistory`` keeps the rounds
+structured and renders a prompt whose tool history stays within a token
+budget:
+
+- A result made stale by a later identical call, or a file view made stale
+  by a later read or edit of the same file, becomes a one-line note.
+- When the rounds outgrow the budget, older results are elided to a
+  one-line stub (the model can rerun the tool), keeping the newest in full,
+  down to well below the budget. Elision sticks, so the prompt prefix stays
+  the same for the next iterations and Ollama can reuse its KV cache.
+- The latest round is always shown in full. If even the stubs don't fit,
+  the oldest rounds are left out.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from penguincode_cli.ollama import Message, TokenBudget
+
+# Start of an elided output kept in its stub
+ELIDED_PREVIEW_CHARS = 120
+
+# Assistant text of compacted rounds is cut to this
+MAX_OLD_ASSISTANT_CHARS = 500
+
+# Over budget, rounds are compacted down to this share of it, so several
+# iterations can append to an unchanged (KV-cached) prefix before the next
+COMPACT_TARGET_FRACTION = 0.6
+
+# Tools whose results make earlier views of their file stale
+FILE_WRITE_TOOLS = frozenset({"write", "edit"})
+
+# Tools whose identical repeat makes the earlier result stale
+REPEATABLE_TOOLS = frozenset({"read", "grep", "glob", "web_search", "web_fetch"})
+
+
+def _path_key(arguments: Dict[str, Any]) -> Optional[str]:
+    path = arguments.get("path") or arguments.get("file_path")
+    return os.path.normpath(str(path)) if path else None
+
+
+@dataclass
+class ToolOutcome:
+    """One tool call of a round and what it returned."""
+
+    name: str
+    arguments: Dict[str, Any]
+    output: str
+    stale: str = ""  # Why a later call made this result stale
+    elided: bool = False  # Shown as a stub after compaction
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.output.startswith("Error")
+
+    @property
+    def call_key(self) -> Optional[Tuple[str, str]]:
+        """Identity of the call for repeat detection (None: never stale by repeat)."""
+        if self.name not in REPEATABLE_TOOLS:
+            return None
+        arguments = dict(self.arguments)
+        if "path" in arguments:
+            arguments["path"] = _path_key(arguments)
+        return self.name, json.dumps(arguments, sort_keys=True, default=str)
+
+    def header(self) -> str:
+        args = ", ".join(f"{k}={str(v)[:60]}" for k, v in self.arguments.items())
+        return f"[Tool: {self.name}] {args}" if args else f"[Tool: {self.name}]"
+
+    def render_full(self) -> str:
+        return f"[Tool: {self.name}]\n{self.output}"
+
+    def render_stub(self) -> str:
+        if self.stale:
+            return f"{self.header()}\n(result no longer current: {self.stale})"
+        preview = self.output.strip().split("\n", 1)[0][:ELIDED_PREVIEW_CHARS]
+        return (
+            f"{self.header()}\n(output elided to save context: {len(self.output)} chars "
+            f"starting \"{preview}\"; run the tool again if you need it)"
+        )
+
+
+@dataclass
+class LoopRound:
+    """An assistant turn and the results of the tools it called."""
+
+    number: int
+    assistant: str
+    outcomes: List[ToolOutcome]
+    note: str = ""  # Appended to the results (e.g. repeated-error guidance)
+    compacted: bool = False  # Assistant text is cut
+
+
+@dataclass
+class LoopHistory:
+    """
+    Message history of one agentic loop run.
+
+    Args:
+        head: Messages always sent first (system prompt and task)
+        token_budget: Estimates tokens for the model
+        model: Model the prompts are for
+        budget_tokens: Tokens the rounds may take in a prompt (None: unbounded)
+    """
+
+    head: List[Message]
+    token_budget: TokenBudget
+    model: str
+    budget_tokens: Optional[int] = None
+    rounds: List[LoopRound] = field(default_factory=list)
+    elided: int = 0  # Results shown as stubs in the last rendered prompt
+    omitted_rounds: int = 0  # Rounds left out of the last rendered prompt
+    _first_round: int = 0
+
+    def add_round(self, assistant: str, outcomes: List[ToolOutcome], note: str = "") -> LoopRound:
+        """
+        Record a round, marking results it makes stale.
+
+        Args:
+            assistant: The assistant's response text
+            outcomes: Tool calls of the response with their outputs
+            note: Text appended after the results
+
+        Returns:
+            The recorded round
+        """
+        number = len(self.rounds) + 1
+        earlier = [o for r in self.rounds for o in r.outcomes]
+        for outcome in outcomes:
+            if outcome.succeeded:
+                self._mark_stale(earlier, outcome, number)
+            earlier.append(outcome)
+        current = LoopRound(number=number, assistant=assistant, outcomes=outcomes, note=note)
+        self.rounds.append(current)
+        return current
+
+    @staticmethod
+    def _mark_stale(earlier: List[ToolOutcome], outcome: ToolOutcome, number: int) -> None:
+        key = outcome.call_key
+        path = _path_key(outcome.arguments) if outcome.name in FILE_WRITE_TOOLS else None
+        for old in earlier:
+            if old.stale or not old.succeeded:
+                continue
+            if key is not None and old.call_key == key:
+                old.stale = f"repeated in step {number}"
+            elif path is not None and old.name == "read" and _path_key(old.arguments) == path:
+                old.stale = f"file changed by {outcome.name} in step {number}"
+
+    def messages(self) -> List[Message]:
+        """The prompt: head messages plus the rounds, compacted to the budget."""
+        if not self.rounds:
+            return list(self.head)
+        if self.budget_tokens is not None and self._cost() > self.budget_tokens:
+            self._compact(int(self.budget_tokens * COMPACT_TARGET_FRACTION))
+
+        rounds = self.rounds[self._first_round:]
+        messages = list(self.head)
+        for round_ in rounds:
+            messages.extend(self._render_round(round_))
+        self.omitted_rounds = self._first_round
+        self.elided = sum(
+            1 for r in rounds for o in r.outcomes if not self._shown_in_full(r, o)
+        )
+        if self.omitted_rounds:
+            first_results = messages[len(self.head) + 1]
+            messages[len(self.head) + 1] = Message(
+                role=first_results.role,
+                content=f"({self.omitted_rounds} earlier steps omitted to save context)\n\n"
+                + first_results.content,
+            )
+        return messages
+
+    def _compact(self, target: int) -> None:
+        """
+        Shrink the rounds to ``target`` tokens.
+
+        Everything before the latest round is elided, then the newest
+        results are restored while they fit. If even the stubs don't fit,
+        the oldest rounds are left out. Elision is sticky and goes below
+        the budget, so the next iterations append to an unchanged prefix.
+        """
+        rounds = self.rounds[self._first_round:]
+        older = [o for r in rounds[:-1] for o in r.outcomes if not o.elided]
+        for round_ in rounds[:-1]:
+            round_.compacted = True
+        for outcome in older:
+            outcome.elided = True
+
+        remaining = target - self._cost()
+        for outcome in reversed(older):
+            if outcome.stale:
+                continue
+            extra = self._estimate(outcome.render_full()) - self._estimate(outcome.render_stub())
+            if extra > remaining:
+                break
+            outcome.elided = False
+            remaining -= extra
+
+        used = self._cost()
+        while len(self.rounds) - self._first_round > 1 and used > target:
+            used -= self._round_cost(self.rounds[self._first_round])
+            self._first_round += 1
+
+    def _shown_in_full(self, round_: LoopRound, outcome: ToolOutcome) -> bool:
+        if round_ is self.rounds[-1]:
+            return True
+        return not (outcome.elided or outcome.stale)
+
+    def _render_round(self, round_: LoopRound) -> List[Message]:
+        assistant = round_.assistant or "Executing tools..."
+        if round_.compacted and len(assistant) > MAX_OLD_ASSISTANT_CHARS:
+            assistant = assistant[:MAX_OLD_ASSISTANT_CHARS] + "..."
+        results = "\n\n".join(
+            o.render_full() if self._shown_in_full(round_, o) else o.render_stub()
+            for o in round_.outcomes
+        )
+        return [
+            Message(role="assistant", content=assistant),
+            Message(role="user", content=f"Tool results:\n{results}{round_.note}"),
+        ]
+
+    def _cost(self) -> int:
+        return sum(self._round_cost(r) for r in self.rounds[self._first_round:])
+
+    def _round_cost(self, round_: LoopRound) -> int:
+        return self.token_budget.estimate_messages(self.model, self._render_round(round_))
+
+    def _estimate(self, text: str) -> int:
+        return self.token_budget.estimate(self.model, text)
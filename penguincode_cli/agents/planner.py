@@ -4,10 +4,20 @@ The planner analyzes complex user requests and creates structured plans
 that can be executed by other agents (explorer, executor).
 """
 
-from dataclasses import dataclass
-from typing import List, Optional
-
-from penguincode_cli.ollama import Message, OllamaClient
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from penguincode_cli.ollama import (
+    ROLE_PLANNING,
+    Message,
+    OllamaClient,
+    TokenBudget,
+    UsageStats,
+    accumulate,
+    get_generation,
+    get_structured_output,
+)
 from penguincode_cli.ui import console
 
 from .base import AgentConfig, AgentResult, Permission
@@ -47,6 +57,39 @@ COMPLEXITY: <simple|moderate|complex>
 Be thorough but concise. Each step should be specific enough for an agent to execute independently.
 """
 
+# With structured output the plan comes back as JSON matching PLAN_SCHEMA
+PLAN_JSON_INSTRUCTION = """
+Instead of the text format above, reply with the plan as a JSON object:
+{"analysis": "...", "steps": [{"agent": "explorer", "description": "...", "depends_on": []}],
+ "parallel_groups": [[1, 2], [3]], "complexity": "moderate"}
+Steps are numbered from 1 in the order listed; depends_on and parallel_groups use those numbers.
+"""
+
+PLAN_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "analysis": {"type": "string"},
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "agent": {"type": "string", "enum": ["explorer", "executor"]},
+                    "description": {"type": "string"},
+                    "depends_on": {"type": "array", "items": {"type": "integer"}},
+                },
+                "required": ["agent", "description", "depends_on"],
+            },
+        },
+        "parallel_groups": {
+            "type": "array",
+            "items": {"type": "array", "items": {"type": "integer"}},
+        },
+        "complexity": {"type": "string", "enum": ["simple", "moderate", "complex"]},
+    },
+    "required": ["analysis", "steps", "parallel_groups", "complexity"],
+}
+
 
 @dataclass
 class PlanStep:
@@ -65,6 +108,7 @@ class Plan:
     parallel_groups: List[List[int]]  # Groups of step numbers that can run in parallel
     complexity: str  # simple, moderate, complex
     raw_output: str  # Original LLM output
+    usage: UsageStats = field(default_factory=UsageStats)  # Cost of producing the plan
 
 
 class PlannerAgent:
@@ -74,9 +118,12 @@ class PlannerAgent:
         self,
         ollama_client: OllamaClient,
         model: str = "deepseek-coder:6.7b",
+        token_budget: Optional[TokenBudget] = None,
     ):
         self.client = ollama_client
         self.model = model
+        # Sizes num_ctx for the plan prompt
+        self.token_budget = token_budget or TokenBudget(ollama_client)
         self.config = AgentConfig(
             name="planner",
             model=model,
@@ -99,8 +146,10 @@ class PlannerAgent:
         """
         console.print("[cyan]> Planning task...[/cyan]")
 
+        structured = get_structured_output().constrained(self.model)
+        system_prompt = PLANNER_SYSTEM_PROMPT + PLAN_JSON_INSTRUCTION if structured else PLANNER_SYSTEM_PROMPT
         messages = [
-            Message(role="system", content=PLANNER_SYSTEM_PROMPT),
+            Message(role="system", content=system_prompt),
         ]
 
         if context:
@@ -111,18 +160,30 @@ class PlannerAgent:
         else:
             messages.append(Message(role="user", content=f"Task to plan:\n{task}"))
 
-        # Get plan from LLM
-        response_text = ""
-        async for chunk in self.client.chat(
+        # Get plan from LLM (response cap from `generation.roles.planning`)
+        await self.token_budget.load(self.model)
+        prompt_tokens = self.token_budget.estimate_messages(self.model, messages)
+        options = get_generation().options(
+            ROLE_PLANNING,
+            self.model,
+            prompt_tokens,
+            self.token_budget.window(self.model),
+            agent=self.config.name,
+            temperature=self.config.temperature,
+            num_predict=self.config.max_tokens,
+        )
+        reply = await accumulate(self.client.chat(
             model=self.model,
             messages=messages,
             stream=True,
-        ):
-            if chunk.message and chunk.message.content:
-                response_text += chunk.message.content
-
-        # Parse the plan
-        plan = self._parse_plan(response_text)
+            format=PLAN_SCHEMA if structured else None,
+            options=options,
+        ))
+        get_generation().record(ROLE_PLANNING, self.model, options, prompt_tokens, reply.usage)
+
+        # Parse the plan (the text format if the JSON one didn't come back)
+        plan = (self._plan_from_json(reply.text) if structured else None) or self._parse_plan(reply.text)
+        plan.usage = reply.usage
         return plan
 
     def _parse_plan(self, raw_output: str) -> Plan:
@@ -173,6 +234,50 @@ class PlannerAgent:
             raw_output=raw_output,
         )
 
+    def _plan_from_json(self, raw_output: str) -> Optional[Plan]:
+        """Build a Plan from a reply constrained by PLAN_SCHEMA (None if it isn't one)."""
+        try:
+            data = json.loads(raw_output)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("steps"), list):
+            return None
+
+        # Steps keep their position in the reply as their number (what
+        # depends_on and parallel_groups refer to), even if one is dropped
+        steps: List[PlanStep] = []
+        for number, item in enumerate(data["steps"], 1):
+            if not isinstance(item, dict) or not str(item.get("description", "")).strip():
+                continue
+            agent_type = item.get("agent")
+            steps.append(PlanStep(
+                step_num=number,
+                agent_type=agent_type if agent_type in ("explorer", "executor") else "executor",
+                description=str(item["description"]).strip(),
+                depends_on=[d for d in item.get("depends_on") or [] if isinstance(d, int)],
+            ))
+
+        numbers = {s.step_num for s in steps}
+        for step in steps:
+            step.depends_on = [d for d in step.depends_on if d in numbers]
+        parallel_groups = [
+            [n for n in group if n in numbers]
+            for group in data.get("parallel_groups") or []
+            if isinstance(group, list)
+        ]
+        parallel_groups = [group for group in parallel_groups if group]
+        if not parallel_groups and steps:
+            parallel_groups = [[s.step_num] for s in steps]
+
+        complexity = data.get("complexity")
+        return Plan(
+            analysis=str(data.get("analysis", "")).strip(),
+            steps=steps,
+            parallel_groups=parallel_groups,
+            complexity=complexity if complexity in ("simple", "moderate", "complex") else "moderate",
+            raw_output=raw_output,
+        )
+
     def _parse_step(self, line: str, default_num: int) -> Optional[PlanStep]:
         """Parse a single step line."""
         # Expected format: "1. [explorer] description (depends on: 1, 2)"
@@ -243,6 +348,8 @@ class PlannerAgent:
                 agent_name="planner",
                 success=True,
                 output="\n".join(output_lines),
+                tokens_used=plan.usage.total_tokens,
+                usage=plan.usage,
             )
         except Exception as e:
             return AgentResult(
@@ -12,7 +12,9 @@ It is read-only and cannot execute commands or write files.
 from typing import Dict, List, Optional
 
 from .base import AgentConfig, AgentResult, BaseAgent, Permission, TOOL_DEFINITIONS
-from penguincode_cli.ollama import OllamaClient
+from penguincode_cli.ollama import OllamaClient, TokenBudget
+from penguincode_cli.shared.interfaces import IToolExecutor
+from penguincode_cli.tools.result_cache import ToolResultCache
 from penguincode_cli.config.settings import ResearchConfig
 from penguincode_cli.tools.web import WebSearchTool, WebFetchTool
 from penguincode_cli.tools.base import ToolResult
@@ -106,6 +108,9 @@ class ResearcherAgent(BaseAgent):
         working_dir: Optional[str] = None,
         model: str = "llama3.2:3b",
         config: Optional[AgentConfig] = None,
+        tool_executor: Optional[IToolExecutor] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        token_budget: Optional[TokenBudget] = None,
     ):
         """
         Initialize researcher agent with web and read permissions.
@@ -116,6 +121,9 @@ class ResearcherAgent(BaseAgent):
             working_dir: Working directory for local file operations
             model: Model to use (default: llama3.2:3b)
             config: Optional custom config
+            tool_executor: Optional executor for file/shell tools (server mode)
+            tool_cache: Optional read/search result cache shared across agents
+            token_budget: Optional context budget shared across agents
         """
         if config is None:
             config = AgentConfig(
@@ -131,6 +139,9 @@ class ResearcherAgent(BaseAgent):
             config=config,
             ollama_client=ollama_client,
             working_dir=working_dir,
+            tool_executor=tool_executor,
+            tool_cache=tool_cache,
+            token_budget=token_budget,
         )
 
         # Initialize web tools
@@ -52,7 +52,7 @@ TOOL_DEFINITIONS = {
         "type": "function",
         "function": {
             "name": "edit",
-            "description": "Edit a file by replacing specific text. The old_text must match exactly.",
+            "description": "Edit a file by replacing specific text. The old_text must match exactly. To make several changes to one file, pass them all in edits (applied in order, all or nothing). Returns a diff of the change.",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -71,9 +71,22 @@ TOOL_DEFINITIONS = {
                     "replace_all": {
                         "type": "boolean",
                         "description": "Whether to replace all occurrences (default: false, only first)"
+                    },
+                    "edits": {
+                        "type": "array",
+                        "description": "Several edits to apply in order instead of old_text/new_text",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "old_text": {"type": "string"},
+                                "new_text": {"type": "string"},
+                                "replace_all": {"type": "boolean"}
+                            },
+                            "required": ["old_text", "new_text"]
+                        }
                     }
                 },
-                "required": ["path", "old_text", "new_text"]
+                "required": ["path"]
             }
         }
     },
@@ -0,0 +1,194 @@
+"""Spotting JSON tool calls in a reply while it streams.
+
+Most local models emit tool calls as JSON in their text rather than through
+Ollama's native tool calling, and often keep talking for hundreds of tokens
+after the call ("This will read the file so that..."). ``ToolCallDetector``
+scans each chunk once as it arrives (braces inside JSON strings don't
+count), parses every balanced object, and turns it into tool calls.
+
+``read_reply`` drains a chat stream through a detector and, once a complete
+call to an allowed tool is followed by prose, closes the stream: the HTTP
+request is dropped, Ollama stops generating, and the tool can start right
+away. JSON text between calls (more objects, commas, code fences) doesn't
+stop the stream, so several calls in one reply are all kept.
+"""
+
+import contextlib
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Collection, Dict, List, Optional
+
+from penguincode_cli.ollama import ChatAccumulator, ChatResponse, UsageStats
+
+# Characters that change the scanner's state inside an object
+_SCAN = re.compile(r'[{}"\\]')
+
+# Markdown code fences around JSON calls are not prose
+_FENCE = re.compile(r"```(?:json)?")
+_PARTIAL_FENCE = re.compile(r"`{1,3}[a-z]*$")
+_PROSE = re.compile(r"[A-Za-z0-9]")
+
+# Text kept after the last call to look for prose
+MAX_TAIL_CHARS = 200
+
+
+class ToolCallDetector:
+    """
+    Incremental scanner for JSON tool calls in streamed text.
+
+    Args:
+        to_calls: Turns a parsed JSON value into tool calls (empty list if it isn't one)
+        allowed: Tool names whose calls may end the stream early (None: any)
+    """
+
+    def __init__(
+        self,
+        to_calls: Callable[[Any], List[Dict]],
+        allowed: Optional[Collection[str]] = None,
+    ):
+        self.to_calls = to_calls
+        self.allowed = allowed
+        self.calls: List[Dict] = []
+        self.settled = False  # An allowed call was followed by prose
+        self.found_allowed = False  # A complete call to an allowed tool was seen
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object: List[str] = []  # Pieces of the object being read
+        self._tail = ""  # Text outside objects since the last allowed call
+
+    def feed(self, text: str) -> List[Dict]:
+        """
+        Scan the next piece of the reply.
+
+        Args:
+            text: Text that just arrived
+
+        Returns:
+            Tool calls completed by this piece
+        """
+        found: List[Dict] = []
+        pos = 0
+        while pos < len(text):
+            if self._depth == 0:
+                start = text.find("{", pos)
+                if start == -1:
+                    self._note_tail(text[pos:])
+                    break
+                self._note_tail(text[pos:start])
+                self._depth, self._in_string, self._object = 1, False, []
+                pos, scan_from = start, start + 1
+            else:
+                scan_from = pos
+            end = self._scan(text, scan_from)
+            if end is None:
+                self._object.append(text[pos:])
+                break
+            self._object.append(text[pos:end])
+            found.extend(self._complete("".join(self._object)))
+            self._object = []
+            pos = end
+        self.calls.extend(found)
+        return found
+
+    def _scan(self, text: str, pos: int) -> Optional[int]:
+        """Index just past the object's closing brace, or None if the text ends first."""
+        if self._escaped:
+            self._escaped = False
+            pos += 1
+        skip = -1
+        for match in _SCAN.finditer(text, pos):
+            i = match.start()
+            if i == skip:
+                continue
+            char = match.group()
+            if self._in_string:
+                if char == "\\":
+                    skip = i + 1
+                    self._escaped = skip == len(text)
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    return i + 1
+        return None
+
+    def _complete(self, text: str) -> List[Dict]:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return []
+        calls = self.to_calls(data)
+        if any(self.allowed is None or call.get("name") in self.allowed for call in calls):
+            self.found_allowed = True
+            self._tail = ""
+        return calls
+
+    def _note_tail(self, text: str) -> None:
+        if not self.found_allowed or self.settled or not text:
+            return
+        self._tail = (self._tail + text)[-MAX_TAIL_CHARS:]
+        prose = _PARTIAL_FENCE.sub("", _FENCE.sub("", self._tail))
+        self.settled = _PROSE.search(prose) is not None
+
+
+def parse_tool_calls(text: str, to_calls: Callable[[Any], List[Dict]]) -> List[Dict]:
+    """Tool calls in a complete reply (one pass over the text)."""
+    return ToolCallDetector(to_calls).feed(text)
+
+
+async def read_reply(
+    stream: AsyncIterator[ChatResponse],
+    reply: ChatAccumulator,
+    detector: Optional[ToolCallDetector] = None,
+    stop_early: bool = True,
+    on_text: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> UsageStats:
+    """
+    Drain a chat stream, stopping once the detector has settled on its calls.
+
+    Args:
+        stream: Chunks from ``chat(..., stream=True)``
+        reply: Accumulates the text, native tool calls and final usage
+        detector: Scans the text for JSON tool calls (None: no scanning)
+        stop_early: Close the stream when the detector settles; when False
+            the reply is read to the end and the waste is only counted
+        on_text: Awaited with each piece of text as it arrives
+
+    Returns:
+        Usage of the call, with ``wasted_tokens`` (chunks generated after
+        the first allowed call was complete) and ``early_stops``. A stream
+        closed early has no final counters; its completion tokens are
+        counted from the chunks received.
+    """
+    complete_at: Optional[int] = None
+    stopped = False
+    async with contextlib.aclosing(stream):
+        async for chunk in stream:
+            delta = reply.add(chunk)
+            if not delta:
+                continue
+            if on_text is not None:
+                await on_text(delta)
+            if detector is None:
+                continue
+            detector.feed(delta)
+            if complete_at is None and detector.found_allowed:
+                complete_at = reply.chunks
+            if stop_early and detector.settled:
+                stopped = True
+                break
+
+    if reply.done:
+        usage = UsageStats().add(reply.usage)
+    else:
+        usage = UsageStats(completion_tokens=reply.chunks, total_tokens=reply.chunks, requests=1)
+    if complete_at is not None:
+        usage.wasted_tokens = reply.chunks - complete_at
+    usage.early_stops = int(stopped)
+    return usage
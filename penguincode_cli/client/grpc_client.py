@@ -2,12 +2,13 @@
 
 import asyncio
 import logging
-from typing import AsyncIterator, Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Set
 
 import grpc
 
 from penguincode_cli.config.settings import ClientConfig, ServerConfig
-from penguincode_cli.shared.interfaces import IChatService, ToolResult
+from penguincode_cli.shared.interfaces import IChatService, IToolExecutor, ToolResult
+from penguincode_cli.shared.tool_args import DEFAULT_TOOL_TIMEOUT, decode_arguments, tool_timeout
 from penguincode_cli.proto import (
     AuthServiceStub,
     ChatServiceStub,
@@ -21,12 +22,17 @@ from penguincode_cli.proto import (
     CloseSessionRequest,
     ToolResponse,
     HealthCheckRequest,
+    ToolRequest,
 )
 
 from .auth import TokenManager
+from .tool_executor import LocalToolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Tool requests from the server executed at once (the rest wait their turn)
+MAX_CONCURRENT_TOOLS = 8
+
 
 class GRPCClient(IChatService):
     """gRPC client that implements IChatService interface.
@@ -43,10 +49,13 @@ class GRPCClient(IChatService):
         server_config: ServerConfig,
         client_config: ClientConfig,
         token_manager: Optional[TokenManager] = None,
+        tool_executor: Optional[IToolExecutor] = None,
     ):
         self.server_config = server_config
         self.client_config = client_config
         self.token_manager = token_manager or TokenManager(client_config.token_path)
+        # Runs the server's tool requests (default: LocalToolExecutor in the project dir)
+        self.tool_executor = tool_executor
 
         self._channel: Optional[grpc.aio.Channel] = None
         self._auth_stub: Optional[AuthServiceStub] = None
@@ -166,6 +175,9 @@ class GRPCClient(IChatService):
         self._current_session_id = response.session_id
         logger.info(f"Created session {response.session_id}")
 
+        if self.tool_executor is None:
+            self.tool_executor = LocalToolExecutor(working_dir=project_dir)
+
         # Start tool callback handler
         await self._start_tool_callback_handler()
 
@@ -216,6 +228,11 @@ class GRPCClient(IChatService):
                         "agent_type": response.agent_result.agent_type,
                         "success": response.agent_result.success,
                         "output": response.agent_result.output,
+                        "duration_ms": response.agent_result.duration_ms,
+                        "tokens_used": response.agent_result.tokens_used,
+                        "prompt_tokens": response.agent_result.prompt_tokens,
+                        "completion_tokens": response.agent_result.completion_tokens,
+                        "tokens_per_second": response.agent_result.tokens_per_second,
                     }
                 elif which_one == "status":
                     yield {
@@ -307,14 +324,23 @@ class GRPCClient(IChatService):
         )
 
     async def _tool_callback_loop(self) -> None:
-        """Handle tool callback requests from server."""
+        """Execute tool requests from the server and stream results back.
+
+        Requests are run concurrently as they arrive (the server may have
+        several outstanding per session); each response carries its request's
+        ``request_id``, so they are sent in completion order.
+        """
         if not self._tool_stub:
             return
 
+        queue = self._tool_response_queue
+
         async def response_generator():
             while True:
-                response = await self._tool_response_queue.get()
-                yield response
+                yield await queue.get()
+
+        running: Set[asyncio.Task] = set()
+        limit = asyncio.Semaphore(MAX_CONCURRENT_TOOLS)
 
         try:
             metadata = self._get_auth_metadata()
@@ -324,12 +350,30 @@ class GRPCClient(IChatService):
                 response_generator(),
                 metadata=metadata,
             ):
-                # Emit event for tool execution
-                # The REPL will handle actual execution
-                logger.debug(f"Tool request: {request.tool_name}")
-                # This would be connected to the tool executor
+                logger.debug(f"Tool request {request.request_id}: {request.tool_name}")
+                task = asyncio.create_task(self._run_tool_request(request, limit))
+                running.add(task)
+                task.add_done_callback(running.discard)
 
         except asyncio.CancelledError:
             pass
         except Exception as e:
             logger.error(f"Tool callback error: {e}")
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _run_tool_request(self, request: ToolRequest, limit: asyncio.Semaphore) -> None:
+        """Execute one tool request and queue its response."""
+        async with limit:
+            try:
+                arguments = decode_arguments(request.arguments)
+                result = await self.tool_executor.execute(
+                    request.tool_name,
+                    arguments,
+                    timeout=tool_timeout(arguments, request.timeout_seconds or DEFAULT_TOOL_TIMEOUT),
+                )
+            except Exception as e:
+                result = ToolResult(success=False, error=str(e))
+
+        await self.submit_tool_result(request.session_id, request.request_id, result)
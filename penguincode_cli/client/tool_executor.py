@@ -7,7 +7,10 @@ import subprocess
 from pathlib import Path
 from typing import Any, Dict, List
 
+from penguincode_cli.shared.file_edit import EditError, edit_file, parse_edits
 from penguincode_cli.shared.interfaces import IToolExecutor, ToolResult
+from penguincode_cli.shared.tool_args import DEFAULT_TOOL_TIMEOUT, tool_timeout
+from penguincode_cli.tools.file_ops import GrepTool, ReadFileTool
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,10 @@ class LocalToolExecutor(IToolExecutor):
     def __init__(self, working_dir: str = "."):
         self.working_dir = Path(working_dir).resolve()
         self._available_tools = ["read", "write", "edit", "bash", "grep", "glob"]
+        # Same readers as local mode: line ranges, windowed large files,
+        # indexed grep
+        self._read_tool = ReadFileTool()
+        self._grep_tool = GrepTool(index_root=str(self.working_dir))
 
     def get_available_tools(self) -> List[str]:
         """Get list of available tools."""
@@ -36,7 +43,7 @@ class LocalToolExecutor(IToolExecutor):
         self,
         tool_name: str,
         arguments: Dict[str, Any],
-        timeout: int = 30,
+        timeout: int = DEFAULT_TOOL_TIMEOUT,
     ) -> ToolResult:
         """Execute a tool with given arguments."""
         if tool_name not in self._available_tools:
@@ -80,11 +87,12 @@ class LocalToolExecutor(IToolExecutor):
         if not file_path.is_file():
             return ToolResult(success=False, error=f"Not a file: {path}")
 
-        try:
-            content = file_path.read_text()
-            return ToolResult(success=True, data=content)
-        except Exception as e:
-            return ToolResult(success=False, error=f"Failed to read file: {e}")
+        result = await self._read_tool.execute(
+            str(file_path),
+            start_line=arguments.get("start_line"),
+            end_line=arguments.get("end_line"),
+        )
+        return self._from_tool_result(result)
 
     async def _execute_write(self, arguments: Dict[str, Any], timeout: int) -> ToolResult:
         """Write file contents."""
@@ -105,65 +113,59 @@ class LocalToolExecutor(IToolExecutor):
             return ToolResult(success=False, error=f"Failed to write file: {e}")
 
     async def _execute_edit(self, arguments: Dict[str, Any], timeout: int) -> ToolResult:
-        """Edit file contents (find and replace)."""
+        """Edit file contents (find and replace, one or several edits)."""
         path = arguments.get("path", "")
-        old_string = arguments.get("old_string", "")
-        new_string = arguments.get("new_string", "")
-
         if not path:
             return ToolResult(success=False, error="Missing 'path' argument")
-        if not old_string:
-            return ToolResult(success=False, error="Missing 'old_string' argument")
 
         file_path = self._resolve_path(path)
         if not file_path.exists():
             return ToolResult(success=False, error=f"File not found: {path}")
 
         try:
-            content = file_path.read_text()
-            if old_string not in content:
-                return ToolResult(success=False, error="String not found in file")
-
-            new_content = content.replace(old_string, new_string, 1)
-            file_path.write_text(new_content)
-            return ToolResult(success=True, data="Edit applied successfully")
+            edits = parse_edits(arguments)
+            outcome = await asyncio.to_thread(edit_file, file_path, edits, path)
+        except EditError as e:
+            return ToolResult(success=False, error=str(e))
         except Exception as e:
             return ToolResult(success=False, error=f"Failed to edit file: {e}")
 
+        summary = f"Replaced {outcome.replacements} occurrence(s) in {path}"
+        return ToolResult(success=True, data=f"{summary}\n{outcome.diff}" if outcome.diff else summary)
+
     async def _execute_bash(self, arguments: Dict[str, Any], timeout: int) -> ToolResult:
         """Execute a shell command."""
         command = arguments.get("command", "")
         if not command:
             return ToolResult(success=False, error="Missing 'command' argument")
 
-        try:
-            process = await asyncio.wait_for(
-                asyncio.create_subprocess_shell(
-                    command,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=str(self.working_dir),
-                ),
-                timeout=timeout,
-            )
+        timeout = tool_timeout(arguments, timeout)
+        process = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(self.working_dir),
+        )
 
+        try:
             stdout, stderr = await asyncio.wait_for(
                 process.communicate(),
                 timeout=timeout,
             )
-
-            output = stdout.decode() + stderr.decode()
-            success = process.returncode == 0
-
-            return ToolResult(
-                success=success,
-                data=output if success else "",
-                error="" if success else output,
-            )
-
         except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
             return ToolResult(success=False, error=f"Command timed out after {timeout}s")
 
+        output = stdout.decode() + stderr.decode()
+        success = process.returncode == 0
+
+        return ToolResult(
+            success=success,
+            data=output if success else "",
+            error="" if success else output,
+        )
+
     async def _execute_grep(self, arguments: Dict[str, Any], timeout: int) -> ToolResult:
         """Search for pattern in files."""
         pattern = arguments.get("pattern", "")
@@ -173,26 +175,14 @@ class LocalToolExecutor(IToolExecutor):
             return ToolResult(success=False, error="Missing 'pattern' argument")
 
         search_path = self._resolve_path(path)
-
-        try:
-            # Use grep command for simplicity
-            cmd = f"grep -rn '{pattern}' '{search_path}'"
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout,
-            )
-
-            output = stdout.decode()
-            return ToolResult(success=True, data=output)
-
-        except Exception as e:
-            return ToolResult(success=False, error=str(e))
+        options = {
+            key: arguments[key] for key in ("case_sensitive", "max_results") if key in arguments
+        }
+        result = await asyncio.wait_for(
+            self._grep_tool.execute(pattern, path=str(search_path), **options),
+            timeout=timeout,
+        )
+        return self._from_tool_result(result)
 
     async def _execute_glob(self, arguments: Dict[str, Any], timeout: int) -> ToolResult:
         """Find files matching a pattern."""
@@ -213,6 +203,13 @@ class LocalToolExecutor(IToolExecutor):
         except Exception as e:
             return ToolResult(success=False, error=str(e))
 
+    @staticmethod
+    def _from_tool_result(result: Any) -> ToolResult:
+        """Convert an in-process tool's result to the wire result."""
+        if result.success:
+            return ToolResult(success=True, data=str(result.data))
+        return ToolResult(success=False, error=result.error or "")
+
     def _resolve_path(self, path: str) -> Path:
         """Resolve a path relative to working directory."""
         p = Path(path)
@@ -13,6 +13,29 @@ class OllamaConfig:
 
     api_url: str = "http://localhost:11434"
     timeout: int = 120
+    # Probed model capabilities, kept across runs (re-probed when a model changes)
+    model_registry_path: str = "./.penguincode/models.json"
+
+
+@dataclass
+class HttpConfig:
+    """Shared outbound HTTP transport (connection pools per host)."""
+
+    max_connections: int = 100  # Open connections across all hosts
+    max_keepalive_connections: int = 20  # Idle connections kept for reuse
+    keepalive_expiry: float = 30.0  # Seconds an idle connection is kept
+    http2: bool = True  # Used when the optional h2 package is installed
+    connect_timeout: float = 10.0
+    timeout: float = 30.0  # Default; callers pass their own per request
+
+
+@dataclass
+class StructuredOutputConfig:
+    """Schema-constrained JSON replies (Ollama ``format``) for tool calls and plans."""
+
+    enabled: bool = True
+    # Per model, by full name or name without the tag; overrides `enabled`
+    models: Dict[str, bool] = field(default_factory=dict)
 
 
 @dataclass
@@ -36,6 +59,9 @@ class AgentConfig:
 
     model: str
     description: str
+    # Generation overrides for the agent's loop (None: `generation`/`defaults`)
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
 
 
 @dataclass
@@ -47,6 +73,28 @@ class DefaultsConfig:
     context_window: int = 8192
 
 
+@dataclass
+class GenerationConfig:
+    """Ollama options per call role, merged over `defaults` and sent with every call."""
+
+    # num_ctx sized to the prompt plus num_predict (rounded up), instead of
+    # the server default
+    size_num_ctx: bool = True
+    min_num_ctx: int = 2048
+    # A model's num_ctx only shrinks after this many calls in a row fit a
+    # smaller one (each change reloads the model; 0: never shrink)
+    num_ctx_shrink_after: int = 8
+    # Per call role (routing, review, summary, memory, planning, agent):
+    # num_predict, temperature, or any other Ollama option
+    roles: Dict[str, Dict[str, Any]] = field(default_factory=lambda: {
+        "routing": {"num_predict": 1024},
+        "review": {"num_predict": 512},
+        "summary": {"num_predict": 384},
+        "memory": {"num_predict": 192},
+        "planning": {"num_predict": 1536},
+    })
+
+
 @dataclass
 class SecurityConfig:
     """Security settings."""
@@ -163,6 +211,9 @@ class MemoryConfig:
     enabled: bool = True
     vector_store: str = "chroma"  # chroma | qdrant | pgvector
     embedding_model: str = "nomic-embed-text"
+    # Shared (model, sha256(text)) embedding cache; empty path disables it
+    embedding_cache_path: str = "./.penguincode/embeddings.db"
+    embedding_cache_max_entries: int = 100_000
     stores: MemoryStoresConfig = field(default_factory=MemoryStoresConfig)
 
 
@@ -179,6 +230,17 @@ class RegulatorsConfig:
     request_queue_size: int = 10
     min_request_interval_ms: int = 100
     cooldown_after_error_ms: int = 1000
+    # Model affinity (drain queued calls per model to avoid weight swaps)
+    affinity_max_wait_ms: int = 3000  # Max time a call for another model waits behind a run
+    affinity_max_run: int = 8  # Max same-model admissions while other models wait
+    affinity_keep_alive: str = "10m"  # keep_alive sent while more calls for the model are queued
+    # keep_alive per model role (keys as in `models`); a loaded model keeps its
+    # prompt cache, so the orchestrator, called every turn, stays longest
+    keep_alive: Dict[str, str] = field(default_factory=lambda: {
+        "orchestration": "30m",
+        "execution": "15m",
+        "exploration": "15m",
+    })
     # Agent concurrency settings
     max_concurrent_agents: int = 5  # Max agents running in parallel
     agent_timeout_seconds: int = 300  # Timeout for individual agent tasks
@@ -296,9 +358,15 @@ class DocsRagConfig:
     max_pages_per_library: int = 50
     max_libraries_to_index: int = 20  # Only index top N libraries
     cache_max_age_days: int = 7
-    # Chunking settings
-    chunk_size: int = 1000
-    chunk_overlap: int = 200
+    # Crawler: pages fetched at once and minimum gap between requests to one host
+    crawl_concurrency: int = 4
+    crawl_delay_ms: int = 500
+    # Chunking settings (in embedding-model tokens)
+    chunk_tokens: int = 384
+    chunk_overlap_tokens: int = 32
+    # Embedding pipeline: chunks per /api/embed call and calls in flight
+    embed_batch_size: int = 32
+    embed_concurrency: int = 4
     # Context injection limits
     max_context_tokens: int = 2000
     max_chunks_per_query: int = 5
@@ -338,9 +406,12 @@ class Settings:
     """Main settings configuration."""
 
     ollama: OllamaConfig = field(default_factory=OllamaConfig)
+    http: HttpConfig = field(default_factory=HttpConfig)
+    structured_output: StructuredOutputConfig = field(default_factory=StructuredOutputConfig)
     models: ModelsConfig = field(default_factory=ModelsConfig)
     agents: Dict[str, AgentConfig] = field(default_factory=dict)
     defaults: DefaultsConfig = field(default_factory=DefaultsConfig)
+    generation: GenerationConfig = field(default_factory=GenerationConfig)
     security: SecurityConfig = field(default_factory=SecurityConfig)
     history: HistoryConfig = field(default_factory=HistoryConfig)
     research: ResearchConfig = field(default_factory=ResearchConfig)
@@ -366,11 +437,14 @@ class Settings:
         # Parse nested configurations
         return cls(
             ollama=OllamaConfig(**data.get("ollama", {})),
+            http=HttpConfig(**data.get("http", {})),
+            structured_output=StructuredOutputConfig(**data.get("structured_output", {})),
             models=ModelsConfig(**data.get("models", {})),
             agents={
                 name: AgentConfig(**config) for name, config in data.get("agents", {}).items()
             },
             defaults=DefaultsConfig(**data.get("defaults", {})),
+            generation=GenerationConfig(**data.get("generation", {})),
             security=SecurityConfig(**data.get("security", {})),
             history=HistoryConfig(**data.get("history", {})),
             research=cls._parse_research_config(data.get("research", {})),
@@ -437,6 +511,8 @@ class Settings:
             enabled=data.get("enabled", True),
             vector_store=data.get("vector_store", "chroma"),
             embedding_model=data.get("embedding_model", "nomic-embed-text"),
+            embedding_cache_path=data.get("embedding_cache_path", "./.penguincode/embeddings.db"),
+            embedding_cache_max_entries=data.get("embedding_cache_max_entries", 100_000),
             stores=stores,
         )
 
@@ -456,8 +532,15 @@ class Settings:
             max_pages_per_library=data.get("max_pages_per_library", 50),
             max_libraries_to_index=data.get("max_libraries_to_index", 20),
             cache_max_age_days=data.get("cache_max_age_days", 7),
-            chunk_size=data.get("chunk_size", 1000),
-            chunk_overlap=data.get("chunk_overlap", 200),
+            crawl_concurrency=data.get("crawl_concurrency", 4),
+            crawl_delay_ms=data.get("crawl_delay_ms", 500),
+            # chunk_size/chunk_overlap were character counts (~4 chars per token)
+            chunk_tokens=data.get("chunk_tokens", data.get("chunk_size", 1536) // 4),
+            chunk_overlap_tokens=data.get(
+                "chunk_overlap_tokens", data.get("chunk_overlap", 128) // 4
+            ),
+            embed_batch_size=data.get("embed_batch_size", 32),
+            embed_concurrency=data.get("embed_concurrency", 4),
             max_context_tokens=data.get("max_context_tokens", 2000),
             max_chunks_per_query=data.get("max_chunks_per_query", 5),
             auto_detect_on_start=data.get("auto_detect_on_start", True),
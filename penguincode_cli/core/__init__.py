@@ -2,6 +2,7 @@
 
 from .repl import REPLSession, start_repl
 from .session import Session, SessionManager
+from .usage import UsageTracker
 from . import debug
 
 __all__ = [
@@ -9,5 +10,6 @@ __all__ = [
     "start_repl",
     "Session",
     "SessionManager",
+    "UsageTracker",
     "debug",
 ]
@@ -13,7 +13,16 @@ from prompt_toolkit.styles import Style
 from rich.table import Table
 
 from penguincode_cli.config.settings import Settings, load_settings
-from penguincode_cli.ollama import OllamaClient
+from penguincode_cli.ollama import (
+    EmbeddingCache,
+    OllamaClient,
+    RequestScheduler,
+    configure_generation,
+    configure_model_registry,
+)
+from penguincode_cli.ollama.structured import configure_structured_output
+from penguincode_cli.shared.html_extract import shutdown_parser_pool
+from penguincode_cli.shared.transport import configure_transport, get_transport
 from penguincode_cli.ui import console, print_error, print_info, print_success
 
 from .session import Session, SessionManager
@@ -52,6 +61,8 @@ class REPLSession:
 
         # Ollama client (will be initialized in async context)
         self.ollama_client: Optional[OllamaClient] = None
+        # GPU scheduler in front of the client - agents talk to this
+        self.llm_client: Optional[RequestScheduler] = None
 
         # Chat agent (main orchestrator) and specialized agents
         self.chat_agent: Optional[ChatAgent] = None
@@ -66,18 +77,33 @@ class REPLSession:
         # Memory manager for cross-session persistence (initialized in async context)
         self.memory_manager: Optional["MemoryManager"] = None
 
+        # Embedding cache shared by memory and docs RAG
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        if self.settings.memory.embedding_cache_path:
+            self.embedding_cache = EmbeddingCache.shared(
+                self.settings.memory.embedding_cache_path,
+                max_entries=self.settings.memory.embedding_cache_max_entries,
+            )
+
     async def __aenter__(self):
         """Async context manager entry."""
         # Lazy import agents to avoid circular import
         from penguincode_cli.agents import ChatAgent, ExecutorAgent, ExplorerAgent
         from penguincode_cli.tools.memory import MemoryManager
 
-        # Initialize Ollama client
+        # Initialize Ollama client (over the shared pooled HTTP transport)
+        configure_transport(self.settings.http)
+        configure_structured_output(self.settings.structured_output)
+        configure_generation(self.settings)
         self.ollama_client = OllamaClient(
             base_url=self.settings.ollama.api_url,
             timeout=self.settings.ollama.timeout,
         )
         await self.ollama_client.__aenter__()
+        registry = configure_model_registry(self.ollama_client, self.settings.ollama.model_registry_path)
+        self.llm_client = RequestScheduler(
+            self.ollama_client, self.settings.regulators, self.settings.models
+        )
 
         # Initialize memory manager for cross-session persistence
         if self.settings.memory.enabled:
@@ -86,6 +112,8 @@ class REPLSession:
                     config=self.settings.memory,
                     ollama_url=self.settings.ollama.api_url,
                     llm_model=self.settings.models.orchestration,
+                    embedding_cache=self.embedding_cache,
+                    embedding_dims=await registry.embedding_dims(self.settings.memory.embedding_model),
                 )
                 if self.memory_manager.is_enabled():
                     print_info("Memory layer initialized")
@@ -95,7 +123,7 @@ class REPLSession:
 
         # Initialize chat agent (main orchestrator) with memory support
         self.chat_agent = ChatAgent(
-            ollama_client=self.ollama_client,
+            ollama_client=self.llm_client,
             settings=self.settings,
             project_dir=str(self.project_dir),
             memory_manager=self.memory_manager,
@@ -107,12 +135,12 @@ class REPLSession:
         executor_model = self.settings.models.execution
 
         self.agents["executor"] = ExecutorAgent(
-            ollama_client=self.ollama_client,
+            ollama_client=self.llm_client,
             working_dir=str(self.project_dir),
             model=executor_model,
         )
         self.agents["explorer"] = ExplorerAgent(
-            ollama_client=self.ollama_client,
+            ollama_client=self.llm_client,
             working_dir=str(self.project_dir),
             model=explorer_model,
         )
@@ -167,14 +195,19 @@ class REPLSession:
                 cache_dir=self.settings.docs_rag.cache_dir,
                 max_pages_per_library=self.settings.docs_rag.max_pages_per_library,
                 cache_max_age_days=self.settings.docs_rag.cache_max_age_days,
+                crawl_concurrency=self.settings.docs_rag.crawl_concurrency,
+                crawl_delay_ms=self.settings.docs_rag.crawl_delay_ms,
             )
 
             self.docs_indexer = DocumentationIndexer(
                 collection_name=self.settings.docs_rag.collection,
                 embedding_model=self.settings.memory.embedding_model,
-                chunk_size=self.settings.docs_rag.chunk_size,
-                chunk_overlap=self.settings.docs_rag.chunk_overlap,
+                chunk_tokens=self.settings.docs_rag.chunk_tokens,
+                chunk_overlap_tokens=self.settings.docs_rag.chunk_overlap_tokens,
                 ollama_base_url=self.settings.ollama.api_url,
+                embed_batch_size=self.settings.docs_rag.embed_batch_size,
+                embed_concurrency=self.settings.docs_rag.embed_concurrency,
+                embedding_cache=self.embedding_cache,
             )
 
             self.context_injector = ContextInjector(
@@ -183,8 +216,11 @@ class REPLSession:
                 max_chunks=self.settings.docs_rag.max_chunks_per_query,
             )
 
-            # Cleanup expired cache entries
-            expired = self.docs_fetcher.expunge_expired()
+            # Cleanup long-expired cache entries (recently expired ones are
+            # revalidated on next fetch instead of re-downloaded)
+            expired = self.docs_fetcher.expunge_expired(
+                grace_days=self.settings.docs_rag.cache_max_age_days * 3
+            )
             if expired > 0:
                 print_info(f"Cleaned up {expired} expired doc cache entries")
 
@@ -231,7 +267,9 @@ class REPLSession:
                 if docs:
                     chunks = await self.docs_indexer.index_language(lang, docs)
                     indexed_count += chunks
-                    console.print(f"[dim]  Indexed {chunks} chunks for {lang.value}[/dim]")
+                    console.print(
+                        f"[dim]  Indexed {chunks} chunks for {lang.value}{self._index_rate()}[/dim]"
+                    )
             except Exception as e:
                 console.print(f"[dim]  Failed to index {lang.value}: {e}[/dim]")
 
@@ -273,21 +311,38 @@ class REPLSession:
             docs = await self.docs_fetcher.fetch_language_docs(lang_enum)
             if docs:
                 chunks = await self.docs_indexer.index_language(lang_enum, docs)
-                console.print(f"[dim]  Indexed {chunks} chunks[/dim]")
+                console.print(f"[dim]  Indexed {chunks} chunks{self._index_rate()}[/dim]")
                 return True
         except Exception as e:
             console.print(f"[dim]  Failed: {e}[/dim]")
 
         return False
 
+    def _index_rate(self) -> str:
+        """Throughput suffix for the last docs indexing run ("" if nothing was embedded)."""
+        stats = self.docs_indexer.last_index_stats if self.docs_indexer else {}
+        if not stats:
+            return ""
+        return f" ({stats['chunks_per_sec']} chunks/s in {stats['seconds']:.1f}s)"
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
         # Save session
         self.session_manager.save_session(self.session)
 
-        # Close Ollama client
+        # Close the docs crawler's and indexer's HTTP sessions
+        if self.docs_fetcher:
+            await self.docs_fetcher.close()
+        if self.docs_indexer:
+            await self.docs_indexer.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
+        shutdown_parser_pool()
+
+        # Close Ollama client and the pooled HTTP connections
         if self.ollama_client:
             await self.ollama_client.__aexit__(exc_type, exc_val, exc_tb)
+        await get_transport().aclose()
 
     async def handle_command(self, command: str) -> bool:
         """
@@ -316,6 +371,8 @@ class REPLSession:
             self.show_history()
         elif cmd == "/agents":
             self.show_agents()
+        elif cmd == "/stats":
+            self.show_stats()
         elif cmd == "/read":
             await self.handle_read(args)
         elif cmd == "/explore":
@@ -346,6 +403,7 @@ class REPLSession:
   /reset             Reset conversation history
   /history           Show conversation history
   /agents            List available agents
+  /stats             Show token usage and generation speed
 
 [yellow]Agent Commands:[/yellow]
   /explore <query>   Explore codebase (read-only)
@@ -387,6 +445,60 @@ class REPLSession:
                 content = content[:200] + "..."
             console.print(f"[{role_color}]{msg.role}:[/{role_color}] {content}\n")
 
+    def show_stats(self) -> None:
+        """Show token/latency accounting for this session."""
+        if not self.chat_agent:
+            print_info("No usage recorded yet")
+            return
+
+        usage = self.chat_agent.usage
+        table = Table(show_header=True)
+        table.add_column("Scope")
+        table.add_column("Calls", justify="right")
+        table.add_column("Prompt", justify="right")
+        table.add_column("Completion", justify="right")
+        table.add_column("Prompt eval", justify="right")
+        table.add_column("Tokens/s", justify="right")
+
+        def add_row(scope: str, stats) -> None:
+            table.add_row(
+                scope,
+                str(stats.requests),
+                str(stats.prompt_tokens),
+                str(stats.completion_tokens),
+                f"{stats.prompt_eval_duration_ms:.0f}ms",
+                f"{stats.tokens_per_second:.1f}",
+            )
+
+        add_row("[bold]session[/bold]", usage.session)
+        if usage.current_turn:
+            add_row(f"last turn (#{usage.current_turn.turn})", usage.current_turn.usage)
+        for name, stats in sorted(usage.by_agent.items()):
+            add_row(f"  agent: {name}", stats)
+        for step_num, stats in sorted(usage.by_step.items()):
+            add_row(f"  plan step {step_num}", stats)
+
+        console.print("\n[bold cyan]Token Usage:[/bold cyan]\n")
+        console.print(table)
+
+        if self.embedding_cache:
+            cache = self.embedding_cache.get_stats()
+            console.print("\n[bold cyan]Embedding Cache:[/bold cyan]\n")
+            console.print(
+                f"  hit rate: {cache['hit_rate']:.0%} ({cache['hits']} hits, {cache['misses']} misses)  "
+                f"entries: {cache['entries']}/{cache['max_entries']}  evictions: {cache['evictions']}"
+            )
+
+        http = get_transport().get_stats()
+        if http["requests"]:
+            console.print("\n[bold cyan]HTTP Connections:[/bold cyan]\n")
+            console.print(
+                f"  requests: {http['requests']}  new connections: {http['connections']} "
+                f"({http['tls_handshakes']} TLS)  reuse: {http['reuse_rate']:.0%}  "
+                f"HTTP/2: {'on' if http['http2'] else 'off'}"
+            )
+        console.print()
+
     def show_agents(self) -> None:
         """Show available agents."""
         console.print("\n[bold cyan]Available Agents:[/bold cyan]\n")
@@ -395,6 +507,20 @@ class REPLSession:
                 f"  [green]{name}[/green]: {agent.config.description} "
                 f"[dim](model: {agent.config.model})[/dim]"
             )
+
+        if self.llm_client:
+            stats = self.llm_client.get_stats()
+            console.print("\n[bold cyan]GPU Request Queue:[/bold cyan]\n")
+            console.print(
+                f"  in flight: {stats['in_flight']}/{stats['limits']['max_concurrent_requests']}  "
+                f"queued: {stats['queue_depth']}/{stats['limits']['request_queue_size']}  "
+                f"models: {', '.join(stats['active_models']) or '-'}"
+            )
+            console.print(
+                f"  [dim]requests: {stats['submitted']} ({stats['failed']} failed, "
+                f"{stats['rejected']} rejected)  wait avg/p95/max: "
+                f"{stats['avg_wait_ms']:.0f}/{stats['p95_wait_ms']:.0f}/{stats['max_wait_ms']:.0f}ms[/dim]"
+            )
         console.print()
 
     async def handle_read(self, path: str) -> None:
@@ -597,7 +723,7 @@ class REPLSession:
                 # Index docs
                 chunks = await self.docs_indexer.index_library(lib, docs)
                 total_chunks += chunks
-                console.print(f"    Indexed {chunks} chunks")
+                console.print(f"    Indexed {chunks} chunks{self._index_rate()}")
             else:
                 console.print(f"    [dim]No docs found[/dim]")
 
@@ -728,29 +854,21 @@ class REPLSession:
                 for lang in detected_langs:
                     await self._ensure_language_indexed(lang)
 
-            # Inject documentation context if available
+            # Documentation context, packed into the prompt by the chat agent
+            docs_context = ""
             if self.context_injector and self.project_context:
                 should_inject = await self.context_injector.should_inject_context(
                     message, self.project_context
                 )
                 if should_inject:
-                    context = await self.context_injector.get_relevant_context(
+                    docs_context = await self.context_injector.get_relevant_context(
                         message, self.project_context
                     )
-                    if context:
-                        # Augment the chat agent's system prompt temporarily
-                        original_prompt = self.chat_agent.system_prompt
-                        self.chat_agent.system_prompt = self.context_injector.build_augmented_prompt(
-                            original_prompt, context
-                        )
+                    if docs_context:
                         console.print("[dim](using documentation context)[/dim]")
 
             # Use chat agent to process the message
-            response = await self.chat_agent.process(message)
-
-            # Restore original prompt if modified
-            if hasattr(self, '_original_prompt'):
-                self.chat_agent.system_prompt = self._original_prompt
+            response = await self.chat_agent.process(message, docs_context=docs_context)
 
             # Display the response
             console.print(f"\n[bold blue]Assistant:[/bold blue]")
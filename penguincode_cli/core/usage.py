@@ -0,0 +1,126 @@
+"""Token/latency accounting rolled up across the agent tree.
+
+Every LLM call reports a UsageStats (from the final streamed chunk). The
+tracker sums them per agent, per plan step, per user turn and per session.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from penguincode_cli.ollama.types import UsageStats
+
+# Agent name used for the orchestrator's own LLM calls
+ORCHESTRATOR = "orchestrator"
+
+
+@dataclass
+class AgentRunUsage:
+    """Usage of a single spawned agent run within a turn."""
+
+    agent_type: str
+    success: bool
+    duration_ms: float
+    usage: UsageStats
+    step_num: Optional[int] = None
+
+
+@dataclass
+class TurnUsage:
+    """Usage for one user turn."""
+
+    turn: int
+    started_at: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    usage: UsageStats = field(default_factory=UsageStats)
+    agent_runs: List[AgentRunUsage] = field(default_factory=list)
+
+
+class UsageTracker:
+    """Aggregates LLM usage per agent, plan step, turn and session."""
+
+    def __init__(self, max_turns: int = 50):
+        """
+        Initialize tracker.
+
+        Args:
+            max_turns: Number of past turns to keep for reporting
+        """
+        self.max_turns = max_turns
+        self.session = UsageStats()
+        self.by_agent: Dict[str, UsageStats] = {}
+        self.by_step: Dict[int, UsageStats] = {}  # Steps of the most recent plan
+        self.turns: List[TurnUsage] = []
+        self._turn_count = 0
+
+    @property
+    def current_turn(self) -> Optional[TurnUsage]:
+        """The turn in progress (or the last finished one)."""
+        return self.turns[-1] if self.turns else None
+
+    def start_turn(self) -> TurnUsage:
+        """Begin accounting for a new user turn."""
+        self._turn_count += 1
+        turn = TurnUsage(turn=self._turn_count)
+        self.turns.append(turn)
+        if len(self.turns) > self.max_turns:
+            self.turns.pop(0)
+        return turn
+
+    def end_turn(self) -> None:
+        """Mark the current turn finished."""
+        turn = self.current_turn
+        if turn:
+            turn.duration_ms = (time.time() - turn.started_at) * 1000
+
+    def start_plan(self) -> None:
+        """Reset per-step totals for a new plan execution."""
+        self.by_step = {}
+
+    def record(self, agent: str, usage: UsageStats, step_num: Optional[int] = None) -> None:
+        """
+        Record usage from one or more LLM calls.
+
+        Args:
+            agent: Agent type that made the calls
+            usage: Usage to add
+            step_num: Plan step the calls belong to, if any
+        """
+        self.session.add(usage)
+        self.by_agent.setdefault(agent, UsageStats()).add(usage)
+        if step_num is not None:
+            self.by_step.setdefault(step_num, UsageStats()).add(usage)
+        if self.current_turn:
+            self.current_turn.usage.add(usage)
+
+    def record_agent_run(
+        self,
+        agent_type: str,
+        success: bool,
+        duration_ms: float,
+        usage: UsageStats,
+        step_num: Optional[int] = None,
+    ) -> AgentRunUsage:
+        """Record a completed spawned-agent run (and its usage)."""
+        self.record(agent_type, usage, step_num)
+        run = AgentRunUsage(
+            agent_type=agent_type,
+            success=success,
+            duration_ms=duration_ms,
+            usage=usage,
+            step_num=step_num,
+        )
+        if self.current_turn:
+            self.current_turn.agent_runs.append(run)
+        return run
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize all rollups as plain dicts."""
+        turn = self.current_turn
+        return {
+            "session": self.session.to_dict(),
+            "turn": turn.usage.to_dict() if turn else UsageStats().to_dict(),
+            "turns": self._turn_count,
+            "by_agent": {name: u.to_dict() for name, u in sorted(self.by_agent.items())},
+            "by_step": {num: u.to_dict() for num, u in sorted(self.by_step.items())},
+        }
@@ -27,6 +27,7 @@ from .sources import (
     get_language_doc_source,
     get_priority_docs_for_project,
 )
+from .crawler import DocsCrawler, FetchedPage, HostRateLimiter
 from .fetcher import DocumentationFetcher, CacheEntry
 from .indexer import DocumentationIndexer
 from .injector import ContextInjector
@@ -50,6 +51,9 @@ __all__ = [
     # Fetching
     "DocumentationFetcher",
     "CacheEntry",
+    "DocsCrawler",
+    "FetchedPage",
+    "HostRateLimiter",
     # Indexing
     "DocumentationIndexer",
     # Injection
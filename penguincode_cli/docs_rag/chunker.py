@@ -0,0 +1,395 @@
+"""Markdown-aware chunking for documentation indexing.
+
+Splits the markdown produced by ``DocumentationFetcher`` on heading and
+code-fence boundaries instead of raw word counts, so fences and headings
+survive intact and each chunk knows its section. Sizes are measured in
+tokens of the embedding model: exactly when the HuggingFace ``tokenizers``
+package and the model's tokenizer are available, otherwise with a
+characters-per-token ratio calibrated against Ollama's own token counts.
+The tokenizer is loaded on first use, from the local HuggingFace cache
+when it's there (downloaded only if ``HF_HUB_OFFLINE`` isn't set).
+
+Chunk boundaries are content-defined (a boundary falls after a block or
+word whose hash hits a target once a chunk is big enough), so an edit
+only changes the chunks around it and chunk IDs stay stable.
+"""
+
+import math
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Fallback ratio until calibrated (typical for English prose and code)
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# HuggingFace tokenizers for common Ollama embedding models
+EMBEDDING_TOKENIZERS = {
+    "nomic-embed-text": "nomic-ai/nomic-embed-text-v1.5",
+    "mxbai-embed-large": "mixedbread-ai/mxbai-embed-large-v1",
+    "all-minilm": "sentence-transformers/all-MiniLM-L6-v2",
+    "bge-m3": "BAAI/bge-m3",
+}
+
+# Words hashed to decide whether a boundary falls inside an oversized block
+BOUNDARY_WINDOW = 3
+
+# Once a chunk reaches its minimum size, about one block in this many ends it
+BLOCK_BOUNDARY_DIVISOR = 3
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_SOURCE = re.compile(r"^# Source:\s*(\S+)\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def _load_tokenizer(model: str):
+    """Load the HuggingFace tokenizer for an embedding model (None if unavailable).
+
+    The local HuggingFace cache is tried first; the Hub only if that misses
+    and ``HF_HUB_OFFLINE`` isn't set.
+    """
+    name = EMBEDDING_TOKENIZERS.get(model.split(":")[0])
+    if not name:
+        return None
+    try:
+        from tokenizers import Tokenizer
+    except ImportError:
+        return None
+
+    try:
+        from huggingface_hub import try_to_load_from_cache
+
+        cached = try_to_load_from_cache(name, "tokenizer.json")
+        if isinstance(cached, str):
+            return Tokenizer.from_file(cached)
+    except Exception:
+        pass
+
+    if os.environ.get("HF_HUB_OFFLINE", "").lower() in ("1", "true", "yes", "on"):
+        return None
+    try:
+        return Tokenizer.from_pretrained(name)
+    except Exception:
+        return None
+
+
+class TokenCounter:
+    """Counts text in the embedding model's tokens."""
+
+    def __init__(
+        self,
+        model: str,
+        chars_per_token: Optional[float] = None,
+        use_tokenizer: bool = True,
+    ):
+        """
+        Initialize counter.
+
+        Args:
+            model: Ollama embedding model name
+            chars_per_token: Previously calibrated ratio (None = not calibrated)
+            use_tokenizer: Try to load the model's exact tokenizer (on first use)
+        """
+        self.model = model
+        self.chars_per_token = chars_per_token or DEFAULT_CHARS_PER_TOKEN
+        self.calibrated = chars_per_token is not None
+        self._tokenizer = None
+        self._loaded = not use_tokenizer
+
+    def load(self) -> None:
+        """Load the model's tokenizer if not tried yet (may read disk or download)."""
+        if not self._loaded:
+            self._tokenizer = _load_tokenizer(self.model)
+            self._loaded = True
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the model's real tokenizer."""
+        self.load()
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+        if not text:
+            return 0
+        self.load()
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+        return max(1, math.ceil(len(text) / self.chars_per_token))
+
+    def calibrate(self, chars: int, tokens: int) -> None:
+        """
+        Set the chars-per-token ratio from a count reported by the model.
+
+        Args:
+            chars: Characters of text the model processed
+            tokens: Tokens the model reported for it (``prompt_eval_count``)
+        """
+        if chars > 0 and tokens > 0:
+            self.chars_per_token = chars / tokens
+            self.calibrated = True
+
+
+@dataclass
+class MarkdownChunk:
+    """A chunk of markdown with the section it came from."""
+
+    text: str
+    section: str = ""
+    tokens: int = 0
+
+
+@dataclass
+class _Block:
+    """A heading, code fence or paragraph run."""
+
+    kind: str  # heading | code | text
+    text: str
+    section: str
+    heading: str = ""  # Markdown heading line of the block's section
+    tokens: int = 0
+
+
+@dataclass
+class _Pending:
+    blocks: List[_Block] = field(default_factory=list)
+    tokens: int = 0
+
+
+def source_url(markdown: str) -> str:
+    """URL from the ``# Source:`` line the fetcher puts at the top of a page."""
+    for line in markdown.lstrip().splitlines()[:1]:
+        match = _SOURCE.match(line)
+        if match:
+            return match.group(1)
+    return ""
+
+
+def _is_boundary(text: str) -> bool:
+    return zlib.crc32(text.encode()) % BLOCK_BOUNDARY_DIVISOR == 0
+
+
+def _is_word_boundary(words: List[str], index: int, divisor: int) -> bool:
+    """Whether the words ending at ``index`` hash to a split point."""
+    window = " ".join(words[max(0, index - BOUNDARY_WINDOW + 1) : index + 1])
+    return zlib.crc32(window.encode()) % divisor == 0
+
+
+class MarkdownChunker:
+    """Splits markdown into token-sized chunks along its structure."""
+
+    def __init__(self, counter: TokenCounter, chunk_tokens: int = 384, overlap_tokens: int = 32):
+        """
+        Initialize chunker.
+
+        Args:
+            counter: Token counter for the embedding model
+            chunk_tokens: Maximum tokens per chunk
+            overlap_tokens: Tokens repeated between pieces of a split oversized block
+        """
+        self.counter = counter
+        self.max_tokens = max(16, chunk_tokens)
+        self.min_tokens = self.max_tokens // 2
+        self.overlap_tokens = max(0, min(overlap_tokens, self.max_tokens // 4))
+
+    def chunk(self, markdown: str) -> List[MarkdownChunk]:
+        """
+        Split markdown into chunks.
+
+        Small sections are merged up to ``chunk_tokens``; a new heading ends
+        the current chunk once it is at least half full. Chunks that
+        continue a section start with its heading line.
+
+        Args:
+            markdown: Markdown text
+
+        Returns:
+            Chunks in document order
+        """
+        chunks: List[MarkdownChunk] = []
+        pending = _Pending()
+
+        def flush() -> None:
+            # Trailing headings belong to the next chunk
+            trailing: List[_Block] = []
+            while pending.blocks and pending.blocks[-1].kind == "heading":
+                trailing.insert(0, pending.blocks.pop())
+            if pending.blocks:
+                chunks.append(MarkdownChunk(
+                    text="\n\n".join(b.text for b in pending.blocks),
+                    section=pending.blocks[0].section,
+                    tokens=pending.tokens - sum(b.tokens for b in trailing),
+                ))
+            pending.blocks = trailing
+            pending.tokens = sum(b.tokens for b in trailing)
+
+        for block in self._blocks(markdown):
+            if block.kind == "heading":
+                if pending.tokens >= self.min_tokens:
+                    flush()
+                pending.blocks.append(block)
+                pending.tokens += block.tokens
+                continue
+
+            heading_tokens = self.counter.count(block.heading)
+            for piece in self._fit(block, self.max_tokens - heading_tokens):
+                if pending.blocks and pending.tokens + piece.tokens > self.max_tokens:
+                    flush()
+                if not pending.blocks and piece.heading:
+                    # Continuing a section: repeat its heading for context
+                    pending.blocks.append(
+                        _Block("heading", piece.heading, piece.section, tokens=heading_tokens)
+                    )
+                    pending.tokens += heading_tokens
+                pending.blocks.append(piece)
+                pending.tokens += piece.tokens
+                if pending.tokens >= self.min_tokens and _is_boundary(piece.text):
+                    flush()
+        flush()
+        return chunks
+
+    def _blocks(self, markdown: str) -> List[_Block]:
+        """Parse markdown into heading, code and text blocks."""
+        blocks: List[_Block] = []
+        headings: List[str] = []  # Titles by level (index 0 = h1)
+        heading_line = ""
+        lines: List[str] = []
+        fence: Optional[str] = None
+
+        def section() -> str:
+            return " > ".join(h for h in headings if h)
+
+        def emit(kind: str) -> None:
+            text = "\n".join(lines).strip("\n")
+            lines.clear()
+            if text.strip():
+                blocks.append(_Block(
+                    kind, text, section(), heading_line, self.counter.count(text)
+                ))
+
+        for line in markdown.splitlines():
+            if fence is not None:
+                lines.append(line)
+                if line.strip().startswith(fence):
+                    emit("code")
+                    fence = None
+                continue
+
+            match = _FENCE.match(line)
+            if match:
+                emit("text")
+                fence = match.group(1)
+                lines.append(line)
+                continue
+
+            if not blocks and not lines and _SOURCE.match(line):
+                continue  # Fetcher's source line; kept as url metadata instead
+
+            match = _HEADING.match(line)
+            if match:
+                emit("text")
+                level = len(match.group(1))
+                del headings[level - 1 :]
+                headings.extend([""] * (level - 1 - len(headings)))
+                headings.append(match.group(2))
+                heading_line = line.strip()
+                blocks.append(_Block(
+                    "heading", heading_line, section(), heading_line,
+                    self.counter.count(heading_line),
+                ))
+                continue
+
+            if not line.strip():
+                emit("text")
+                continue
+            lines.append(line)
+
+        emit("code" if fence is not None else "text")
+        return blocks
+
+    def _fit(self, block: _Block, limit: int) -> List[_Block]:
+        """Split a block larger than ``limit`` tokens (lines first, then words).
+
+        Each piece of a code block is wrapped in the block's fence lines.
+        """
+        limit = max(8, limit)
+        if block.tokens <= limit:
+            return [block]
+
+        opening = closing = ""
+        lines = block.text.split("\n")
+        match = _FENCE.match(lines[0]) if block.kind == "code" else None
+        if match:
+            opening = lines.pop(0)
+            if lines and lines[-1].strip().startswith(match.group(1)):
+                closing = lines.pop()
+            else:
+                closing = match.group(1)  # Unterminated fence
+            fence_tokens = self.counter.count(opening) + self.counter.count(closing) + 2
+            limit = max(8, limit - fence_tokens)
+
+        pieces: List[_Block] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        def add(text: str, tokens: int) -> None:
+            if opening:
+                text = f"{opening}\n{text}\n{closing}"
+                tokens += fence_tokens
+            pieces.append(_Block(block.kind, text, block.section, block.heading, tokens))
+
+        for line in lines:
+            tokens = self.counter.count(line) + 1
+            if tokens > limit:
+                if current:
+                    add("\n".join(current), current_tokens)
+                    current, current_tokens = [], 0
+                for text in self._split_words(line, limit):
+                    add(text, self.counter.count(text))
+                continue
+            if current and current_tokens + tokens > limit:
+                add("\n".join(current), current_tokens)
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += tokens
+            if current_tokens >= limit // 2 and _is_boundary(line):
+                add("\n".join(current), current_tokens)
+                current, current_tokens = [], 0
+        if current:
+            add("\n".join(current), current_tokens)
+        return pieces
+
+    def _split_words(self, text: str, limit: int) -> List[str]:
+        """Content-defined split of one long line into pieces of at most ``limit`` tokens."""
+        words = text.split()
+        counts = [self.counter.count(word) for word in words]
+        overlap = self.overlap_tokens
+        budget = max(1, limit - overlap)
+        minimum = max(1, budget // 2)
+        divisor = max(1, round((budget - minimum) / max(1.0, sum(counts) / len(counts))))
+
+        spans = []
+        start = 0
+        tokens = 0
+        for i, count in enumerate(counts):
+            if tokens and tokens + count > budget:
+                spans.append((start, i))
+                start, tokens = i, 0
+            tokens += count
+            if tokens >= minimum and _is_word_boundary(words, i, divisor):
+                spans.append((start, i + 1))
+                start, tokens = i + 1, 0
+        if start < len(words):
+            spans.append((start, len(words)))
+
+        pieces = []
+        for begin, end in spans:
+            # Carry up to ``overlap`` tokens from the previous piece
+            lead = begin
+            carried = 0
+            while lead > 0 and carried + counts[lead - 1] <= overlap:
+                lead -= 1
+                carried += counts[lead]
+            pieces.append(" ".join(words[lead:end]))
+        return pieces
@@ -0,0 +1,251 @@
+"""Concurrent, polite crawler for documentation sites.
+
+Starts from a source's seed URLs and sitemap, follows in-scope links
+(same host, under the base URL's path) breadth-first, and keeps a bounded
+number of pages in flight. Requests to each host are spaced by a minimum
+interval (raised to the site's robots.txt ``Crawl-delay``) and URLs
+disallowed by robots.txt are skipped.
+
+Fetching a page (cache lookup, conditional GET, HTML conversion) is left
+to a callback so the crawler only deals with discovery and scheduling.
+"""
+
+import asyncio
+import posixpath
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+USER_AGENT = "PenguinCode-DocsFetcher/0.1 (+https://github.com/penguintechinc/penguin-code)"
+
+# Links to these are never pages worth indexing
+SKIP_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp",
+    ".css", ".js", ".json", ".xml", ".txt",
+    ".zip", ".gz", ".tar", ".tgz", ".bz2", ".pdf", ".epub",
+    ".woff", ".woff2", ".ttf", ".mp4", ".webm",
+}
+
+# Child sitemaps followed from a sitemap index
+MAX_CHILD_SITEMAPS = 5
+
+_LOC = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+
+
+@dataclass
+class FetchedPage:
+    """A crawled page: its markdown and the links found on it."""
+
+    url: str
+    content: str
+    links: List[str] = field(default_factory=list)
+
+
+class HostRateLimiter:
+    """Spaces request starts to each host by a minimum interval."""
+
+    def __init__(self, interval: float):
+        """
+        Initialize limiter.
+
+        Args:
+            interval: Minimum seconds between requests to one host
+        """
+        self.interval = interval
+        self._next_slot: Dict[str, float] = {}
+        self._delays: Dict[str, float] = {}
+
+    def set_delay(self, host: str, seconds: float) -> None:
+        """Use a longer interval for a host (e.g. its robots.txt Crawl-delay)."""
+        self._delays[host] = max(self.interval, seconds)
+
+    async def wait(self, url: str) -> None:
+        """Wait until a request to this URL's host may start."""
+        host = urlparse(url).netloc
+        interval = self._delays.get(host, self.interval)
+        now = time.monotonic()
+        # Reserve the slot before sleeping so concurrent callers queue up
+        slot = max(now, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = slot + interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def normalize_url(url: str) -> str:
+    """Drop fragments and query strings so a page is only crawled once."""
+    url, _ = urldefrag(url)
+    parsed = urlparse(url)
+    return parsed._replace(query="").geturl()
+
+
+class DocsCrawler:
+    """Breadth-first crawler bounded by page count and concurrency."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        limiter: HostRateLimiter,
+        max_pages: int = 50,
+        concurrency: int = 4,
+        respect_robots: bool = True,
+    ):
+        """
+        Initialize crawler.
+
+        Args:
+            session: Shared HTTP session (used for sitemaps and robots.txt)
+            limiter: Per-host rate limiter shared with page fetches
+            max_pages: Stop after this many pages have been collected
+            concurrency: Pages fetched at once
+            respect_robots: Skip URLs disallowed by robots.txt
+        """
+        self.session = session
+        self.limiter = limiter
+        self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.respect_robots = respect_robots
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_lock = asyncio.Lock()
+
+    def in_scope(self, url: str, scope: str) -> bool:
+        """Whether a URL is an in-domain page under the scope prefix."""
+        parsed = urlparse(url)
+        scope_parsed = urlparse(scope)
+        if parsed.scheme not in ("http", "https") or parsed.netloc != scope_parsed.netloc:
+            return False
+        path = parsed.path or "/"
+        base = scope_parsed.path or "/"
+        if not path.startswith(base[: base.rfind("/") + 1]):
+            return False
+        return posixpath.splitext(path)[1].lower() not in SKIP_EXTENSIONS
+
+    async def crawl(
+        self,
+        seeds: List[str],
+        fetch: Callable[[str], Awaitable[Optional[FetchedPage]]],
+        sitemap_url: Optional[str] = None,
+        scope: Optional[str] = None,
+    ) -> List[FetchedPage]:
+        """
+        Crawl from seed URLs.
+
+        Args:
+            seeds: Start URLs (always tried first, in order)
+            fetch: Fetches one page; returns None on failure. Pages with empty
+                content are not collected but their links are still followed
+            sitemap_url: Sitemap whose URLs are queued after the seeds
+            scope: URL prefix links must fall under (default: first seed)
+
+        Returns:
+            Pages in discovery order (seeds, then sitemap, then links)
+        """
+        if not seeds or self.max_pages <= 0:
+            return []
+        scope = scope or seeds[0]
+
+        frontier: List[str] = []
+        seen: Set[str] = set()
+
+        def enqueue(url: str) -> None:
+            url = normalize_url(url)
+            if url not in seen and self.in_scope(url, scope):
+                seen.add(url)
+                frontier.append(url)
+
+        for seed in seeds:
+            url = normalize_url(seed)
+            if url not in seen:
+                seen.add(url)
+                frontier.append(url)
+        if sitemap_url:
+            for url in await self.sitemap_urls(sitemap_url):
+                enqueue(url)
+
+        results: Dict[int, FetchedPage] = {}
+        in_flight: Dict[asyncio.Task, int] = {}
+        next_index = 0
+
+        async def visit(url: str) -> Optional[FetchedPage]:
+            if not await self.allowed(url):
+                return None
+            try:
+                return await fetch(url)
+            except Exception:
+                return None
+
+        while frontier or in_flight:
+            # Keep the pipeline full without overshooting max_pages
+            while frontier and len(in_flight) < self.concurrency and (
+                len(results) + len(in_flight) < self.max_pages
+            ):
+                in_flight[asyncio.create_task(visit(frontier.pop(0)))] = next_index
+                next_index += 1
+
+            if not in_flight:
+                break
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = in_flight.pop(task)
+                page = task.result()
+                if page is None:
+                    continue
+                if page.content:
+                    results[index] = page
+                for link in page.links:
+                    enqueue(urljoin(page.url, link))
+
+        return [results[i] for i in sorted(results)]
+
+    async def sitemap_urls(self, sitemap_url: str) -> List[str]:
+        """URLs listed in a sitemap (following a sitemap index one level)."""
+        body = await self._get_text(sitemap_url)
+        if not body:
+            return []
+        locs = _LOC.findall(body)
+        if "<sitemapindex" not in body.lower():
+            return locs
+        urls: List[str] = []
+        for child in locs[:MAX_CHILD_SITEMAPS]:
+            child_body = await self._get_text(child)
+            if child_body:
+                urls.extend(_LOC.findall(child_body))
+        return urls
+
+    async def allowed(self, url: str) -> bool:
+        """Check robots.txt for a URL (fetched once per host)."""
+        if not self.respect_robots:
+            return True
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        async with self._robots_lock:
+            if origin not in self._robots:
+                self._robots[origin] = await self._load_robots(origin)
+        robots = self._robots[origin]
+        return robots is None or robots.can_fetch(USER_AGENT, url)
+
+    async def _load_robots(self, origin: str) -> Optional[RobotFileParser]:
+        body = await self._get_text(f"{origin}/robots.txt")
+        if body is None:
+            return None
+        robots = RobotFileParser()
+        robots.parse(body.splitlines())
+        delay = robots.crawl_delay(USER_AGENT)
+        if delay:
+            self.limiter.set_delay(urlparse(origin).netloc, float(delay))
+        return robots
+
+    async def _get_text(self, url: str) -> Optional[str]:
+        """GET a small text resource (None on any failure or non-200)."""
+        await self.limiter.wait(url)
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status != 200:
+                    return None
+                return await response.text()
+        except Exception:
+            return None
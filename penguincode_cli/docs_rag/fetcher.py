@@ -1,24 +1,34 @@
 """Documentation fetching and caching.
 
 Fetches documentation from official sources and caches locally.
-Includes TTL (time-to-live) for cache expiration.
+Includes TTL (time-to-live) for cache expiration. An expired page is
+revalidated with a conditional GET (ETag / Last-Modified) rather than
+dropped, so unchanged docs are neither re-downloaded nor re-indexed.
+Pages are discovered by ``DocsCrawler`` (seeds, sitemap, in-site links)
+over one shared connection pool.
 """
 
-import asyncio
 import hashlib
 import json
 import os
-import re
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 from urllib.parse import urljoin, urlparse
 
 import aiohttp
-from bs4 import BeautifulSoup
 
+from penguincode_cli.shared.html_extract import (
+    DEFAULT_MAX_HTML_BYTES,
+    decode_html,
+    html_to_markdown,
+    parse_html,
+    read_capped,
+)
+
+from .crawler import USER_AGENT, DocsCrawler, FetchedPage, HostRateLimiter
 from .models import DocChunk, Language, Library
 from .sources import DocSource, get_doc_source, get_language_doc_source
 
@@ -32,6 +42,9 @@ class CacheEntry:
     content_hash: str
     library: str
     language: str
+    etag: str = ""
+    last_modified: str = ""
+    links: List[str] = field(default_factory=list)
 
     def is_expired(self) -> bool:
         """Check if cache entry has expired."""
@@ -54,16 +67,72 @@ class DocumentationFetcher:
         cache_dir: str = "./.penguincode/docs",
         max_pages_per_library: int = 50,
         cache_max_age_days: int = 7,
+        crawl_concurrency: int = 4,
+        crawl_delay_ms: int = 500,
+        max_page_bytes: int = DEFAULT_MAX_HTML_BYTES,
     ):
+        """
+        Initialize fetcher.
+
+        Args:
+            cache_dir: Directory for cached markdown and the cache index
+            max_pages_per_library: Pages collected per library or language
+            cache_max_age_days: TTL before a page is revalidated
+            crawl_concurrency: Pages fetched at once
+            crawl_delay_ms: Minimum gap between requests to one host
+            max_page_bytes: HTML beyond this many bytes is not downloaded
+        """
         self.cache_dir = Path(cache_dir)
         self.max_pages = max_pages_per_library
         self.ttl_days = cache_max_age_days
+        self.crawl_concurrency = max(1, crawl_concurrency)
+        self.max_page_bytes = max_page_bytes
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+        # One connection pool and per-host rate limit for every crawl
+        self._limiter = HostRateLimiter(crawl_delay_ms / 1000)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._crawler: Optional[DocsCrawler] = None
+
         # Cache index file
         self.index_path = self.cache_dir / "cache_index.json"
         self.cache_index: Dict[str, CacheEntry] = self._load_cache_index()
 
+        # Outcomes of revalidating expired pages (not_modified/unchanged/changed/stale)
+        self.revalidation_stats: Dict[str, int] = {
+            "not_modified": 0,
+            "unchanged": 0,
+            "changed": 0,
+            "stale": 0,
+        }
+
+    def _get_crawler(self) -> DocsCrawler:
+        """Get the crawler, opening the shared HTTP session on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.crawl_concurrency * 2,
+                limit_per_host=self.crawl_concurrency,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers={"User-Agent": USER_AGENT}
+            )
+            self._crawler = None
+        if self._crawler is None:
+            self._crawler = DocsCrawler(
+                self._session,
+                self._limiter,
+                max_pages=self.max_pages,
+                concurrency=self.crawl_concurrency,
+            )
+        return self._crawler
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._crawler = None
+
     def _load_cache_index(self) -> Dict[str, CacheEntry]:
         """Load cache index from disk."""
         if self.index_path.exists():
@@ -79,17 +148,7 @@ class DocumentationFetcher:
 
     def _save_cache_index(self) -> None:
         """Save cache index to disk."""
-        data = {
-            k: {
-                "url": v.url,
-                "fetch_time": v.fetch_time,
-                "ttl_days": v.ttl_days,
-                "content_hash": v.content_hash,
-                "library": v.library,
-                "language": v.language,
-            }
-            for k, v in self.cache_index.items()
-        }
+        data = {k: asdict(v) for k, v in self.cache_index.items()}
         with open(self.index_path, "w") as f:
             json.dump(data, f, indent=2)
 
@@ -122,11 +181,20 @@ class DocumentationFetcher:
         except Exception:
             return None
 
-    def get_expired_entries(self) -> List[CacheEntry]:
-        """Get list of expired cache entries."""
+    def get_stale_entry(self, url: str) -> Optional[CacheEntry]:
+        """Get an expired entry whose content is still on disk (revalidatable)."""
+        cache_key = self._get_cache_key(url)
+        entry = self.cache_index.get(cache_key)
+        if entry and entry.is_expired() and self._get_cache_path(cache_key).exists():
+            return entry
+        return None
+
+    def get_expired_entries(self, grace_days: int = 0) -> List[CacheEntry]:
+        """Get list of cache entries expired for more than ``grace_days``."""
+        now = datetime.now()
         return [
             entry for entry in self.cache_index.values()
-            if entry.is_expired()
+            if now > entry.expires_at + timedelta(days=grace_days)
         ]
 
     def get_entries_for_library(self, library_name: str) -> List[CacheEntry]:
@@ -136,9 +204,14 @@ class DocumentationFetcher:
             if entry.library.lower() == library_name.lower()
         ]
 
-    def expunge_expired(self) -> int:
-        """Remove expired cache entries. Returns count of removed entries."""
-        expired = self.get_expired_entries()
+    def expunge_expired(self, grace_days: int = 0) -> int:
+        """Remove expired cache entries. Returns count of removed entries.
+
+        Args:
+            grace_days: Keep entries expired for at most this many days, so
+                they can still be revalidated instead of re-fetched
+        """
+        expired = self.get_expired_entries(grace_days)
         removed = 0
 
         for entry in expired:
@@ -277,49 +350,34 @@ class DocumentationFetcher:
         language: str,
         force_refresh: bool = False,
     ) -> List[str]:
-        """Fetch docs from a documentation source."""
-        docs: List[str] = []
-        pages_fetched = 0
-
-        # Build list of URLs to fetch
-        urls_to_fetch = [source.base_url]
-
+        """Crawl a documentation source, serving valid pages from cache."""
+        seeds = [source.base_url]
         if source.api_docs_path:
-            urls_to_fetch.append(urljoin(source.base_url, source.api_docs_path))
-
+            seeds.append(urljoin(source.base_url, source.api_docs_path))
         if source.guide_path:
-            urls_to_fetch.append(urljoin(source.base_url, source.guide_path))
-
-        # Fetch pages
-        async with aiohttp.ClientSession() as session:
-            for url in urls_to_fetch:
-                if pages_fetched >= self.max_pages:
-                    break
-
-                # Check cache first
-                if not force_refresh:
-                    cached = self.get_cached_content(url)
-                    if cached:
-                        docs.append(cached)
-                        pages_fetched += 1
-                        continue
-
-                # Fetch and convert
-                try:
-                    content = await self._fetch_and_convert(
-                        session, url, library_name, language
-                    )
-                    if content:
-                        docs.append(content)
-                        pages_fetched += 1
-
-                    # Rate limiting
-                    await asyncio.sleep(0.5)
-
-                except Exception:
-                    pass
-
-        return docs
+            seeds.append(urljoin(source.base_url, source.guide_path))
+
+        crawler = self._get_crawler()
+        session = crawler.session
+
+        async def fetch_page(url: str) -> Optional[FetchedPage]:
+            if not force_refresh:
+                cached = self.get_cached_content(url)
+                if cached:
+                    entry = self.cache_index[self._get_cache_key(url)]
+                    return FetchedPage(url, cached, list(entry.links))
+
+            # Fetch (conditionally if we hold an expired copy) and convert
+            stale = None if force_refresh else self.get_stale_entry(url)
+            await self._limiter.wait(url)
+            if stale:
+                return await self._revalidate(session, url, stale, library_name, language)
+            return await self._fetch_and_convert(session, url, library_name, language)
+
+        pages = await crawler.crawl(
+            seeds, fetch_page, sitemap_url=source.sitemap_url, scope=source.base_url
+        )
+        return [page.content for page in pages]
 
     async def _fetch_and_convert(
         self,
@@ -327,79 +385,110 @@ class DocumentationFetcher:
         url: str,
         library_name: str,
         language: str,
-    ) -> Optional[str]:
-        """Fetch URL and convert HTML to markdown."""
+    ) -> Optional[FetchedPage]:
+        """Fetch URL and convert HTML to markdown (content is empty if unusable)."""
         try:
-            async with session.get(url, timeout=30) as response:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status != 200:
                     return None
 
-                html = await response.text()
-                markdown = self._html_to_markdown(html, url)
+                html = await self._read_html(response)
+                markdown, links = await parse_html(html_to_markdown, html, url)
 
                 if markdown:
                     # Cache the content
-                    self._cache_content(url, markdown, library_name, language)
+                    self._cache_content(
+                        url,
+                        markdown,
+                        library_name,
+                        language,
+                        etag=response.headers.get("ETag", ""),
+                        last_modified=response.headers.get("Last-Modified", ""),
+                        links=links,
+                    )
 
-                return markdown
+                return FetchedPage(url, markdown or "", links)
 
         except Exception:
             return None
 
-    def _html_to_markdown(self, html: str, url: str) -> Optional[str]:
-        """Convert HTML to markdown, extracting main content."""
+    async def _revalidate(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        entry: CacheEntry,
+        library_name: str,
+        language: str,
+    ) -> Optional[FetchedPage]:
+        """Revalidate an expired page with a conditional GET.
+
+        A 304 (or a 200 whose converted content hashes the same) only renews
+        the entry's TTL. If the server can't be reached the stale copy is
+        served rather than dropping the page.
+        """
+        cache_path = self._get_cache_path(self._get_cache_key(url))
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Remove scripts, styles, nav, footer
-            for tag in soup.find_all(['script', 'style', 'nav', 'footer', 'header']):
-                tag.decompose()
-
-            # Try to find main content area
-            main = (
-                soup.find('main') or
-                soup.find('article') or
-                soup.find('div', class_=re.compile(r'content|main|doc')) or
-                soup.find('body')
-            )
+            cached = FetchedPage(url, cache_path.read_text(), list(entry.links))
+        except Exception:
+            return await self._fetch_and_convert(session, url, library_name, language)
 
-            if not main:
-                return None
-
-            # Extract text with basic structure
-            lines = []
-            lines.append(f"# Source: {url}\n")
-
-            for element in main.find_all(['h1', 'h2', 'h3', 'h4', 'p', 'pre', 'code', 'li']):
-                text = element.get_text(strip=True)
-                if not text:
-                    continue
-
-                if element.name == 'h1':
-                    lines.append(f"\n# {text}\n")
-                elif element.name == 'h2':
-                    lines.append(f"\n## {text}\n")
-                elif element.name == 'h3':
-                    lines.append(f"\n### {text}\n")
-                elif element.name == 'h4':
-                    lines.append(f"\n#### {text}\n")
-                elif element.name in ('pre', 'code'):
-                    lines.append(f"\n```\n{text}\n```\n")
-                elif element.name == 'li':
-                    lines.append(f"- {text}")
-                else:
-                    lines.append(text)
-
-            content = '\n'.join(lines)
-
-            # Skip if too short (likely error page)
-            if len(content) < 200:
-                return None
-
-            return content
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
 
+        try:
+            async with session.get(
+                url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status == 304:
+                    self._renew(entry)
+                    self.revalidation_stats["not_modified"] += 1
+                    return cached
+
+                if response.status == 200:
+                    html = await self._read_html(response)
+                    markdown, links = await parse_html(html_to_markdown, html, url)
+                    if markdown:
+                        etag = response.headers.get("ETag", "")
+                        last_modified = response.headers.get("Last-Modified", "")
+                        if self._content_hash(markdown) == entry.content_hash:
+                            entry.etag, entry.last_modified = etag, last_modified
+                            entry.links = links
+                            self._renew(entry)
+                            self.revalidation_stats["unchanged"] += 1
+                            cached.links = links
+                            return cached
+                        self._cache_content(
+                            url, markdown, library_name, language, etag, last_modified, links
+                        )
+                        self.revalidation_stats["changed"] += 1
+                        return FetchedPage(url, markdown, links)
         except Exception:
-            return None
+            pass
+
+        self.revalidation_stats["stale"] += 1
+        return cached
+
+    async def _read_html(self, response: aiohttp.ClientResponse) -> str:
+        """Read a response body, truncated at ``max_page_bytes``."""
+        body, _ = await read_capped(response.content.iter_chunked(64 * 1024), self.max_page_bytes)
+        return decode_html(body, response.charset)
+
+    def _renew(self, entry: CacheEntry) -> None:
+        """Restart an entry's TTL after a successful revalidation."""
+        entry.fetch_time = datetime.now().isoformat()
+        entry.ttl_days = self.ttl_days
+        self._save_cache_index()
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.md5(content.encode()).hexdigest()
+
+    def _html_to_markdown(self, html: str, url: str) -> Optional[str]:
+        """Convert HTML to markdown, extracting main content (runs on the calling thread)."""
+        return html_to_markdown(html, url)[0]
 
     def _cache_content(
         self,
@@ -407,6 +496,9 @@ class DocumentationFetcher:
         content: str,
         library_name: str,
         language: str,
+        etag: str = "",
+        last_modified: str = "",
+        links: Optional[List[str]] = None,
     ) -> None:
         """Cache fetched content."""
         cache_key = self._get_cache_key(url)
@@ -420,9 +512,12 @@ class DocumentationFetcher:
             url=url,
             fetch_time=datetime.now().isoformat(),
             ttl_days=self.ttl_days,
-            content_hash=hashlib.md5(content.encode()).hexdigest(),
+            content_hash=self._content_hash(content),
             library=library_name,
             language=language,
+            etag=etag,
+            last_modified=last_modified,
+            links=list(links or []),
         )
         self._save_cache_index()
 
@@ -443,4 +538,5 @@ class DocumentationFetcher:
             "valid_entries": valid,
             "expired_entries": expired,
             "by_library": by_library,
+            "revalidation": dict(self.revalidation_stats),
         }
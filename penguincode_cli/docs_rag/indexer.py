@@ -3,16 +3,48 @@
 Chunks documentation and stores embeddings in ChromaDB.
 Uses a separate collection from user memories to keep docs isolated.
 Supports TTL-based expiration and library-specific cleanup.
+
+Pages are split along their markdown structure (see ``chunker``) into
+chunks sized in embedding-model tokens. Chunk boundaries are
+content-defined and chunk IDs hash the chunk text, so editing one part of
+a page only changes the chunks around the edit.
+Re-indexing diffs the new chunk IDs against the collection: only new
+chunks are embedded and upserted, and vanished ones are deleted.
+
+Embedding runs as a pipeline: chunks are sent to Ollama's batch
+``/api/embed`` endpoint over the shared pooled transport, a bounded number of
+batches are in flight at once, and each embedded batch is written to
+ChromaDB with a single ``upsert`` call.
 """
 
+import asyncio
 import hashlib
 import json
+import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional
+
+import httpx
 
+from penguincode_cli.ollama.embedding_cache import EmbeddingCache
+from penguincode_cli.shared.transport import get_transport
+
+from .chunker import MarkdownChunker, TokenCounter, source_url
 from .models import DocChunk, DocSearchResult, Language, Library
 
+# Seconds allowed for one embed request (a whole batch)
+EMBED_TIMEOUT = 120
+
+# Characters of a page sent to Ollama to calibrate token counts
+CALIBRATION_SAMPLE_CHARS = 4000
+
+
+def chunk_id(library: str, content: str) -> str:
+    """Stable ID for a chunk: depends only on its library and text."""
+    return hashlib.sha256(f"{library}\0{content}".encode()).hexdigest()[:32]
+
 
 class DocumentationIndexer:
     """Indexes documentation into vector storage for RAG retrieval."""
@@ -21,17 +53,23 @@ class DocumentationIndexer:
         self,
         collection_name: str = "penguincode_docs",
         embedding_model: str = "nomic-embed-text",
-        chunk_size: int = 1000,
-        chunk_overlap: int = 200,
+        chunk_tokens: int = 384,
+        chunk_overlap_tokens: int = 32,
         persist_directory: str = "./.penguincode/docs_index",
         ollama_base_url: str = "http://localhost:11434",
+        embed_batch_size: int = 32,
+        embed_concurrency: int = 4,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ):
         self.collection_name = collection_name
         self.embedding_model = embedding_model
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
         self.persist_dir = Path(persist_directory)
         self.ollama_url = ollama_base_url
+        self.embed_batch_size = max(1, embed_batch_size)
+        self.embed_concurrency = max(1, embed_concurrency)
+        self.embedding_cache = embedding_cache
 
         self.persist_dir.mkdir(parents=True, exist_ok=True)
 
@@ -39,10 +77,23 @@ class DocumentationIndexer:
         self.metadata_path = self.persist_dir / "index_metadata.json"
         self.index_metadata = self._load_metadata()
 
+        # Token sizing for the embedding model (ratio persisted once calibrated)
+        self.token_counter = TokenCounter(
+            embedding_model,
+            chars_per_token=self.index_metadata.get("chars_per_token", {}).get(embedding_model),
+        )
+        self.chunker = MarkdownChunker(self.token_counter, chunk_tokens, chunk_overlap_tokens)
+
         # ChromaDB client (lazy init)
         self._chroma_client = None
         self._collection = None
 
+        # False once the server turned out to lack /api/embed (Ollama < 0.3)
+        self._batch_endpoint = True
+
+        # Throughput of the last index_library/index_language call
+        self.last_index_stats: Dict[str, float] = {}
+
     def _load_metadata(self) -> Dict:
         """Load index metadata from disk."""
         if self.metadata_path.exists():
@@ -123,54 +174,231 @@ class DocumentationIndexer:
         except Exception as e:
             raise RuntimeError(f"Failed to initialize ChromaDB: {e}")
 
+    async def _post(self, path: str, payload: Dict) -> httpx.Response:
+        """POST to Ollama over the shared transport (connections are reused)."""
+        return await get_transport().client().post(
+            f"{self.ollama_url}{path}", json=payload, timeout=EMBED_TIMEOUT
+        )
+
+    async def close(self) -> None:
+        """Release resources (connections belong to the shared transport)."""
+
     async def _get_embedding(self, text: str) -> List[float]:
-        """Get embedding for text using Ollama."""
-        import aiohttp
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.ollama_url}/api/embeddings",
-                json={"model": self.embedding_model, "prompt": text},
-                timeout=30,
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get("embedding", [])
-                raise RuntimeError(f"Embedding failed: {response.status}")
+        """Get embedding for text using Ollama (through the cache if set)."""
+        if self.embedding_cache is not None:
+            cached = await asyncio.to_thread(self.embedding_cache.get, self.embedding_model, text)
+            if cached is not None:
+                return cached
+        embedding = (await self._embed_batch([text]))[0]
+        if self.embedding_cache is not None:
+            await asyncio.to_thread(self.embedding_cache.put, self.embedding_model, text, embedding)
+        return embedding
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts with one request to Ollama.
 
-    def _chunk_text(self, text: str, metadata: Dict) -> List[DocChunk]:
-        """Split text into overlapping chunks."""
-        chunks = []
-        words = text.split()
+        Args:
+            texts: Texts to embed
 
-        if len(words) == 0:
-            return []
+        Returns:
+            One embedding per text, in order
+        """
+        if not self._batch_endpoint:
+            return [await self._embed_legacy(text) for text in texts]
+
+        response = await self._post(
+            "/api/embed", {"model": self.embedding_model, "input": texts}
+        )
+        if response.status_code == 200:
+            embeddings = response.json().get("embeddings", [])
+            if len(embeddings) != len(texts):
+                raise RuntimeError(
+                    f"Embedding failed: expected {len(texts)} vectors, got {len(embeddings)}"
+                )
+            return embeddings
+
+        body = response.text
+        # An unknown endpoint (old server) 404s without mentioning the model
+        if response.status_code == 404 and "model" not in body.lower():
+            self._batch_endpoint = False
+            return [await self._embed_legacy(text) for text in texts]
+        raise RuntimeError(f"Embedding failed: {response.status_code} {body[:200]}")
+
+    async def _embed_legacy(self, text: str) -> List[float]:
+        """Embed one text via the pre-batch /api/embeddings endpoint."""
+        response = await self._post(
+            "/api/embeddings", {"model": self.embedding_model, "prompt": text}
+        )
+        if response.status_code == 200:
+            return response.json().get("embedding", [])
+        raise RuntimeError(f"Embedding failed: {response.status_code}")
+
+    async def _index_chunks(self, chunks: List[DocChunk], library_key: str) -> int:
+        """
+        Bring a library's chunks in the collection in line with ``chunks``.
+
+        Chunks whose IDs are already stored are not re-embedded (only their
+        metadata is rewritten if it changed, e.g. a new version or URL),
+        stored chunks that no longer appear are deleted, and new chunks are
+        embedded in batches and upserted in bulk. If any batch fails, no
+        chunks are deleted, so a failed reindex doesn't lose stored ones. New chunks already in the embedding
+        cache skip Ollama. Up to ``embed_concurrency`` batches are embedded
+        at once; writes are serialized and run off the event loop so they
+        overlap with embedding. Counts and throughput are recorded in
+        ``last_index_stats``.
+
+        Args:
+            chunks: Current chunks for the library
+            library_key: The ``library`` metadata value the chunks are stored under
+
+        Returns:
+            Number of chunks now stored for the library
+        """
+        start = time.perf_counter()
+        collection = self._get_collection()
+
+        # ChromaDB rejects a write that repeats an ID
+        current = {chunk.chunk_id: chunk for chunk in chunks}
+        existing = await asyncio.to_thread(self._stored_metadata, library_key)
+        vanished = [cid for cid in existing if cid not in current]
+        unique = [chunk for cid, chunk in current.items() if cid not in existing]
+        unchanged = len(current) - len(unique)
+        stale = [
+            chunk for cid, chunk in current.items()
+            if cid in existing and existing[cid] != chunk.metadata
+        ]
+        if stale:
+            await asyncio.to_thread(
+                collection.update,
+                ids=[c.chunk_id for c in stale],
+                metadatas=[c.metadata for c in stale],
+            )
+
+        cached: List[Optional[List[float]]] = [None] * len(unique)
+        if self.embedding_cache is not None:
+            cached = await asyncio.to_thread(
+                self.embedding_cache.get_many, self.embedding_model, [c.content for c in unique]
+            )
+        hits = [(c, e) for c, e in zip(unique, cached) if e is not None]
+        misses = [c for c, e in zip(unique, cached) if e is None]
 
-        # Approximate words per chunk
-        words_per_chunk = self.chunk_size // 5  # ~5 chars per word
-        overlap_words = self.chunk_overlap // 5
+        size = self.embed_batch_size
+        batches = [misses[i : i + size] for i in range(0, len(misses), size)]
+        # Cached chunks only need writing, in larger batches
+        hit_batches = [hits[i : i + size * 4] for i in range(0, len(hits), size * 4)]
 
-        start = 0
-        chunk_num = 0
+        semaphore = asyncio.Semaphore(self.embed_concurrency)
+        write_lock = asyncio.Lock()
+        errors: List[Exception] = []
 
-        while start < len(words):
-            end = min(start + words_per_chunk, len(words))
-            chunk_text = ' '.join(words[start:end])
+        async def run(batch: List[DocChunk], embeddings: Optional[List] = None) -> int:
+            try:
+                if embeddings is None:
+                    texts = [c.content for c in batch]
+                    async with semaphore:
+                        embeddings = await self._embed_batch(texts)
+                    if self.embedding_cache is not None:
+                        await asyncio.to_thread(
+                            self.embedding_cache.put_many, self.embedding_model, texts, embeddings
+                        )
+                async with write_lock:
+                    await asyncio.to_thread(
+                        collection.upsert,
+                        ids=[c.chunk_id for c in batch],
+                        embeddings=embeddings,
+                        documents=[c.content for c in batch],
+                        metadatas=[c.metadata for c in batch],
+                    )
+                return len(batch)
+            except Exception as e:
+                errors.append(e)
+                return 0
+
+        stored = sum(
+            await asyncio.gather(
+                *(run([c for c, _ in part], [e for _, e in part]) for part in hit_batches),
+                *(run(batch) for batch in batches),
+            )
+        )
+
+        if errors:
+            # Report the first error only to avoid spam
+            print(f"  Embedding error: {errors[0]}", file=sys.stderr)
+            print(f"  Hint: Run 'ollama pull {self.embedding_model}'", file=sys.stderr)
+            vanished = []  # Keep what's stored until a reindex succeeds
+
+        if vanished:
+            await asyncio.to_thread(collection.delete, ids=vanished)
+
+        elapsed = time.perf_counter() - start
+        self.last_index_stats = {
+            "chunks": stored,
+            "unchanged": unchanged,
+            "metadata_updated": len(stale),
+            "removed": len(vanished),
+            "failed": len(unique) - stored,
+            "batches": len(batches),
+            "cache_hits": len(hits),
+            "seconds": round(elapsed, 3),
+            "chunks_per_sec": round(stored / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        return unchanged + stored
 
-            chunk_id = hashlib.md5(
-                f"{metadata.get('library', 'unknown')}_{chunk_num}_{chunk_text[:50]}".encode()
-            ).hexdigest()
+    def _stored_metadata(self, library_key: str) -> Dict[str, Dict]:
+        """Metadata of the chunks currently stored for a library, by ID."""
+        try:
+            results = self._get_collection().get(
+                where={"library": library_key}, include=["metadatas"]
+            )
+        except Exception:
+            return {}
+        if not results or not results.get("ids"):
+            return {}
+        metadatas = results.get("metadatas") or [None] * len(results["ids"])
+        return {cid: meta or {} for cid, meta in zip(results["ids"], metadatas)}
 
-            chunks.append(DocChunk(
-                content=chunk_text,
-                metadata={**metadata, "chunk_num": str(chunk_num)},
-                chunk_id=chunk_id,
-            ))
+    def _chunk_text(self, text: str, metadata: Dict) -> List[DocChunk]:
+        """Split a markdown page into token-sized chunks with section/url metadata."""
+        url = source_url(text)
+        library = metadata.get("library", "unknown")
+        return [
+            DocChunk(
+                content=chunk.text,
+                metadata={**metadata, "section": chunk.section, "url": url},
+                chunk_id=chunk_id(library, chunk.text),
+            )
+            for chunk in self.chunker.chunk(text)
+        ]
 
-            chunk_num += 1
-            start = end - overlap_words if end < len(words) else end
+    async def _calibrate_tokens(self, sample: str) -> None:
+        """Calibrate chars-per-token from Ollama's count for a sample (once per model).
 
-        return chunks
+        Loads the model's tokenizer first (before any chunking), and is
+        skipped when that exact tokenizer is available. The ratio is
+        persisted so chunk boundaries stay the same across runs.
+        """
+        counter = self.token_counter
+        await asyncio.to_thread(counter.load)  # Off the event loop: may read disk or download
+        if counter.exact or counter.calibrated or not sample.strip():
+            return
+        sample = sample[:CALIBRATION_SAMPLE_CHARS]
+        try:
+            response = await self._post(
+                "/api/embed", {"model": self.embedding_model, "input": [sample]}
+            )
+            if response.status_code != 200:
+                return
+            tokens = response.json().get("prompt_eval_count", 0)
+        except Exception:
+            return
+        # Less the model's [CLS]/[SEP]-style special tokens, approximately
+        counter.calibrate(len(sample), tokens - 2 if tokens > 2 else tokens)
+        if counter.calibrated:
+            self.index_metadata.setdefault("chars_per_token", {})[self.embedding_model] = round(
+                counter.chars_per_token, 4
+            )
+            self._save_metadata()
 
     async def index_library(
         self,
@@ -184,12 +412,13 @@ class DocumentationIndexer:
         Args:
             library: Library being indexed
             doc_contents: List of markdown content strings
-            force_reindex: Clear existing and reindex
+            force_reindex: Reindex even if fresh (only changed chunks are re-embedded)
 
         Returns:
-            Number of chunks indexed
+            Number of chunks indexed for the library
         """
         lib_key = library.name.lower()
+        self.last_index_stats = {}
 
         # Check if already indexed and not forcing
         if not force_reindex and lib_key in self.index_metadata.get("libraries", {}):
@@ -199,14 +428,10 @@ class DocumentationIndexer:
             if datetime.now() - indexed_at < timedelta(days=7):
                 return existing.get("chunk_count", 0)
 
-        # Clear existing if reindexing
-        if force_reindex:
-            await self.clear_library_index(library.name)
-
-        collection = self._get_collection()
-        total_chunks = 0
+        if doc_contents:
+            await self._calibrate_tokens(doc_contents[0])
 
-        embedding_error_shown = False
+        chunks: List[DocChunk] = []
         for i, content in enumerate(doc_contents):
             metadata = {
                 "library": library.name,
@@ -214,29 +439,12 @@ class DocumentationIndexer:
                 "version": library.version or "latest",
                 "doc_index": str(i),
             }
+            chunks.extend(self._chunk_text(content, metadata))
 
-            chunks = self._chunk_text(content, metadata)
-
-            for chunk in chunks:
-                try:
-                    embedding = await self._get_embedding(chunk.content)
-
-                    collection.add(
-                        ids=[chunk.chunk_id],
-                        embeddings=[embedding],
-                        documents=[chunk.content],
-                        metadatas=[chunk.metadata],
-                    )
-                    total_chunks += 1
-
-                except Exception as e:
-                    # Log first embedding error only to avoid spam
-                    if not embedding_error_shown:
-                        embedding_error_shown = True
-                        import sys
-                        print(f"  Embedding error: {e}", file=sys.stderr)
-                        print(f"  Hint: Run 'ollama pull {self.embedding_model}'", file=sys.stderr)
-                    continue
+        total_chunks = await self._index_chunks(chunks, library.name)
+        if self.last_index_stats.get("failed"):
+            # Partly indexed: not fresh, so the next run retries
+            return total_chunks
 
         # Update metadata
         if "libraries" not in self.index_metadata:
@@ -260,6 +468,7 @@ class DocumentationIndexer:
     ) -> int:
         """Index core language documentation."""
         lang_key = language.value
+        self.last_index_stats = {}
 
         if not force_reindex and lang_key in self.index_metadata.get("languages", {}):
             existing = self.index_metadata["languages"][lang_key]
@@ -267,42 +476,21 @@ class DocumentationIndexer:
             if datetime.now() - indexed_at < timedelta(days=7):
                 return existing.get("chunk_count", 0)
 
-        if force_reindex:
-            await self.clear_language_index(language)
-
-        collection = self._get_collection()
-        total_chunks = 0
+        if doc_contents:
+            await self._calibrate_tokens(doc_contents[0])
 
-        embedding_error_shown = False
+        chunks: List[DocChunk] = []
         for i, content in enumerate(doc_contents):
             metadata = {
                 "library": f"_lang_{language.value}",
                 "language": language.value,
                 "doc_index": str(i),
             }
+            chunks.extend(self._chunk_text(content, metadata))
 
-            chunks = self._chunk_text(content, metadata)
-
-            for chunk in chunks:
-                try:
-                    embedding = await self._get_embedding(chunk.content)
-
-                    collection.add(
-                        ids=[chunk.chunk_id],
-                        embeddings=[embedding],
-                        documents=[chunk.content],
-                        metadatas=[chunk.metadata],
-                    )
-                    total_chunks += 1
-
-                except Exception as e:
-                    # Log first embedding error only to avoid spam
-                    if not embedding_error_shown:
-                        embedding_error_shown = True
-                        import sys
-                        print(f"  Embedding error: {e}", file=sys.stderr)
-                        print(f"  Hint: Run 'ollama pull {self.embedding_model}'", file=sys.stderr)
-                    continue
+        total_chunks = await self._index_chunks(chunks, f"_lang_{language.value}")
+        if self.last_index_stats.get("failed"):
+            return total_chunks
 
         if "languages" not in self.index_metadata:
             self.index_metadata["languages"] = {}
@@ -24,8 +24,8 @@ class ContextInjector:
         self.max_tokens = max_context_tokens
         self.max_chunks = max_chunks
 
-        # Approximate tokens per character
-        self.chars_per_token = 4
+        # Budget in the same tokens chunks are sized in
+        self.token_counter = indexer.token_counter
 
     async def get_relevant_context(
         self,
@@ -81,8 +81,8 @@ class ContextInjector:
             return ""
 
         lines = ["## Relevant Documentation\n"]
-        current_chars = len(lines[0])
-        max_chars = self.max_tokens * self.chars_per_token
+        count = self.token_counter.count
+        used_tokens = count(lines[0])
 
         for result in results:
             # Build result block
@@ -90,22 +90,28 @@ class ContextInjector:
             if result.section:
                 header += f" - {result.section}"
             header += f" (relevance: {result.relevance_score:.2f})\n"
+            if result.url:
+                header += f"Source: {result.url}\n"
 
             content = result.content.strip()
 
             # Truncate content if needed
-            available = max_chars - current_chars - len(header) - 50
-            if len(content) > available:
-                content = content[:available] + "..."
+            available = self.max_tokens - used_tokens - count(header) - 12
+            if count(content) > available:
+                if available <= 0:
+                    break
+                chars = int(available * self.token_counter.chars_per_token)
+                content = content[:chars] + "..."
 
             block = f"{header}\n{content}\n\n"
+            block_tokens = count(block)
 
             # Check if we'd exceed limit
-            if current_chars + len(block) > max_chars:
+            if used_tokens + block_tokens > self.max_tokens:
                 break
 
             lines.append(block)
-            current_chars += len(block)
+            used_tokens += block_tokens
 
         return "".join(lines)
 
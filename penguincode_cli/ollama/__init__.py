@@ -1,7 +1,39 @@
 """Ollama client and types."""
 
+from .capabilities import ModelCapabilities, ModelRegistry, configure_model_registry, get_model_registry
 from .client import OllamaClient
-from .types import GenerateRequest, GenerateResponse, Message, ChatRequest, ChatResponse, ToolCall
+from .embedding_cache import CachedEmbedder, EmbeddingCache
+from .generation import (
+    ROLE_AGENT,
+    ROLE_MEMORY,
+    ROLE_PLANNING,
+    ROLE_REVIEW,
+    ROLE_ROUTING,
+    ROLE_SUMMARY,
+    Generation,
+    configure_generation,
+    get_generation,
+)
+from .prompt_cache import PrefixCacheTracker, assemble_messages
+from .scheduler import (
+    PRIORITY_AGENT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RequestScheduler,
+    SchedulerQueueFullError,
+    request_priority,
+)
+from .stream import ChatAccumulator, accumulate
+from .structured import (
+    StructuredOutput,
+    configure_structured_output,
+    get_structured_output,
+    structured_answer,
+    supports_native_tools,
+    tool_call_schema,
+)
+from .token_budget import ContextSection, PackedContext, TokenBudget
+from .types import GenerateRequest, GenerateResponse, Message, ChatRequest, ChatResponse, ToolCall, UsageStats
 
 __all__ = [
     "OllamaClient",
@@ -11,4 +43,39 @@ __all__ = [
     "ChatRequest",
     "ChatResponse",
     "ToolCall",
+    "UsageStats",
+    "RequestScheduler",
+    "SchedulerQueueFullError",
+    "request_priority",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_AGENT",
+    "PRIORITY_BACKGROUND",
+    "EmbeddingCache",
+    "CachedEmbedder",
+    "TokenBudget",
+    "ContextSection",
+    "PackedContext",
+    "PrefixCacheTracker",
+    "assemble_messages",
+    "ChatAccumulator",
+    "accumulate",
+    "StructuredOutput",
+    "configure_structured_output",
+    "get_structured_output",
+    "structured_answer",
+    "supports_native_tools",
+    "tool_call_schema",
+    "ModelCapabilities",
+    "ModelRegistry",
+    "configure_model_registry",
+    "get_model_registry",
+    "Generation",
+    "configure_generation",
+    "get_generation",
+    "ROLE_ROUTING",
+    "ROLE_REVIEW",
+    "ROLE_SUMMARY",
+    "ROLE_MEMORY",
+    "ROLE_PLANNING",
+    "ROLE_AGENT",
 ]
@@ -0,0 +1,299 @@
+"""What each installed model can do, probed once and kept on disk.
+
+Context length, native tool support, parameter size, quantization and
+embedding width all come from ``/api/show``. ``ModelRegistry`` asks once
+per model digest (from ``/api/tags``) and keeps the answers in
+``.penguincode/models.json``, so a restart costs one ``/api/tags`` call and
+a model is probed again only when it is re-pulled.
+
+The context budget reads the context length from it, agents and the
+scheduler read tool support (instead of guessing from the model name), the
+scheduler reads model sizes to tell which models fit in VRAM together, and
+the memory store reads the embedding width.
+
+Usage:
+    registry = configure_model_registry(client, ".penguincode/models.json")
+    caps = await registry.get("qwen2.5-coder:7b")
+    caps.context_length, caps.tools, caps.parameter_size
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_PATH = "./.penguincode/models.json"
+
+# Bumped when the stored fields change; older files are probed again
+REGISTRY_VERSION = 1
+
+# A failed /api/show or /api/tags isn't retried for this long (a model that
+# isn't pulled would otherwise be probed on every call)
+PROBE_RETRY_SECONDS = 300.0
+
+
+def context_length_from_show(info: Dict[str, Any]) -> int:
+    """
+    Trained context length from an ``/api/show`` response.
+
+    Args:
+        info: Response of OllamaClient.show_model
+
+    Returns:
+        ``<architecture>.context_length`` from ``model_info``, or 0
+    """
+    for key, value in (info.get("model_info") or {}).items():
+        if key.endswith(".context_length") and isinstance(value, (int, float)):
+            return int(value)
+    return 0
+
+
+def model_key(name: str) -> str:
+    """Name as listed by ``/api/tags`` (an untagged name means ``:latest``)."""
+    return name if ":" in name else f"{name}:latest"
+
+
+@dataclass
+class ModelCapabilities:
+    """One model's probed capabilities."""
+
+    name: str
+    digest: str = ""  # From /api/tags; "" if it couldn't be listed
+    size_bytes: int = 0  # Size of the weights (about what they take in VRAM)
+    context_length: int = 0  # Trained context length (0 = unknown)
+    embedding_length: int = 0  # Width of the model's vectors
+    parameter_size: str = ""  # e.g. "7.6B"
+    quantization: str = ""  # e.g. "Q4_K_M"
+    family: str = ""
+    capabilities: List[str] = field(default_factory=list)  # As reported by Ollama >= 0.6.4
+    template_tools: bool = False  # The chat template renders tools
+    probed_at: float = 0.0
+
+    @property
+    def tools(self) -> bool:
+        """Whether the model takes native tool definitions."""
+        if self.capabilities:
+            return "tools" in self.capabilities
+        return self.template_tools
+
+    @property
+    def embedding(self) -> bool:
+        """Whether the model is an embedding model."""
+        if self.capabilities:
+            return "embedding" in self.capabilities
+        return "bert" in self.family
+
+    @classmethod
+    def from_show(
+        cls, name: str, info: Dict[str, Any], digest: str = "", size_bytes: int = 0
+    ) -> "ModelCapabilities":
+        """
+        Build from an ``/api/show`` response.
+
+        Args:
+            name: Model name
+            info: Response of OllamaClient.show_model
+            digest: Digest from ``/api/tags``
+            size_bytes: Size from ``/api/tags``
+        """
+        details = info.get("details") or {}
+        model_info = info.get("model_info") or {}
+        architecture = model_info.get("general.architecture", "")
+        embedding_length = model_info.get(f"{architecture}.embedding_length", 0)
+        return cls(
+            name=name,
+            digest=digest,
+            size_bytes=size_bytes,
+            context_length=context_length_from_show(info),
+            embedding_length=int(embedding_length or 0),
+            parameter_size=details.get("parameter_size", ""),
+            quantization=details.get("quantization_level", ""),
+            family=details.get("family", "") or architecture,
+            capabilities=list(info.get("capabilities") or []),
+            template_tools=".Tools" in (info.get("template") or ""),
+            probed_at=time.time(),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelCapabilities":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class ModelRegistry:
+    """
+    Capabilities of installed models, probed once per digest.
+
+    Args:
+        client: OllamaClient (or RequestScheduler); None leaves the registry
+            empty, and callers fall back to their defaults
+        path: JSON file the probes are kept in (None: memory only)
+    """
+
+    def __init__(self, client: Any = None, path: Optional[str] = DEFAULT_REGISTRY_PATH):
+        self.configure(client, path)
+
+    def configure(self, client: Any, path: Optional[str] = DEFAULT_REGISTRY_PATH) -> None:
+        """Point the registry at a client and file, dropping what it knew."""
+        self.client = client
+        self.path = Path(path) if path else None
+        self._entries: Dict[str, ModelCapabilities] = {}
+        self._installed: Optional[Dict[str, Any]] = None  # name -> ModelInfo
+        self._probing: Dict[str, asyncio.Task] = {}
+        self._failed: Dict[str, float] = {}  # Model -> monotonic time of its failed probe
+        self._list_failed_at: Optional[float] = None
+        self._file_loaded = False
+        self.probes = 0  # /api/show calls made
+
+    # ==================== Lookup ====================
+
+    def cached(self, model: str) -> Optional[ModelCapabilities]:
+        """What is known about a model without asking Ollama (None if nothing)."""
+        self._load_file()
+        return self._entries.get(model_key(model))
+
+    async def get(self, model: str) -> Optional[ModelCapabilities]:
+        """
+        Capabilities of a model, probing it if its digest is new.
+
+        Args:
+            model: Model name
+
+        Returns:
+            The capabilities, or None if there is no client or the probe failed
+        """
+        if self.client is None:
+            return None
+        self._load_file()
+        key = model_key(model)
+        listed = (await self._list()).get(key)
+        entry = self._entries.get(key)
+        if entry is not None and (listed is None or entry.digest == listed.digest):
+            return entry
+        failed_at = self._failed.get(key)
+        if failed_at is not None and time.monotonic() - failed_at < PROBE_RETRY_SECONDS:
+            return entry
+
+        task = self._probing.get(key)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._probe(key, listed))
+            self._probing[key] = task
+        return await asyncio.shield(task)
+
+    async def embedding_dims(self, model: str) -> Optional[int]:
+        """Width of an embedding model's vectors (None if unknown)."""
+        caps = await self.get(model)
+        return caps.embedding_length if caps and caps.embedding_length else None
+
+    # ==================== Probing ====================
+
+    async def _list(self) -> Dict[str, Any]:
+        """Installed models by name (listed once per process; retried after a backoff)."""
+        if self._installed is None:
+            if (
+                self._list_failed_at is not None
+                and time.monotonic() - self._list_failed_at < PROBE_RETRY_SECONDS
+            ):
+                return {}
+            try:
+                self._installed = {info.name: info for info in await self.client.list_models()}
+            except Exception as e:
+                logger.debug(f"Listing models failed: {e}")
+                self._list_failed_at = time.monotonic()
+                return {}
+        return self._installed
+
+    async def _probe(self, key: str, listed: Any) -> Optional[ModelCapabilities]:
+        try:
+            info = await self.client.show_model(key)
+        except Exception as e:
+            logger.debug(f"Capability probe failed for {key}: {e}")
+            self._failed[key] = time.monotonic()
+            return self._entries.get(key)
+        self._failed.pop(key, None)
+        self.probes += 1
+        entry = ModelCapabilities.from_show(
+            key,
+            info,
+            digest=getattr(listed, "digest", "") or "",
+            size_bytes=getattr(listed, "size", 0) or 0,
+        )
+        self._entries[key] = entry
+        self._save()
+        return entry
+
+    # ==================== Persistence ====================
+
+    def _load_file(self) -> None:
+        if self._file_loaded:
+            return
+        self._file_loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            if data.get("version") != REGISTRY_VERSION:
+                return
+            for key, entry in data.get("models", {}).items():
+                self._entries.setdefault(key, ModelCapabilities.from_dict(entry))
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable model registry {self.path}: {e}")
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        data = {
+            "version": REGISTRY_VERSION,
+            "models": {key: asdict(entry) for key, entry in sorted(self._entries.items())},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save model registry {self.path}: {e}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Known models and probe count, for status output."""
+        return {
+            "models": {
+                key: {
+                    "context_length": entry.context_length,
+                    "tools": entry.tools,
+                    "parameter_size": entry.parameter_size,
+                    "quantization": entry.quantization,
+                }
+                for key, entry in sorted(self._entries.items())
+            },
+            "probes": self.probes,
+        }
+
+
+_registry = ModelRegistry(client=None, path=None)
+
+
+def get_model_registry() -> ModelRegistry:
+    """The process-wide model registry."""
+    return _registry
+
+
+def configure_model_registry(client: Any, path: Optional[str] = DEFAULT_REGISTRY_PATH) -> ModelRegistry:
+    """
+    Point the process-wide registry at a client and its file.
+
+    Args:
+        client: OllamaClient (or RequestScheduler) used for probes
+        path: JSON file for the probes (None: memory only)
+
+    Returns:
+        The registry
+    """
+    _registry.configure(client, path)
+    return _registry
@@ -1,10 +1,19 @@
-"""Async Ollama API client."""
+"""Async Ollama API client.
+
+Streaming responses are NDJSON, one line per generated token, so decoding
+runs thousands of times per reply. Lines are split from the raw bytes and
+parsed with ``orjson`` when it is installed (``json`` otherwise), and chat
+chunks are built straight from the parsed dict.
+"""
 
 import json
-from typing import AsyncIterator, Dict, List, Optional
+from dataclasses import fields, is_dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 
+from penguincode_cli.shared.transport import get_transport
+
 from .types import (
     ChatRequest,
     ChatResponse,
@@ -15,9 +24,72 @@ from .types import (
     ToolCall,
 )
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Fields of GenerateResponse; others sent by newer servers are ignored
+_GENERATE_FIELDS = frozenset(f.name for f in fields(GenerateResponse))
+
+
+async def _ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Parse newline-delimited JSON from a byte stream."""
+    pending = b""
+    async for chunk in chunks:
+        lines = chunk.split(b"\n")
+        if pending:
+            lines[0] = pending + lines[0]
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield _loads(line)
+    if pending.strip():
+        yield _loads(pending)
+
+
+def _decode_chat(data: Dict[str, Any]) -> ChatResponse:
+    """Build a ChatResponse from one parsed line of /api/chat."""
+    msg = data.get("message")
+    if msg is None:
+        if "error" in data:
+            raise RuntimeError(f"Ollama error: {data['error']}")
+        msg = {}
+    calls = msg.get("tool_calls")
+    message = Message(
+        msg.get("role", "assistant"),
+        msg.get("content", ""),
+        msg.get("images"),
+        [ToolCall(tc.get("function", {})) for tc in calls] if calls else None,
+    )
+    if not data.get("done"):
+        # Token chunks carry no counters
+        return ChatResponse(data.get("model", ""), data.get("created_at", ""), message, False)
+    get = data.get
+    return ChatResponse(
+        get("model", ""),
+        get("created_at", ""),
+        message,
+        True,
+        get("done_reason"),
+        get("total_duration"),
+        get("load_duration"),
+        get("prompt_eval_count"),
+        get("prompt_eval_duration"),
+        get("eval_count"),
+        get("eval_duration"),
+    )
+
 
 class OllamaClient:
-    """Async client for Ollama API."""
+    """Async client for Ollama API.
+
+    Requests go over the process-wide pooled transport
+    (``penguincode_cli.shared.transport``), so the client works without
+    ``async with`` and connections are kept alive across calls and clients.
+    """
 
     def __init__(self, base_url: str = "http://localhost:11434", timeout: int = 120):
         """
@@ -29,29 +101,23 @@ class OllamaClient:
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self._client: Optional[httpx.AsyncClient] = None
+        # Per-request options (the pooled client is shared with other callers)
+        self._request_options = {"timeout": httpx.Timeout(timeout), "follow_redirects": True}
 
     async def __aenter__(self):
-        """Async context manager entry."""
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=httpx.Timeout(self.timeout),
-            follow_redirects=True,
-        )
+        """Async context manager entry (kept for compatibility; nothing to open)."""
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Async context manager exit (pooled connections stay with the transport)."""
 
     @property
     def client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
-        if self._client is None:
-            raise RuntimeError("Client not initialized. Use 'async with' context manager.")
-        return self._client
+        """Pooled HTTP client for the running event loop."""
+        return get_transport().client()
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
 
     async def generate(
         self,
@@ -84,15 +150,14 @@ class OllamaClient:
 
         async with self.client.stream(
             "POST",
-            "/api/generate",
+            self._url("/api/generate"),
             json=self._to_dict(request),
+            **self._request_options,
         ) as response:
             response.raise_for_status()
 
-            async for line in response.aiter_lines():
-                if line.strip():
-                    data = json.loads(line)
-                    yield GenerateResponse(**data)
+            async for data in _ndjson(response.aiter_bytes()):
+                yield GenerateResponse(**{k: v for k, v in data.items() if k in _GENERATE_FIELDS})
 
     async def chat(
         self,
@@ -125,38 +190,14 @@ class OllamaClient:
 
         async with self.client.stream(
             "POST",
-            "/api/chat",
+            self._url("/api/chat"),
             json=self._to_dict(request),
+            **self._request_options,
         ) as response:
             response.raise_for_status()
 
-            async for line in response.aiter_lines():
-                if line.strip():
-                    data = json.loads(line)
-                    # Convert message dict to Message object
-                    if "message" in data:
-                        msg_data = data["message"]
-                        # Parse tool_calls if present
-                        tool_calls = None
-                        if "tool_calls" in msg_data and msg_data["tool_calls"]:
-                            tool_calls = [
-                                ToolCall(function=tc.get("function", {}))
-                                for tc in msg_data["tool_calls"]
-                            ]
-                        data["message"] = Message(
-                            role=msg_data.get("role", "assistant"),
-                            content=msg_data.get("content", ""),
-                            images=msg_data.get("images"),
-                            tool_calls=tool_calls,
-                        )
-                    # Filter to known ChatResponse fields to handle API changes
-                    known_fields = {
-                        "model", "created_at", "message", "done", "done_reason",
-                        "total_duration", "load_duration", "prompt_eval_count",
-                        "prompt_eval_duration", "eval_count", "eval_duration",
-                    }
-                    filtered_data = {k: v for k, v in data.items() if k in known_fields}
-                    yield ChatResponse(**filtered_data)
+            async for data in _ndjson(response.aiter_bytes()):
+                yield _decode_chat(data)
 
     async def list_models(self) -> List[ModelInfo]:
         """
@@ -165,10 +206,15 @@ class OllamaClient:
         Returns:
             List of ModelInfo objects
         """
-        response = await self.client.get("/api/tags")
+        response = await self.client.get(self._url("/api/tags"), **self._request_options)
         response.raise_for_status()
         data = response.json()
-        return [ModelInfo(**model) for model in data.get("models", [])]
+        # Newer servers add fields (e.g. "model") that ModelInfo doesn't have
+        known = {f.name for f in fields(ModelInfo)}
+        return [
+            ModelInfo(**{k: v for k, v in model.items() if k in known})
+            for model in data.get("models", [])
+        ]
 
     async def show_model(self, name: str) -> Dict:
         """
@@ -181,8 +227,9 @@ class OllamaClient:
             Model info dictionary
         """
         response = await self.client.post(
-            "/api/show",
+            self._url("/api/show"),
             json={"name": name},
+            **self._request_options,
         )
         response.raise_for_status()
         return response.json()
@@ -199,14 +246,14 @@ class OllamaClient:
         """
         async with self.client.stream(
             "POST",
-            "/api/pull",
+            self._url("/api/pull"),
             json={"name": name},
+            **self._request_options,
         ) as response:
             response.raise_for_status()
 
-            async for line in response.aiter_lines():
-                if line.strip():
-                    yield json.loads(line)
+            async for data in _ndjson(response.aiter_bytes()):
+                yield data
 
     async def delete_model(self, name: str) -> bool:
         """
@@ -219,8 +266,9 @@ class OllamaClient:
             True if successful
         """
         response = await self.client.delete(
-            "/api/delete",
+            self._url("/api/delete"),
             json={"name": name},
+            **self._request_options,
         )
         response.raise_for_status()
         return True
@@ -233,7 +281,7 @@ class OllamaClient:
             True if server is responding
         """
         try:
-            response = await self.client.get("/")
+            response = await self.client.get(self._url("/"), **self._request_options)
             return response.status_code == 200
         except Exception:
             return False
@@ -241,21 +289,20 @@ class OllamaClient:
     @staticmethod
     def _to_dict(obj) -> Dict:
         """Convert dataclass to dict, removing None values."""
-        if hasattr(obj, "__dataclass_fields__"):
-            result = {}
-            for key, value in obj.__dict__.items():
-                if value is not None:
-                    if isinstance(value, list) and value and hasattr(value[0], "__dict__"):
-                        result[key] = [
-                            OllamaClient._to_dict(item) if hasattr(item, "__dataclass_fields__") else item.__dict__
-                            for item in value
-                        ]
-                    elif hasattr(value, "__dataclass_fields__"):
-                        result[key] = OllamaClient._to_dict(value)
-                    else:
-                        result[key] = value
-            return result
-        return obj.__dict__
+        if not is_dataclass(obj):
+            return obj.__dict__
+        result = {}
+        for f in fields(obj):  # Slotted types have no __dict__
+            value = getattr(obj, f.name)
+            if value is None:
+                continue
+            if isinstance(value, list) and value and is_dataclass(value[0]):
+                result[f.name] = [OllamaClient._to_dict(item) for item in value]
+            elif is_dataclass(value):
+                result[f.name] = OllamaClient._to_dict(value)
+            else:
+                result[f.name] = value
+        return result
 
 
 # Convenience function
@@ -268,6 +315,6 @@ async def create_client(base_url: str = "http://localhost:11434", timeout: int =
         timeout: Request timeout
 
     Returns:
-        OllamaClient instance (use with async context manager)
+        OllamaClient instance
     """
     return OllamaClient(base_url, timeout)
@@ -0,0 +1,300 @@
+"""Content-addressed embedding cache.
+
+Embeddings are keyed on (model, sha256(text)) and stored as float32 blobs
+in SQLite, so identical text is embedded once per model no matter which
+component asks for it (docs indexing, docs search, mem0). Entries carry a
+last-used timestamp and the least recently used ones are evicted once the
+cache grows past ``max_entries``.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_CACHE_PATH = "./.penguincode/embeddings.db"
+
+# Fraction of max_entries removed per eviction pass, so eviction isn't per-insert
+EVICTION_SLACK = 0.05
+
+
+def text_digest(text: str) -> bytes:
+    """SHA-256 digest used as the cache key for a text."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Hit/miss counters for an embedding cache."""
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with LRU eviction."""
+
+    _registry: Dict[Path, "EmbeddingCache"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 100_000):
+        """
+        Initialize cache.
+
+        Args:
+            path: SQLite file holding the cache
+            max_entries: Entries kept before least recently used ones are evicted
+        """
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        self.stats = EmbeddingCacheStats()
+        self.by_model: Dict[str, EmbeddingCacheStats] = {}
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def shared(cls, path: str = DEFAULT_CACHE_PATH, max_entries: int = 100_000) -> "EmbeddingCache":
+        """Get the process-wide cache for a path."""
+        key = Path(path).resolve()
+        with cls._registry_lock:
+            cache = cls._registry.get(key)
+            if cache is None:
+                cache = cls(str(key), max_entries=max_entries)
+                cls._registry[key] = cache
+            return cache
+
+    # ==================== Lookups ====================
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Get a cached embedding, or None on a miss."""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for several texts.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            One embedding (or None for a miss) per text, in order
+        """
+        digests = [text_digest(text) for text in texts]
+        found: Dict[bytes, List[float]] = {}
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                unique = list(dict.fromkeys(digests))
+                # Stay under SQLite's bound-parameter limit
+                for i in range(0, len(unique), 500):
+                    part = unique[i : i + 500]
+                    placeholders = ",".join("?" * len(part))
+                    for digest, blob in conn.execute(
+                        f"SELECT digest, vector FROM embeddings "
+                        f"WHERE model = ? AND digest IN ({placeholders})",
+                        [model, *part],
+                    ):
+                        found[digest] = array("f", blob).tolist()
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND digest = ?",
+                        [(now, model, digest) for digest in found],
+                    )
+                    conn.commit()
+
+            results = [found.get(digest) for digest in digests]
+            hits = sum(1 for r in results if r is not None)
+            self._count_lookup(model, hits, len(results) - hits)
+        return results
+
+    def put(self, model: str, text: str, embedding: Sequence[float]) -> None:
+        """Store one embedding."""
+        self.put_many(model, [text], [embedding])
+
+    def put_many(
+        self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]
+    ) -> None:
+        """
+        Store embeddings for several texts.
+
+        Args:
+            model: Embedding model name
+            texts: Texts that were embedded
+            embeddings: Their embeddings, in the same order
+        """
+        now = time.time()
+        rows = [
+            (model, text_digest(text), len(vector), array("f", vector).tobytes(), now)
+            for text, vector in zip(texts, embeddings)
+            if vector
+        ]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, digest, dims, vector, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+            except sqlite3.Error:
+                return
+            self.stats.writes += len(rows)
+            self._model_stats(model).writes += len(rows)
+            self._evict_if_needed(conn)
+
+    # ==================== Maintenance ====================
+
+    def __len__(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM embeddings")
+                conn.commit()
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics overall and per model."""
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            **self._stats_dict(self.stats),
+            "by_model": {model: self._stats_dict(s) for model, s in self.by_model.items()},
+        }
+
+    @staticmethod
+    def _stats_dict(stats: EmbeddingCacheStats) -> Dict[str, Any]:
+        return {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "writes": stats.writes,
+            "evictions": stats.evictions,
+            "hit_rate": round(stats.hit_rate, 3),
+        }
+
+    def _model_stats(self, model: str) -> EmbeddingCacheStats:
+        return self.by_model.setdefault(model, EmbeddingCacheStats())
+
+    def _count_lookup(self, model: str, hits: int, misses: int) -> None:
+        for stats in (self.stats, self._model_stats(model)):
+            stats.hits += hits
+            stats.misses += misses
+
+    def _evict_if_needed(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries once over max_entries."""
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        target = int(self.max_entries * (1 - EVICTION_SLACK))
+        excess = count - target
+        conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        conn.commit()
+        self.stats.evictions += excess
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use (None if it can't be opened)."""
+        if self._conn is not None:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, digest BLOB NOT NULL, dims INTEGER NOT NULL, "
+                "vector BLOB NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (model, digest))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError):
+            # A cache that can't be opened just means every lookup misses
+            return None
+        self._conn = conn
+        return conn
+
+
+class CachedEmbedder:
+    """Wraps a mem0 embedder so its embed calls go through an EmbeddingCache."""
+
+    def __init__(self, embedder: Any, cache: EmbeddingCache, model: str):
+        """
+        Initialize wrapper.
+
+        Args:
+            embedder: mem0 embedder (has ``embed`` and optionally ``embed_batch``)
+            cache: Cache to consult
+            model: Embedding model name used as part of the cache key
+        """
+        self._embedder = embedder
+        self._cache = cache
+        self._model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._embedder, name)
+
+    def embed(self, text, memory_action=None):
+        if not isinstance(text, str):
+            return self._embedder.embed(text, memory_action)
+        cached = self._cache.get(self._model, text)
+        if cached is not None:
+            return cached
+        embedding = self._embedder.embed(text, memory_action)
+        self._cache.put(self._model, text, embedding)
+        return embedding
+
+    def embed_batch(self, texts, memory_action=None):
+        texts = list(texts)
+        results = self._cache.get_many(self._model, texts)
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            miss_texts = [texts[i] for i in missing]
+            if hasattr(self._embedder, "embed_batch"):
+                embedded = self._embedder.embed_batch(miss_texts, memory_action)
+            else:
+                embedded = [self._embedder.embed(t, memory_action) for t in miss_texts]
+            self._cache.put_many(self._model, miss_texts, embedded)
+            for i, embedding in zip(missing, embedded):
+                results[i] = embedding
+        return results
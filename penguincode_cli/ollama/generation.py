@@ -0,0 +1,270 @@
+"""Generation options (temperature, num_predict, num_ctx) for each call.
+
+A chat call without ``options`` runs with the server's defaults: its
+temperature, no limit on ``num_predict``, and its own ``num_ctx``, which
+on many installs is shorter than the window ``TokenBudget`` packs prompts
+for (Ollama then drops the start of the prompt without saying so).
+
+``Generation`` resolves the options of one call from, lowest first:
+
+1. ``defaults`` (``temperature``, ``max_tokens`` as ``num_predict``)
+2. ``generation.roles[<call role>]``, e.g. a short ``num_predict`` for
+   routing, review, summary and memory calls
+3. ``agents.<name>`` in the settings
+4. Values the caller passes (an agent's own AgentConfig)
+
+``num_ctx`` is sized to the packed prompt plus ``num_predict``, rounded up
+to a power of two and capped by the model's window, so the KV cache isn't
+allocated for a window the prompt never uses. Ollama reloads a model when
+``num_ctx`` changes, so a model's size grows at once but only shrinks
+after ``num_ctx_shrink_after`` calls in a row fit a smaller size: one
+large call doesn't pin the model's KV cache for the rest of the process,
+and alternating sizes don't reload it on every call.
+
+Every call's options and outcome are recorded for ``to_dict``.
+
+Usage:
+    options = get_generation().options(ROLE_ROUTING, model, prompt_tokens, window)
+    reply = await accumulate(client.chat(model, messages, options=options))
+    get_generation().record(ROLE_ROUTING, model, options, prompt_tokens, reply.usage)
+"""
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from penguincode_cli.config.settings import AgentConfig, DefaultsConfig, GenerationConfig, Settings
+
+from .types import UsageStats
+
+logger = logging.getLogger(__name__)
+
+# Call roles (keys of `generation.roles`)
+ROLE_ROUTING = "routing"  # Orchestrator turns: route to an agent or answer
+ROLE_REVIEW = "review"  # Orchestrator reviewing agent output or an escalation
+ROLE_SUMMARY = "summary"  # Conversation compaction
+ROLE_MEMORY = "memory"  # Facts extracted for the memory store
+ROLE_PLANNING = "planning"  # Planner
+ROLE_AGENT = "agent"  # Agent tool loops
+
+# Calls kept for to_dict
+MAX_RECORDED_CALLS = 200
+
+
+@dataclass
+class GenerationCall:
+    """Options one call was sent with, and how it went."""
+
+    role: str
+    model: str
+    options: Dict[str, Any]
+    prompt_tokens: int  # Estimate num_ctx was sized for
+    completion_tokens: int = 0
+    hit_limit: bool = False  # Cut off by num_predict or num_ctx
+    at: float = field(default_factory=time.time)
+
+
+class Generation:
+    """
+    Resolves Ollama options per call and records what was sent.
+
+    Args:
+        config: Per-role options and num_ctx sizing
+        defaults: Default temperature and max_tokens
+        agents: Per-agent overrides by agent name
+    """
+
+    def __init__(
+        self,
+        config: Optional[GenerationConfig] = None,
+        defaults: Optional[DefaultsConfig] = None,
+        agents: Optional[Dict[str, AgentConfig]] = None,
+    ):
+        self.configure(config or GenerationConfig(), defaults, agents)
+
+    def configure(
+        self,
+        config: GenerationConfig,
+        defaults: Optional[DefaultsConfig] = None,
+        agents: Optional[Dict[str, AgentConfig]] = None,
+    ) -> None:
+        """Apply settings, dropping num_ctx sizes and recorded calls."""
+        self.config = config
+        self.defaults = defaults or DefaultsConfig()
+        self.agents = agents or {}
+        self._num_ctx: Dict[str, int] = {}  # Model -> num_ctx last sent
+        self._smaller: Dict[str, Tuple[int, int]] = {}  # Model -> (calls, largest size) fitting less
+        self.calls: Deque[GenerationCall] = deque(maxlen=MAX_RECORDED_CALLS)
+
+    # ==================== Resolution ====================
+
+    def resolve(
+        self,
+        role: str,
+        agent: Optional[str] = None,
+        temperature: Optional[float] = None,
+        num_predict: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Options for a call role, without ``num_ctx``.
+
+        Args:
+            role: Call role (ROLE_*)
+            agent: Agent name, for its overrides in the settings
+            temperature: Caller's temperature (wins over the settings)
+            num_predict: Caller's response cap (wins over the settings)
+
+        Returns:
+            Ollama options
+        """
+        options: Dict[str, Any] = {
+            "temperature": self.defaults.temperature,
+            "num_predict": self.defaults.max_tokens,
+        }
+        options.update(self.config.roles.get(role) or {})
+        agent_config = self.agents.get(agent) if agent else None
+        if agent_config is not None:
+            if agent_config.temperature is not None:
+                options["temperature"] = agent_config.temperature
+            if agent_config.max_tokens is not None:
+                options["num_predict"] = agent_config.max_tokens
+        if temperature is not None:
+            options["temperature"] = temperature
+        if num_predict is not None:
+            options["num_predict"] = num_predict
+        return options
+
+    def sized(
+        self, model: str, options: Dict[str, Any], prompt_tokens: int, window: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Copy of ``options`` with ``num_ctx`` sized for a prompt.
+
+        Args:
+            model: Model the call goes to
+            options: Resolved options
+            prompt_tokens: Estimated tokens of the prompt (with tool definitions)
+            window: Model's usable window (0: unknown)
+
+        Returns:
+            The options with ``num_ctx`` (unchanged if sizing is off or
+            ``num_ctx`` is already set)
+        """
+        if not self.config.size_num_ctx or "num_ctx" in options:
+            return options
+        num_predict = options.get("num_predict") or 0
+        if num_predict <= 0:  # Unlimited: room up to the window
+            num_predict = max(0, window - prompt_tokens)
+        return {**options, "num_ctx": self.num_ctx(model, prompt_tokens + num_predict, window)}
+
+    def options(
+        self,
+        role: str,
+        model: str,
+        prompt_tokens: int,
+        window: int = 0,
+        agent: Optional[str] = None,
+        temperature: Optional[float] = None,
+        num_predict: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Resolved options with ``num_ctx`` sized (see ``resolve`` and ``sized``)."""
+        options = self.resolve(role, agent, temperature, num_predict)
+        return self.sized(model, options, prompt_tokens, window)
+
+    def num_ctx(self, model: str, tokens: int, window: int = 0) -> int:
+        """
+        Context size for a call that needs ``tokens``.
+
+        Rounded up to a power of two (at least ``min_num_ctx``) and capped
+        by ``window``. Smaller than what was last sent to the model only
+        once ``num_ctx_shrink_after`` calls in a row fit a smaller size
+        (then the largest size those calls needed).
+        """
+        size = max(self.config.min_num_ctx, 1 << max(0, tokens - 1).bit_length())
+        if window:
+            size = min(size, max(window, self.config.min_num_ctx))
+        current = self._num_ctx.get(model, 0)
+        if size < current:
+            calls, largest = self._smaller.get(model, (0, 0))
+            calls, largest = calls + 1, max(largest, size)
+            shrink_after = self.config.num_ctx_shrink_after
+            if shrink_after <= 0 or calls < shrink_after:
+                self._smaller[model] = (calls, largest)
+                return current
+            size = largest
+        self._smaller.pop(model, None)
+        if size != current:
+            logger.debug(f"num_ctx for {model}: {size}")
+        self._num_ctx[model] = size
+        return size
+
+    # ==================== Recording ====================
+
+    def record(
+        self,
+        role: str,
+        model: str,
+        options: Dict[str, Any],
+        prompt_tokens: int,
+        usage: Optional[UsageStats] = None,
+    ) -> GenerationCall:
+        """
+        Record the options a call was sent with.
+
+        Args:
+            role: Call role
+            model: Model called
+            options: Options sent
+            prompt_tokens: Estimate ``num_ctx`` was sized for
+            usage: The call's usage, if it finished
+        """
+        call = GenerationCall(
+            role=role,
+            model=model,
+            options=options,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            hit_limit=bool(usage and usage.length_stops),
+        )
+        self.calls.append(call)
+        if call.hit_limit:
+            logger.debug(f"{role} reply from {model} hit num_predict={options.get('num_predict')}")
+        return call
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Recent calls summed per role, and the num_ctx sent per model."""
+        roles: Dict[str, Dict[str, Any]] = {}
+        for call in self.calls:
+            summary = roles.setdefault(call.role, {
+                "calls": 0, "completion_tokens": 0, "hit_limit": 0, "max_num_ctx": 0, "num_predict": 0,
+            })
+            summary["calls"] += 1
+            summary["completion_tokens"] += call.completion_tokens
+            summary["hit_limit"] += int(call.hit_limit)
+            summary["max_num_ctx"] = max(summary["max_num_ctx"], call.options.get("num_ctx", 0))
+            summary["num_predict"] = call.options.get("num_predict", 0)
+        return {"roles": roles, "num_ctx": dict(sorted(self._num_ctx.items()))}
+
+
+_generation = Generation()
+
+
+def get_generation() -> Generation:
+    """The process-wide generation options."""
+    return _generation
+
+
+def configure_generation(settings: Settings) -> Generation:
+    """
+    Apply ``Settings.generation``, ``defaults`` and ``agents``.
+
+    Args:
+        settings: Loaded settings
+
+    Returns:
+        The process-wide generation options
+    """
+    _generation.configure(settings.generation, settings.defaults, settings.agents)
+    return _generation
@@ -0,0 +1,160 @@
+"""Prompt layouts that let Ollama reuse its KV cache, and measuring it.
+
+Ollama keeps the key/value cache of a loaded model's last prompt and only
+evaluates the part of a new prompt after the longest prefix the two share.
+Anything that changes early in the prompt (memories or a summary in front
+of the system prompt) forces the whole prompt to be evaluated again.
+
+``assemble_messages`` lays a chat prompt out as static system prompt,
+history, then the turn's volatile context together with the new message,
+so consecutive turns share everything up to the previous turn's message.
+``PrefixCacheTracker`` compares each prompt with the previous one for the
+same model and splits ``prompt_eval_duration`` into calls that could reuse
+the cache (warm) and calls that couldn't (cold).
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .types import Message
+
+# Heads the volatile context placed in front of the user's message
+CONTEXT_HEADER = "Context for this request:"
+
+
+def assemble_messages(
+    system_prompt: str,
+    history: Sequence[Message],
+    user_message: str,
+    context: str = "",
+) -> List[Message]:
+    """
+    Build a chat prompt whose prefix stays byte-stable across turns.
+
+    Args:
+        system_prompt: Static system prompt (must not vary per turn)
+        history: Earlier messages, oldest first
+        user_message: The new message
+        context: Per-turn context (memories, summary, docs); goes with the
+            new message so it never shifts what comes before it
+
+    Returns:
+        Messages to send
+    """
+    messages = [Message(role="system", content=system_prompt)]
+    messages.extend(history)
+    if context:
+        user_message = f"{CONTEXT_HEADER}\n{context.strip()}\n---\n\n{user_message}"
+    messages.append(Message(role="user", content=user_message))
+    return messages
+
+
+def shared_prefix_chars(previous: Sequence[Message], current: Sequence[Message]) -> int:
+    """Characters of message content two prompts share from the start."""
+    shared = 0
+    for old, new in zip(previous, current):
+        if old.role != new.role:
+            break
+        if old.content == new.content:
+            shared += len(new.content)
+            continue
+        limit = min(len(old.content), len(new.content))
+        i = 0
+        while i < limit and old.content[i] == new.content[i]:
+            i += 1
+        shared += i
+        break
+    return shared
+
+
+@dataclass
+class PrefixCacheStats:
+    """Prompt evaluation time split by whether the prompt prefix was reusable."""
+
+    calls: int = 0
+    warm_calls: int = 0  # Prompt began with the whole previous system prompt
+    prompt_chars: int = 0
+    reused_chars: int = 0  # Shared with the previous prompt to the same model
+    warm_chars: int = 0
+    cold_chars: int = 0
+    warm_eval_ms: float = 0.0
+    cold_eval_ms: float = 0.0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Share of prompt characters that matched the previous prompt."""
+        return self.reused_chars / self.prompt_chars if self.prompt_chars else 0.0
+
+    @property
+    def warm_ms_per_kchar(self) -> float:
+        """Prompt evaluation ms per 1000 prompt characters on warm calls."""
+        return self.warm_eval_ms * 1000 / self.warm_chars if self.warm_chars else 0.0
+
+    @property
+    def cold_ms_per_kchar(self) -> float:
+        """Prompt evaluation ms per 1000 prompt characters on cold calls."""
+        return self.cold_eval_ms * 1000 / self.cold_chars if self.cold_chars else 0.0
+
+    @property
+    def eval_time_drop(self) -> float:
+        """Fraction of prompt evaluation time saved per character when warm."""
+        if not self.warm_chars or not self.cold_ms_per_kchar:
+            return 0.0
+        return 1.0 - self.warm_ms_per_kchar / self.cold_ms_per_kchar
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "warm_calls": self.warm_calls,
+            "reuse_rate": round(self.reuse_rate, 3),
+            "warm_ms_per_kchar": round(self.warm_ms_per_kchar, 2),
+            "cold_ms_per_kchar": round(self.cold_ms_per_kchar, 2),
+            "eval_time_drop": round(self.eval_time_drop, 3),
+        }
+
+
+@dataclass
+class PrefixCacheTracker:
+    """Compares each prompt with the previous one sent to the same model."""
+
+    stats: PrefixCacheStats = field(default_factory=PrefixCacheStats)
+    _last: Dict[str, Tuple[str, List[Message]]] = field(default_factory=dict)
+
+    def observe(
+        self,
+        model: str,
+        messages: Sequence[Message],
+        tools: Optional[List[Dict]],
+        prompt_eval_duration_ns: Optional[int],
+    ) -> None:
+        """
+        Record a finished chat call.
+
+        Args:
+            model: Model the prompt went to
+            messages: The prompt
+            tools: Tool definitions sent with it (rendered into the prompt)
+            prompt_eval_duration_ns: ``prompt_eval_duration`` of the response
+        """
+        tools_key = json.dumps(tools, sort_keys=True) if tools else ""
+        chars = sum(len(m.content) for m in messages)
+        previous = self._last.get(model)
+        shared = 0
+        if previous is not None and previous[0] == tools_key:
+            shared = shared_prefix_chars(previous[1], messages)
+        self._last[model] = (tools_key, list(messages))
+
+        warm = bool(messages) and previous is not None and shared >= len(messages[0].content)
+        eval_ms = (prompt_eval_duration_ns or 0) / 1_000_000
+        stats = self.stats
+        stats.calls += 1
+        stats.prompt_chars += chars
+        stats.reused_chars += shared
+        if warm:
+            stats.warm_calls += 1
+            stats.warm_chars += chars
+            stats.warm_eval_ms += eval_ms
+        else:
+            stats.cold_chars += chars
+            stats.cold_eval_ms += eval_ms
@@ -0,0 +1,479 @@
+"""GPU request scheduler for Ollama calls.
+
+Wraps an OllamaClient and enforces the ``regulators`` settings so that
+parallel agents share the GPU instead of all hitting Ollama at once:
+
+- Bounded priority queue (``request_queue_size``)
+- Concurrency cap (``max_concurrent_requests``)
+- Per-model admission (``max_models_loaded``, and only models whose
+  weights fit in ``vram_mb`` together once the model registry knows their
+  sizes)
+- Minimum spacing between request starts (``min_request_interval_ms``)
+- Cooldown after a failed request (``cooldown_after_error_ms``)
+- Model affinity: queued calls for an already-loaded model are drained in
+  runs so interleaved agents don't force Ollama to swap weights. A call for
+  another model is never held back longer than ``affinity_max_wait_ms`` or
+  ``affinity_max_run`` admissions.
+- Per-role ``keep_alive`` so models (and their prompt caches) stay loaded
+  between calls; chat calls are tracked for prompt-prefix cache reuse.
+- Tool definitions are dropped for models the registry knows can't take
+  them, which Ollama would reject.
+
+The scheduler exposes the same ``chat``/``generate`` interface as
+OllamaClient, so agents use it transparently. Everything else
+(``list_models``, ``show_model``, ...) is delegated to the wrapped client.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import aclosing, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from penguincode_cli.config.settings import ModelsConfig, RegulatorsConfig
+
+from .capabilities import get_model_registry
+from .client import OllamaClient
+from .prompt_cache import PrefixCacheTracker
+from .types import ChatResponse, GenerateResponse, Message
+
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower value = served first)
+PRIORITY_INTERACTIVE = 0  # Orchestrator routing - the user is waiting on it
+PRIORITY_AGENT = 10  # Agent tool loops
+PRIORITY_BACKGROUND = 20  # Memory extraction, history compaction
+
+_request_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "ollama_request_priority", default=PRIORITY_AGENT
+)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Set the scheduling priority for LLM calls made inside this block.
+
+    Uses a context variable so callers don't need to know whether they hold
+    a RequestScheduler or a plain OllamaClient (which ignores it).
+    """
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def _duration_seconds(value: str) -> float:
+    """Seconds in an Ollama keep_alive value ("30m", "1h", "90", "-1" = forever)."""
+    value = str(value).strip()
+    if not value:
+        return 0.0
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for suffix in sorted(units, key=len, reverse=True):
+        if value.endswith(suffix):
+            number, scale = value[: -len(suffix)], units[suffix]
+            break
+    else:
+        number, scale = value, 1
+    try:
+        seconds = float(number) * scale
+    except ValueError:
+        return 0.0
+    return float("inf") if seconds < 0 else seconds
+
+
+def model_keep_alive(models: ModelsConfig, keep_alive: Dict[str, str]) -> Dict[str, str]:
+    """
+    Resolve per-role keep_alive settings to model names.
+
+    Args:
+        models: Model roles
+        keep_alive: keep_alive per role name
+
+    Returns:
+        keep_alive per model; a model with several roles gets the longest
+    """
+    resolved: Dict[str, str] = {}
+    for role, duration in keep_alive.items():
+        model = getattr(models, role, None)
+        if not model or not duration:
+            continue
+        current = resolved.get(model)
+        if current is None or _duration_seconds(duration) > _duration_seconds(current):
+            resolved[model] = duration
+    return resolved
+
+
+class SchedulerQueueFullError(RuntimeError):
+    """Raised when the request queue is at ``request_queue_size``."""
+
+
+@dataclass(order=True)
+class _Waiter:
+    """A request waiting for a GPU slot."""
+
+    priority: int
+    seq: int
+    model: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+@dataclass
+class SchedulerStats:
+    """Counters for tuning the scheduler under load."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    model_swaps: int = 0
+    max_queue_depth: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    recent_waits_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def record_wait(self, wait_ms: float) -> None:
+        """Record how long a request waited for its slot."""
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.recent_waits_ms.append(wait_ms)
+
+    def p95_wait_ms(self) -> float:
+        """95th percentile wait over the recent window."""
+        if not self.recent_waits_ms:
+            return 0.0
+        ordered = sorted(self.recent_waits_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class RequestScheduler:
+    """Admission-controlled front end for OllamaClient."""
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        config: Optional[RegulatorsConfig] = None,
+        models: Optional[ModelsConfig] = None,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            client: Ollama client to wrap (must already be entered)
+            config: Regulator settings (defaults if not provided)
+            models: Model roles, to resolve ``config.keep_alive`` to models
+        """
+        self.client = client
+        self.config = config or RegulatorsConfig()
+
+        self.max_concurrent = max(1, self.config.max_concurrent_requests)
+        self.max_models = max(1, self.config.max_models_loaded)
+        self.queue_size = max(1, self.config.request_queue_size)
+        self.min_interval = max(0, self.config.min_request_interval_ms) / 1000
+        self.error_cooldown = max(0, self.config.cooldown_after_error_ms) / 1000
+        self.affinity_max_wait = max(0, self.config.affinity_max_wait_ms) / 1000
+        self.affinity_max_run = max(1, self.config.affinity_max_run)
+        self.affinity_keep_alive = self.config.affinity_keep_alive
+        self.vram_bytes = max(0, self.config.vram_mb) * 1024 * 1024
+        self.model_keep_alive = model_keep_alive(models, self.config.keep_alive) if models else {}
+        self.prefix_cache = PrefixCacheTracker()
+
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._active_models: Dict[str, int] = {}
+        # Models assumed loaded in Ollama, least recently started first
+        self._resident_models: List[str] = []
+        self._run_length = 0
+        self._last_start = 0.0
+        self._cooldown_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.stats = SchedulerStats()
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate anything we don't schedule to the wrapped client."""
+        return getattr(self.client, name)
+
+    # ==================== Public API ====================
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Message],
+        stream: bool = True,
+        tools: Optional[List[Dict]] = None,
+        **kwargs,
+    ) -> AsyncIterator[ChatResponse]:
+        """Scheduled version of OllamaClient.chat (holds a slot while streaming)."""
+        await self._acquire(model)
+        failed = False
+        # Everything after _acquire is inside the try, so the slot is
+        # always released
+        try:
+            self._apply_keep_alive(model, kwargs)
+            caps = get_model_registry().cached(model)
+            if tools and caps is not None and not caps.tools:
+                logger.debug(f"{model} doesn't support tools; sending the request without them")
+                tools = None
+            # Closing this stream early (a complete tool call) must drop the
+            # HTTP request now, not when the inner generator is collected
+            async with aclosing(self.client.chat(
+                model=model, messages=messages, stream=stream, tools=tools, **kwargs
+            )) as chunks:
+                async for chunk in chunks:
+                    if chunk.done:
+                        self.prefix_cache.observe(model, messages, tools, chunk.prompt_eval_duration)
+                    yield chunk
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(model, failed)
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        system: Optional[str] = None,
+        stream: bool = True,
+        **kwargs,
+    ) -> AsyncIterator[GenerateResponse]:
+        """Scheduled version of OllamaClient.generate (holds a slot while streaming)."""
+        await self._acquire(model)
+        failed = False
+        try:
+            self._apply_keep_alive(model, kwargs)
+            async with aclosing(self.client.generate(
+                model=model, prompt=prompt, system=system, stream=stream, **kwargs
+            )) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(model, failed)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._queue)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently streaming from Ollama."""
+        return self._in_flight
+
+    @property
+    def model_swaps(self) -> int:
+        """Number of times a request needed a model that wasn't loaded."""
+        return self.stats.model_swaps
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and wait-time statistics."""
+        admitted = self.stats.completed + self.stats.failed + self._in_flight
+        return {
+            "queue_depth": len(self._queue),
+            "in_flight": self._in_flight,
+            "active_models": sorted(self._active_models),
+            "resident_models": list(self._resident_models),
+            "model_swaps": self.stats.model_swaps,
+            "submitted": self.stats.submitted,
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "rejected": self.stats.rejected,
+            "max_queue_depth": self.stats.max_queue_depth,
+            "avg_wait_ms": self.stats.total_wait_ms / admitted if admitted else 0.0,
+            "p95_wait_ms": self.stats.p95_wait_ms(),
+            "max_wait_ms": self.stats.max_wait_ms,
+            "cooling_down": time.monotonic() < self._cooldown_until,
+            "prefix_cache": self.prefix_cache.stats.to_dict(),
+            "limits": {
+                "max_concurrent_requests": self.max_concurrent,
+                "max_models_loaded": self.max_models,
+                "vram_mb": self.vram_bytes // (1024 * 1024),
+                "request_queue_size": self.queue_size,
+                "min_request_interval_ms": int(self.min_interval * 1000),
+                "cooldown_after_error_ms": int(self.error_cooldown * 1000),
+                "affinity_max_wait_ms": int(self.affinity_max_wait * 1000),
+                "affinity_max_run": self.affinity_max_run,
+            },
+        }
+
+    # ==================== Admission ====================
+
+    async def _acquire(self, model: str) -> None:
+        """Wait until this request may start."""
+        if len(self._queue) >= self.queue_size:
+            self.stats.rejected += 1
+            raise SchedulerQueueFullError(
+                f"Ollama request queue full ({self.queue_size} waiting)"
+            )
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=_request_priority.get(),
+            seq=next(self._seq),
+            model=model,
+            future=loop.create_future(),
+            enqueued_at=time.monotonic(),
+        )
+        heapq.heappush(self._queue, waiter)
+        self.stats.submitted += 1
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._queue))
+
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._queue:
+                # Cancelled while queued - just drop out of line
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+            elif not waiter.future.cancelled():
+                # Slot was granted but the caller went away before using it
+                self._release(model, failed=False)
+            raise
+
+    def _release(self, model: str, failed: bool) -> None:
+        """Return a slot and wake the next waiter."""
+        self._in_flight -= 1
+        remaining = self._active_models.get(model, 0) - 1
+        if remaining > 0:
+            self._active_models[model] = remaining
+        else:
+            self._active_models.pop(model, None)
+
+        if failed:
+            self.stats.failed += 1
+            if self.error_cooldown:
+                self._cooldown_until = time.monotonic() + self.error_cooldown
+                logger.warning(
+                    f"Ollama request failed for {model}; cooling down "
+                    f"{int(self.error_cooldown * 1000)}ms"
+                )
+        else:
+            self.stats.completed += 1
+
+        self._dispatch()
+
+    def _fits_in_vram(self, models: List[str]) -> bool:
+        """Whether the models' weights fit in VRAM together (models of unknown size count as 0)."""
+        if not self.vram_bytes or len(models) < 2:
+            return True
+        registry = get_model_registry()
+        sizes = [registry.cached(m) for m in models]
+        return sum(caps.size_bytes for caps in sizes if caps is not None) <= self.vram_bytes
+
+    def _is_admissible(self, waiter: _Waiter) -> bool:
+        """Check per-model admission for a waiter."""
+        if waiter.model in self._active_models:
+            return True
+        if len(self._active_models) >= self.max_models:
+            return False
+        return self._fits_in_vram([*self._active_models, waiter.model])
+
+    def _is_affine(self, waiter: _Waiter) -> bool:
+        """Check whether a waiter's model is running or assumed loaded."""
+        return waiter.model in self._active_models or waiter.model in self._resident_models
+
+    def _starving_waiter(self, ordered: List[_Waiter], now: float) -> Optional[_Waiter]:
+        """Find a non-affine waiter that has been held back too long."""
+        others = [w for w in ordered if not self._is_affine(w)]
+        if not others:
+            return None
+        oldest = min(others, key=lambda w: w.enqueued_at)
+        if now - oldest.enqueued_at >= self.affinity_max_wait:
+            return oldest
+        if self._run_length >= self.affinity_max_run:
+            return oldest
+        return None
+
+    def _pick_waiter(self) -> Optional[_Waiter]:
+        """Choose the next waiter to admit.
+
+        Calls for loaded models go first (in priority order) so they drain in
+        one run; other models follow. A starving waiter takes precedence, and
+        while it can't be admitted nothing else is, so the current run drains
+        and its model can be swapped out.
+        """
+        ordered = sorted(self._queue)
+        starving = self._starving_waiter(ordered, time.monotonic())
+        if starving is not None:
+            return starving if self._is_admissible(starving) else None
+
+        affine = [w for w in ordered if self._is_affine(w)]
+        others = [w for w in ordered if not self._is_affine(w)]
+        for waiter in affine + others:
+            if self._is_admissible(waiter):
+                return waiter
+        return None
+
+    def _note_admission(self, waiter: _Waiter) -> None:
+        """Track resident models, swaps and run length for an admission."""
+        if waiter.model in self._resident_models:
+            self._resident_models.remove(waiter.model)
+            # Only count the run while someone else is waiting on it
+            if any(w.model != waiter.model for w in self._queue):
+                self._run_length += 1
+        else:
+            if self._resident_models:
+                self.stats.model_swaps += 1
+                logger.debug(f"Model swap to {waiter.model} (resident: {self._resident_models})")
+            self._run_length = 0
+        self._resident_models.append(waiter.model)
+        del self._resident_models[: -self.max_models]
+        # Ollama unloads the least recently used model when the next won't fit
+        while not self._fits_in_vram(self._resident_models):
+            self._resident_models.pop(0)
+
+    def _apply_keep_alive(self, model: str, kwargs: Dict[str, Any]) -> None:
+        """Keep the model loaded for its role, or longer while more calls for it are queued."""
+        if "keep_alive" in kwargs:
+            return
+        candidates = [self.model_keep_alive.get(model, "")]
+        if self.affinity_keep_alive and any(w.model == model for w in self._queue):
+            candidates.append(self.affinity_keep_alive)
+        keep_alive = max(candidates, key=_duration_seconds)
+        if keep_alive:
+            kwargs["keep_alive"] = keep_alive
+
+    def _dispatch(self) -> None:
+        """Admit as many waiters as limits allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue and self._in_flight < self.max_concurrent:
+            now = time.monotonic()
+            start_at = max(self._last_start + self.min_interval, self._cooldown_until)
+            if now < start_at:
+                # Pacing or cooldown - try again when the gate opens
+                loop = asyncio.get_running_loop()
+                self._timer = loop.call_later(start_at - now, self._dispatch)
+                return
+
+            waiter = self._pick_waiter()
+            if waiter is None:
+                return  # Everything queued is blocked on model admission
+
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+
+            if waiter.future.done():
+                continue  # Cancelled between scheduling and dispatch
+
+            self._note_admission(waiter)
+            self._in_flight += 1
+            self._active_models[waiter.model] = self._active_models.get(waiter.model, 0) + 1
+            self._last_start = now
+            self.stats.record_wait((now - waiter.enqueued_at) * 1000)
+            waiter.future.set_result(None)
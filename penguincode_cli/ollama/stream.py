@@ -0,0 +1,94 @@
+"""Accumulating streamed chat responses.
+
+A streamed reply arrives one token per chunk. Growing the reply with
+``text += chunk.message.content`` copies everything received so far on
+every chunk when the string is shared (as it is once anything else holds a
+reference), which is quadratic on long generations. ``ChatAccumulator``
+collects the pieces in a list, joins them once, and keeps the tool calls
+and usage of the final chunk.
+
+Usage:
+    reply = ChatAccumulator()
+    async for chunk in client.chat(model, messages):
+        delta = reply.add(chunk)
+    reply.text, reply.tool_calls, reply.usage
+"""
+
+from typing import Any, AsyncIterable, Dict, List, Optional
+
+from .types import ChatResponse, UsageStats
+
+
+class ChatAccumulator:
+    """Joined text, tool calls and usage of one streamed chat reply."""
+
+    __slots__ = ("_parts", "_text", "length", "chunks", "tool_calls", "final", "usage")
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._text = ""
+        self.length = 0  # Characters received
+        self.chunks = 0  # Chunks with text (about one token each)
+        self.tool_calls: List[Dict[str, Any]] = []  # {"name": ..., "arguments": ...}
+        self.final: Optional[ChatResponse] = None  # The done chunk
+        self.usage = UsageStats()
+
+    def add(self, chunk: ChatResponse) -> str:
+        """
+        Take one chunk.
+
+        Args:
+            chunk: A streamed chat response
+
+        Returns:
+            The text the chunk added ("" if none)
+        """
+        message = chunk.message
+        delta = ""
+        if message is not None:
+            delta = message.content
+            if delta:
+                self._parts.append(delta)
+                self.length += len(delta)
+                self.chunks += 1
+            # Ollama may send tool calls before the done chunk
+            if message.tool_calls:
+                for call in message.tool_calls:
+                    # ToolCall from the client, or a plain dict from stand-ins
+                    function = call.get("function", call) if isinstance(call, dict) else call.function
+                    self.tool_calls.append({
+                        "name": function.get("name", ""),
+                        "arguments": function.get("arguments", {}),
+                    })
+        if chunk.done:
+            self.final = chunk
+            self.usage.add(UsageStats.from_chat_response(chunk))
+        return delta
+
+    @property
+    def text(self) -> str:
+        """Everything received so far."""
+        if self._parts:
+            self._text = "".join([self._text, *self._parts])
+            self._parts.clear()
+        return self._text
+
+    @property
+    def done(self) -> bool:
+        return self.final is not None
+
+
+async def accumulate(stream: AsyncIterable[ChatResponse]) -> ChatAccumulator:
+    """
+    Drain a chat stream.
+
+    Args:
+        stream: Chunks from ``chat(..., stream=True)``
+
+    Returns:
+        The accumulated reply
+    """
+    reply = ChatAccumulator()
+    async for chunk in stream:
+        reply.add(chunk)
+    return reply
@@ -0,0 +1,161 @@
+"""Schema-constrained replies through Ollama's ``format`` field.
+
+Models without native tool calling are asked in their prompt to answer with
+a JSON tool call, and often don't: single quotes, a missing brace, a call
+written as ``read(path=...)``, or an explanation instead of the call. Each
+miss costs a loop iteration or a round of keyword guessing. Ollama accepts
+a JSON schema as ``format`` and compiles it into a grammar, so every token
+the model samples keeps the reply valid against it.
+
+``tool_call_schema`` turns Ollama tool definitions into a schema whose
+replies are either one call (``{"name": ..., "arguments": {...}}``, the
+shape the prompts already ask for) or a plain ``{"answer": "..."}``.
+``StructuredOutput`` decides per model whether to send it.
+
+Usage:
+    schema = tool_call_schema(tools)
+    if get_structured_output().constrained(model):
+        client.chat(model, messages, format=schema)
+    answer = structured_answer(reply.text)  # None for a tool call
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from penguincode_cli.config.settings import StructuredOutputConfig
+
+from .capabilities import get_model_registry
+
+# Families known to support native tool calling, for models the registry
+# hasn't probed
+# See: https://ollama.com/search?c=tools for full list
+# See: https://ollama.com/blog/tool-support for implementation details
+NATIVE_TOOL_MODELS = frozenset({
+    # Llama family
+    "llama3.1", "llama3.2", "llama3.3", "llama4",
+    # Mistral family
+    "mistral", "mistral-nemo", "mistral-small", "mistral-large", "mixtral",
+    # Cohere Command-R family
+    "command-r", "command-r-plus", "command-r7b",
+    # Qwen family
+    "qwen2.5", "qwen2.5-coder", "qwen3",
+    # Others
+    "firefunction-v2", "hermes3",
+})
+
+# Added to the system prompt when replies are constrained, so the model
+# knows how to finish without calling a tool
+ANSWER_INSTRUCTION = (
+    'Reply with JSON only: a tool call, or {"answer": "<your reply>"} '
+    "when no tool is needed or the task is done."
+)
+
+ANSWER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"answer": {"type": "string"}},
+    "required": ["answer"],
+}
+
+
+def supports_native_tools(model: str) -> bool:
+    """
+    Whether the model takes native tool definitions.
+
+    Answered by the model registry once the model has been probed (see
+    ``ModelRegistry.get``); until then, by the model's family name.
+    """
+    caps = get_model_registry().cached(model)
+    if caps is not None:
+        return caps.tools
+    model_base = model.split(":")[0].lower()
+    return any(name in model_base for name in NATIVE_TOOL_MODELS)
+
+
+def tool_call_schema(tools: List[Dict[str, Any]], answer: bool = True) -> Dict[str, Any]:
+    """
+    JSON schema for a reply that calls exactly one of ``tools``.
+
+    Args:
+        tools: Ollama tool definitions (``{"type": "function", "function": {...}}``)
+        answer: Also allow ``{"answer": "..."}`` for replies without a call
+
+    Returns:
+        Schema for the ``format`` field
+    """
+    options = []
+    for tool in tools:
+        function = tool.get("function", tool)
+        parameters = function.get("parameters") or {"type": "object", "properties": {}}
+        options.append({
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "enum": [function["name"]]},
+                "arguments": parameters,
+            },
+            "required": ["name", "arguments"],
+        })
+    if answer:
+        options.append(ANSWER_SCHEMA)
+    if len(options) == 1:
+        return options[0]
+    return {"anyOf": options}
+
+
+def structured_answer(text: str) -> Optional[str]:
+    """The ``answer`` of a constrained reply, or None if it is a tool call or not JSON."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(data, dict) and isinstance(data.get("answer"), str):
+        return data["answer"]
+    return None
+
+
+class StructuredOutput:
+    """
+    Per-model switch for schema-constrained replies.
+
+    Overrides are looked up by full model name, then by name without the
+    tag ("qwen2.5-coder" covers every size); anything else follows
+    ``enabled``.
+
+    Args:
+        config: Settings; defaults to enabled for every model
+    """
+
+    def __init__(self, config: Optional[StructuredOutputConfig] = None):
+        self.configure(config or StructuredOutputConfig())
+
+    def configure(self, config: StructuredOutputConfig) -> None:
+        self.enabled = config.enabled
+        self.models = {name.lower(): bool(on) for name, on in config.models.items()}
+
+    def constrained(self, model: str) -> bool:
+        """Whether replies from ``model`` should be constrained by a schema."""
+        name = model.lower()
+        if name in self.models:
+            return self.models[name]
+        return self.models.get(name.split(":")[0], self.enabled)
+
+
+_structured_output = StructuredOutput()
+
+
+def get_structured_output() -> StructuredOutput:
+    """The process-wide structured output switch."""
+    return _structured_output
+
+
+def configure_structured_output(config: StructuredOutputConfig) -> StructuredOutput:
+    """
+    Apply ``Settings.structured_output`` to the process-wide switch.
+
+    Args:
+        config: Structured output settings
+
+    Returns:
+        The switch
+    """
+    _structured_output.configure(config)
+    return _structured_output
@@ -0,0 +1,312 @@
+"""Token budgets for prompts sent to chat models.
+
+Ollama keeps only the last ``num_ctx`` tokens of a prompt and says nothing
+when it drops the start (usually the system prompt). ``TokenBudget`` sizes
+prompts against what the model can really take:
+
+- The context length comes from the model itself (``/api/show``, through
+  the model registry when one is configured), capped by the configured
+  ``context_window``.
+- Token counts use a characters-per-token ratio calibrated from the
+  ``prompt_eval_count`` Ollama reports for prompts actually sent, instead
+  of a fixed four characters per token.
+- ``pack`` fills what's left after the required parts of a prompt with
+  optional context in priority order; ``fit_messages`` trims an agent
+  loop's message list to the window.
+
+Probes and calibrations are shared by every budget in the process.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence
+
+from .capabilities import context_length_from_show, get_model_registry
+from .types import Message
+
+logger = logging.getLogger(__name__)
+
+# Ratio used until a model has been calibrated
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Window assumed when neither the settings nor the model give one
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Chat-template tokens around each message (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Prompts shorter than this say too little about the tokenizer
+MIN_CALIBRATION_CHARS = 400
+
+# Calibrated ratios outside this range are measurement noise
+MIN_CHARS_PER_TOKEN = 1.0
+MAX_CHARS_PER_TOKEN = 6.0
+
+# Share of the window kept free for the response unless the caller says
+RESPONSE_RESERVE_FRACTION = 0.25
+
+# An item isn't cut shorter than this; it is dropped instead
+MIN_TRUNCATED_TOKENS = 32
+
+TRUNCATION_MARKER = "\n... (truncated to fit the context window)"
+
+
+@dataclass
+class ModelTokens:
+    """What is known about one model's context and tokenizer."""
+
+    context_length: int = 0  # Trained context length (0 = unknown)
+    chars_per_token: float = DEFAULT_CHARS_PER_TOKEN
+    samples: int = 0  # Prompts the ratio was calibrated from
+    probed: bool = False
+
+
+@dataclass
+class ContextSection:
+    """
+    Optional prompt context competing for the budget.
+
+    Sections are filled in priority order (lower first). Items within a
+    section are taken in order and the section stops at the first one that
+    doesn't fit, so history passed newest-first stays contiguous.
+    """
+
+    name: str
+    items: List[str]
+    priority: int
+    truncate: bool = False  # Cut the first item that doesn't fit to size
+    item_overhead: int = 0  # Extra tokens per item (e.g. per message)
+
+
+@dataclass
+class PackedContext:
+    """Result of packing sections into a budget."""
+
+    sections: Dict[str, List[str]]
+    budget_tokens: int
+    used_tokens: int
+    dropped: Dict[str, int] = field(default_factory=dict)  # Section -> items left out
+    truncated: List[str] = field(default_factory=list)  # Sections with a cut item
+
+    def kept(self, name: str) -> List[str]:
+        """Items of a section that made it into the budget."""
+        return self.sections.get(name, [])
+
+
+class TokenBudget:
+    """Per-model context windows and calibrated token estimates."""
+
+    _models: Dict[str, ModelTokens] = {}
+
+    def __init__(self, client: Any, max_window: int = DEFAULT_CONTEXT_WINDOW):
+        """
+        Initialize budget.
+
+        Args:
+            client: OllamaClient (or RequestScheduler) used to probe models
+            max_window: Configured context window; models with a shorter
+                trained context get their own
+        """
+        self.client = client
+        self.max_window = max_window or DEFAULT_CONTEXT_WINDOW
+
+    def _model(self, model: str) -> ModelTokens:
+        return self._models.setdefault(model, ModelTokens())
+
+    async def load(self, model: str) -> ModelTokens:
+        """
+        Probe a model's context length (once per process).
+
+        A failed probe is retried on the next call; until then the
+        configured window is used.
+        """
+        info = self._model(model)
+        if info.probed:
+            return info
+        # The model registry probes once per digest and keeps it on disk
+        caps = await get_model_registry().get(model)
+        if caps is not None:
+            info.context_length = caps.context_length
+            info.probed = True
+            return info
+        if self.client is None:
+            return info
+        try:
+            info.context_length = context_length_from_show(await self.client.show_model(model))
+            info.probed = True
+        except Exception as e:
+            logger.debug(f"Context length probe failed for {model}: {e}")
+        return info
+
+    def window(self, model: str) -> int:
+        """Usable context window for a model, in tokens."""
+        length = self._model(model).context_length
+        return min(self.max_window, length) if length else self.max_window
+
+    def budget(self, model: str, reserve_tokens: Optional[int] = None) -> int:
+        """
+        Tokens available for the prompt.
+
+        Args:
+            model: Model name
+            reserve_tokens: Kept free for the response (default: a quarter
+                of the window)
+        """
+        window = self.window(model)
+        if reserve_tokens is None:
+            reserve_tokens = int(window * RESPONSE_RESERVE_FRACTION)
+        return max(0, window - reserve_tokens)
+
+    def chars_to_tokens(self, model: str, chars: int) -> int:
+        """Estimated tokens of a given length of text for a model."""
+        if chars <= 0:
+            return 0
+        return math.ceil(chars / self._model(model).chars_per_token)
+
+    def estimate(self, model: str, text: str) -> int:
+        """Estimated tokens of text for a model."""
+        return self.chars_to_tokens(model, len(text) if text else 0)
+
+    def estimate_messages(self, model: str, messages: Sequence[Message]) -> int:
+        """Estimated prompt tokens of a message list."""
+        return sum(
+            self.estimate(model, message.content) + MESSAGE_OVERHEAD_TOKENS
+            for message in messages
+        )
+
+    def observe(
+        self,
+        model: str,
+        messages: Sequence[Message],
+        prompt_tokens: int,
+        extra_chars: int = 0,
+    ) -> None:
+        """
+        Calibrate a model's ratio from a prompt Ollama evaluated.
+
+        Ollama doesn't count prompt tokens it reused from its cache, so a
+        sample can only overstate characters per token; the smallest ratio
+        seen is kept.
+
+        Args:
+            model: Model the prompt was sent to
+            messages: The prompt's messages
+            prompt_tokens: ``prompt_eval_count`` of the response
+            extra_chars: Other prompt text (e.g. tool definitions)
+        """
+        chars = sum(len(message.content or "") for message in messages) + extra_chars
+        tokens = prompt_tokens - MESSAGE_OVERHEAD_TOKENS * len(messages)
+        if chars < MIN_CALIBRATION_CHARS or tokens <= 0:
+            return
+        ratio = chars / tokens
+        if not MIN_CHARS_PER_TOKEN <= ratio <= MAX_CHARS_PER_TOKEN:
+            return
+        info = self._model(model)
+        info.chars_per_token = ratio if info.samples == 0 else min(info.chars_per_token, ratio)
+        info.samples += 1
+
+    def truncate(self, model: str, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens, marking the cut."""
+        if self.estimate(model, text) <= max_tokens:
+            return text
+        chars = int(max_tokens * self._model(model).chars_per_token) - len(TRUNCATION_MARKER)
+        if chars <= 0:
+            return ""
+        return text[:chars] + TRUNCATION_MARKER
+
+    def pack(
+        self, model: str, available_tokens: int, sections: Sequence[ContextSection]
+    ) -> PackedContext:
+        """
+        Fill a token budget with optional context by priority.
+
+        Args:
+            model: Model the prompt is for
+            available_tokens: Budget left after the required prompt parts
+            sections: Candidate context
+
+        Returns:
+            PackedContext with the items kept per section
+        """
+        remaining = max(0, available_tokens)
+        packed = PackedContext(sections={}, budget_tokens=remaining, used_tokens=0)
+        for section in sorted(sections, key=lambda s: s.priority):
+            kept: List[str] = []
+            for item in section.items:
+                cost = self.estimate(model, item) + section.item_overhead
+                if cost <= remaining:
+                    kept.append(item)
+                    remaining -= cost
+                    continue
+                room = remaining - section.item_overhead
+                if section.truncate and room >= MIN_TRUNCATED_TOKENS:
+                    cut = self.truncate(model, item, room)
+                    kept.append(cut)
+                    remaining -= self.estimate(model, cut) + section.item_overhead
+                    packed.truncated.append(section.name)
+                break
+            packed.sections[section.name] = kept
+            if len(kept) < len(section.items):
+                packed.dropped[section.name] = len(section.items) - len(kept)
+        packed.used_tokens = packed.budget_tokens - remaining
+        return packed
+
+    def fit_messages(
+        self,
+        model: str,
+        messages: List[Message],
+        reserve_tokens: Optional[int] = None,
+        keep_head: int = 2,
+    ) -> List[Message]:
+        """
+        Trim a message list to the model's budget.
+
+        The first ``keep_head`` messages (system prompt and task) and the
+        latest message are always kept. The oldest messages in between are
+        dropped first, a whole assistant turn at a time; if that isn't
+        enough the longest remaining message is cut.
+
+        Args:
+            model: Model the messages are for
+            messages: Conversation to send (not modified)
+            reserve_tokens: Kept free for the response
+            keep_head: Leading messages that are never dropped
+
+        Returns:
+            The messages, or a shortened copy that fits
+        """
+        budget = self.budget(model, reserve_tokens)
+        total = self.estimate_messages(model, messages)
+        if total <= budget:
+            return messages
+
+        head, tail = list(messages[:keep_head]), list(messages[keep_head:])
+        dropped = 0
+        while len(tail) > 1 and total > budget:
+            total -= self.estimate_messages(model, tail[:1])
+            tail.pop(0)
+            dropped += 1
+            # Don't leave tool results whose assistant turn is gone
+            while len(tail) > 1 and tail[0].role != "assistant":
+                total -= self.estimate_messages(model, tail[:1])
+                tail.pop(0)
+                dropped += 1
+
+        fitted = head + tail
+        if total > budget and fitted:
+            longest = max(range(len(fitted)), key=lambda i: len(fitted[i].content or ""))
+            message = fitted[longest]
+            room = self.estimate(model, message.content) - (total - budget)
+            fitted[longest] = replace(message, content=self.truncate(model, message.content, room))
+        if dropped:
+            logger.debug(f"Dropped {dropped} messages to fit {model}'s context window")
+        return fitted
+
+    @classmethod
+    def forget(cls, model: Optional[str] = None) -> None:
+        """Drop what's known about a model (or all models)."""
+        if model is None:
+            cls._models.clear()
+        else:
+            cls._models.pop(model, None)
@@ -1,17 +1,17 @@
 """Type definitions for Ollama API."""
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """Tool call from assistant message."""
 
     function: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Chat message."""
 
@@ -32,12 +32,12 @@ class GenerateRequest:
     context: Optional[List[int]] = None
     stream: bool = True
     raw: bool = False
-    format: Optional[str] = None  # "json" for JSON mode
+    format: Optional[Union[str, Dict[str, Any]]] = None  # "json", or a JSON schema
     options: Optional[Dict[str, Any]] = None
     keep_alive: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerateResponse:
     """Generate API response."""
 
@@ -61,13 +61,13 @@ class ChatRequest:
     model: str
     messages: List[Message]
     stream: bool = True
-    format: Optional[str] = None  # "json" for JSON mode
+    format: Optional[Union[str, Dict[str, Any]]] = None  # "json", or a JSON schema
     options: Optional[Dict[str, Any]] = None
     keep_alive: Optional[str] = None
     tools: Optional[List[Dict[str, Any]]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatResponse:
     """Chat API response."""
 
@@ -97,35 +97,89 @@ class ModelInfo:
 
 @dataclass
 class UsageStats:
-    """Token usage statistics from a response."""
+    """Token usage statistics from a response (or a sum of responses)."""
 
     prompt_tokens: int = 0
     completion_tokens: int = 0
     total_tokens: int = 0
     prompt_eval_duration_ms: float = 0.0
     eval_duration_ms: float = 0.0
+    load_duration_ms: float = 0.0
     total_duration_ms: float = 0.0
+    requests: int = 0
+    # Completion tokens generated after a complete tool call in the text
+    wasted_tokens: int = 0
+    early_stops: int = 0  # Streams closed once their tool calls were complete
+    length_stops: int = 0  # Replies cut off by num_predict or num_ctx
 
     @classmethod
     def from_response(cls, response: GenerateResponse) -> "UsageStats":
         """Create usage stats from a generate response."""
-        return cls(
-            prompt_tokens=response.prompt_eval_count or 0,
-            completion_tokens=response.eval_count or 0,
-            total_tokens=(response.prompt_eval_count or 0) + (response.eval_count or 0),
-            prompt_eval_duration_ms=(response.prompt_eval_duration or 0) / 1_000_000,
-            eval_duration_ms=(response.eval_duration or 0) / 1_000_000,
-            total_duration_ms=(response.total_duration or 0) / 1_000_000,
-        )
+        return cls._from_final_chunk(response)
 
     @classmethod
     def from_chat_response(cls, response: ChatResponse) -> "UsageStats":
         """Create usage stats from a chat response."""
+        return cls._from_final_chunk(response)
+
+    @classmethod
+    def _from_final_chunk(cls, response: Any) -> "UsageStats":
+        """Read the counters Ollama attaches to the final (done) chunk."""
         return cls(
             prompt_tokens=response.prompt_eval_count or 0,
             completion_tokens=response.eval_count or 0,
             total_tokens=(response.prompt_eval_count or 0) + (response.eval_count or 0),
             prompt_eval_duration_ms=(response.prompt_eval_duration or 0) / 1_000_000,
             eval_duration_ms=(response.eval_duration or 0) / 1_000_000,
+            load_duration_ms=(response.load_duration or 0) / 1_000_000,
             total_duration_ms=(response.total_duration or 0) / 1_000_000,
+            requests=1,
+            length_stops=int(getattr(response, "done_reason", None) == "length"),
         )
+
+    def add(self, other: "UsageStats") -> "UsageStats":
+        """Accumulate another usage record into this one (in place)."""
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.total_tokens += other.total_tokens
+        self.prompt_eval_duration_ms += other.prompt_eval_duration_ms
+        self.eval_duration_ms += other.eval_duration_ms
+        self.load_duration_ms += other.load_duration_ms
+        self.total_duration_ms += other.total_duration_ms
+        self.requests += other.requests
+        self.wasted_tokens += other.wasted_tokens
+        self.early_stops += other.early_stops
+        self.length_stops += other.length_stops
+        return self
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Generation speed (completion tokens per second of eval time)."""
+        if not self.eval_duration_ms:
+            return 0.0
+        return self.completion_tokens / (self.eval_duration_ms / 1000)
+
+    @property
+    def prompt_tokens_per_second(self) -> float:
+        """Prompt processing speed (prompt tokens per second of prompt eval)."""
+        if not self.prompt_eval_duration_ms:
+            return 0.0
+        return self.prompt_tokens / (self.prompt_eval_duration_ms / 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict (with derived rates)."""
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "prompt_eval_ms": round(self.prompt_eval_duration_ms, 1),
+            "eval_ms": round(self.eval_duration_ms, 1),
+            "load_ms": round(self.load_duration_ms, 1),
+            "total_ms": round(self.total_duration_ms, 1),
+            "tokens_per_second": round(self.tokens_per_second, 1),
+            "prompt_tokens_per_second": round(self.prompt_tokens_per_second, 1),
+            "wasted_tokens": self.wasted_tokens,
+            "early_stops": self.early_stops,
+            "length_stops": self.length_stops,
+        }
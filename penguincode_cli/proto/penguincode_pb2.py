@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11penguincode.proto\x12\x0bpenguincode\"1\n\x0b\x41uthRequest\x12\x0f\n\x07\x61pi_key\x18\x01 \x01(\t\x12\x11\n\tclient_id\x18\x02 \x01(\t\"O\n\x0c\x41uthResponse\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\x12\x12\n\nexpires_in\x18\x02 \x01(\x03\x12\x15\n\rrefresh_token\x18\x03 \x01(\t\"\'\n\x0eRefreshRequest\x12\x15\n\rrefresh_token\x18\x01 \x01(\t\"\'\n\x0fValidateRequest\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\"B\n\x10ValidateResponse\x12\r\n\x05valid\x18\x01 \x01(\x08\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0e\n\x06scopes\x18\x03 \x03(\t\"b\n\x14\x43reateSessionRequest\x12\x13\n\x0bproject_dir\x18\x01 \x01(\t\x12\x35\n\x0c\x63\x61pabilities\x18\x02 \x01(\x0b\x32\x1f.penguincode.ClientCapabilities\"?\n\x12\x43lientCapabilities\x12\x17\n\x0f\x61vailable_tools\x18\x01 \x03(\t\x12\x10\n\x08platform\x18\x02 \x01(\t\"Y\n\x15\x43reateSessionResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12,\n\x0bserver_info\x18\x02 \x01(\x0b\x32\x17.penguincode.ServerInfo\"Q\n\nServerInfo\x12\x0f\n\x07version\x18\x01 \x01(\t\x12\x18\n\x10\x61vailable_models\x18\x02 \x03(\t\x12\x18\n\x10ollama_connected\x18\x03 \x01(\x08\"2\n\x0b\x43hatRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xad\x02\n\x0c\x43hatResponse\x12&\n\x04text\x18\x01 \x01(\x0b\x32\x16.penguincode.TextChunkH\x00\x12\x30\n\x0ctool_request\x18\x02 \x01(\x0b\x32\x18.penguincode.ToolRequestH\x00\x12.\n\x0b\x61gent_spawn\x18\x03 \x01(\x0b\x32\x17.penguincode.AgentSpawnH\x00\x12\x30\n\x0c\x61gent_result\x18\x04 \x01(\x0b\x32\x18.penguincode.AgentResultH\x00\x12+\n\x06status\x18\x05 \x01(\x0b\x32\x19.penguincode.StatusUpdateH\x00\x12#\n\x05\x65rror\x18\x06 \x01(\x0b\x32\x12.penguincode.ErrorH\x00\x42\x0f\n\rresponse_type\".\n\tTextChunk\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x10\n\x08is_final\x18\x02 \x01(\x08\".\n\nAgentSpawn\x12\x12\n\nagent_type\x18\x01 \x01(\t\x12\x0c\n\x04task\x18\x02 \x01(\t\"W\n\x0b\x41gentResult\x12\x12\n\nagent_type\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0e\n\x06output\x18\x03 \x01(\t\x12\x13\n\x0b\x64uration_ms\x18\x04 \x01(\x03\"/\n\x0cStatusUpdate\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\";\n\x05\x45rror\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x13\n\x0brecoverable\x18\x03 \x01(\x08\"6\n\x11GetHistoryRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"C\n\x12GetHistoryResponse\x12-\n\x08messages\x18\x01 \x03(\x0b\x32\x1b.penguincode.HistoryMessage\"B\n\x0eHistoryMessage\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\t\")\n\x13\x43loseSessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\"\'\n\x14\x43loseSessionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"\xcf\x01\n\x0bToolRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x11\n\ttool_name\x18\x03 \x01(\t\x12:\n\targuments\x18\x04 \x03(\x0b\x32\'.penguincode.ToolRequest.ArgumentsEntry\x12\x17\n\x0ftimeout_seconds\x18\x05 \x01(\x05\x1a\x30\n\x0e\x41rgumentsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"P\n\x0cToolResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\t\x12\r\n\x05\x65rror\x18\x04 \x01(\t\"\x14\n\x12HealthCheckRequest\"j\n\x13HealthCheckResponse\x12\x0f\n\x07healthy\x18\x01 \x01(\x08\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x18\n\x10ollama_connected\x18\x03 \x01(\x08\x12\x17\n\x0f\x61\x63tive_sessions\x18\x04 \x01(\x05\x32\xe8\x01\n\x0b\x41uthService\x12\x43\n\x0c\x41uthenticate\x12\x18.penguincode.AuthRequest\x1a\x19.penguincode.AuthResponse\x12\x46\n\x0cRefreshToken\x12\x1b.penguincode.RefreshRequest\x1a\x19.penguincode.AuthResponse\x12L\n\rValidateToken\x12\x1c.penguincode.ValidateRequest\x1a\x1d.penguincode.ValidateResponse2\xc8\x02\n\x0b\x43hatService\x12V\n\rCreateSession\x12!.penguincode.CreateSessionRequest\x1a\".penguincode.CreateSessionResponse\x12=\n\x04\x43hat\x12\x18.penguincode.ChatRequest\x1a\x19.penguincode.ChatResponse0\x01\x12M\n\nGetHistory\x12\x1e.penguincode.GetHistoryRequest\x1a\x1f.penguincode.GetHistoryResponse\x12S\n\x0c\x43loseSession\x12 .penguincode.CloseSessionRequest\x1a!.penguincode.CloseSessionResponse2^\n\x13ToolCallbackService\x12G\n\x0c\x45xecuteTools\x12\x19.penguincode.ToolResponse\x1a\x18.penguincode.ToolRequest(\x01\x30\x01\x32[\n\rHealthService\x12J\n\x05\x43heck\x12\x1f.penguincode.HealthCheckRequest\x1a .penguincode.HealthCheckResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11penguincode.proto\x12\x0bpenguincode\"1\n\x0b\x41uthRequest\x12\x0f\n\x07\x61pi_key\x18\x01 \x01(\t\x12\x11\n\tclient_id\x18\x02 \x01(\t\"O\n\x0c\x41uthResponse\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\x12\x12\n\nexpires_in\x18\x02 \x01(\x03\x12\x15\n\rrefresh_token\x18\x03 \x01(\t\"\'\n\x0eRefreshRequest\x12\x15\n\rrefresh_token\x18\x01 \x01(\t\"\'\n\x0fValidateRequest\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\"B\n\x10ValidateResponse\x12\r\n\x05valid\x18\x01 \x01(\x08\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0e\n\x06scopes\x18\x03 \x03(\t\"b\n\x14\x43reateSessionRequest\x12\x13\n\x0bproject_dir\x18\x01 \x01(\t\x12\x35\n\x0c\x63\x61pabilities\x18\x02 \x01(\x0b\x32\x1f.penguincode.ClientCapabilities\"?\n\x12\x43lientCapabilities\x12\x17\n\x0f\x61vailable_tools\x18\x01 \x03(\t\x12\x10\n\x08platform\x18\x02 \x01(\t\"Y\n\x15\x43reateSessionResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12,\n\x0bserver_info\x18\x02 \x01(\x0b\x32\x17.penguincode.ServerInfo\"Q\n\nServerInfo\x12\x0f\n\x07version\x18\x01 \x01(\t\x12\x18\n\x10\x61vailable_models\x18\x02 \x03(\t\x12\x18\n\x10ollama_connected\x18\x03 \x01(\x08\"2\n\x0b\x43hatRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xad\x02\n\x0c\x43hatResponse\x12&\n\x04text\x18\x01 \x01(\x0b\x32\x16.penguincode.TextChunkH\x00\x12\x30\n\x0ctool_request\x18\x02 \x01(\x0b\x32\x18.penguincode.ToolRequestH\x00\x12.\n\x0b\x61gent_spawn\x18\x03 \x01(\x0b\x32\x17.penguincode.AgentSpawnH\x00\x12\x30\n\x0c\x61gent_result\x18\x04 \x01(\x0b\x32\x18.penguincode.AgentResultH\x00\x12+\n\x06status\x18\x05 \x01(\x0b\x32\x19.penguincode.StatusUpdateH\x00\x12#\n\x05\x65rror\x18\x06 \x01(\x0b\x32\x12.penguincode.ErrorH\x00\x42\x0f\n\rresponse_type\".\n\tTextChunk\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x10\n\x08is_final\x18\x02 \x01(\x08\".\n\nAgentSpawn\x12\x12\n\nagent_type\x18\x01 \x01(\t\x12\x0c\n\x04task\x18\x02 \x01(\t\"\xe2\x01\n\x0b\x41gentResult\x12\x12\n\nagent_type\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0e\n\x06output\x18\x03 \x01(\t\x12\x13\n\x0b\x64uration_ms\x18\x04 \x01(\x03\x12\x13\n\x0btokens_used\x18\x05 \x01(\x05\x12\x15\n\rprompt_tokens\x18\x06 \x01(\x05\x12\x19\n\x11\x63ompletion_tokens\x18\x07 \x01(\x05\x12\x16\n\x0eprompt_eval_ms\x18\x08 \x01(\x01\x12\x0f\n\x07\x65val_ms\x18\t \x01(\x01\x12\x19\n\x11tokens_per_second\x18\n \x01(\x01\"/\n\x0cStatusUpdate\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\";\n\x05\x45rror\x12\x0c\n\x04\x63ode\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x13\n\x0brecoverable\x18\x03 \x01(\x08\"6\n\x11GetHistoryRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"C\n\x12GetHistoryResponse\x12-\n\x08messages\x18\x01 \x03(\x0b\x32\x1b.penguincode.HistoryMessage\"B\n\x0eHistoryMessage\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\t\")\n\x13\x43loseSessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\"\'\n\x14\x43loseSessionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"\xcf\x01\n\x0bToolRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x11\n\ttool_name\x18\x03 \x01(\t\x12:\n\targuments\x18\x04 \x03(\x0b\x32\'.penguincode.ToolRequest.ArgumentsEntry\x12\x17\n\x0ftimeout_seconds\x18\x05 \x01(\x05\x1a\x30\n\x0e\x41rgumentsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"P\n\x0cToolResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\t\x12\r\n\x05\x65rror\x18\x04 \x01(\t\"\x14\n\x12HealthCheckRequest\"j\n\x13HealthCheckResponse\x12\x0f\n\x07healthy\x18\x01 \x01(\x08\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x18\n\x10ollama_connected\x18\x03 \x01(\x08\x12\x17\n\x0f\x61\x63tive_sessions\x18\x04 \x01(\x05\x32\xe8\x01\n\x0b\x41uthService\x12\x43\n\x0c\x41uthenticate\x12\x18.penguincode.AuthRequest\x1a\x19.penguincode.AuthResponse\x12\x46\n\x0cRefreshToken\x12\x1b.penguincode.RefreshRequest\x1a\x19.penguincode.AuthResponse\x12L\n\rValidateToken\x12\x1c.penguincode.ValidateRequest\x1a\x1d.penguincode.ValidateResponse2\xc8\x02\n\x0b\x43hatService\x12V\n\rCreateSession\x12!.penguincode.CreateSessionRequest\x1a\".penguincode.CreateSessionResponse\x12=\n\x04\x43hat\x12\x18.penguincode.ChatRequest\x1a\x19.penguincode.ChatResponse0\x01\x12M\n\nGetHistory\x12\x1e.penguincode.GetHistoryRequest\x1a\x1f.penguincode.GetHistoryResponse\x12S\n\x0c\x43loseSession\x12 .penguincode.CloseSessionRequest\x1a!.penguincode.CloseSessionResponse2^\n\x13ToolCallbackService\x12G\n\x0c\x45xecuteTools\x12\x19.penguincode.ToolResponse\x1a\x18.penguincode.ToolRequest(\x01\x30\x01\x32[\n\rHealthService\x12J\n\x05\x43heck\x12\x1f.penguincode.HealthCheckRequest\x1a .penguincode.HealthCheckResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -59,38 +59,38 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_TEXTCHUNK']._serialized_end=1057
   _globals['_AGENTSPAWN']._serialized_start=1059
   _globals['_AGENTSPAWN']._serialized_end=1105
-  _globals['_AGENTRESULT']._serialized_start=1107
-  _globals['_AGENTRESULT']._serialized_end=1194
-  _globals['_STATUSUPDATE']._serialized_start=1196
-  _globals['_STATUSUPDATE']._serialized_end=1243
-  _globals['_ERROR']._serialized_start=1245
-  _globals['_ERROR']._serialized_end=1304
-  _globals['_GETHISTORYREQUEST']._serialized_start=1306
-  _globals['_GETHISTORYREQUEST']._serialized_end=1360
-  _globals['_GETHISTORYRESPONSE']._serialized_start=1362
-  _globals['_GETHISTORYRESPONSE']._serialized_end=1429
-  _globals['_HISTORYMESSAGE']._serialized_start=1431
-  _globals['_HISTORYMESSAGE']._serialized_end=1497
-  _globals['_CLOSESESSIONREQUEST']._serialized_start=1499
-  _globals['_CLOSESESSIONREQUEST']._serialized_end=1540
-  _globals['_CLOSESESSIONRESPONSE']._serialized_start=1542
-  _globals['_CLOSESESSIONRESPONSE']._serialized_end=1581
-  _globals['_TOOLREQUEST']._serialized_start=1584
-  _globals['_TOOLREQUEST']._serialized_end=1791
-  _globals['_TOOLREQUEST_ARGUMENTSENTRY']._serialized_start=1743
-  _globals['_TOOLREQUEST_ARGUMENTSENTRY']._serialized_end=1791
-  _globals['_TOOLRESPONSE']._serialized_start=1793
-  _globals['_TOOLRESPONSE']._serialized_end=1873
-  _globals['_HEALTHCHECKREQUEST']._serialized_start=1875
-  _globals['_HEALTHCHECKREQUEST']._serialized_end=1895
-  _globals['_HEALTHCHECKRESPONSE']._serialized_start=1897
-  _globals['_HEALTHCHECKRESPONSE']._serialized_end=2003
-  _globals['_AUTHSERVICE']._serialized_start=2006
-  _globals['_AUTHSERVICE']._serialized_end=2238
-  _globals['_CHATSERVICE']._serialized_start=2241
-  _globals['_CHATSERVICE']._serialized_end=2569
-  _globals['_TOOLCALLBACKSERVICE']._serialized_start=2571
-  _globals['_TOOLCALLBACKSERVICE']._serialized_end=2665
-  _globals['_HEALTHSERVICE']._serialized_start=2667
-  _globals['_HEALTHSERVICE']._serialized_end=2758
+  _globals['_AGENTRESULT']._serialized_start=1108
+  _globals['_AGENTRESULT']._serialized_end=1334
+  _globals['_STATUSUPDATE']._serialized_start=1336
+  _globals['_STATUSUPDATE']._serialized_end=1383
+  _globals['_ERROR']._serialized_start=1385
+  _globals['_ERROR']._serialized_end=1444
+  _globals['_GETHISTORYREQUEST']._serialized_start=1446
+  _globals['_GETHISTORYREQUEST']._serialized_end=1500
+  _globals['_GETHISTORYRESPONSE']._serialized_start=1502
+  _globals['_GETHISTORYRESPONSE']._serialized_end=1569
+  _globals['_HISTORYMESSAGE']._serialized_start=1571
+  _globals['_HISTORYMESSAGE']._serialized_end=1637
+  _globals['_CLOSESESSIONREQUEST']._serialized_start=1639
+  _globals['_CLOSESESSIONREQUEST']._serialized_end=1680
+  _globals['_CLOSESESSIONRESPONSE']._serialized_start=1682
+  _globals['_CLOSESESSIONRESPONSE']._serialized_end=1721
+  _globals['_TOOLREQUEST']._serialized_start=1724
+  _globals['_TOOLREQUEST']._serialized_end=1931
+  _globals['_TOOLREQUEST_ARGUMENTSENTRY']._serialized_start=1883
+  _globals['_TOOLREQUEST_ARGUMENTSENTRY']._serialized_end=1931
+  _globals['_TOOLRESPONSE']._serialized_start=1933
+  _globals['_TOOLRESPONSE']._serialized_end=2013
+  _globals['_HEALTHCHECKREQUEST']._serialized_start=2015
+  _globals['_HEALTHCHECKREQUEST']._serialized_end=2035
+  _globals['_HEALTHCHECKRESPONSE']._serialized_start=2037
+  _globals['_HEALTHCHECKRESPONSE']._serialized_end=2143
+  _globals['_AUTHSERVICE']._serialized_start=2146
+  _globals['_AUTHSERVICE']._serialized_end=2378
+  _globals['_CHATSERVICE']._serialized_start=2381
+  _globals['_CHATSERVICE']._serialized_end=2709
+  _globals['_TOOLCALLBACKSERVICE']._serialized_start=2711
+  _globals['_TOOLCALLBACKSERVICE']._serialized_end=2805
+  _globals['_HEALTHSERVICE']._serialized_start=2807
+  _globals['_HEALTHSERVICE']._serialized_end=2898
 # @@protoc_insertion_point(module_scope)
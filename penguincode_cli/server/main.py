@@ -13,6 +13,9 @@ from typing import Optional
 import grpc
 
 from penguincode_cli.config.settings import Settings, load_settings
+from penguincode_cli.ollama.generation import configure_generation
+from penguincode_cli.ollama.structured import configure_structured_output
+from penguincode_cli.shared.transport import configure_transport, get_transport
 from penguincode_cli.proto import (
     add_AuthServiceServicer_to_server,
     add_ChatServiceServicer_to_server,
@@ -72,10 +75,13 @@ class PenguinCodeServer:
             interceptors=interceptors,
         )
 
-        # Initialize services
+        # Initialize services (outbound HTTP shares one pooled transport)
+        configure_transport(self.settings.http)
+        configure_structured_output(self.settings.structured_output)
+        configure_generation(self.settings)
         self.auth_service = AuthServiceImpl(self.settings.auth)
-        self.chat_service = ChatServiceImpl(self.settings)
         self.tool_service = ToolCallbackServiceImpl()
+        self.chat_service = ChatServiceImpl(self.settings, tool_service=self.tool_service)
         self.health_service = HealthServiceImpl(self.settings)
 
         # Register services
@@ -105,6 +111,7 @@ class PenguinCodeServer:
         if self.server:
             logger.info("Stopping server...")
             await self.server.stop(grace_period)
+            await get_transport().aclose()
             logger.info("Server stopped")
 
     async def wait_for_termination(self) -> None:
@@ -2,12 +2,13 @@
 
 from .auth import AuthServiceImpl
 from .chat import ChatServiceImpl
-from .tools import ToolCallbackServiceImpl
+from .tools import RemoteToolExecutor, ToolCallbackServiceImpl
 from .health import HealthServiceImpl
 
 __all__ = [
     "AuthServiceImpl",
     "ChatServiceImpl",
     "ToolCallbackServiceImpl",
+    "RemoteToolExecutor",
     "HealthServiceImpl",
 ]
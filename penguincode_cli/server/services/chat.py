@@ -9,8 +9,15 @@ from typing import AsyncIterator, Dict, Optional
 import grpc
 
 from penguincode_cli.config.settings import Settings
-from penguincode_cli.ollama import OllamaClient
+from penguincode_cli.ollama import OllamaClient, RequestScheduler, configure_model_registry
 from penguincode_cli.agents import ChatAgent
+from penguincode_cli.agents.events import (
+    AgentResultEvent,
+    AgentSpawnEvent,
+    ChatEvent,
+    StatusEvent,
+    TextDeltaEvent,
+)
 from penguincode_cli.proto import (
     ChatServiceServicer,
     CreateSessionRequest,
@@ -31,8 +38,13 @@ from penguincode_cli.proto import (
     CloseSessionResponse,
 )
 
+from .tools import RemoteToolExecutor, ToolCallbackServiceImpl
+
 logger = logging.getLogger(__name__)
 
+# Agent output sent with AgentResult (the full text goes into the final answer)
+MAX_AGENT_OUTPUT_CHARS = 4000
+
 
 class SessionState:
     """State for an active chat session."""
@@ -66,21 +78,36 @@ class ChatServiceImpl(ChatServiceServicer):
 
     VERSION = "0.1.0"
 
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        tool_service: Optional[ToolCallbackServiceImpl] = None,
+    ):
         self.settings = settings
+        # Sessions whose client advertises tools run them through this
+        self.tool_service = tool_service
         self.sessions: Dict[str, SessionState] = {}
         self._ollama_client: Optional[OllamaClient] = None
+        self._scheduler: Optional[RequestScheduler] = None
         self._lock = asyncio.Lock()
 
-    async def _get_ollama_client(self) -> OllamaClient:
-        """Get or create Ollama client."""
-        if self._ollama_client is None:
+    async def _get_ollama_client(self) -> RequestScheduler:
+        """Get or create the Ollama client.
+
+        Returns the shared request scheduler so every session's agents
+        go through the same GPU regulators.
+        """
+        if self._scheduler is None:
             self._ollama_client = OllamaClient(
                 base_url=self.settings.ollama.api_url,
                 timeout=self.settings.ollama.timeout,
             )
             await self._ollama_client.__aenter__()
-        return self._ollama_client
+            configure_model_registry(self._ollama_client, self.settings.ollama.model_registry_path)
+            self._scheduler = RequestScheduler(
+                self._ollama_client, self.settings.regulators, self.settings.models
+            )
+        return self._scheduler
 
     async def _check_ollama_connection(self) -> bool:
         """Check if Ollama is connected."""
@@ -116,11 +143,20 @@ class ChatServiceImpl(ChatServiceServicer):
         try:
             ollama_client = await self._get_ollama_client()
 
+            # File and shell tools run on the client when it provides them.
+            # Registering now queues tool requests until the client attaches
+            # its ExecuteTools stream.
+            tool_executor = None
+            if self.tool_service is not None and client_tools:
+                await self.tool_service.register_session(session_id)
+                tool_executor = RemoteToolExecutor(self.tool_service, session_id, client_tools)
+
             chat_agent = ChatAgent(
                 ollama_client=ollama_client,
                 settings=self.settings,
                 project_dir=request.project_dir,
                 session_id=session_id,
+                tool_executor=tool_executor,
             )
 
             # Store session
@@ -185,20 +221,12 @@ class ChatServiceImpl(ChatServiceServicer):
                 )
             )
 
-            # Process message through ChatAgent
-            # Note: In full implementation, we'd hook into agent spawning
-            # to yield AgentSpawn/AgentResult messages
-            start_time = time.time()
-            response = await session.chat_agent.process(request.message)
-            duration_ms = int((time.time() - start_time) * 1000)
-
-            # Yield the response
-            yield ChatResponse(
-                text=TextChunk(
-                    content=response,
-                    is_final=True,
-                )
-            )
+            # Forward the agent's events as they happen. gRPC only resumes
+            # this generator once a message is handed to the transport, so a
+            # slow client pauses the turn instead of buffering its output.
+            async for event in session.chat_agent.process_stream(request.message):
+                yield self._event_message(event)
+                session.update_activity()
 
         except Exception as e:
             logger.error(f"Chat error in session {request.session_id}: {e}")
@@ -210,6 +238,42 @@ class ChatServiceImpl(ChatServiceServicer):
                 )
             )
 
+    @classmethod
+    def _event_message(cls, event: ChatEvent) -> ChatResponse:
+        """Convert a ChatAgent event to its ChatResponse message."""
+        if isinstance(event, TextDeltaEvent):
+            return ChatResponse(text=TextChunk(content=event.content, is_final=event.is_final))
+        if isinstance(event, AgentSpawnEvent):
+            return ChatResponse(
+                agent_spawn=AgentSpawn(agent_type=event.agent_type, task=event.task)
+            )
+        if isinstance(event, AgentResultEvent):
+            return ChatResponse(agent_result=cls._agent_result_message(event))
+        if isinstance(event, StatusEvent):
+            return ChatResponse(status=StatusUpdate(status=event.status, message=event.message))
+        return ChatResponse(
+            error=Error(code=event.code, message=event.message, recoverable=event.recoverable)
+        )
+
+    @staticmethod
+    def _agent_result_message(run: AgentResultEvent) -> AgentResult:
+        """Build an AgentResult proto from a finished agent run."""
+        output = run.output
+        if len(output) > MAX_AGENT_OUTPUT_CHARS:
+            output = output[:MAX_AGENT_OUTPUT_CHARS] + "\n... (truncated)"
+        return AgentResult(
+            agent_type=run.agent_type,
+            success=run.success,
+            output=output,
+            duration_ms=int(run.duration_ms),
+            tokens_used=run.usage.total_tokens,
+            prompt_tokens=run.usage.prompt_tokens,
+            completion_tokens=run.usage.completion_tokens,
+            prompt_eval_ms=run.usage.prompt_eval_duration_ms,
+            eval_ms=run.usage.eval_duration_ms,
+            tokens_per_second=run.usage.tokens_per_second,
+        )
+
     async def GetHistory(
         self,
         request: GetHistoryRequest,
@@ -247,6 +311,7 @@ class ChatServiceImpl(ChatServiceServicer):
             session = self.sessions.pop(request.session_id, None)
 
         if session:
+            await self._release_tools(request.session_id)
             logger.info(f"Closed session {request.session_id}")
             return CloseSessionResponse(success=True)
         else:
@@ -269,4 +334,12 @@ class ChatServiceImpl(ChatServiceServicer):
                 del self.sessions[session_id]
                 logger.info(f"Cleaned up stale session {session_id}")
 
+        for session_id in stale_sessions:
+            await self._release_tools(session_id)
+
         return len(stale_sessions)
+
+    async def _release_tools(self, session_id: str) -> None:
+        """Fail a closed session's outstanding tool requests."""
+        if self.tool_service is not None:
+            await self.tool_service.unregister_session(session_id)
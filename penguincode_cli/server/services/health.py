@@ -32,13 +32,13 @@ class HealthServiceImpl(HealthServiceServicer):
         # Check Ollama connection
         ollama_connected = False
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.settings.ollama.api_url}/api/tags",
-                    timeout=5.0,
-                )
-                ollama_connected = response.status_code == 200
+            from penguincode_cli.shared.transport import get_transport
+
+            response = await get_transport().client().get(
+                f"{self.settings.ollama.api_url}/api/tags",
+                timeout=5.0,
+            )
+            ollama_connected = response.status_code == 200
         except Exception:
             pass
 
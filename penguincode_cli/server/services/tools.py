@@ -3,7 +3,7 @@
 import asyncio
 import logging
 import uuid
-from typing import AsyncIterator, Dict
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import grpc
 
@@ -12,9 +12,14 @@ from penguincode_cli.proto import (
     ToolRequest,
     ToolResponse,
 )
+from penguincode_cli.shared.interfaces import IToolExecutor, ToolResult
+from penguincode_cli.shared.tool_args import DEFAULT_TOOL_TIMEOUT, encode_arguments, tool_timeout
 
 logger = logging.getLogger(__name__)
 
+# Extra wait over a tool's own timeout for the client to stop it and report back
+RESPONSE_MARGIN_SECONDS = 10
+
 
 class PendingToolRequest:
     """Represents a pending tool request waiting for client response."""
@@ -60,23 +65,30 @@ class ToolCallbackServiceImpl(ToolCallbackServiceServicer):
         """Unregister a session."""
         async with self._lock:
             self._request_queues.pop(session_id, None)
-            # Cancel any pending requests
+            # Fail any pending requests (their callers are not cancelled)
             pending = self._pending_requests.pop(session_id, {})
             for req in pending.values():
                 if not req.future.done():
-                    req.future.cancel()
+                    req.future.set_result(ToolResponse(
+                        request_id=req.request_id,
+                        success=False,
+                        error="Tool callback channel closed",
+                    ))
 
     async def request_tool_execution(
         self,
         session_id: str,
         tool_name: str,
         arguments: dict,
-        timeout_seconds: int = 30,
+        timeout_seconds: int = DEFAULT_TOOL_TIMEOUT,
     ) -> ToolResponse:
         """Request tool execution from the client.
 
-        Called by ChatAgent when it needs to execute a tool.
-        Blocks until client responds or timeout.
+        Called by agents (via RemoteToolExecutor) when they need a tool.
+        Blocks until client responds, or ``RESPONSE_MARGIN_SECONDS`` past
+        the tool's own timeout (the client enforces that). Any number of requests
+        may be outstanding per session; responses are matched by request_id
+        in whatever order the client finishes them.
         """
         request_id = str(uuid.uuid4())
 
@@ -92,21 +104,22 @@ class ToolCallbackServiceImpl(ToolCallbackServiceServicer):
             if session_id not in self._pending_requests:
                 raise RuntimeError(f"Session {session_id} not registered for tool callbacks")
             self._pending_requests[session_id][request_id] = pending
+            queue = self._request_queues[session_id]
 
-            # Queue the request for the client
-            queue = self._request_queues.get(session_id)
-            if queue:
-                await queue.put(ToolRequest(
-                    request_id=request_id,
-                    session_id=session_id,
-                    tool_name=tool_name,
-                    arguments={k: str(v) for k, v in arguments.items()},
-                    timeout_seconds=timeout_seconds,
-                ))
+        # Queue the request for the client (sent once its stream is attached)
+        queue.put_nowait(ToolRequest(
+            request_id=request_id,
+            session_id=session_id,
+            tool_name=tool_name,
+            arguments=encode_arguments(arguments),
+            timeout_seconds=timeout_seconds,
+        ))
 
         try:
             # Wait for response
-            result = await asyncio.wait_for(pending.future, timeout=timeout_seconds)
+            result = await asyncio.wait_for(
+                pending.future, timeout=timeout_seconds + RESPONSE_MARGIN_SECONDS
+            )
             return result
         except asyncio.TimeoutError:
             logger.warning(f"Tool request {request_id} timed out")
@@ -182,3 +195,58 @@ class ToolCallbackServiceImpl(ToolCallbackServiceServicer):
 
         except Exception as e:
             logger.error(f"Error processing tool responses: {e}")
+
+
+class RemoteToolExecutor(IToolExecutor):
+    """Executes one session's tools on its client over the callback stream.
+
+    Agents in server mode use this instead of running file and shell tools
+    in the server process. Calls are pipelined: concurrent ``execute`` calls
+    are all in flight on the stream at once, so a batch of tool calls costs
+    one round trip rather than one per call.
+    """
+
+    def __init__(
+        self,
+        tool_service: ToolCallbackServiceImpl,
+        session_id: str,
+        available_tools: List[str],
+    ):
+        """
+        Initialize executor.
+
+        Args:
+            tool_service: Callback service the client's stream is attached to
+            session_id: Session whose client runs the tools
+            available_tools: Tools the client advertised
+        """
+        self.tool_service = tool_service
+        self.session_id = session_id
+        self._available_tools = list(available_tools)
+
+    def get_available_tools(self) -> List[str]:
+        """Get list of tools the client executes."""
+        return self._available_tools.copy()
+
+    async def execute(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[int] = None,
+    ) -> ToolResult:
+        """Send a tool call to the client and wait for its result.
+
+        The call's own ``timeout`` argument (bash) wins over ``timeout``.
+        """
+        if tool_name not in self._available_tools:
+            return ToolResult(success=False, error=f"Client does not provide tool: {tool_name}")
+        timeout = tool_timeout(arguments, timeout or DEFAULT_TOOL_TIMEOUT)
+
+        try:
+            response = await self.tool_service.request_tool_execution(
+                self.session_id, tool_name, arguments, timeout_seconds=timeout
+            )
+        except RuntimeError as e:
+            return ToolResult(success=False, error=str(e))
+
+        return ToolResult(success=response.success, data=response.data, error=response.error)
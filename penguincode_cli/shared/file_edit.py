@@ -0,0 +1,242 @@
+"""Atomic search-and-replace edits with a unified diff summary.
+
+Used by the in-process ``EditFileTool`` and by the client's
+``LocalToolExecutor``. Any number of replacements are applied to a file in
+one read/write pass, in order, each seeing the result of the previous one.
+If any of them can't be applied nothing is written. The new contents go to
+a temporary file in the same directory which is then renamed over the
+original, so a crash mid-write never leaves a truncated file.
+
+The caller gets back a unified diff of the change, which is usually far
+smaller than the file and is what the model needs to see.
+"""
+
+import difflib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Diffs longer than this are cut (the model only needs to see what changed)
+MAX_DIFF_CHARS = 3000
+
+# Round-trips bytes that aren't valid UTF-8 instead of corrupting them
+_ERRORS = "surrogateescape"
+
+# Lines with their "\n" (only "\n" ends a line; "\r" stays part of it)
+_LINES = re.compile(r"[^\n]*\n|[^\n]+")
+
+
+class EditError(ValueError):
+    """An edit could not be applied; the file was left unchanged."""
+
+
+@dataclass
+class Edit:
+    """One search-and-replace operation."""
+
+    old_text: str
+    new_text: str
+    replace_all: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Edit":
+        """Build from tool arguments (accepts old_string/new_string too)."""
+        replace_all = data.get("replace_all", False)
+        if isinstance(replace_all, str):
+            replace_all = replace_all.strip().lower() in ("true", "1", "yes")
+        return cls(
+            old_text=data.get("old_text", data.get("old_string", "")),
+            new_text=data.get("new_text", data.get("new_string", "")),
+            replace_all=bool(replace_all),
+        )
+
+
+@dataclass
+class EditOutcome:
+    """Result of applying edits to a file."""
+
+    replacements: int
+    diff: str
+    bytes_written: int
+
+
+def apply_edits(content: str, edits: Sequence[Edit]) -> Tuple[str, int]:
+    """
+    Apply edits to text in order.
+
+    Args:
+        content: Original text
+        edits: Edits to apply; each sees the result of the previous ones
+
+    Returns:
+        Tuple of (new text, total replacements)
+
+    Raises:
+        EditError: If an edit has empty old_text or its text isn't found
+    """
+    replacements = 0
+    for number, edit in enumerate(edits, 1):
+        label = f"Edit {number} of {len(edits)}: " if len(edits) > 1 else ""
+        if not edit.old_text or not edit.old_text.strip():
+            raise EditError(
+                f"{label}old_text cannot be empty. Use 'write' tool to overwrite entire file."
+            )
+        if edit.old_text not in content:
+            raise EditError(f"{label}Text not found in file: {edit.old_text[:50]}...")
+        if edit.replace_all:
+            replacements += content.count(edit.old_text)
+            content = content.replace(edit.old_text, edit.new_text)
+        else:
+            replacements += 1
+            content = content.replace(edit.old_text, edit.new_text, 1)
+    return content, replacements
+
+
+def unified_diff(old: str, new: str, name: str, max_chars: int = MAX_DIFF_CHARS) -> str:
+    """Unified diff between two versions of a file, cut to max_chars."""
+    diff = "".join(
+        difflib.unified_diff(
+            old.splitlines(keepends=True),
+            new.splitlines(keepends=True),
+            fromfile=f"a/{name}",
+            tofile=f"b/{name}",
+            n=2,
+        )
+    )
+    diff = diff.encode("utf-8", _ERRORS).decode("utf-8", "replace")
+    if len(diff) > max_chars:
+        diff = diff[:max_chars] + f"\n... (diff truncated, {len(diff)} chars total)"
+    return diff
+
+
+def atomic_write(path: Path, content: str) -> int:
+    """
+    Replace a file's contents via a temporary file and rename.
+
+    Args:
+        path: File to write (its permissions are kept)
+        content: New contents
+
+    Returns:
+        Bytes written
+    """
+    data = content.encode("utf-8", _ERRORS)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return len(data)
+
+
+def _ending(line: str) -> str:
+    if line.endswith("\r\n"):
+        return "\r\n"
+    return "\n" if line.endswith("\n") else ""
+
+
+def _restore_line_endings(raw: str, updated: str) -> str:
+    """
+    ``updated`` (LF text edited from ``raw``) with ``raw``'s line endings.
+
+    Unchanged lines keep their own ending; changed and added lines take the
+    ending of the line they replace, or of the line before them.
+    """
+    raw_lines = _LINES.findall(raw)
+    old_lines = [line[:-2] + "\n" if line.endswith("\r\n") else line for line in raw_lines]
+    new_lines = _LINES.findall(updated)
+    ending = _ending(raw_lines[0]) if raw_lines else "\n"
+
+    out: List[str] = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            out.extend(raw_lines[i1:i2])
+            ending = _ending(raw_lines[i2 - 1]) or ending
+            continue
+        if i1 < i2:
+            ending = _ending(raw_lines[i1]) or ending
+        out.extend(line[:-1] + ending if line.endswith("\n") else line for line in new_lines[j1:j2])
+    return "".join(out)
+
+
+def edit_file(path: Path, edits: Sequence[Edit], name: str = "") -> EditOutcome:
+    """
+    Apply edits to a file in one atomic read/write pass.
+
+    Args:
+        path: File to edit
+        edits: Edits to apply in order
+        name: Name shown in the diff header (default: the file name)
+
+    Returns:
+        EditOutcome with the replacement count and a unified diff
+
+    Raises:
+        EditError: If an edit can't be applied (nothing is written)
+        OSError: If the file can't be read or written
+    """
+    path = Path(path).resolve()  # Rename over the target, not a symlink to it
+    with open(path, "r", encoding="utf-8", errors=_ERRORS, newline="") as f:
+        raw = f.read()
+
+    # Match against LF text (what the model sees) but write each line back
+    # with its own ending: CRLF files stay CRLF, mixed files stay mixed
+    crlf = "\r\n" in raw
+    original = raw.replace("\r\n", "\n") if crlf else raw
+    updated, replacements = apply_edits(original, edits)
+
+    written = 0
+    if updated != original:
+        if not crlf:
+            updated_raw = updated
+        elif raw.count("\n") == raw.count("\r\n"):  # Every line CRLF
+            updated_raw = updated.replace("\r\n", "\n").replace("\n", "\r\n")
+        else:
+            updated_raw = _restore_line_endings(raw, updated)
+        written = atomic_write(path, updated_raw)
+    return EditOutcome(
+        replacements=replacements,
+        diff=unified_diff(original, updated, name or path.name),
+        bytes_written=written,
+    )
+
+
+def parse_edits(arguments: Dict[str, Any]) -> List[Edit]:
+    """
+    Edits described by tool arguments.
+
+    Accepts either a single edit (``old_text``/``new_text``/``replace_all``)
+    or an ``edits`` list of such objects, which may arrive JSON-encoded when
+    sent over the tool callback stream.
+
+    Raises:
+        EditError: If ``edits`` is malformed
+    """
+    batch = arguments.get("edits")
+    if batch in (None, "", []):
+        return [Edit.from_dict(arguments)]
+    if isinstance(batch, str):
+        try:
+            batch = json.loads(batch)
+        except json.JSONDecodeError as e:
+            raise EditError(f"edits must be a list of objects: {e}") from None
+    if not isinstance(batch, list) or not all(isinstance(item, dict) for item in batch):
+        raise EditError("edits must be a list of {old_text, new_text, replace_all} objects")
+    return [Edit.from_dict(item) for item in batch]
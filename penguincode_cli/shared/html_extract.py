@@ -0,0 +1,318 @@
+"""HTML extraction that keeps parsing off the event loop.
+
+BeautifulSoup on a large documentation page takes hundreds of milliseconds,
+which stalls every coroutine sharing the loop. ``parse_html`` runs the
+extraction functions here in a process pool (falling back to a thread if
+worker processes can't be started); small documents are parsed inline since
+shipping them to a worker costs more than parsing them.
+
+Parser backends are optional: ``lxml`` is used for BeautifulSoup when
+installed (several times faster than ``html.parser``), and ``selectolax``
+is used for plain-text extraction when installed.
+
+Response bodies are read through ``read_capped`` so an oversized page is
+truncated while streaming instead of being buffered whole.
+
+This module is deliberately light to import: it is what pool workers load.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import AsyncIterator, Callable, List, Optional, Tuple, TypeVar
+from urllib.parse import urldefrag, urljoin
+
+from bs4 import BeautifulSoup
+
+T = TypeVar("T")
+
+# Bodies larger than this are truncated while streaming
+DEFAULT_MAX_HTML_BYTES = 5 * 1024 * 1024
+
+# Documents shorter than this (in characters) are parsed inline
+INLINE_PARSE_CHARS = 16 * 1024
+
+# Links remembered per page
+MAX_LINKS_PER_PAGE = 200
+
+_STRIP_TAGS = ["script", "style", "nav", "footer", "header"]
+
+
+# ==================== Parser backends ====================
+
+
+@lru_cache(maxsize=None)
+def bs4_parser() -> str:
+    """BeautifulSoup tree builder to use: ``lxml`` if installed, else ``html.parser``."""
+    try:
+        import lxml  # noqa: F401
+
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+@lru_cache(maxsize=None)
+def _selectolax():
+    try:
+        from selectolax.parser import HTMLParser
+
+        return HTMLParser
+    except ImportError:
+        return None
+
+
+def parser_backends() -> dict:
+    """Backends in use, for diagnostics and benchmarks."""
+    return {
+        "markdown": bs4_parser(),
+        "text": "selectolax" if _selectolax() else bs4_parser(),
+    }
+
+
+def _clean_lines(text: str) -> str:
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+# ==================== Extraction (run in workers) ====================
+
+
+def extract_text(html: str) -> str:
+    """
+    Extract clean text from HTML content.
+
+    Args:
+        html: HTML content
+
+    Returns:
+        Text with scripts, styles and page chrome removed, one line per
+        block; the raw HTML if parsing fails
+    """
+    try:
+        parser = _selectolax()
+        if parser is not None:
+            tree = parser(html)
+            tree.strip_tags(_STRIP_TAGS)
+            root = tree.body or tree.root
+            return _clean_lines(root.text(separator="\n") if root else "")
+
+        soup = BeautifulSoup(html, bs4_parser())
+        for element in soup(_STRIP_TAGS):
+            element.decompose()
+        return _clean_lines(soup.get_text(separator="\n", strip=True))
+
+    except Exception:
+        return html
+
+
+def html_to_markdown(html: str, url: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Convert HTML to markdown, extracting main content and links.
+
+    Args:
+        html: Page HTML
+        url: Page URL (for the source line and resolving links)
+
+    Returns:
+        Tuple of (markdown or None if the page has no real content,
+        absolute link URLs found anywhere on the page)
+    """
+    try:
+        soup = BeautifulSoup(html, bs4_parser())
+    except Exception:
+        return None, []
+
+    # Collect links before nav is stripped; sidebars are where doc links live
+    links: List[str] = []
+    seen = {url}
+    for anchor in soup.find_all('a', href=True):
+        link = urldefrag(urljoin(url, anchor['href']))[0]
+        if link not in seen:
+            seen.add(link)
+            links.append(link)
+            if len(links) >= MAX_LINKS_PER_PAGE:
+                break
+
+    try:
+        # Remove scripts, styles, nav, footer
+        for tag in soup.find_all(_STRIP_TAGS):
+            tag.decompose()
+
+        # Try to find main content area
+        main = (
+            soup.find('main') or
+            soup.find('article') or
+            soup.find('div', class_=re.compile(r'content|main|doc')) or
+            soup.find('body')
+        )
+
+        if not main:
+            return None, links
+
+        # Extract text with basic structure
+        lines = []
+        lines.append(f"# Source: {url}\n")
+
+        for element in main.find_all(['h1', 'h2', 'h3', 'h4', 'p', 'pre', 'code', 'li']):
+            text = element.get_text(strip=True)
+            if not text:
+                continue
+
+            if element.name == 'h1':
+                lines.append(f"\n# {text}\n")
+            elif element.name == 'h2':
+                lines.append(f"\n## {text}\n")
+            elif element.name == 'h3':
+                lines.append(f"\n### {text}\n")
+            elif element.name == 'h4':
+                lines.append(f"\n#### {text}\n")
+            elif element.name in ('pre', 'code'):
+                lines.append(f"\n```\n{text}\n```\n")
+            elif element.name == 'li':
+                lines.append(f"- {text}")
+            else:
+                lines.append(text)
+
+        content = '\n'.join(lines)
+
+        # Skip if too short (likely error page)
+        if len(content) < 200:
+            return None, links
+
+        return content, links
+
+    except Exception:
+        return None, links
+
+
+# ==================== Worker pool ====================
+
+
+class HtmlParserPool:
+    """Process pool for HTML extraction, with a thread fallback."""
+
+    _shared: Optional["HtmlParserPool"] = None
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize pool.
+
+        Args:
+            max_workers: Worker processes (default: half the CPUs, 1-4)
+        """
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) // 2))
+        self._executor: Optional[Executor] = None
+        self._broken = False
+
+    @classmethod
+    def shared(cls) -> "HtmlParserPool":
+        """Get the process-wide pool."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def uses_processes(self) -> bool:
+        """Whether work goes to worker processes (False once fallen back to threads)."""
+        return not self._broken
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """
+        Run an extraction function off the event loop.
+
+        Args:
+            func: Module-level (picklable) function
+            *args: Its arguments
+
+        Returns:
+            The function's result
+        """
+        if not self._broken:
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+            except (BrokenProcessPool, OSError, RuntimeError, NotImplementedError):
+                # No usable worker processes here (sandbox, frozen app, ...)
+                self._broken = True
+                self.shutdown()
+        return await asyncio.to_thread(func, *args)
+
+    def shutdown(self) -> None:
+        """Stop worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            # Never fork a process that may hold threads and open sockets
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=context)
+        return self._executor
+
+
+async def parse_html(func: Callable[..., T], html: str, *args) -> T:
+    """
+    Run ``func(html, *args)`` without blocking the event loop.
+
+    Args:
+        func: Extraction function from this module (or another picklable one)
+        html: Document to parse
+        *args: Extra arguments
+
+    Returns:
+        The function's result
+    """
+    if len(html) < INLINE_PARSE_CHARS:
+        return func(html, *args)
+    return await HtmlParserPool.shared().run(func, html, *args)
+
+
+def shutdown_parser_pool() -> None:
+    """Stop the shared pool's worker processes, if started."""
+    if HtmlParserPool._shared is not None:
+        HtmlParserPool._shared.shutdown()
+
+
+# ==================== Streaming reads ====================
+
+
+async def read_capped(
+    chunks: AsyncIterator[bytes], max_bytes: int = DEFAULT_MAX_HTML_BYTES
+) -> Tuple[bytes, bool]:
+    """
+    Read a streamed body, stopping at a size cap.
+
+    Args:
+        chunks: Body chunks (``response.content.iter_chunked(n)`` for aiohttp,
+            ``response.aiter_bytes()`` for httpx)
+        max_bytes: Bytes kept before the rest is dropped
+
+    Returns:
+        Tuple of (body, whether it was truncated)
+    """
+    parts: List[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        if size + len(chunk) > max_bytes:
+            parts.append(chunk[: max_bytes - size])
+            return b"".join(parts), True
+        parts.append(chunk)
+        size += len(chunk)
+    return b"".join(parts), False
+
+
+def decode_html(body: bytes, charset: Optional[str] = None) -> str:
+    """Decode a (possibly truncated) body, replacing undecodable bytes."""
+    try:
+        return body.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
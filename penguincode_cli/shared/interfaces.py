@@ -97,6 +97,7 @@ class IChatService(ABC):
         Yields:
             Response chunks which can be:
             - {"type": "text", "content": str, "is_final": bool}
+              (non-final chunks are live deltas; the final one is the full response)
             - {"type": "tool_request", "request_id": str, "tool": str, "args": dict}
             - {"type": "agent_spawn", "agent_type": str, "task": str}
             - {"type": "agent_result", "agent_type": str, "success": bool, "output": str}
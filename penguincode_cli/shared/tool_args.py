@@ -0,0 +1,46 @@
+"""Tool arguments on the ToolCallbackService stream.
+
+``ToolRequest.arguments`` is a string map. The server JSON-encodes every
+value and the client decodes every value, so lists, numbers and booleans
+keep their types and the string ``"10"`` stays distinct from ``10``.
+
+A call's own ``timeout`` argument (bash) wins over the executor default
+on both ends, so long commands aren't cut off at 30 seconds.
+"""
+
+import json
+from typing import Any, Dict, Mapping
+
+# Seconds a tool may run when neither the call nor the caller sets a limit
+DEFAULT_TOOL_TIMEOUT = 30
+
+
+def tool_timeout(arguments: Mapping[str, Any], default: int = DEFAULT_TOOL_TIMEOUT) -> int:
+    """Seconds a tool call may run: its ``timeout`` argument if valid, else ``default``."""
+    value = arguments.get("timeout")
+    try:
+        seconds = int(value) if value is not None and not isinstance(value, bool) else 0
+    except (TypeError, ValueError):
+        seconds = 0
+    return seconds if seconds > 0 else default
+
+
+def encode_arguments(arguments: Mapping[str, Any]) -> Dict[str, str]:
+    """Flatten tool arguments to the string map ToolRequest carries."""
+    return {key: json.dumps(value) for key, value in arguments.items()}
+
+
+def decode_arguments(arguments: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Tool arguments from a ToolRequest's string map.
+
+    A value that isn't valid JSON is kept as the raw string (sent by a
+    server that passed strings through unencoded).
+    """
+    decoded: Dict[str, Any] = {}
+    for key, value in arguments.items():
+        try:
+            decoded[key] = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            decoded[key] = value
+    return decoded
@@ -0,0 +1,202 @@
+"""Process-wide pooled HTTP clients for outbound requests.
+
+Opening an ``httpx.AsyncClient`` per call pays a TCP (and TLS) handshake on
+every request and throws the connection away afterwards. The transport
+registry hands out one long-lived client per event loop instead. It keeps
+a keep-alive connection pool per host within the limits in
+``Settings.http`` and speaks HTTP/2 to servers that offer it when the
+optional ``h2`` package is installed. Callers pass absolute URLs, and their
+own timeout and ``follow_redirects``, per request.
+
+Every request is traced, so requests, new connections and TLS handshakes
+are counted per host; ``get_stats()`` reports them with the resulting
+connection reuse.
+
+Usage:
+    client = get_transport().client()
+    response = await client.get(url, timeout=10)
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from penguincode_cli.config.settings import HttpConfig
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class HostStats:
+    """Request and connection counts for one host."""
+
+    requests: int = 0
+    connections: int = 0  # New TCP connections (one handshake each)
+    tls_handshakes: int = 0
+    http2_responses: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests sent over an already open connection."""
+        return max(0, self.requests - self.connections)
+
+    @property
+    def reuse_rate(self) -> float:
+        return self.reused / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused": self.reused,
+            "reuse_rate": round(self.reuse_rate, 3),
+            "http2_responses": self.http2_responses,
+        }
+
+
+class TransportRegistry:
+    """
+    Hands out the shared ``httpx.AsyncClient`` and counts its traffic.
+
+    A client is bound to the event loop that created it (its connections
+    are), so each running loop gets its own; clients of loops that have
+    been closed are discarded.
+    """
+
+    def __init__(self, config: Optional[HttpConfig] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            config: Pool limits and HTTP/2 switch (defaults if None)
+        """
+        self.config = config or HttpConfig()
+        self.hosts: Dict[str, HostStats] = {}
+        self.clients_created = 0
+        self._clients: Dict[int, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+    @property
+    def http2(self) -> bool:
+        """Whether new clients offer HTTP/2."""
+        return self.config.http2 and HTTP2_AVAILABLE
+
+    def configure(self, config: HttpConfig) -> None:
+        """Use new limits; clients already handed out keep theirs."""
+        self.config = config
+
+    def client(self) -> httpx.AsyncClient:
+        """
+        Get the shared client for the running event loop.
+
+        Returns:
+            A pooled client; don't close it (see ``aclose``)
+        """
+        loop = asyncio.get_running_loop()
+        self._discard_dead_loops()
+        entry = self._clients.get(id(loop))
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            entry = (loop, self._new_client())
+            self._clients[id(loop)] = entry
+        return entry[1]
+
+    async def aclose(self) -> None:
+        """Close the running loop's clients (and their connections)."""
+        loop = asyncio.get_running_loop()
+        for key, (owner, client) in list(self._clients.items()):
+            if owner is loop:
+                del self._clients[key]
+                await client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection reuse and handshakes, in total and per host."""
+        total = HostStats()
+        for stats in self.hosts.values():
+            total.requests += stats.requests
+            total.connections += stats.connections
+            total.tls_handshakes += stats.tls_handshakes
+            total.http2_responses += stats.http2_responses
+        return {
+            "http2": self.http2,
+            "clients": len(self._clients),
+            "clients_created": self.clients_created,
+            **total.to_dict(),
+            "hosts": {host: stats.to_dict() for host, stats in self.hosts.items()},
+        }
+
+    def reset_stats(self) -> None:
+        self.hosts.clear()
+
+    # ==================== Internals ====================
+
+    def _new_client(self) -> httpx.AsyncClient:
+        config = self.config
+        self.clients_created += 1
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+
+    def _discard_dead_loops(self) -> None:
+        for key, (owner, _) in list(self._clients.items()):
+            if owner.is_closed():
+                del self._clients[key]
+
+    def _host(self, url: httpx.URL) -> HostStats:
+        host = f"{url.host}:{url.port}" if url.port else url.host
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostStats()
+        return stats
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        stats = self._host(request.url)
+        stats.requests += 1
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            # httpcore reports connection setup only when it opens a connection
+            if event == "connection.connect_tcp.complete":
+                stats.connections += 1
+            elif event == "connection.start_tls.complete":
+                stats.tls_handshakes += 1
+
+        request.extensions["trace"] = trace
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        if response.http_version == "HTTP/2":
+            self._host(response.request.url).http2_responses += 1
+
+
+_registry = TransportRegistry()
+
+
+def get_transport() -> TransportRegistry:
+    """The process-wide transport registry."""
+    return _registry
+
+
+def configure_transport(config: HttpConfig) -> TransportRegistry:
+    """
+    Apply ``Settings.http`` to the process-wide registry.
+
+    Args:
+        config: HTTP transport settings
+
+    Returns:
+        The registry
+    """
+    _registry.configure(config)
+    return _registry
@@ -2,8 +2,10 @@
 
 from .base import BaseTool, ToolResult
 from .bash import BashTool, execute_bash
+from .code_index import CodeIndex
 from .file_ops import EditFileTool, GlobTool, GrepTool, ReadFileTool, WriteFileTool
 from .memory import MemoryManager, create_memory_manager
+from .result_cache import ToolResultCache
 from .web import WebFetchTool, WebSearchTool, fetch_url, search_web
 
 __all__ = [
@@ -16,6 +18,8 @@ __all__ = [
     "EditFileTool",
     "GrepTool",
     "GlobTool",
+    "CodeIndex",
+    "ToolResultCache",
     # Bash
     "BashTool",
     "execute_bash",
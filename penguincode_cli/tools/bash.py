@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Optional
 
 from .base import BaseTool, ToolResult
+from .code_index import CodeIndex
 
 
 class BashTool(BaseTool):
@@ -69,6 +70,7 @@ class BashTool(BaseTool):
             except asyncio.TimeoutError:
                 process.kill()
                 await process.wait()
+                CodeIndex.mark_all_dirty()
                 return ToolResult(
                     success=False,
                     data=None,
@@ -76,6 +78,9 @@ class BashTool(BaseTool):
                     metadata={"command": command, "timeout": timeout_val},
                 )
 
+            # Commands may have changed files behind the code index
+            CodeIndex.mark_all_dirty()
+
             # Decode output
             stdout_text = stdout.decode("utf-8", errors="replace").strip()
             stderr_text = stderr.decode("utf-8", errors="replace").strip()
@@ -0,0 +1,546 @@
+"""Persistent trigram index for fast grep/glob over large trees.
+
+Every indexed file gets a trigram signature: a Bloom-filter bitset of the
+byte trigrams in its (ASCII lower-cased) content. A regex is reduced to the
+literal trigrams any match must contain, and only files whose signature has
+all of them are opened and scanned. Signatures are kept in SQLite under
+``.penguincode/`` together with each file's mtime/size, so a refresh only
+re-reads files that changed.
+
+Signatures are used instead of posting lists because they stay small and
+load quickly in pure Python. Testing a file is one big-int AND, and a false
+positive only costs an extra file scan, never a missed match.
+"""
+
+import fnmatch
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse  # type: ignore[no-redef]
+
+# Directories never searched (shared with GrepTool's full-scan fallback)
+IGNORE_DIRS = {
+    ".git",
+    ".svn",
+    "node_modules",
+    "__pycache__",
+    ".pytest_cache",
+    ".mypy_cache",
+    ".venv",
+    "venv",
+    ".env",
+    ".penguincode",
+}
+
+# Binary file extensions never searched (still listed for glob)
+BINARY_EXTENSIONS = {
+    ".pyc",
+    ".so",
+    ".o",
+    ".a",
+    ".exe",
+    ".dll",
+    ".dylib",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".pdf",
+    ".zip",
+    ".tar",
+    ".gz",
+}
+
+INDEX_VERSION = "1"
+INDEX_FILENAME = "code_index.db"
+
+# Signature size bounds (bits, powers of two)
+MIN_SIGNATURE_BITS = 512
+MAX_SIGNATURE_BITS = 1 << 15
+
+# Re-signing at least this many files (e.g. a cold build) uses a process pool
+PARALLEL_BUILD_THRESHOLD = 1000
+
+
+def is_binary_path(path: str) -> bool:
+    """Whether a file's extension marks it as binary (never grepped)."""
+    return os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS
+
+
+# ==================== Trigram helpers ====================
+
+
+def _trigram_bit(trigram: bytes, bits: int) -> int:
+    """Map a trigram to a bit position in a signature of ``bits`` bits."""
+    value = (trigram[0] << 16) | (trigram[1] << 8) | trigram[2]
+    return ((value * 2654435761) >> 7) & (bits - 1)
+
+
+def _signature_bits(unique_trigrams: int) -> int:
+    """Pick a signature size giving a low fill ratio for this many trigrams."""
+    bits = MIN_SIGNATURE_BITS
+    while bits < unique_trigrams * 4 and bits < MAX_SIGNATURE_BITS:
+        bits <<= 1
+    return bits
+
+
+def build_signature(data: bytes) -> Tuple[int, bytes]:
+    """
+    Build the trigram signature for file content.
+
+    Args:
+        data: Raw file bytes
+
+    Returns:
+        Tuple of (signature size in bits, signature bytes)
+    """
+    data = data.lower()
+    trigrams = {data[i : i + 3] for i in range(len(data) - 2)}
+    bits = _signature_bits(len(trigrams))
+    sig = bytearray(bits // 8)
+    for trigram in trigrams:
+        bit = _trigram_bit(trigram, bits)
+        sig[bit >> 3] |= 1 << (bit & 7)
+    return bits, bytes(sig)
+
+
+def signature_for_file(path: str, max_file_size: int) -> Tuple[int, bytes]:
+    """Read a file and build its signature ((0, b"") if too large or unreadable)."""
+    try:
+        if os.path.getsize(path) > max_file_size:
+            return 0, b""
+        with open(path, "rb") as f:
+            return build_signature(f.read())
+    except OSError:
+        return 0, b""
+
+
+def _literal_runs(parsed, case_sensitive: bool) -> Optional[List[Set[bytes]]]:
+    """Collect required trigrams from a parsed regex sequence.
+
+    Returns a list of alternatives (any one must match), each a set of
+    trigrams that must all be present, or None if nothing is required.
+    """
+    required: Set[bytes] = set()
+    run: List[str] = []
+    alternatives: Optional[List[Set[bytes]]] = None
+
+    def flush() -> None:
+        text = "".join(run)
+        run.clear()
+        data = text.encode("utf-8").lower()
+        for i in range(len(data) - 2):
+            trigram = data[i : i + 3]
+            # Non-ASCII case folding isn't mirrored by bytes.lower()
+            if not case_sensitive and any(b >= 0x80 for b in trigram):
+                continue
+            required.add(trigram)
+
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        flush()
+        if op is sre_parse.SUBPATTERN:
+            # (group, add_flags, del_flags, pattern)
+            inner = _literal_runs(arg[-1], case_sensitive)
+            if inner and len(inner) == 1:
+                required |= inner[0]
+            elif inner and alternatives is None:
+                alternatives = inner
+        elif op is sre_parse.BRANCH and alternatives is None:
+            branches = [_literal_runs(branch, case_sensitive) for branch in arg[1]]
+            if all(b and len(b) == 1 and b[0] for b in branches):
+                alternatives = [b[0] for b in branches]
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and arg[0] >= 1:
+            inner = _literal_runs(arg[2], case_sensitive)
+            if inner and len(inner) == 1:
+                required |= inner[0]
+    flush()
+
+    if alternatives:
+        combined = [alt | required for alt in alternatives]
+        return combined if all(combined) else ([required] if required else None)
+    return [required] if required else None
+
+
+def regex_trigrams(pattern: str, case_sensitive: bool = True) -> Optional[List[Set[bytes]]]:
+    """
+    Reduce a regex to the trigrams any match must contain.
+
+    Args:
+        pattern: Regular expression
+        case_sensitive: Whether the search is case-sensitive
+
+    Returns:
+        List of alternatives (each a set of required trigrams), or None when
+        the pattern can't be narrowed (every file is a candidate)
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        case_sensitive = False
+    return _literal_runs(parsed, case_sensitive)
+
+
+def glob_to_regex(pattern: str) -> "re.Pattern[str]":
+    """Translate a glob (with ``**`` support) to a regex over '/'-separated paths."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                out.append(fnmatch.translate(pattern[i : end + 1])[4:-3])
+                i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+# ==================== Index ====================
+
+
+@dataclass
+class _Entry:
+    """In-memory index entry for one file."""
+
+    mtime_ns: int
+    size: int
+    bits: int  # 0 = not indexed (too large/unreadable) -> always a candidate
+    signature: int
+
+
+class CodeIndex:
+    """Incrementally updated trigram signature index for one project root."""
+
+    _registry: Dict[Path, "CodeIndex"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        root: str,
+        index_path: Optional[str] = None,
+        max_file_size: int = 1_000_000,
+        refresh_interval: float = 2.0,
+    ):
+        """
+        Initialize index.
+
+        Args:
+            root: Project root to index
+            index_path: SQLite file (default: <root>/.penguincode/code_index.db)
+            max_file_size: Files larger than this get no signature and are always scanned
+            refresh_interval: Seconds a refresh stays fresh unless marked dirty
+        """
+        self.root = Path(root).resolve()
+        self.index_path = (
+            Path(index_path) if index_path else self.root / ".penguincode" / INDEX_FILENAME
+        )
+        self.max_file_size = max_file_size
+        self.refresh_interval = refresh_interval
+
+        self._entries: Dict[str, _Entry] = {}
+        self._sorted: Optional[List[Tuple[str, _Entry]]] = None
+        self._loaded = False
+        self._dirty = True
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        self.last_refresh_stats: Dict[str, int] = {}
+
+    @classmethod
+    def for_root(cls, root: str) -> "CodeIndex":
+        """Get the shared index for a project root."""
+        key = Path(root).resolve()
+        with cls._registry_lock:
+            index = cls._registry.get(key)
+            if index is None:
+                index = cls(str(key))
+                cls._registry[key] = index
+            return index
+
+    @classmethod
+    def mark_all_dirty(cls) -> None:
+        """Force a rescan on next use (call after tools modify files)."""
+        with cls._registry_lock:
+            for index in cls._registry.values():
+                index.mark_dirty()
+
+    def mark_dirty(self) -> None:
+        """Force a rescan on next use."""
+        self._dirty = True
+
+    def contains(self, path: Path) -> bool:
+        """Check whether a path is inside this index's root."""
+        try:
+            path.resolve().relative_to(self.root)
+            return True
+        except ValueError:
+            return False
+
+    # ==================== Queries ====================
+
+    def candidates(
+        self,
+        pattern: str,
+        subdir: Optional[Path] = None,
+        case_sensitive: bool = True,
+    ) -> Tuple[List[Path], int]:
+        """
+        Find files that may contain a regex match.
+
+        Args:
+            pattern: Regular expression
+            subdir: Restrict to files under this directory
+            case_sensitive: Whether the search is case-sensitive
+
+        Returns:
+            Tuple of (candidate paths sorted by path, total files considered)
+        """
+        alternatives = regex_trigrams(pattern, case_sensitive)
+        with self._lock:
+            self._refresh_if_needed()
+            entries = self._entries_under(subdir)
+
+            entries = [(rel, entry) for rel, entry in entries if not is_binary_path(rel)]
+            if not alternatives:
+                return [self.root / rel for rel, _ in entries], len(entries)
+
+            mask_cache: Dict[int, List[int]] = {}
+            result = []
+            for rel, entry in entries:
+                if not entry.bits:
+                    result.append(self.root / rel)
+                    continue
+                masks = mask_cache.get(entry.bits)
+                if masks is None:
+                    masks = [self._mask(alt, entry.bits) for alt in alternatives]
+                    mask_cache[entry.bits] = masks
+                signature = entry.signature
+                if any(signature & mask == mask for mask in masks):
+                    result.append(self.root / rel)
+            return result, len(entries)
+
+    def glob(self, pattern: str, subdir: Optional[Path] = None) -> List[Path]:
+        """
+        Find indexed files matching a glob pattern relative to ``subdir``.
+
+        Args:
+            pattern: Glob pattern (e.g., "**/*.py")
+            subdir: Base directory the pattern is relative to (default: root)
+
+        Returns:
+            Matching paths sorted by path
+        """
+        regex = glob_to_regex(pattern)
+        base = subdir.resolve() if subdir else self.root
+        prefix = "" if base == self.root else base.relative_to(self.root).as_posix() + "/"
+        with self._lock:
+            self._refresh_if_needed()
+            return [
+                self.root / rel
+                for rel, _ in self._entries_under(subdir)
+                if regex.match(rel[len(prefix):])
+            ]
+
+    def file_count(self) -> int:
+        """Number of files in the index."""
+        with self._lock:
+            self._refresh_if_needed()
+            return len(self._entries)
+
+    @staticmethod
+    def _mask(trigrams: Set[bytes], bits: int) -> int:
+        mask = 0
+        for trigram in trigrams:
+            mask |= 1 << _trigram_bit(trigram, bits)
+        return mask
+
+    def _entries_under(self, subdir: Optional[Path]) -> List[Tuple[str, _Entry]]:
+        """Entries (sorted by path) under an optional subdirectory."""
+        if self._sorted is None:
+            self._sorted = sorted(self._entries.items())
+        items = self._sorted
+        if subdir is None:
+            return items
+        rel = subdir.resolve().relative_to(self.root).as_posix()
+        if rel == ".":
+            return items
+        prefix = rel + "/"
+        return [(path, entry) for path, entry in items if path.startswith(prefix)]
+
+    # ==================== Maintenance ====================
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the filesystem.
+
+        Returns:
+            Counts of added, updated, removed and total files
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh_if_needed(self) -> None:
+        if self._dirty or time.monotonic() - self._last_refresh >= self.refresh_interval:
+            self._refresh()
+
+    def _refresh(self) -> Dict[str, int]:
+        if not self._loaded:
+            self._load()
+
+        seen: Set[str] = set()
+        changed: List[Tuple[str, os.stat_result]] = []
+        for rel, stat in self._walk():
+            seen.add(rel)
+            entry = self._entries.get(rel)
+            if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                changed.append((rel, stat))
+
+        removed = [rel for rel in self._entries if rel not in seen]
+        added = sum(1 for rel, _ in changed if rel not in self._entries)
+
+        rows = []
+        for (rel, stat), (bits, signature) in zip(changed, self._sign(changed)):
+            self._entries[rel] = _Entry(
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                bits=bits,
+                signature=int.from_bytes(signature, "little"),
+            )
+            rows.append((rel, stat.st_mtime_ns, stat.st_size, bits, signature))
+        for rel in removed:
+            del self._entries[rel]
+
+        if rows or removed:
+            self._sorted = None
+            self._persist(rows, removed)
+
+        self._dirty = False
+        self._last_refresh = time.monotonic()
+        self.last_refresh_stats = {
+            "added": added,
+            "updated": len(changed) - added,
+            "removed": len(removed),
+            "files": len(self._entries),
+        }
+        return self.last_refresh_stats
+
+    def _sign(self, changed: List[Tuple[str, os.stat_result]]) -> List[Tuple[int, bytes]]:
+        """Build signatures for changed files (in parallel for large batches)."""
+        # Binary files are only listed (for glob), never read
+        text = [i for i, (rel, _) in enumerate(changed) if not is_binary_path(rel)]
+        paths = [str(self.root / changed[i][0]) for i in text]
+        sizes = [self.max_file_size] * len(paths)
+        signatures: Optional[List[Tuple[int, bytes]]] = None
+        if len(paths) >= PARALLEL_BUILD_THRESHOLD and (os.cpu_count() or 1) > 1:
+            try:
+                with ProcessPoolExecutor() as pool:
+                    signatures = list(pool.map(signature_for_file, paths, sizes, chunksize=64))
+            except Exception:
+                pass  # Fall back to building in-process
+        if signatures is None:
+            signatures = [signature_for_file(path, size) for path, size in zip(paths, sizes)]
+        result: List[Tuple[int, bytes]] = [(0, b"")] * len(changed)
+        for i, signature in zip(text, signatures):
+            result[i] = signature
+        return result
+
+    def _walk(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """Yield (relative posix path, stat) for every file outside ignored dirs."""
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in IGNORE_DIRS]
+            rel_dir = os.path.relpath(dirpath, self.root)
+            for name in filenames:
+                if name in IGNORE_DIRS:
+                    continue
+                full = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(full)
+                except OSError:
+                    continue
+                rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+                yield rel.replace(os.sep, "/"), stat
+
+    # ==================== Persistence ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "bits INTEGER NOT NULL, signature BLOB NOT NULL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if version is None or version[0] != INDEX_VERSION:
+            conn.execute("DELETE FROM files")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (INDEX_VERSION,)
+            )
+            conn.commit()
+        return conn
+
+    def _load(self) -> None:
+        """Load persisted signatures (a corrupt index is rebuilt)."""
+        try:
+            conn = self._connect()
+        except sqlite3.DatabaseError:
+            self.index_path.unlink(missing_ok=True)
+            conn = self._connect()
+        with conn:
+            for path, mtime_ns, size, bits, signature in conn.execute(
+                "SELECT path, mtime_ns, size, bits, signature FROM files"
+            ):
+                self._entries[path] = _Entry(
+                    mtime_ns=mtime_ns,
+                    size=size,
+                    bits=bits,
+                    signature=int.from_bytes(signature, "little"),
+                )
+        conn.close()
+        self._loaded = True
+
+    def _persist(self, rows: List[Tuple], removed: List[str]) -> None:
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, bits, signature) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.executemany("DELETE FROM files WHERE path = ?", [(r,) for r in removed])
+            conn.close()
+        except (sqlite3.Error, OSError):
+            # The in-memory index is still correct; persistence is best-effort
+            pass
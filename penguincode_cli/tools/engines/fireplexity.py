@@ -4,6 +4,8 @@ from typing import List
 
 import httpx
 
+from penguincode_cli.shared.transport import get_transport
+
 from .base import (
     BaseSearchEngine,
     SearchEngineError,
@@ -55,38 +57,39 @@ class FireplexityEngine(BaseSearchEngine):
             # This is a placeholder - adjust based on your Fireplexity setup
             fireplexity_url = "http://localhost:8080/api/search"
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                headers = {}
-                if self.firecrawl_api_key:
-                    headers["Authorization"] = f"Bearer {self.firecrawl_api_key}"
-
-                response = await client.post(
-                    fireplexity_url,
-                    json={
-                        "query": query,
-                        "max_results": max_results,
-                        "safe_mode": True,  # Enable content filtering
-                    },
-                    headers=headers,
+            client = get_transport().client()
+            headers = {}
+            if self.firecrawl_api_key:
+                headers["Authorization"] = f"Bearer {self.firecrawl_api_key}"
+
+            response = await client.post(
+                fireplexity_url,
+                json={
+                    "query": query,
+                    "max_results": max_results,
+                    "safe_mode": True,  # Enable content filtering
+                },
+                headers=headers,
+                timeout=60.0,
+            )
+
+            if response.status_code != 200:
+                raise SearchEngineError(
+                    f"Fireplexity API error: {response.status_code} - {response.text}"
                 )
 
-                if response.status_code != 200:
-                    raise SearchEngineError(
-                        f"Fireplexity API error: {response.status_code} - {response.text}"
-                    )
-
-                data = response.json()
-                results = []
+            data = response.json()
+            results = []
 
-                for item in data.get("results", []):
-                    search_result = self._create_result(
-                        title=item.get("title", ""),
-                        url=item.get("url", ""),
-                        snippet=item.get("summary", item.get("snippet", "")),
-                    )
-                    results.append(search_result)
+            for item in data.get("results", []):
+                search_result = self._create_result(
+                    title=item.get("title", ""),
+                    url=item.get("url", ""),
+                    snippet=item.get("summary", item.get("snippet", "")),
+                )
+                results.append(search_result)
 
-                return results
+            return results
 
         except httpx.TimeoutException as e:
             raise SearchEngineTimeoutError(f"Fireplexity search timeout: {e}") from e
@@ -4,6 +4,8 @@ from typing import List
 
 import httpx
 
+from penguincode_cli.shared.transport import get_transport
+
 from .base import (
     BaseSearchEngine,
     SearchEngineAuthError,
@@ -52,39 +54,40 @@ class GoogleEngine(BaseSearchEngine):
             # Google limits to 10 results per query
             num_results = min(max_results, 10)
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    self.base_url,
-                    params={
-                        "key": self.api_key,
-                        "cx": self.cx_id,
-                        "q": query,
-                        "num": num_results,
-                        "safe": "active",  # Enable SafeSearch
-                    },
+            client = get_transport().client()
+            response = await client.get(
+                self.base_url,
+                params={
+                    "key": self.api_key,
+                    "cx": self.cx_id,
+                    "q": query,
+                    "num": num_results,
+                    "safe": "active",  # Enable SafeSearch
+                },
+                timeout=30.0,
+            )
+
+            if response.status_code == 401 or response.status_code == 403:
+                raise SearchEngineAuthError("Invalid Google API key or CX ID")
+            elif response.status_code == 429:
+                raise SearchEngineRateLimitError("Google API rate limit exceeded")
+            elif response.status_code != 200:
+                raise SearchEngineError(
+                    f"Google API error: {response.status_code} - {response.text}"
+                )
+
+            data = response.json()
+            results = []
+
+            for item in data.get("items", []):
+                search_result = self._create_result(
+                    title=item.get("title", ""),
+                    url=item.get("link", ""),
+                    snippet=item.get("snippet", ""),
                 )
+                results.append(search_result)
 
-                if response.status_code == 401 or response.status_code == 403:
-                    raise SearchEngineAuthError("Invalid Google API key or CX ID")
-                elif response.status_code == 429:
-                    raise SearchEngineRateLimitError("Google API rate limit exceeded")
-                elif response.status_code != 200:
-                    raise SearchEngineError(
-                        f"Google API error: {response.status_code} - {response.text}"
-                    )
-
-                data = response.json()
-                results = []
-
-                for item in data.get("items", []):
-                    search_result = self._create_result(
-                        title=item.get("title", ""),
-                        url=item.get("link", ""),
-                        snippet=item.get("snippet", ""),
-                    )
-                    results.append(search_result)
-
-                return results
+            return results
 
         except httpx.TimeoutException as e:
             raise SearchEngineTimeoutError(f"Google search timeout: {e}") from e
@@ -4,6 +4,8 @@ from typing import List
 
 import httpx
 
+from penguincode_cli.shared.transport import get_transport
+
 from .base import (
     BaseSearchEngine,
     SearchEngineAuthError,
@@ -49,37 +51,38 @@ class SciraAIEngine(BaseSearchEngine):
             raise SearchEngineAuthError("SciraAI API key not configured")
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.endpoint}/search",
-                    json={"query": query, "max_results": max_results, "safe_search": True},
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
+            client = get_transport().client()
+            response = await client.post(
+                f"{self.endpoint}/search",
+                json={"query": query, "max_results": max_results, "safe_search": True},
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=30.0,
+            )
+
+            if response.status_code == 401:
+                raise SearchEngineAuthError("Invalid SciraAI API key")
+            elif response.status_code == 429:
+                raise SearchEngineRateLimitError("SciraAI rate limit exceeded")
+            elif response.status_code != 200:
+                raise SearchEngineError(
+                    f"SciraAI API error: {response.status_code} - {response.text}"
+                )
+
+            data = response.json()
+            results = []
+
+            for item in data.get("results", []):
+                search_result = self._create_result(
+                    title=item.get("title", ""),
+                    url=item.get("url", ""),
+                    snippet=item.get("snippet", ""),
                 )
+                results.append(search_result)
 
-                if response.status_code == 401:
-                    raise SearchEngineAuthError("Invalid SciraAI API key")
-                elif response.status_code == 429:
-                    raise SearchEngineRateLimitError("SciraAI rate limit exceeded")
-                elif response.status_code != 200:
-                    raise SearchEngineError(
-                        f"SciraAI API error: {response.status_code} - {response.text}"
-                    )
-
-                data = response.json()
-                results = []
-
-                for item in data.get("results", []):
-                    search_result = self._create_result(
-                        title=item.get("title", ""),
-                        url=item.get("url", ""),
-                        snippet=item.get("snippet", ""),
-                    )
-                    results.append(search_result)
-
-                return results
+            return results
 
         except httpx.TimeoutException as e:
             raise SearchEngineTimeoutError(f"SciraAI search timeout: {e}") from e
@@ -4,6 +4,8 @@ from typing import List
 
 import httpx
 
+from penguincode_cli.shared.transport import get_transport
+
 from .base import (
     BaseSearchEngine,
     SearchEngineError,
@@ -42,36 +44,37 @@ class SearXNGEngine(BaseSearchEngine):
             SearchEngineError: If search fails
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # SearXNG API endpoint
-                response = await client.get(
-                    f"{self.url}/search",
-                    params={
-                        "q": query,
-                        "format": "json",
-                        "categories": ",".join(self.categories),
-                        "safesearch": "1",  # Enable safe search
-                        "pageno": "1",
-                    },
+            client = get_transport().client()
+            # SearXNG API endpoint
+            response = await client.get(
+                f"{self.url}/search",
+                params={
+                    "q": query,
+                    "format": "json",
+                    "categories": ",".join(self.categories),
+                    "safesearch": "1",  # Enable safe search
+                    "pageno": "1",
+                },
+                timeout=30.0,
+            )
+
+            if response.status_code != 200:
+                raise SearchEngineError(
+                    f"SearXNG API error: {response.status_code} - {response.text}"
                 )
 
-                if response.status_code != 200:
-                    raise SearchEngineError(
-                        f"SearXNG API error: {response.status_code} - {response.text}"
-                    )
-
-                data = response.json()
-                results = []
+            data = response.json()
+            results = []
 
-                for item in data.get("results", [])[:max_results]:
-                    search_result = self._create_result(
-                        title=item.get("title", ""),
-                        url=item.get("url", ""),
-                        snippet=item.get("content", ""),
-                    )
-                    results.append(search_result)
+            for item in data.get("results", [])[:max_results]:
+                search_result = self._create_result(
+                    title=item.get("title", ""),
+                    url=item.get("url", ""),
+                    snippet=item.get("content", ""),
+                )
+                results.append(search_result)
 
-                return results
+            return results
 
         except httpx.TimeoutException as e:
             raise SearchEngineTimeoutError(f"SearXNG search timeout: {e}") from e
@@ -1,19 +1,32 @@
 """File operation tools for reading, writing, and editing files."""
 
+import asyncio
 import os
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 
 import aiofiles
 
+from penguincode_cli.shared.file_edit import EditError, edit_file, parse_edits
+
 from .base import BaseTool, ToolResult
+from .code_index import BINARY_EXTENSIONS, IGNORE_DIRS, CodeIndex
+from .line_index import LineIndex, get_line_index
 
 
 class ReadFileTool(BaseTool):
-    """Tool for reading file contents."""
+    """Tool for reading file contents.
 
-    def __init__(self):
+    Files up to ``full_read_bytes`` are read whole. Larger files are read
+    through a cached line-offset index, so only the requested window (at
+    most ``max_window_lines`` lines) is loaded, and the result says how big
+    the file is and which lines were shown.
+    """
+
+    def __init__(self, full_read_bytes: int = 1024 * 1024, max_window_lines: int = 2000):
         super().__init__("read", "Read file contents with optional line range")
+        self.full_read_bytes = full_read_bytes
+        self.max_window_lines = max_window_lines
 
     async def execute(
         self,
@@ -49,6 +62,12 @@ class ReadFileTool(BaseTool):
                     error=f"Not a file: {path}",
                 )
 
+            start_line = int(start_line) if start_line else None
+            end_line = int(end_line) if end_line else None
+
+            if file_path.stat().st_size > self.full_read_bytes:
+                return await self._read_window(file_path, start_line, end_line)
+
             async with aiofiles.open(file_path, "r", encoding="utf-8", errors="replace") as f:
                 lines = await f.readlines()
 
@@ -86,6 +105,46 @@ class ReadFileTool(BaseTool):
                 error=f"Failed to read file: {str(e)}",
             )
 
+    async def _read_window(
+        self,
+        file_path: Path,
+        start_line: Optional[int],
+        end_line: Optional[int],
+    ) -> ToolResult:
+        """Read a window of a large file through its line index."""
+        start = max(1, start_line or 1)
+        end = end_line or start + self.max_window_lines - 1
+        end = min(end, start + self.max_window_lines - 1)
+
+        def read() -> Tuple[LineIndex, List[str]]:
+            index = get_line_index(str(file_path))
+            return index, index.read_window(start, end)
+
+        index, lines = await asyncio.to_thread(read)
+        last = start + len(lines) - 1
+
+        content = "\n".join(f"{start + i:6d}→{line}" for i, line in enumerate(lines))
+        if start > 1 or last < index.total_lines:
+            # Header first: agents truncate long tool output from the end
+            shown = f"lines {start}-{last}" if lines else "no lines"
+            content = (
+                f"[Large file: {index.total_lines} lines, {index.size} bytes; {shown} shown. "
+                f"Use start_line/end_line to read other parts.]\n{content}"
+            )
+
+        return ToolResult(
+            success=True,
+            data=content,
+            metadata={
+                "path": str(file_path),
+                "total_lines": index.total_lines,
+                "size_bytes": index.size,
+                "start_line": start,
+                "end_line": last,
+                "windowed": True,
+            },
+        )
+
 
 class WriteFileTool(BaseTool):
     """Tool for writing file contents."""
@@ -117,6 +176,7 @@ class WriteFileTool(BaseTool):
 
             async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
                 await f.write(content)
+            CodeIndex.mark_all_dirty()
 
             return ToolResult(
                 success=True,
@@ -137,7 +197,12 @@ class WriteFileTool(BaseTool):
 
 
 class EditFileTool(BaseTool):
-    """Tool for editing files using search and replace."""
+    """Tool for editing files using search and replace.
+
+    Several replacements can be made in one call (``edits``); they are
+    applied in a single atomic read/write pass and the result carries a
+    unified diff instead of the file.
+    """
 
     def __init__(self):
         super().__init__("edit", "Edit file using search and replace")
@@ -145,9 +210,10 @@ class EditFileTool(BaseTool):
     async def execute(
         self,
         path: str,
-        old_text: str,
-        new_text: str,
+        old_text: str = "",
+        new_text: str = "",
         replace_all: bool = False,
+        edits: Optional[List[Dict[str, Any]]] = None,
     ) -> ToolResult:
         """
         Edit file by replacing text.
@@ -157,9 +223,11 @@ class EditFileTool(BaseTool):
             old_text: Text to search for
             new_text: Replacement text
             replace_all: Replace all occurrences (default: first only)
+            edits: Several {old_text, new_text, replace_all} edits to apply in
+                order instead of the single one above; all or none are applied
 
         Returns:
-            ToolResult with operation status
+            ToolResult with operation status and a unified diff
         """
         try:
             file_path = Path(path).expanduser().resolve()
@@ -171,48 +239,35 @@ class EditFileTool(BaseTool):
                     error=f"File not found: {path}",
                 )
 
-            # Validate old_text is not empty
-            if not old_text or not old_text.strip():
-                return ToolResult(
-                    success=False,
-                    data=None,
-                    error="old_text cannot be empty. Use 'write' tool to overwrite entire file.",
-                )
-
-            # Read file content
-            async with aiofiles.open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                content = await f.read()
-
-            # Check if old_text exists
-            if old_text not in content:
-                return ToolResult(
-                    success=False,
-                    data=None,
-                    error=f"Text not found in file: {old_text[:50]}...",
-                )
-
-            # Replace text
-            if replace_all:
-                count = content.count(old_text)
-                new_content = content.replace(old_text, new_text)
-            else:
-                count = 1
-                new_content = content.replace(old_text, new_text, 1)
-
-            # Write back
-            async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
-                await f.write(new_content)
-
+            batch = parse_edits({
+                "old_text": old_text,
+                "new_text": new_text,
+                "replace_all": replace_all,
+                "edits": edits,
+            })
+            outcome = await asyncio.to_thread(edit_file, file_path, batch, path)
+            if outcome.bytes_written:
+                CodeIndex.mark_all_dirty()
+
+            summary = f"Replaced {outcome.replacements} occurrence(s) in {path}"
             return ToolResult(
                 success=True,
-                data=f"Replaced {count} occurrence(s) in {path}",
+                data=f"{summary}\n{outcome.diff}" if outcome.diff else summary,
                 metadata={
                     "path": str(file_path),
-                    "replacements": count,
+                    "replacements": outcome.replacements,
+                    "edits": len(batch),
                     "replace_all": replace_all,
+                    "diff": outcome.diff,
                 },
             )
 
+        except EditError as e:
+            return ToolResult(
+                success=False,
+                data=None,
+                error=str(e),
+            )
         except Exception as e:
             return ToolResult(
                 success=False,
@@ -222,10 +277,15 @@ class EditFileTool(BaseTool):
 
 
 class GrepTool(BaseTool):
-    """Tool for searching text in files."""
+    """Tool for searching text in files.
 
-    def __init__(self):
+    When ``index_root`` is set, directory searches under it use the
+    persistent trigram index to skip files that can't match.
+    """
+
+    def __init__(self, index_root: Optional[str] = None):
         super().__init__("grep", "Search for pattern in files")
+        self.index_root = index_root
 
     async def execute(
         self,
@@ -254,10 +314,17 @@ class GrepTool(BaseTool):
             regex = re.compile(pattern, flags)
 
             matches: List[Tuple[str, int, str]] = []
+            index = _index_for(self.index_root, search_path)
+            total_files = None
 
             # Determine if path is file or directory
             if search_path.is_file():
                 files = [search_path]
+            elif index is not None:
+                # Only scan files whose trigram signature can match
+                files, total_files = await asyncio.to_thread(
+                    index.candidates, pattern, search_path, case_sensitive
+                )
             elif search_path.is_dir():
                 # Search all text files in directory recursively
                 files = [
@@ -302,16 +369,17 @@ class GrepTool(BaseTool):
             else:
                 result_text = f"No matches found for pattern: {pattern}"
 
-            return ToolResult(
-                success=True,
-                data=result_text,
-                metadata={
-                    "pattern": pattern,
-                    "matches": len(matches),
-                    "files_searched": len(files),
-                    "truncated": len(matches) >= max_results,
-                },
-            )
+            metadata = {
+                "pattern": pattern,
+                "matches": len(matches),
+                "files_searched": len(files),
+                "truncated": len(matches) >= max_results,
+            }
+            if total_files is not None:
+                metadata["indexed"] = True
+                metadata["files_total"] = total_files
+
+            return ToolResult(success=True, data=result_text, metadata=metadata)
 
         except Exception as e:
             return ToolResult(
@@ -323,53 +391,28 @@ class GrepTool(BaseTool):
     @staticmethod
     def _should_ignore(path: Path) -> bool:
         """Check if path should be ignored."""
-        ignore_patterns = {
-            ".git",
-            ".svn",
-            "node_modules",
-            "__pycache__",
-            ".pytest_cache",
-            ".mypy_cache",
-            ".venv",
-            "venv",
-            ".env",
-        }
-
         # Check if any part of the path matches ignore patterns
         for part in path.parts:
-            if part in ignore_patterns:
+            if part in IGNORE_DIRS:
                 return True
 
         # Ignore binary file extensions
-        binary_extensions = {
-            ".pyc",
-            ".so",
-            ".o",
-            ".a",
-            ".exe",
-            ".dll",
-            ".dylib",
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".gif",
-            ".pdf",
-            ".zip",
-            ".tar",
-            ".gz",
-        }
-
-        if path.suffix.lower() in binary_extensions:
+        if path.suffix.lower() in BINARY_EXTENSIONS:
             return True
 
         return False
 
 
 class GlobTool(BaseTool):
-    """Tool for finding files by pattern."""
+    """Tool for finding files by pattern.
 
-    def __init__(self):
+    When ``index_root`` is set, patterns under it are matched against the
+    code index's file list instead of walking the tree.
+    """
+
+    def __init__(self, index_root: Optional[str] = None):
         super().__init__("glob", "Find files matching pattern")
+        self.index_root = index_root
 
     async def execute(
         self,
@@ -398,9 +441,14 @@ class GlobTool(BaseTool):
                     error=f"Path not found: {path}",
                 )
 
-            # Find matching files
-            matches = list(base_path.glob(pattern))
-            matches = [m for m in matches if m.is_file()]
+            # Find matching files (the index skips ignored dirs, so patterns
+            # naming one of them go to the filesystem)
+            index = _index_for(self.index_root, base_path)
+            if index is not None and not set(Path(pattern).parts) & IGNORE_DIRS:
+                matches = await asyncio.to_thread(index.glob, pattern, base_path)
+            else:
+                matches = list(base_path.glob(pattern))
+                matches = [m for m in matches if m.is_file()]
 
             # Limit results
             truncated = len(matches) > max_results
@@ -429,3 +477,11 @@ class GlobTool(BaseTool):
                 data=None,
                 error=f"Glob search failed: {str(e)}",
             )
+
+
+def _index_for(index_root: Optional[str], path: Path) -> Optional[CodeIndex]:
+    """Get the code index to use for a directory search, if any."""
+    if not index_root or not path.is_dir():
+        return None
+    index = CodeIndex.for_root(index_root)
+    return index if index.contains(path) else None
@@ -0,0 +1,146 @@
+"""Sparse line-offset index for reading windows of large files.
+
+Reading lines 10-20 of a multi-gigabyte log shouldn't load the whole file.
+A ``LineIndex`` scans the file once and records, for every
+``CHECKPOINT_BYTES`` block, how many lines start before it. Reads memory-map
+the file: seeking to a line is a bisect over the checkpoints plus a short
+forward scan inside one block, so only the pages holding the requested
+window are touched and decoded.
+
+Indexes are cached per path and rebuilt when the file's mtime or size
+changes.
+"""
+
+import mmap
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# Bytes between remembered line counts
+CHECKPOINT_BYTES = 256 * 1024
+
+# Longest line returned in full; the rest of a longer line is cut
+MAX_LINE_BYTES = 8 * 1024
+
+# Indexes kept in memory
+MAX_CACHED_INDEXES = 16
+
+
+class LineIndex:
+    """Block checkpoints of line starts for one version of a file."""
+
+    def __init__(self, path: str):
+        """
+        Build the index (one pass over the file).
+
+        Args:
+            path: File to index
+        """
+        self.path = path
+        stat = os.stat(path)
+        self.stamp: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        self.size = stat.st_size
+        # _newlines_before[i]: newlines in bytes [0, i * CHECKPOINT_BYTES)
+        self._newlines_before: List[int] = [0]
+        self.total_lines = 0
+        self._build()
+
+    def _build(self) -> None:
+        if self.size == 0:
+            return
+        # Plain block reads into one buffer: mapping the whole file here
+        # would leave all of it resident after the scan
+        buffer = bytearray(CHECKPOINT_BYTES)
+        view = memoryview(buffer)
+        newlines = 0
+        last = b""
+        with open(self.path, "rb") as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                newlines += buffer.count(b"\n", 0, n)
+                self._newlines_before.append(newlines)
+                last = bytes(view[n - 1:n])
+        # A last line without a trailing newline still counts
+        self.total_lines = newlines if last == b"\n" else newlines + 1
+
+    def read_window(self, start_line: int, end_line: int) -> List[str]:
+        """
+        Read lines ``start_line``..``end_line`` (1-indexed, inclusive).
+
+        Args:
+            start_line: First line to return
+            end_line: Last line to return (clamped to the file's end)
+
+        Returns:
+            Decoded lines without line endings; lines longer than
+            MAX_LINE_BYTES are cut short
+        """
+        start_line = max(1, start_line)
+        end_line = min(end_line, self.total_lines)
+        if self.size == 0 or start_line > end_line:
+            return []
+
+        lines: List[str] = []
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = self._line_offset(mm, start_line)
+            for _ in range(end_line - start_line + 1):
+                end = mm.find(b"\n", pos)
+                if end == -1:
+                    end = self.size
+                line = mm[pos:min(end, pos + MAX_LINE_BYTES)]
+                text = line.decode("utf-8", errors="replace").rstrip("\r")
+                if end - pos > MAX_LINE_BYTES:
+                    text += f" ... ({end - pos} bytes)"
+                lines.append(text)
+                pos = end + 1
+                if pos >= self.size:
+                    break
+        return lines
+
+    def _line_offset(self, mm: mmap.mmap, line: int) -> int:
+        """Byte offset where a 1-indexed line starts."""
+        skip = line - 1  # Newlines before the line
+        block = bisect_right(self._newlines_before, skip) - 1
+        # The checkpoint holding exactly `skip` newlines may end on the line
+        # break itself; step back so the scan below starts before it
+        while block > 0 and self._newlines_before[block] == skip:
+            block -= 1
+        pos = block * CHECKPOINT_BYTES
+        for _ in range(skip - self._newlines_before[block]):
+            pos = mm.find(b"\n", pos) + 1
+        return pos
+
+
+_cache: "OrderedDict[str, LineIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_line_index(path: str) -> LineIndex:
+    """
+    Get the index for a file, building it if missing or stale.
+
+    Args:
+        path: Resolved file path
+
+    Returns:
+        LineIndex for the file's current contents
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        index: Optional[LineIndex] = _cache.get(path)
+        if index is not None and index.stamp == stamp:
+            _cache.move_to_end(path)
+            return index
+
+    index = LineIndex(path)
+    with _cache_lock:
+        _cache[path] = index
+        _cache.move_to_end(path)
+        while len(_cache) > MAX_CACHED_INDEXES:
+            _cache.popitem(last=False)
+    return index
@@ -4,7 +4,7 @@ import asyncio
 import json
 from typing import Any, Dict, List, Optional
 
-import httpx
+from penguincode_cli.shared.transport import get_transport
 
 
 class MCPClient:
@@ -150,20 +150,20 @@ class HTTPMCPClient:
         Returns:
             Tool result
         """
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/tools/call",
-                json={
-                    "name": tool_name,
-                    "arguments": arguments,
-                },
-            )
+        response = await get_transport().client().post(
+            f"{self.base_url}/tools/call",
+            json={
+                "name": tool_name,
+                "arguments": arguments,
+            },
+            timeout=self.timeout,
+        )
 
-            if response.status_code != 200:
-                raise RuntimeError(f"MCP HTTP error: {response.status_code} - {response.text}")
+        if response.status_code != 200:
+            raise RuntimeError(f"MCP HTTP error: {response.status_code} - {response.text}")
 
-            result = response.json()
-            return result.get("result")
+        result = response.json()
+        return result.get("result")
 
     async def list_tools(self) -> List[Dict[str, Any]]:
         """
@@ -172,11 +172,12 @@ class HTTPMCPClient:
         Returns:
             List of tool definitions
         """
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(f"{self.base_url}/tools/list")
+        response = await get_transport().client().get(
+            f"{self.base_url}/tools/list", timeout=self.timeout
+        )
 
-            if response.status_code != 200:
-                raise RuntimeError(f"MCP HTTP error: {response.status_code} - {response.text}")
+        if response.status_code != 200:
+            raise RuntimeError(f"MCP HTTP error: {response.status_code} - {response.text}")
 
-            result = response.json()
-            return result.get("tools", [])
+        result = response.json()
+        return result.get("tools", [])
@@ -5,12 +5,20 @@ from typing import Any, Dict, List, Optional
 from mem0 import Memory
 
 from penguincode_cli.config.settings import MemoryConfig
+from penguincode_cli.ollama.embedding_cache import CachedEmbedder, EmbeddingCache
 
 
 class MemoryManager:
     """Manages persistent memory using mem0 open-source."""
 
-    def __init__(self, config: MemoryConfig, ollama_url: str, llm_model: str = "llama3.2:3b"):
+    def __init__(
+        self,
+        config: MemoryConfig,
+        ollama_url: str,
+        llm_model: str = "llama3.2:3b",
+        embedding_cache: Optional[EmbeddingCache] = None,
+        embedding_dims: Optional[int] = None,
+    ):
         """
         Initialize memory manager.
 
@@ -18,6 +26,9 @@ class MemoryManager:
             config: Memory configuration
             ollama_url: Ollama API base URL
             llm_model: LLM model to use for memory operations
+            embedding_cache: Shared embedding cache for mem0's embedder (optional)
+            embedding_dims: Vector width of the embedding model, from the model
+                registry (None: mem0's default, which must match the model)
         """
         self.config = config
         self.ollama_url = ollama_url
@@ -45,9 +56,18 @@ class MemoryManager:
             },
             "vector_store": self._get_vector_store_config(config),
         }
+        if embedding_dims:
+            mem0_config["embedder"]["config"]["embedding_dims"] = embedding_dims
+            mem0_config["vector_store"]["config"]["embedding_model_dims"] = embedding_dims
 
         self.memory = Memory.from_config(mem0_config)
 
+        # Route mem0's embed calls through the shared cache
+        if embedding_cache is not None:
+            self.memory.embedding_model = CachedEmbedder(
+                self.memory.embedding_model, embedding_cache, config.embedding_model
+            )
+
     def _get_vector_store_config(self, config: MemoryConfig) -> Dict[str, Any]:
         """
         Get vector store configuration based on selected store.
@@ -234,7 +254,11 @@ class MemoryManager:
 
 # Utility function for creating memory manager from settings
 def create_memory_manager(
-    config: MemoryConfig, ollama_url: str, llm_model: str = "llama3.2:3b"
+    config: MemoryConfig,
+    ollama_url: str,
+    llm_model: str = "llama3.2:3b",
+    embedding_cache: Optional[EmbeddingCache] = None,
+    embedding_dims: Optional[int] = None,
 ) -> MemoryManager:
     """
     Create a MemoryManager instance.
@@ -243,8 +267,10 @@ def create_memory_manager(
         config: Memory configuration
         ollama_url: Ollama API URL
         llm_model: LLM model name
+        embedding_cache: Shared embedding cache (optional)
+        embedding_dims: Vector width of the embedding model (optional)
 
     Returns:
         MemoryManager instance
     """
-    return MemoryManager(config, ollama_url, llm_model)
+    return MemoryManager(config, ollama_url, llm_model, embedding_cache, embedding_dims)
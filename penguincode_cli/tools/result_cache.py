@@ -0,0 +1,204 @@
+"""Read-through cache for file and search tool results.
+
+Agents re-read the same files and re-run identical greps, both within one
+agentic loop and across the agents of a plan. A ``ToolResultCache`` shared
+by a session's agents answers those repeats without touching the disk.
+
+Entries are keyed on (tool, arguments) and validated on lookup:
+
+- ``read`` results are tied to the file's mtime and size and are dropped
+  when a tool writes that file.
+- ``grep`` and ``glob`` results depend on the whole tree, so any change
+  made through a tool invalidates them.
+
+Change tracking belongs to each cache: the agent that runs a modifying
+tool reports it to its session's cache (``mark_changed``/
+``mark_all_changed``), so one server session's writes never invalidate
+another's entries. Edits made outside the tools are caught by the mtime
+check for reads; searches rely on the owner clearing the cache each turn.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .base import ToolResult
+
+# Tools whose results can be cached
+CACHEABLE_TOOLS = frozenset({"read", "grep", "glob"})
+
+FileStamp = Tuple[int, int]  # (mtime_ns, size)
+
+
+@dataclass
+class ToolCacheStats:
+    """Hit/miss counters for a tool result cache."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0  # Entries found stale on lookup
+    evictions: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    result: ToolResult
+    generation: int  # Change generation when the tool started running
+    stamp: Optional[FileStamp]  # Read target's stamp when the tool started
+
+
+def _file_stamp(path: str) -> Optional[FileStamp]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _resolve(path: str, base_dir: Optional[str] = None) -> str:
+    """Normalize a path the way the file tools do (relative to ``base_dir`` if given)."""
+    resolved = Path(path).expanduser()
+    if base_dir and not resolved.is_absolute():
+        resolved = Path(base_dir) / resolved
+    return str(resolved.resolve())
+
+
+class ToolResultCache:
+    """LRU cache of successful read/grep/glob results."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        check_files: bool = True,
+        base_dir: Optional[str] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Entries kept before least recently used ones are evicted
+            check_files: Validate reads against the file's mtime and size (turn
+                off when tools run on a remote client's filesystem)
+            base_dir: Directory relative paths are resolved against (a remote
+                client's project dir; default: this process's cwd)
+        """
+        self.max_entries = max(1, max_entries)
+        self.check_files = check_files
+        self.base_dir = base_dir
+        self.stats = ToolCacheStats()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+        # Changes reported by the tools run for this cache's owner
+        self._generation = 0
+        self._all_changed_at = 0
+        self._changed_at: Dict[str, int] = {}
+
+    # ==================== Change tracking ====================
+
+    def generation(self) -> int:
+        """Current change generation (bumped by every reported change)."""
+        return self._generation
+
+    def mark_changed(self, path: str) -> None:
+        """Report that a tool modified one file."""
+        self._generation += 1
+        self._changed_at[_resolve(path, self.base_dir)] = self._generation
+
+    def mark_all_changed(self) -> None:
+        """Report that a tool may have modified anything (e.g. a shell command)."""
+        self._generation += 1
+        self._all_changed_at = self._generation
+        self._changed_at.clear()
+
+    # ==================== Lookup ====================
+
+    def cache_key(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Key for a tool call (argument order doesn't matter)."""
+        if tool_name == "read" and "path" in arguments:
+            arguments = {**arguments, "path": _resolve(str(arguments["path"]), self.base_dir)}
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True, default=str)}"
+
+    async def run(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        execute: Callable[[], Awaitable[ToolResult]],
+    ) -> ToolResult:
+        """
+        Return a cached result for a tool call, or run it and cache the result.
+
+        Args:
+            tool_name: Tool being called
+            arguments: Its arguments
+            execute: Runs the tool (called on a miss)
+
+        Returns:
+            The tool's result; cached ones have ``metadata["cached"]`` set
+        """
+        if tool_name not in CACHEABLE_TOOLS:
+            return await execute()
+
+        key = self.cache_key(tool_name, arguments)
+        path = _resolve(str(arguments.get("path", "")), self.base_dir) if tool_name == "read" else None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._is_valid(entry, path):
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                metadata = {**(entry.result.metadata or {}), "cached": True}
+                return replace(entry.result, metadata=metadata)
+            del self._entries[key]
+            self.stats.invalidations += 1
+        self.stats.misses += 1
+
+        # Capture validity before running so a change made meanwhile wins
+        generation = self._generation
+        stamp = _file_stamp(path) if path and self.check_files else None
+        result = await execute()
+        if result.success:
+            self._entries[key] = _Entry(result=result, generation=generation, stamp=stamp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        return result
+
+    def _is_valid(self, entry: _Entry, path: Optional[str]) -> bool:
+        if path is None:
+            # Searches depend on the whole tree
+            return entry.generation == self._generation
+        changed_at = max(self._all_changed_at, self._changed_at.get(path, 0))
+        if changed_at > entry.generation:
+            return False
+        return not self.check_files or entry.stamp == _file_stamp(path)
+
+    def clear(self) -> None:
+        """Drop all entries (statistics are kept)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "invalidations": self.stats.invalidations,
+            "evictions": self.stats.evictions,
+            "hit_rate": round(self.stats.hit_rate, 3),
+        }
@@ -3,9 +3,10 @@
 from typing import List, Optional
 
 import httpx
-from bs4 import BeautifulSoup
 
 from penguincode_cli.config.settings import ResearchConfig
+from penguincode_cli.shared import html_extract
+from penguincode_cli.shared.transport import get_transport
 
 from .engines.base import SearchResult
 from .engines.factory import get_search_engine
@@ -46,14 +47,16 @@ class WebSearchTool:
 class WebFetchTool:
     """Web content fetching tool with parsing capabilities."""
 
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, max_bytes: int = html_extract.DEFAULT_MAX_HTML_BYTES):
         """
         Initialize web fetch tool.
 
         Args:
             timeout: Request timeout in seconds
+            max_bytes: Response bytes kept; the rest is not downloaded
         """
         self.timeout = timeout
+        self.max_bytes = max_bytes
 
     async def fetch(self, url: str, extract_text: bool = True) -> dict:
         """
@@ -64,22 +67,33 @@ class WebFetchTool:
             extract_text: Whether to extract and clean text content
 
         Returns:
-            Dictionary with 'url', 'status', 'content', and optionally 'text'
+            Dictionary with 'url', 'status', 'content', optionally 'text', and
+            'truncated' if the body exceeded ``max_bytes``
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
-                response = await client.get(url)
-
-                result = {
-                    "url": str(response.url),
-                    "status": response.status_code,
-                    "content": response.text,
-                }
-
-                if extract_text and response.status_code == 200:
-                    result["text"] = self._extract_text(response.text)
-
-                return result
+            client = get_transport().client()
+            async with client.stream(
+                "GET", url, timeout=self.timeout, follow_redirects=True
+            ) as response:
+                body, truncated = await html_extract.read_capped(
+                    response.aiter_bytes(), self.max_bytes
+                )
+                content = html_extract.decode_html(body, response.charset_encoding)
+
+            result = {
+                "url": str(response.url),
+                "status": response.status_code,
+                "content": content,
+            }
+            if truncated:
+                result["truncated"] = True
+
+            if extract_text and response.status_code == 200:
+                result["text"] = await html_extract.parse_html(
+                    html_extract.extract_text, content
+                )
+
+            return result
 
         except httpx.TimeoutException:
             return {"url": url, "status": 0, "error": "Request timed out"}
@@ -96,24 +110,7 @@ class WebFetchTool:
         Returns:
             Cleaned text content
         """
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-
-            # Remove script and style elements
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
-
-            # Get text
-            text = soup.get_text(separator="\n", strip=True)
-
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            text = "\n".join(line for line in lines if line)
-
-            return text
-
-        except Exception:
-            return html  # Return raw HTML if parsing fails
+        return html_extract.extract_text(html)
 
 
 # Utility functions for convenience
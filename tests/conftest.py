@@ -4,6 +4,9 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from dataclasses import dataclass
 
+from penguincode_cli.agents.base import BaseAgent
+from penguincode_cli.ollama.types import ChatResponse, Message
+
 
 # ============================================================================
 # Common Mock Response Types
@@ -67,6 +70,49 @@ def mock_code_generator():
     return generator
 
 
+# ============================================================================
+# Ollama and Agent Fakes
+# ============================================================================
+
+class ScriptedOllama:
+    """
+    Ollama client stand-in that replies from a script and records each chat call.
+
+    A reply is the text, a ``(text, tool_calls)`` pair, a ChatResponse, or
+    a callable taking the recorded request and returning one of those.
+    Once the script runs out every call gets ``default``.
+    """
+
+    def __init__(self, *replies, default="done", context_length=32768):
+        self.replies = list(replies)
+        self.default = default
+        self.context_length = context_length
+        self.requests = []  # model, messages, tools and options/format of each call
+
+    async def show_model(self, name):
+        return {"model_info": {"general.architecture": "llama",
+                               "llama.context_length": self.context_length}}
+
+    async def chat(self, model, messages, tools=None, stream=True, **kwargs):
+        request = {"model": model, "messages": list(messages), "tools": tools, **kwargs}
+        self.requests.append(request)
+        reply = self.replies.pop(0) if self.replies else self.default
+        if callable(reply):
+            reply = reply(request)
+        if not isinstance(reply, ChatResponse):
+            text, calls = (reply, None) if isinstance(reply, str) else reply
+            message = Message(role="assistant", content=text, tool_calls=calls or None)
+            reply = ChatResponse(model=model, created_at="", message=message, done=True)
+        yield reply
+
+
+class LoopAgent(BaseAgent):
+    """Agent whose run() is just the agentic loop."""
+
+    async def run(self, task, **kwargs):
+        return await self.agentic_loop(task)
+
+
 # ============================================================================
 # Orchestrator Fixtures
 # ============================================================================
@@ -0,0 +1,70 @@
+"""Tests for the streaming chat decode path and the reply accumulator."""
+
+import json
+
+import pytest
+
+from penguincode_cli.ollama import ChatAccumulator, accumulate
+from penguincode_cli.ollama.client import OllamaClient, _decode_chat, _ndjson
+from penguincode_cli.ollama.types import ChatRequest, ChatResponse, Message, ToolCall
+
+
+async def byte_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_ndjson_lines_span_reads():
+    stream = byte_chunks(b'{"a": 1}\n{"b"', b': 2}\n\n{"c": ', b"3}")
+
+    assert [data async for data in _ndjson(stream)] == [{"a": 1}, {"b": 2}, {"c": 3}]
+
+
+def test_decode_token_and_done_chunks():
+    token = _decode_chat({"model": "m", "created_at": "t", "done": False,
+                          "message": {"role": "assistant", "content": "hi"}})
+    done = _decode_chat({"model": "m", "created_at": "t", "done": True, "eval_count": 7,
+                         "prompt_eval_count": 3, "new_server_field": 1,
+                         "message": {"role": "assistant", "content": "",
+                                     "tool_calls": [{"function": {"name": "read"}}]}})
+
+    assert token.message.content == "hi" and token.eval_count is None
+    assert done.done and done.eval_count == 7 and done.prompt_eval_count == 3
+    assert done.message.tool_calls == [ToolCall({"name": "read"})]
+    with pytest.raises(RuntimeError, match="model not found"):
+        _decode_chat({"error": "model not found"})
+
+
+def chunk(content="", done=False, tool_calls=None, **counters):
+    return ChatResponse(model="m", created_at="", done=done, **counters,
+                        message=Message(role="assistant", content=content, tool_calls=tool_calls))
+
+
+async def test_accumulator_joins_text_tool_calls_and_usage():
+    reply = await accumulate(byte_chunks(
+        chunk("Hel"),
+        chunk("lo", tool_calls=[ToolCall({"name": "read", "arguments": {"path": "a"}})]),
+        chunk(done=True, prompt_eval_count=10, eval_count=2, eval_duration=2_000_000_000),
+    ))
+
+    assert reply.text == "Hello" and reply.length == 5 and reply.done
+    assert reply.tool_calls == [{"name": "read", "arguments": {"path": "a"}}]
+    assert reply.usage.total_tokens == 12 and reply.usage.tokens_per_second == 1.0
+
+
+def test_accumulator_text_is_readable_mid_stream():
+    reply = ChatAccumulator()
+
+    assert reply.add(chunk("ab")) == "ab" and reply.text == "ab"
+    reply.add(chunk("cd"))
+    assert reply.text == "abcd" and not reply.done
+
+
+def test_slotted_messages_still_serialize():
+    request = ChatRequest(model="m", messages=[Message(role="user", content="hi")], tools=[{"type": "function"}])
+
+    assert not hasattr(request.messages[0], "__dict__")
+    assert json.loads(json.dumps(OllamaClient._to_dict(request))) == {
+        "model": "m", "messages": [{"role": "user", "content": "hi"}],
+        "stream": True, "tools": [{"type": "function"}],
+    }
@@ -0,0 +1,129 @@
+"""Tests for ChatAgent's event stream and its forwarding over gRPC."""
+
+import asyncio
+
+from penguincode_cli.agents import AgentResult, ChatAgent
+from penguincode_cli.agents.events import (
+    AgentResultEvent,
+    AgentSpawnEvent,
+    StatusEvent,
+    TextDeltaEvent,
+    coalesce_text,
+)
+from penguincode_cli.config.settings import Settings
+from penguincode_cli.ollama.types import ChatResponse, Message
+from penguincode_cli.proto import ChatRequest
+from penguincode_cli.server.services.chat import ChatServiceImpl, SessionState
+
+
+def chunk(content: str, done: bool = False) -> ChatResponse:
+    return ChatResponse(
+        model="m", created_at="", message=Message(role="assistant", content=content), done=done
+    )
+
+
+class ScriptedClient:
+    """Streams one scripted reply (a list of tokens) per chat call."""
+
+    def __init__(self, *replies, gate: asyncio.Event = None):
+        self.replies = list(replies)
+        self.gate = gate
+        self.tokens_sent = 0
+
+    async def chat(self, model, messages, stream=True, tools=None, **kwargs):
+        tokens = self.replies.pop(0)
+        for i, token in enumerate(tokens):
+            if i == 1 and self.gate is not None:
+                await self.gate.wait()
+            self.tokens_sent += 1
+            yield chunk(token)
+        yield chunk("", done=True)
+
+
+class FakeExplorer:
+    async def run(self, task):
+        return AgentResult(agent_name="explorer", success=True, output=f"found: {task}", duration_ms=5)
+
+
+def make_agent(client) -> ChatAgent:
+    agent = ChatAgent(ollama_client=client, settings=Settings(), project_dir="/tmp")
+    agent._get_explorer_agent = lambda lite=False: FakeExplorer()
+    return agent
+
+
+async def test_direct_answer_streams_before_turn_completes():
+    """The first delta arrives while the model is still generating."""
+    gate = asyncio.Event()
+    agent = make_agent(ScriptedClient(["Hello", " there", " friend"], gate=gate))
+
+    stream = agent.process_stream("hi")
+    events = [await stream.__anext__()]
+    while not isinstance(events[-1], TextDeltaEvent):
+        events.append(await stream.__anext__())
+    assert events[-1].content == "Hello" and not events[-1].is_final
+
+    gate.set()
+    events += [event async for event in stream]
+    text = "".join(e.content for e in events if isinstance(e, TextDeltaEvent) and not e.is_final)
+    assert text == "Hello there friend"
+    assert events[-1] == TextDeltaEvent("Hello there friend", is_final=True)
+    assert isinstance(events[0], StatusEvent)
+
+
+async def test_tool_call_json_is_not_streamed_and_agents_reported():
+    """Routing JSON stays hidden; spawn/result events precede the reviewed answer."""
+    client = ScriptedClient(
+        ['{"name": "spawn_explorer", ', '"arguments": {"task": "find x"}}'],
+        ["x is in ", "a.py"],
+    )
+    agent = make_agent(client)
+
+    events = [event async for event in agent.process_stream("where is x?")]
+
+    deltas = [e.content for e in events if isinstance(e, TextDeltaEvent) and not e.is_final]
+    assert "".join(deltas) == "x is in a.py"
+    kinds = [type(e).__name__ for e in events if not isinstance(e, StatusEvent)]
+    assert kinds[:2] == ["AgentSpawnEvent", "AgentResultEvent"]
+    assert events[-1] == TextDeltaEvent("x is in a.py", is_final=True)
+    spawn = next(e for e in events if isinstance(e, AgentSpawnEvent))
+    assert spawn.task == "find x"
+
+
+async def test_slow_consumer_applies_backpressure():
+    """An unread stream pauses generation at the queue bound."""
+    agent = make_agent(ScriptedClient([f"tok{i} " for i in range(500)]))
+    stream = agent.process_stream("talk")
+    await stream.__anext__()
+
+    await asyncio.sleep(0.05)
+    # One coalesced batch held by the consumer plus a full queue
+    assert agent.client.tokens_sent <= 2 * agent.EVENT_QUEUE_SIZE + 5
+
+    await stream.aclose()  # Abandoning the stream cancels the turn
+    assert agent._events is None
+
+
+def test_coalesce_text():
+    events = [TextDeltaEvent("a"), TextDeltaEvent("b"), StatusEvent("x"), TextDeltaEvent("c"),
+              TextDeltaEvent("abc", is_final=True), None]
+    assert coalesce_text(events) == [
+        TextDeltaEvent("ab"), StatusEvent("x"), TextDeltaEvent("c"),
+        TextDeltaEvent("abc", is_final=True), None,
+    ]
+
+
+async def test_chat_rpc_forwards_events_incrementally():
+    client = ScriptedClient(
+        ['{"name": "spawn_explorer", "arguments": {"task": "find x"}}'],
+        ["Done."],
+    )
+    service = ChatServiceImpl(Settings())
+    service.sessions["s"] = SessionState("s", "/tmp", make_agent(client), [])
+
+    responses = [r async for r in service.Chat(ChatRequest(session_id="s", message="find x"), None)]
+
+    kinds = [r.WhichOneof("response_type") for r in responses]
+    assert kinds[0] == "status"
+    assert kinds.index("agent_spawn") < kinds.index("agent_result") < len(kinds) - 1
+    assert responses[kinds.index("agent_result")].agent_result.output == "found: find x"
+    assert responses[-1].text.is_final and responses[-1].text.content == "Done."
@@ -0,0 +1,125 @@
+"""Tests for code index module - trigram extraction, CodeIndex, indexed grep/glob."""
+
+import os
+
+import pytest
+
+from penguincode_cli.tools.code_index import CodeIndex, glob_to_regex, regex_trigrams
+from penguincode_cli.tools.file_ops import GlobTool, GrepTool
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Small project tree with an ignored directory."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("def handle_request(req):\n    return Response(req)\n")
+    (tmp_path / "src" / "util.py").write_text("def slugify(text):\n    return text.lower()\n")
+    (tmp_path / "README.md").write_text("# Demo\nCall handle_request to start.\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("handle_request()\n")
+    return tmp_path
+
+
+def test_regex_trigrams_literals():
+    """Literal runs become required trigrams; short runs require nothing."""
+    assert regex_trigrams("handle") == [{b"han", b"and", b"ndl", b"dle"}]
+    assert regex_trigrams("a.b") is None
+    assert regex_trigrams(r"foo\.bar") == [{b"foo", b"oo.", b"o.b", b".ba", b"bar"}]
+
+
+def test_regex_trigrams_alternation_and_case():
+    """Alternation yields alternatives; literals are lower-cased."""
+    alts = regex_trigrams("Foo|bar")
+    assert alts == [{b"foo"}, {b"bar"}]
+    assert regex_trigrams("(?i)ABC") == [{b"abc"}]
+    # A branch without trigrams can't narrow anything
+    assert regex_trigrams("foo|x") is None
+
+
+def test_glob_to_regex():
+    """Globs support ** across directories and * within one."""
+    regex = glob_to_regex("**/*.py")
+    assert regex.match("a.py")
+    assert regex.match("src/pkg/a.py")
+    assert not regex.match("src/a.pyc")
+    assert not glob_to_regex("*.py").match("src/a.py")
+
+
+def test_candidates_prune_and_persist(project):
+    """Only files with matching trigrams are candidates; the index persists."""
+    index = CodeIndex(str(project))
+
+    candidates, total = index.candidates("handle_request")
+    names = sorted(p.name for p in candidates)
+
+    assert total == 3  # node_modules is ignored
+    assert names == ["README.md", "app.py"]
+    assert (project / ".penguincode" / "code_index.db").exists()
+
+    reloaded = CodeIndex(str(project))
+    stats = reloaded.refresh()
+    assert stats["files"] == 3
+    assert stats["added"] == 0 and stats["updated"] == 0
+
+
+def test_incremental_refresh(project):
+    """Changed, added and removed files are picked up on refresh."""
+    index = CodeIndex(str(project))
+    index.refresh()
+
+    util = project / "src" / "util.py"
+    util.write_text("def handle_request_v2(): pass\n")
+    os.utime(util, ns=(1, 1))
+    (project / "src" / "new.py").write_text("x = 1\n")
+    (project / "README.md").unlink()
+
+    stats = index.refresh()
+    assert stats == {"added": 1, "updated": 1, "removed": 1, "files": 3}
+
+    candidates, _ = index.candidates("handle_request")
+    assert sorted(p.name for p in candidates) == ["app.py", "util.py"]
+
+
+async def test_grep_tool_uses_index(project):
+    """GrepTool results are the same with the index, with fewer files scanned."""
+    indexed = await GrepTool(index_root=str(project)).execute("handle_request", path=str(project))
+    full = await GrepTool().execute("handle_request", path=str(project))
+
+    assert indexed.success
+    assert indexed.metadata["indexed"] is True
+    assert indexed.metadata["files_searched"] == 2
+    assert sorted(indexed.data.splitlines()) == sorted(
+        line for line in full.data.splitlines() if "node_modules" not in line
+    )
+
+
+async def test_grep_tool_sees_tool_writes(project):
+    """Writes through other tools invalidate the index immediately."""
+    from penguincode_cli.tools.file_ops import WriteFileTool
+
+    grep = GrepTool(index_root=str(project))
+    await grep.execute("brand_new_symbol", path=str(project))
+    await WriteFileTool().execute(str(project / "src" / "fresh.py"), "brand_new_symbol = 1\n")
+
+    result = await grep.execute("brand_new_symbol", path=str(project))
+    assert "fresh.py:1" in result.data
+
+
+async def test_glob_tool_uses_index(project):
+    """GlobTool matches against the index file list relative to the base path."""
+    result = await GlobTool(index_root=str(project)).execute("**/*.py", path=str(project / "src"))
+
+    assert sorted(result.data.splitlines()) == ["app.py", "util.py"]
+
+
+async def test_binary_files_are_globbed_but_not_grepped(project):
+    """Binary extensions stay in the file list for glob; grep never opens them."""
+    (project / "img").mkdir()
+    (project / "img" / "a.png").write_bytes(b"\x89PNG handle_request")
+    (project / "c.pdf").write_bytes(b"%PDF handle_request")
+    glob = GlobTool(index_root=str(project))
+
+    assert (await glob.execute("**/*.png", path=str(project))).data == "img/a.png"
+    assert (await glob.execute("*.pdf", path=str(project))).data == "c.pdf"
+    files, _ = CodeIndex(str(project)).candidates("handle_request")
+    assert sorted(f.relative_to(project).as_posix() for f in files) == ["README.md", "src/app.py"]
@@ -0,0 +1,96 @@
+"""Tests for the markdown-aware docs chunker."""
+
+from penguincode_cli.docs_rag.chunker import MarkdownChunker, TokenCounter, source_url
+
+PAGE = """# Source: https://docs.example.dev/guide
+
+# Guide
+
+Intro paragraph about the library.
+
+## Install
+
+Install it with pip:
+
+```
+pip install example
+pip install example[extras]
+```
+
+## Usage
+
+""" + "\n".join(f"- step {i}: call example.run() with option {i}" for i in range(40)) + """
+
+### Advanced
+
+Short note.
+"""
+
+
+def make_chunker(chunk_tokens=80) -> MarkdownChunker:
+    return MarkdownChunker(TokenCounter("test-model", use_tokenizer=False), chunk_tokens=chunk_tokens)
+
+
+def test_code_fences_and_headings_kept_intact():
+    """Fences and headings survive chunking verbatim."""
+    chunks = make_chunker().chunk(PAGE)
+    text = "\n".join(c.text for c in chunks)
+
+    assert "```\npip install example\npip install example[extras]\n```" in text
+    assert chunks[0].text.startswith("# Guide")
+    assert "# Source:" not in text
+    assert all(c.text.count("```") % 2 == 0 for c in chunks)
+
+
+def test_sections_and_token_limits():
+    """Chunks carry their section path and respect the token budget."""
+    chunker = make_chunker()
+    chunks = chunker.chunk(PAGE)
+
+    assert chunks[0].section == "Guide"
+    usage = [c for c in chunks if c.section == "Guide > Usage"]
+    assert len(usage) > 1
+    # Continuation chunks repeat the section heading
+    assert all(c.text.startswith("## Usage") for c in usage)
+    assert "### Advanced\n\nShort note." in chunks[-1].text  # Tiny section merged
+    assert all(c.tokens <= chunker.max_tokens for c in chunks)
+
+
+def test_fewer_chunks_than_word_windows():
+    """Small sections merge instead of producing one chunk each."""
+    page = "\n\n".join(f"## Topic {i}\n\nOne line about topic {i}." for i in range(30))
+    chunks = make_chunker(chunk_tokens=200).chunk(page)
+
+    assert len(chunks) < 10
+
+
+def test_source_url():
+    assert source_url(PAGE) == "https://docs.example.dev/guide"
+    assert source_url("# Title\n\ntext") == ""
+
+
+def test_split_code_blocks_are_refenced():
+    """Every piece of an oversized code block is a complete fence."""
+    code = "\n".join(f"    result_{i} = compute(value_{i}, option={i})" for i in range(60))
+    page = f"## Example\n\n```python\n{code}\n```\n"
+    chunker = make_chunker(chunk_tokens=120)
+    chunks = chunker.chunk(page)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        body = chunk.text.split("\n", 1)[1] if chunk.text.startswith("## ") else chunk.text
+        assert body.strip().startswith("```python") and body.rstrip().endswith("```")
+        assert chunk.tokens <= chunker.max_tokens
+    assert all(f"result_{i} =" in "\n".join(c.text for c in chunks) for i in range(60))
+
+
+def test_tokenizer_loads_on_first_use(monkeypatch):
+    from penguincode_cli.docs_rag import chunker
+
+    loads = []
+    monkeypatch.setattr(chunker, "_load_tokenizer", lambda model: loads.append(model))
+    counter = TokenCounter("nomic-embed-text")
+    assert loads == []
+
+    counter.count("hello world")
+    assert not counter.exact and loads == ["nomic-embed-text"]
@@ -0,0 +1,172 @@
+"""Tests for the documentation crawler against a local fixture site."""
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from penguincode_cli.docs_rag import DocumentationFetcher, HostRateLimiter
+from penguincode_cli.docs_rag.sources import DocSource
+
+TEXT = "Some documentation text. " * 20
+
+
+def page(title: str, links=()) -> str:
+    nav = "".join(f'<a href="{href}">{href}</a>' for href in links)
+    return (
+        f"<html><body><nav>{nav}</nav><main><h1>{title}</h1><p>{TEXT}</p></main></body></html>"
+    )
+
+
+class DocsSite:
+    """Fixture docs site under /docs/ with a sitemap and robots.txt."""
+
+    def __init__(self, pages: int = 12, latency: float = 0.02):
+        self.latency = latency
+        self.hits = []
+        self.times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.robots = "User-agent: *\nDisallow: /docs/private/\n"
+        self.pages = {
+            "/docs/": page("Index", [
+                "intro.html", "api/", "private/secret.html", "/blog/post.html",
+                "https://elsewhere.example/docs/x.html", "intro.html#usage", "logo.png",
+            ]),
+            "/docs/intro.html": page("Intro", ["p0.html"]),
+            "/docs/api/": page("API", ["../intro.html"]),
+            "/docs/private/secret.html": page("Secret"),
+            "/docs/linkonly.html": "<html><body><a href='/docs/p1.html'>next</a></body></html>",
+            "/docs/from-sitemap.html": page("Sitemap"),
+            "/blog/post.html": page("Blog"),
+        }
+        for i in range(pages):
+            self.pages[f"/docs/p{i}.html"] = page(f"Page {i}", [f"p{i + 1}.html"])
+
+    async def handle(self, request):
+        path = request.path
+        if path == "/robots.txt":
+            return web.Response(text=self.robots)
+        if path == "/docs/sitemap.xml":
+            base = f"{request.scheme}://{request.host}"
+            return web.Response(
+                text=f"<urlset><url><loc>{base}/docs/from-sitemap.html</loc></url>"
+                f"<url><loc>{base}/docs/linkonly.html</loc></url></urlset>",
+                content_type="application/xml",
+            )
+        if path not in self.pages:
+            return web.Response(status=404)
+        self.hits.append(path)
+        self.times.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return web.Response(text=self.pages[path], content_type="text/html")
+
+
+@pytest.fixture
+async def site():
+    docs_site = DocsSite()
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", docs_site.handle)
+    server = TestServer(app)
+    await server.start_server()
+    docs_site.base = str(server.make_url("/docs/"))
+    yield docs_site
+    await server.close()
+
+
+@pytest.fixture
+async def make_fetcher(tmp_path):
+    fetchers = []
+
+    def factory(**kwargs):
+        kwargs.setdefault("crawl_delay_ms", 0)
+        fetcher = DocumentationFetcher(cache_dir=str(tmp_path / "cache"), **kwargs)
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield factory
+    for fetcher in fetchers:
+        await fetcher.close()
+
+
+async def crawl(fetcher, site, **source):
+    source.setdefault("sitemap_url", site.base + "sitemap.xml")
+    return await fetcher._fetch_docs_from_source(
+        DocSource(base_url=site.base, **source), "demo", "python"
+    )
+
+
+async def test_crawl_follows_sitemap_and_in_scope_links(site, make_fetcher):
+    """Seeds, sitemap URLs and in-scope links are crawled; others are not."""
+    fetcher = make_fetcher(max_pages_per_library=100)
+
+    docs = await crawl(fetcher, site, api_docs_path="api/")
+
+    assert docs[0].startswith(f"# Source: {site.base}")
+    assert "# API" in docs[1]  # Seeds first
+    assert "# Sitemap" in docs[2]  # Then sitemap entries
+    assert len(docs) == len(set(docs)) == 16  # Index, API, sitemap, intro, p0..p11
+    assert "/docs/p11.html" in site.hits
+    assert "/docs/linkonly.html" in site.hits  # Fetched for its links, not collected
+    assert "/docs/private/secret.html" not in site.hits  # robots.txt
+    assert "/blog/post.html" not in site.hits  # Outside the base path
+    assert site.hits.count("/docs/intro.html") == 1  # Fragments dropped
+
+
+async def test_crawl_stops_at_max_pages_with_bounded_concurrency(site, make_fetcher):
+    """No more than max_pages pages are fetched, at most crawl_concurrency at once."""
+    fetcher = make_fetcher(max_pages_per_library=5, crawl_concurrency=2)
+
+    docs = await crawl(fetcher, site)
+
+    assert len(docs) == 5
+    assert len(site.hits) <= 6  # linkonly.html yields no page
+    assert site.max_in_flight <= 2
+
+
+async def test_requests_to_a_host_are_spaced(site, make_fetcher):
+    """The per-host delay spaces request starts even with spare concurrency."""
+    fetcher = make_fetcher(max_pages_per_library=4, crawl_delay_ms=50, crawl_concurrency=4)
+
+    await crawl(fetcher, site, sitemap_url=None)
+
+    gaps = [b - a for a, b in zip(site.times, site.times[1:])]
+    assert len(site.times) == 4
+    assert min(gaps) >= 0.045
+
+
+async def test_robots_crawl_delay_raises_interval(site, make_fetcher):
+    site.robots = "User-agent: *\nCrawl-delay: 1\n"
+    fetcher = make_fetcher(max_pages_per_library=2)
+
+    await crawl(fetcher, site, sitemap_url=None)
+
+    assert len(site.times) == 2
+    assert site.times[1] - site.times[0] >= 0.95
+
+
+async def test_cached_pages_still_feed_links(site, make_fetcher):
+    """A second crawl is served from cache, including link discovery."""
+    fetcher = make_fetcher(max_pages_per_library=100)
+    first = await crawl(fetcher, site)
+    site.hits.clear()
+
+    second = await crawl(fetcher, site)
+
+    assert sorted(second) == sorted(first)
+    assert site.hits == ["/docs/linkonly.html"]  # Had no content, so never cached
+
+
+async def test_host_rate_limiter_reserves_slots():
+    limiter = HostRateLimiter(0.05)
+    start = time.monotonic()
+
+    await asyncio.gather(*(limiter.wait("http://a.example/x") for _ in range(3)))
+    await limiter.wait("http://b.example/x")  # Other hosts are not delayed
+
+    assert 0.09 <= time.monotonic() - start < 0.2
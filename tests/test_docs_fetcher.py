@@ -0,0 +1,97 @@
+"""Tests for documentation fetcher caching and conditional revalidation."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from penguincode_cli.docs_rag import DocumentationFetcher
+from penguincode_cli.docs_rag.sources import DocSource
+
+PAGE = "<html><body><main><h1>Guide</h1><p>" + "Some documentation text. " * 20 + "</p></main></body></html>"
+
+
+class DocsSite:
+    """Serves one page with an ETag and honours If-None-Match."""
+
+    def __init__(self):
+        self.body = PAGE
+        self.etag = '"v1"'
+        self.requests = []
+
+    async def page(self, request):
+        self.requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304)
+        return web.Response(text=self.body, content_type="text/html", headers={"ETag": self.etag})
+
+
+@pytest.fixture
+async def site():
+    docs_site = DocsSite()
+    app = web.Application()
+    app.router.add_get("/", docs_site.page)
+    server = TestServer(app)
+    await server.start_server()
+    docs_site.url = str(server.make_url("/"))
+    yield docs_site
+    await server.close()
+
+
+def expire_all(fetcher: DocumentationFetcher) -> None:
+    old = (datetime.now() - timedelta(days=30)).isoformat()
+    for entry in fetcher.cache_index.values():
+        entry.fetch_time = old
+
+
+async def fetch(fetcher, site):
+    return await fetcher._fetch_docs_from_source(DocSource(base_url=site.url), "demo", "python")
+
+
+async def test_expired_page_revalidated_not_modified(site, tmp_path):
+    """An expired page is revalidated with its ETag; a 304 renews the TTL."""
+    fetcher = DocumentationFetcher(cache_dir=str(tmp_path))
+    first = await fetch(fetcher, site)
+    expire_all(fetcher)
+
+    second = await fetch(fetcher, site)
+
+    assert second == first
+    assert site.requests == [None, '"v1"']
+    assert fetcher.revalidation_stats["not_modified"] == 1
+    assert fetcher.is_cache_valid(site.url)
+
+    # Entries (with their ETag) persist across instances
+    reloaded = DocumentationFetcher(cache_dir=str(tmp_path))
+    assert next(iter(reloaded.cache_index.values())).etag == '"v1"'
+
+
+async def test_expired_page_changed(site, tmp_path):
+    """A changed page replaces the cached copy."""
+    fetcher = DocumentationFetcher(cache_dir=str(tmp_path))
+    await fetch(fetcher, site)
+    expire_all(fetcher)
+    site.etag = '"v2"'
+    site.body = PAGE.replace("Guide", "New Guide")
+
+    docs = await fetch(fetcher, site)
+
+    assert "New Guide" in docs[0]
+    assert fetcher.revalidation_stats["changed"] == 1
+
+
+async def test_expunge_keeps_recently_expired(tmp_path):
+    """Entries within the grace period are kept for revalidation."""
+    fetcher = DocumentationFetcher(cache_dir=str(tmp_path), cache_max_age_days=7)
+    fetcher._cache_content("http://a/", "x" * 300, "demo", "python")
+    fetcher._cache_content("http://b/", "y" * 300, "demo", "python")
+    fetcher.cache_index[fetcher._get_cache_key("http://a/")].fetch_time = (
+        datetime.now() - timedelta(days=10)
+    ).isoformat()
+    fetcher.cache_index[fetcher._get_cache_key("http://b/")].fetch_time = (
+        datetime.now() - timedelta(days=40)
+    ).isoformat()
+
+    assert fetcher.expunge_expired(grace_days=21) == 1
+    assert fetcher.get_stale_entry("http://a/") is not None
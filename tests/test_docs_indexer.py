@@ -0,0 +1,268 @@
+"""Tests for the documentation indexer's batched embedding pipeline."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from penguincode_cli.docs_rag import DocumentationIndexer, Language, Library
+from penguincode_cli.ollama.embedding_cache import EmbeddingCache
+
+
+class FakeCollection:
+    """In-memory stand-in for a ChromaDB collection, recording writes."""
+
+    def __init__(self):
+        self.rows = {}
+        self.adds = []
+        self.deletes = []
+        self.updates = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        assert len(ids) == len(set(ids)) == len(embeddings) == len(documents)
+        self.adds.append(ids)
+        for cid, document, metadata in zip(ids, documents, metadatas):
+            self.rows[cid] = (document, metadata)
+
+    def get(self, where, include=None):
+        ids = [cid for cid, (_, meta) in self.rows.items() if meta["library"] == where["library"]]
+        return {"ids": ids, "metadatas": [dict(self.rows[cid][1]) for cid in ids]}
+
+    def update(self, ids, metadatas):
+        self.updates.append(ids)
+        for cid, metadata in zip(ids, metadatas):
+            self.rows[cid] = (self.rows[cid][0], metadata)
+
+    def delete(self, ids):
+        self.deletes.append(ids)
+        for cid in ids:
+            self.rows.pop(cid, None)
+
+
+class FakeOllama:
+    """Minimal embed server tracking batch sizes and concurrency."""
+
+    def __init__(self, batch_endpoint=True, status=200):
+        self.batch_endpoint = batch_endpoint
+        self.status = status
+        self.batches = []
+        self.legacy_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        if self.batch_endpoint:
+            app.router.add_post("/api/embed", self.embed)
+        app.router.add_post("/api/embeddings", self.embeddings)
+        return app
+
+    async def embed(self, request):
+        body = await request.json()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.status != 200:
+            return web.json_response({"error": "boom"}, status=self.status)
+        self.batches.append(len(body["input"]))
+        return web.json_response({"embeddings": [[0.1, 0.2] for _ in body["input"]]})
+
+    async def embeddings(self, request):
+        self.legacy_calls += 1
+        return web.json_response({"embedding": [0.1, 0.2]})
+
+
+@pytest.fixture
+async def make_indexer(tmp_path):
+    """Start a fake Ollama and build an indexer pointed at it."""
+    servers = []
+    indexers = []
+
+    async def factory(ollama, **kwargs):
+        server = TestServer(ollama.app())
+        await server.start_server()
+        servers.append(server)
+        indexer = DocumentationIndexer(
+            persist_directory=str(tmp_path / "index"),
+            ollama_base_url=str(server.make_url("")).rstrip("/"),
+            chunk_tokens=64,
+            **kwargs,
+        )
+        indexer._collection = FakeCollection()
+        indexer.token_counter.calibrate(4, 1)  # Skip the calibration probe
+        indexers.append(indexer)
+        return indexer
+
+    yield factory
+    for indexer in indexers:
+        await indexer.close()
+    for server in servers:
+        await server.close()
+
+
+def docs(count: int) -> list:
+    """Documents that chunk into ``count`` distinct chunks (10 words each)."""
+    return [" ".join(f"doc{i}word{j}" for j in range(10)) for i in range(count)]
+
+
+async def test_index_library_batches_and_bulk_adds(make_indexer):
+    """Chunks are embedded in batches with bounded concurrency and added in bulk."""
+    ollama = FakeOllama()
+    indexer = await make_indexer(ollama, embed_batch_size=8, embed_concurrency=2)
+
+    stored = await indexer.index_library(Library("demo", Language.PYTHON), docs(20))
+
+    assert stored == 20
+    assert sorted(ollama.batches) == [4, 8, 8]
+    assert ollama.max_in_flight <= 2
+    assert sorted(len(ids) for ids in indexer._collection.adds) == [4, 8, 8]
+    assert indexer.last_index_stats["batches"] == 3
+    assert indexer.last_index_stats["chunks_per_sec"] > 0
+    assert indexer.index_metadata["libraries"]["demo"]["chunk_count"] == 20
+
+
+async def test_duplicate_chunks_added_once(make_indexer):
+    """Identical chunks share an ID and are only embedded once."""
+    ollama = FakeOllama()
+    indexer = await make_indexer(ollama)
+
+    stored = await indexer.index_language(Language.GO, docs(3) + docs(3))
+
+    assert stored == 3
+    assert ollama.batches == [3]
+
+
+async def test_falls_back_to_legacy_endpoint(make_indexer):
+    """Servers without /api/embed are embedded one text at a time."""
+    ollama = FakeOllama(batch_endpoint=False)
+    indexer = await make_indexer(ollama)
+
+    stored = await indexer.index_library(Library("old", Language.PYTHON), docs(5))
+
+    assert stored == 5
+    assert ollama.legacy_calls == 5
+    assert indexer._batch_endpoint is False
+
+
+async def test_embedding_errors_are_counted(make_indexer, capsys):
+    """Failed batches are reported once and not stored."""
+    ollama = FakeOllama(status=500)
+    indexer = await make_indexer(ollama, embed_batch_size=2)
+
+    stored = await indexer.index_library(Library("bad", Language.PYTHON), docs(4))
+
+    assert stored == 0
+    assert indexer.last_index_stats["failed"] == 4
+    assert capsys.readouterr().err.count("Embedding error") == 1
+
+
+async def test_reindex_uses_embedding_cache(make_indexer, tmp_path):
+    """Unchanged chunks and repeated queries are not re-embedded."""
+    ollama = FakeOllama()
+    cache = EmbeddingCache(str(tmp_path / "emb.db"))
+    indexer = await make_indexer(ollama, embedding_cache=cache, embed_batch_size=4)
+    library = Library("demo", Language.PYTHON)
+
+    await indexer.index_library(library, docs(6))
+    indexer._collection = FakeCollection()  # Collection lost; cache survives
+    stored = await indexer.index_library(library, docs(8), force_reindex=True)
+
+    assert stored == 8
+    assert sorted(ollama.batches) == [2, 2, 4]
+    assert indexer.last_index_stats["cache_hits"] == 6
+
+    await indexer._get_embedding("query")
+    await indexer._get_embedding("query")
+    assert cache.get_stats()["by_model"]["nomic-embed-text"]["hits"] >= 7
+
+
+def test_chunk_ids_survive_insertions(tmp_path):
+    """Inserting a paragraph only changes the chunks around it."""
+    indexer = DocumentationIndexer(
+        persist_directory=str(tmp_path), chunk_tokens=25, chunk_overlap_tokens=0
+    )
+    words = [f"w{i}" for i in range(2000)]
+    original = " ".join(words)
+    edited = " ".join(words[:1000] + ["an", "inserted", "paragraph", "here"] + words[1000:])
+
+    before = {c.chunk_id for c in indexer._chunk_text(original, {"library": "x"})}
+    after = {c.chunk_id for c in indexer._chunk_text(edited, {"library": "x"})}
+
+    assert len(before) > 50
+    assert len(before - after) <= 2
+    assert len(after - before) <= 2
+
+
+async def test_reindex_diffs_changed_chunks(make_indexer):
+    """Reindexing only embeds new chunks and deletes vanished ones."""
+    ollama = FakeOllama()
+    indexer = await make_indexer(ollama)
+    library = Library("demo", Language.PYTHON)
+
+    await indexer.index_library(library, docs(6))
+    ollama.batches.clear()
+    stored = await indexer.index_library(library, docs(6)[1:] + ["brand new page content"], force_reindex=True)
+
+    assert stored == 6
+    assert ollama.batches == [1]
+    assert indexer.last_index_stats["unchanged"] == 5
+    assert indexer.last_index_stats["removed"] == 1
+    assert len(indexer._collection.rows) == 6
+
+
+async def test_reindex_refreshes_metadata_and_keeps_chunks_on_failure(make_indexer):
+    """Moved or re-versioned chunks get new metadata; a failed reindex deletes nothing."""
+    ollama = FakeOllama()
+    indexer = await make_indexer(ollama)
+
+    await indexer.index_library(Library("demo", Language.PYTHON, version="1.0"), docs(4))
+    await indexer.index_library(Library("demo", Language.PYTHON, version="2.0"), docs(4), force_reindex=True)
+
+    rows = indexer._collection.rows
+    assert {meta["version"] for _, meta in rows.values()} == {"2.0"}
+    assert indexer.last_index_stats["metadata_updated"] == 4 and ollama.batches == [4]
+
+    ollama.status = 500
+    await indexer.index_library(
+        Library("demo", Language.PYTHON, version="2.0"), docs(2) + ["a page that fails"], force_reindex=True
+    )
+
+    assert len(rows) == 4 and indexer._collection.deletes == []
+    assert indexer.last_index_stats["removed"] == 0
+    assert indexer.index_metadata["libraries"]["demo"]["chunk_count"] == 4  # Not stamped
+
+
+async def test_token_ratio_calibrated_and_persisted(tmp_path):
+    """Without a local tokenizer, Ollama's prompt_eval_count sets chars/token once."""
+    seen = []
+
+    async def embed(request):
+        texts = (await request.json())["input"]
+        seen.append(len(texts))
+        tokens = sum(len(t) for t in texts) // 3 + 2
+        return web.json_response(
+            {"embeddings": [[0.1] for _ in texts], "prompt_eval_count": tokens}
+        )
+
+    app = web.Application()
+    app.router.add_post("/api/embed", embed)
+    server = TestServer(app)
+    await server.start_server()
+    indexer = DocumentationIndexer(
+        embedding_model="custom-embed",
+        persist_directory=str(tmp_path),
+        ollama_base_url=str(server.make_url("")).rstrip("/"),
+    )
+    indexer._collection = FakeCollection()
+    try:
+        await indexer.index_language(Language.RUST, ["word " * 300])
+    finally:
+        await indexer.close()
+        await server.close()
+
+    assert seen[0] == 1  # The calibration probe
+    assert abs(indexer.token_counter.chars_per_token - 3.0) < 0.05
+    reloaded = DocumentationIndexer(embedding_model="custom-embed", persist_directory=str(tmp_path))
+    assert reloaded.token_counter.calibrated
@@ -0,0 +1,75 @@
+"""Tests for the content-addressed embedding cache."""
+
+import time
+
+from penguincode_cli.ollama.embedding_cache import CachedEmbedder, EmbeddingCache
+
+
+class CountingEmbedder:
+    """mem0-style embedder that counts texts it embeds."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, text, memory_action=None):
+        self.embedded.append(text)
+        return [float(len(text)), 0.5]
+
+    def embed_batch(self, texts, memory_action=None):
+        return [self.embed(t, memory_action) for t in texts]
+
+
+def test_get_put_roundtrip_and_metrics(tmp_path):
+    """Embeddings round-trip per model; hits and misses are counted."""
+    cache = EmbeddingCache(str(tmp_path / "emb.db"))
+
+    assert cache.get_many("m", ["a", "b"]) == [None, None]
+    cache.put_many("m", ["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    assert cache.get_many("m", ["b", "a", "c"]) == [[3.0, 4.0], [1.0, 2.0], None]
+    assert cache.get("other-model", "a") is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["entries"] == 2
+    assert stats["by_model"]["m"]["hit_rate"] == 0.4
+
+
+def test_persists_across_instances(tmp_path):
+    """A new cache on the same file sees earlier entries."""
+    path = str(tmp_path / "emb.db")
+    first = EmbeddingCache(path)
+    first.put("m", "hello", [0.25, 0.75])
+    first.close()
+
+    assert EmbeddingCache(path).get("m", "hello") == [0.25, 0.75]
+
+
+def test_lru_eviction(tmp_path):
+    """Least recently used entries are evicted past max_entries."""
+    cache = EmbeddingCache(str(tmp_path / "emb.db"), max_entries=20)
+    cache.put_many("m", [f"t{i}" for i in range(20)], [[float(i)] for i in range(20)])
+    time.sleep(0.01)
+    cache.get("m", "t0")  # Touch the oldest entry
+
+    cache.put("m", "new", [1.0])
+
+    assert len(cache) == 19
+    assert cache.get("m", "t0") == [0.0]
+    assert cache.get("m", "t1") is None
+    assert cache.get("m", "new") == [1.0]
+    assert cache.stats.evictions == 2
+
+
+def test_cached_embedder_wraps_mem0_embedder(tmp_path):
+    """Repeated mem0 embed calls are served from the cache."""
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, EmbeddingCache(str(tmp_path / "emb.db")), "m")
+
+    first = embedder.embed("remember this", "add")
+    again = embedder.embed("remember this", "search")
+    batch = embedder.embed_batch(["remember this", "new fact"])
+
+    assert first == again == batch[0]
+    assert inner.embedded == ["remember this", "new fact"]
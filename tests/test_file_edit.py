@@ -0,0 +1,116 @@
+"""Tests for atomic multi-edit and its use by both edit tool implementations."""
+
+import json
+import os
+
+import pytest
+
+from penguincode_cli.client import LocalToolExecutor
+from penguincode_cli.shared import file_edit
+from penguincode_cli.shared.file_edit import Edit, EditError, edit_file
+from penguincode_cli.tools import EditFileTool
+
+SOURCE = "".join(f"def f{i}():\n    return {i}\n\n" for i in range(200))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text(SOURCE)
+    return path
+
+
+def test_edits_apply_in_order_in_one_pass(source):
+    outcome = edit_file(source, [
+        Edit("return 1\n", "return 'one'\n"),
+        Edit("'one'", "'uno'"),
+        Edit("    return", "    yield", replace_all=True),
+    ])
+
+    text = source.read_text()
+    assert "    yield 'uno'\n" in text and "return" not in text
+    assert outcome.replacements == 202
+    assert outcome.diff.startswith(f"--- a/{source.name}\n+++ b/{source.name}\n")
+
+
+def test_diff_is_much_smaller_than_the_file(source):
+    outcome = edit_file(source, [Edit("def f100():", "def f_hundred():")])
+
+    assert len(outcome.diff) < len(SOURCE) / 20
+    assert "-def f100():\n+def f_hundred():" in outcome.diff
+
+
+def test_failed_edit_leaves_file_untouched(source):
+    with pytest.raises(EditError, match="Edit 2 of 2: Text not found"):
+        edit_file(source, [Edit("def f1():", "def g():"), Edit("missing", "x")])
+
+    assert source.read_text() == SOURCE
+    assert os.listdir(source.parent) == [source.name]
+
+
+def test_crash_during_write_keeps_original(source, monkeypatch):
+    def crash(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(file_edit.os, "replace", crash)
+
+    with pytest.raises(OSError):
+        edit_file(source, [Edit("def f1():", "def g():")])
+
+    assert source.read_text() == SOURCE
+    assert os.listdir(source.parent) == [source.name]  # Temp file removed
+
+
+def test_crlf_and_mode_are_preserved(tmp_path):
+    path = tmp_path / "script.sh"
+    path.write_bytes(b"echo one\r\necho two\r\n")
+    path.chmod(0o755)
+
+    edit_file(path, [Edit("one\necho two", "1\necho 2")])
+
+    assert path.read_bytes() == b"echo 1\r\necho 2\r\n"
+    assert path.stat().st_mode & 0o777 == 0o755
+
+
+def test_mixed_line_endings_are_kept_per_line(tmp_path):
+    path = tmp_path / "mixed.txt"
+    path.write_bytes(b"a\r\nb\nc\r\nd\ne\n")
+
+    outcome = edit_file(path, [Edit("c\nd", "C\nnew\nD")])
+
+    assert path.read_bytes() == b"a\r\nb\nC\r\nnew\r\nD\r\ne\n"
+    assert outcome.diff.endswith(" b\n-c\n-d\n+C\n+new\n+D\n e\n")  # Only the edited lines
+
+
+async def test_edit_tool_multi_edit(source):
+    result = await EditFileTool().execute(
+        str(source),
+        edits=[
+            {"old_text": "def f0():", "new_text": "def zero():"},
+            {"old_text": "return 0", "new_text": "return None"},
+        ],
+    )
+
+    assert result.success and result.metadata["edits"] == 2
+    assert result.data.startswith(f"Replaced 2 occurrence(s) in {source}\n---")
+    assert source.read_text().startswith("def zero():\n    return None\n")
+
+
+async def test_local_executor_uses_the_same_engine(source):
+    """Arguments as sent over the callback stream: strings and JSON-encoded lists."""
+    executor = LocalToolExecutor(working_dir=str(source.parent))
+
+    single = await executor.execute(
+        "edit", {"path": source.name, "old_text": "    return", "new_text": "    yield",
+                 "replace_all": "true"},
+    )
+    batch = await executor.execute(
+        "edit", {"path": source.name, "edits": json.dumps([
+            {"old_text": "def f0():", "new_text": "def zero():"},
+            {"old_text": "missing", "new_text": ""},
+        ])},
+    )
+
+    assert single.success and single.data.startswith("Replaced 200 occurrence(s)")
+    assert not batch.success and "Edit 2 of 2" in batch.error
+    assert source.read_text().startswith("def f0():\n    yield 0\n")
@@ -0,0 +1,94 @@
+"""Tests for per-role generation options sent with each Ollama call."""
+
+import pytest
+
+from penguincode_cli.agents import ChatAgent
+from penguincode_cli.agents.base import AgentConfig
+from penguincode_cli.config.settings import AgentConfig as AgentSettings
+from penguincode_cli.config.settings import DefaultsConfig, GenerationConfig, Settings
+from penguincode_cli.ollama import (
+    ROLE_AGENT,
+    ROLE_REVIEW,
+    ROLE_ROUTING,
+    ROLE_SUMMARY,
+    TokenBudget,
+    configure_generation,
+    get_generation,
+)
+from penguincode_cli.ollama.types import ChatResponse, Message
+from tests.conftest import LoopAgent, ScriptedOllama
+
+
+@pytest.fixture(autouse=True)
+def fresh_generation():
+    configure_generation(Settings())
+    TokenBudget.forget()
+    yield
+    configure_generation(Settings())
+    TokenBudget.forget()
+
+
+def stopped_at_num_predict(request):
+    """Reply cut off at the call's num_predict."""
+    options = request.get("options") or {}
+    return ChatResponse(model=request["model"], created_at="", done=True,
+                        message=Message(role="assistant", content="short summary"),
+                        done_reason="length", prompt_eval_count=40,
+                        eval_count=options.get("num_predict", 0))
+
+
+def test_options_resolve_defaults_role_agent_then_caller():
+    settings = Settings(
+        defaults=DefaultsConfig(temperature=0.6, max_tokens=3000),
+        generation=GenerationConfig(roles={ROLE_REVIEW: {"num_predict": 400, "top_p": 0.9}}),
+        agents={"executor": AgentSettings(model="m", description="", temperature=0.1)},
+    )
+    generation = configure_generation(settings)
+
+    assert generation.resolve(ROLE_AGENT) == {"temperature": 0.6, "num_predict": 3000}
+    assert generation.resolve(ROLE_REVIEW) == {"temperature": 0.6, "num_predict": 400, "top_p": 0.9}
+    assert generation.resolve(ROLE_AGENT, agent="executor")["temperature"] == 0.1
+    assert generation.resolve(ROLE_AGENT, agent="executor", temperature=0.3, num_predict=256) == {
+        "temperature": 0.3, "num_predict": 256,
+    }
+
+
+def test_num_ctx_fits_the_prompt_and_shrinks_after_a_run_of_smaller_calls():
+    generation = configure_generation(Settings(generation=GenerationConfig(num_ctx_shrink_after=3)))
+
+    def num_ctx(prompt_tokens, model="a"):
+        return generation.options(ROLE_ROUTING, model, prompt_tokens, window=16384)["num_ctx"]
+
+    assert num_ctx(500) == 2048
+    assert num_ctx(3000) == 4096
+    assert [num_ctx(500), num_ctx(500), num_ctx(7000)] == [4096, 4096, 8192]  # Run broken
+    assert [num_ctx(500), num_ctx(3000), num_ctx(500)] == [8192, 8192, 4096]  # Largest of the run
+    assert generation.options(ROLE_AGENT, "b", prompt_tokens=30000, window=8192)["num_ctx"] == 8192
+
+    generation = configure_generation(Settings(generation=GenerationConfig(num_ctx_shrink_after=0)))
+    assert num_ctx(3000) == 4096
+    assert all(num_ctx(500) == 4096 for _ in range(20))
+
+    configure_generation(Settings(generation=GenerationConfig(size_num_ctx=False)))
+    assert "num_ctx" not in get_generation().options(ROLE_ROUTING, "a", 500, 8192)
+
+
+async def test_agent_loop_and_orchestrator_calls_send_options(tmp_path):
+    client = ScriptedOllama(default=stopped_at_num_predict)
+    config = AgentConfig(name="t", model="tiny", description="", max_tokens=700)
+    budget = TokenBudget(client, max_window=16384)
+
+    await LoopAgent(config, client, token_budget=budget).agentic_loop("say hi")
+
+    sent = client.requests[-1]["options"]
+    assert sent["num_predict"] == 700 and sent["temperature"] == 0.7
+    assert 2048 <= sent["num_ctx"] <= 4096
+
+    agent = ChatAgent(client, Settings(), str(tmp_path))
+    await agent._call_llm([Message(role="user", content="summarize")], use_tools=False, role=ROLE_SUMMARY)
+
+    assert client.requests[-1]["options"]["num_predict"] == 384
+    summary = agent.get_agent_status()["generation"]["roles"][ROLE_SUMMARY]
+    assert summary == {"calls": 1, "completion_tokens": 384, "hit_limit": 1,
+                       "max_num_ctx": client.requests[-1]["options"]["num_ctx"], "num_predict": 384}
+    assert agent.usage.session.length_stops == 1
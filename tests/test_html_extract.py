@@ -0,0 +1,108 @@
+"""Tests for off-loop HTML extraction and capped streaming reads."""
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from penguincode_cli.shared import html_extract
+from penguincode_cli.shared.html_extract import (
+    HtmlParserPool,
+    extract_text,
+    html_to_markdown,
+    parse_html,
+    read_capped,
+)
+from penguincode_cli.tools.web import WebFetchTool
+
+
+def big_page(sections: int = 200) -> str:
+    body = "".join(
+        f"<h2>Section {i}</h2><p>{'Documentation text. ' * 20}</p><pre>code_{i}()</pre>"
+        f'<a href="/docs/s{i}.html#top">s{i}</a>'
+        for i in range(sections)
+    )
+    return (
+        "<html><head><script>var x = 1;</script></head><body><nav>Menu</nav>"
+        f"<main><h1>Big</h1>{body}</main><footer>Footer</footer></body></html>"
+    )
+
+
+async def chunks(parts):
+    for part in parts:
+        yield part
+
+
+async def test_read_capped_truncates_stream():
+    body, truncated = await read_capped(chunks([b"abcd", b"efgh", b"ijkl"]), 6)
+    assert (body, truncated) == (b"abcdef", True)
+
+    body, truncated = await read_capped(chunks([b"abcd", b"efgh"]), 8)
+    assert (body, truncated) == (b"abcdefgh", False)
+
+
+def test_extract_text_strips_chrome():
+    text = extract_text(big_page(2))
+
+    assert "Menu" not in text and "Footer" not in text and "var x" not in text
+    assert text.splitlines()[:2] == ["Big", "Section 0"]
+
+
+async def test_large_pages_parsed_in_pool_match_inline():
+    """Off-loop conversion gives the same result as converting inline."""
+    html = big_page()
+    assert len(html) > html_extract.INLINE_PARSE_CHARS
+    pool = HtmlParserPool(max_workers=1)
+    try:
+        markdown, links = await pool.run(html_to_markdown, html, "https://docs.example/docs/")
+        assert pool.uses_processes
+    finally:
+        pool.shutdown()
+
+    assert (markdown, links) == html_to_markdown(html, "https://docs.example/docs/")
+    assert "## Section 199" in markdown
+    assert links[0] == "https://docs.example/docs/s0.html"
+
+
+async def test_pool_falls_back_to_threads(monkeypatch):
+    pool = HtmlParserPool(max_workers=1)
+
+    def no_processes():
+        raise OSError("no worker processes")
+
+    monkeypatch.setattr(pool, "_get_executor", no_processes)
+
+    assert await pool.run(extract_text, "<p>hello</p>") == "hello"
+    assert not pool.uses_processes
+
+
+async def test_small_documents_parsed_inline(monkeypatch):
+    async def fail(*args):
+        raise AssertionError("small documents should not use the pool")
+
+    monkeypatch.setattr(HtmlParserPool.shared(), "run", fail)
+
+    assert await parse_html(extract_text, "<p>tiny</p>") == "tiny"
+
+
+@pytest.fixture
+async def server():
+    async def page(request):
+        return web.Response(text=big_page(), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    yield test_server
+    await test_server.close()
+
+
+async def test_web_fetch_caps_download(server):
+    tool = WebFetchTool(max_bytes=4096)
+
+    result = await tool.fetch(str(server.make_url("/")))
+
+    assert result["status"] == 200
+    assert result["truncated"] is True
+    assert len(result["content"].encode()) <= 4096
+    assert result["text"].startswith("Big")
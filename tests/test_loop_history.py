@@ -0,0 +1,93 @@
+"""Tests for the agentic loop's compacting message history."""
+
+from penguincode_cli.agents.base import AgentConfig, Permission
+from penguincode_cli.agents.loop_history import COMPACT_TARGET_FRACTION, LoopHistory, ToolOutcome
+from penguincode_cli.ollama import TokenBudget
+from penguincode_cli.ollama.types import Message
+from tests.conftest import LoopAgent, ScriptedOllama
+
+HEAD = [Message(role="system", content="system"), Message(role="user", content="task")]
+
+
+def history(budget_tokens=None):
+    return LoopHistory(list(HEAD), TokenBudget(None), "m", budget_tokens=budget_tokens)
+
+
+def read(path, output):
+    return ToolOutcome("read", {"path": path}, output)
+
+
+def results(messages):
+    """Tool-result messages of the rendered prompt."""
+    return [m.content for m in messages[len(HEAD):] if m.role == "user"]
+
+
+def test_stale_views_become_notes():
+    h = history()
+    h.add_round("", [read("a.py", "old a"), read("b.py", "b"), ToolOutcome("grep", {"pattern": "x"}, "hits")])
+    h.add_round("", [ToolOutcome("edit", {"path": "./a.py"}, "Replaced 1 occurrence(s)")])
+    h.add_round("", [ToolOutcome("grep", {"pattern": "x"}, "hits"), read("b.py", "Error: gone")])
+
+    first = results(h.messages())[0]
+
+    assert "old a" not in first and "file changed by edit in step 2" in first
+    assert "repeated in step 3" in first
+    assert "[Tool: read]\nb" in first  # A failed re-read doesn't replace the view
+
+
+def test_rounds_are_compacted_below_the_budget_newest_in_full():
+    h = history(budget_tokens=1500)
+    for i in range(10):
+        h.add_round(f"step {i}", [read(f"f{i}.py", f"contents of {i}\n" + "x" * 2000)])
+
+    messages = h.messages()
+    shown = results(messages)
+
+    rounds_tokens = h.token_budget.estimate_messages("m", messages[len(HEAD):])
+    assert rounds_tokens <= 1500 * COMPACT_TARGET_FRACTION
+    assert "x" * 2000 in shown[-1]
+    assert 'output elided to save context: 2014 chars starting "contents of 8"' in shown[-2]
+    assert h.elided == 8 and h.omitted_rounds == 1
+
+
+def test_compaction_keeps_the_prefix_between_compactions():
+    h = history(budget_tokens=1500)
+    previous, compactions = None, 0
+    for i in range(20):
+        h.add_round(f"step {i}", [read(f"f{i}.py", "y" * 1200)])
+        messages = h.messages()
+        assert h.token_budget.estimate_messages("m", messages[len(HEAD):]) <= 1500
+        if previous is not None and messages[:len(previous)] != previous:
+            compactions += 1
+        previous = messages
+
+    assert 0 < compactions <= 8  # Most iterations only append
+
+
+def test_oldest_rounds_are_left_out_when_stubs_overflow():
+    h = history(budget_tokens=300)
+    for i in range(30):
+        h.add_round("x" * 200, [read(f"f{i}.py", "y" * 400)])
+
+    messages = h.messages()
+
+    assert h.omitted_rounds > 0
+    assert results(messages)[0].startswith(f"({h.omitted_rounds} earlier steps omitted")
+    assert messages[-1].content.endswith("y" * 400)
+
+
+async def test_prompt_size_stops_growing(tmp_path):
+    paths = []
+    for i in range(9):
+        paths.append(tmp_path / f"f{i}.py")
+        paths[-1].write_text(f"value_{i} = 1\n" * 300)
+    client = ScriptedOllama(*(("", [{"name": "read", "arguments": {"path": str(p)}}]) for p in paths))
+    config = AgentConfig(name="t", model="bounded", description="",
+                         permissions=[Permission.READ], history_budget_tokens=2000)
+
+    result = await LoopAgent(config, client).agentic_loop("survey")
+    prompt_chars = [sum(len(m.content) for m in r["messages"]) for r in client.requests]
+
+    assert result.success and len(prompt_chars) == 10
+    assert max(prompt_chars) < prompt_chars[0] + 2000 * 4 + 1000
+    assert prompt_chars[-1] < prompt_chars[0] + 2000 * 4 * COMPACT_TARGET_FRACTION + 1000
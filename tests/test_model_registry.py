@@ -0,0 +1,177 @@
+"""Tests for the model capability registry and the code that reads it."""
+
+import asyncio
+import json
+
+import pytest
+
+from penguincode_cli.config.settings import RegulatorsConfig
+from penguincode_cli.ollama import (
+    ModelCapabilities,
+    ModelRegistry,
+    RequestScheduler,
+    TokenBudget,
+    configure_model_registry,
+    supports_native_tools,
+)
+from penguincode_cli.ollama.capabilities import PROBE_RETRY_SECONDS
+from penguincode_cli.ollama.types import ChatResponse, Message, ModelInfo
+
+GiB = 1024 ** 3
+
+SHOW = {
+    "qwen2.5-coder:7b": {
+        "details": {"family": "qwen2", "parameter_size": "7.6B", "quantization_level": "Q4_K_M"},
+        "model_info": {"general.architecture": "qwen2", "qwen2.context_length": 32768,
+                       "qwen2.embedding_length": 3584},
+        "capabilities": ["completion", "tools"],
+    },
+    "llama3.2:3b": {  # Older server: no capabilities list, tools seen in the template
+        "details": {"family": "llama", "parameter_size": "3.2B", "quantization_level": "Q4_K_M"},
+        "model_info": {"general.architecture": "llama", "llama.context_length": 131072},
+        "template": "{{ if .Messages }}{{ if .Tools }}...{{ end }}{{ end }}",
+    },
+    "codellama:7b": {
+        "details": {"family": "llama", "parameter_size": "7B", "quantization_level": "Q4_0"},
+        "model_info": {"general.architecture": "llama", "llama.context_length": 16384},
+        "capabilities": ["completion", "insert"],
+    },
+    "nomic-embed-text:latest": {
+        "details": {"family": "nomic-bert", "parameter_size": "137M", "quantization_level": "F16"},
+        "model_info": {"general.architecture": "nomic-bert", "nomic-bert.embedding_length": 768,
+                       "nomic-bert.context_length": 2048},
+        "capabilities": ["embedding"],
+    },
+}
+
+
+class ShowClient:
+    """Answers /api/tags and /api/show from SHOW and counts the calls."""
+
+    def __init__(self, digests=None, sizes=None):
+        self.digests = digests or {}
+        self.sizes = sizes or {}
+        self.shows = []
+        self.lists = 0
+
+    async def list_models(self):
+        self.lists += 1
+        return [ModelInfo(name=name, modified_at="", size=self.sizes.get(name, GiB),
+                          digest=self.digests.get(name, "d1")) for name in SHOW]
+
+    async def show_model(self, name):
+        self.shows.append(name)
+        await asyncio.sleep(0)
+        if name not in SHOW:
+            raise RuntimeError(f"model '{name}' not found")
+        return SHOW[name]
+
+
+@pytest.fixture(autouse=True)
+def no_registry():
+    configure_model_registry(None, None)
+    yield
+    configure_model_registry(None, None)
+
+
+def test_capabilities_from_show():
+    qwen = ModelCapabilities.from_show("qwen2.5-coder:7b", SHOW["qwen2.5-coder:7b"], digest="d1")
+    llama = ModelCapabilities.from_show("llama3.2:3b", SHOW["llama3.2:3b"])
+    embed = ModelCapabilities.from_show("nomic-embed-text:latest", SHOW["nomic-embed-text:latest"])
+
+    assert (qwen.context_length, qwen.parameter_size, qwen.quantization) == (32768, "7.6B", "Q4_K_M")
+    assert qwen.tools and not qwen.embedding
+    assert llama.tools and llama.context_length == 131072
+    assert embed.embedding and embed.embedding_length == 768 and not embed.tools
+
+
+async def test_probed_once_per_digest_and_kept_on_disk(tmp_path):
+    path = tmp_path / "models.json"
+    client = ShowClient()
+    registry = ModelRegistry(client, str(path))
+
+    first = await asyncio.gather(*(registry.get("qwen2.5-coder:7b") for _ in range(5)))
+    assert client.shows == ["qwen2.5-coder:7b"] and all(c is first[0] for c in first)
+    assert await registry.embedding_dims("nomic-embed-text") == 768  # Untagged means :latest
+
+    restarted = ShowClient()
+    caps = await ModelRegistry(restarted, str(path)).get("qwen2.5-coder:7b")
+    assert restarted.shows == [] and restarted.lists == 1 and caps.context_length == 32768
+
+    repulled = ShowClient(digests={"qwen2.5-coder:7b": "d2"})
+    caps = await ModelRegistry(repulled, str(path)).get("qwen2.5-coder:7b")
+    assert repulled.shows == ["qwen2.5-coder:7b"] and caps.digest == "d2"
+    assert json.loads(path.read_text())["models"]["qwen2.5-coder:7b"]["digest"] == "d2"
+
+
+async def test_failed_probe_is_not_repeated():
+    client = ShowClient()
+    registry = ModelRegistry(client, None)
+
+    for _ in range(3):
+        assert await registry.get("not-pulled:7b") is None
+    assert client.shows == ["not-pulled:7b"]
+
+    registry._failed["not-pulled:7b"] -= PROBE_RETRY_SECONDS + 1  # Backoff over
+    await registry.get("not-pulled:7b")
+    assert client.shows == ["not-pulled:7b"] * 2
+
+
+async def test_budget_and_tool_support_read_the_registry(tmp_path):
+    assert supports_native_tools("codellama:7b") is False  # Name guess before probing
+    assert supports_native_tools("llama3.2:3b") is True
+    client = ShowClient()
+    configure_model_registry(client, str(tmp_path / "models.json"))
+
+    budget = TokenBudget(client, max_window=100_000)
+    await budget.load("codellama:7b")
+    await budget.load("llama3.2:3b")
+
+    assert budget.window("codellama:7b") == 16384 and budget.window("llama3.2:3b") == 100_000
+    assert client.shows == ["codellama:7b", "llama3.2:3b"]
+    assert not supports_native_tools("codellama:7b") and supports_native_tools("llama3.2:3b")
+
+
+class RecordingClient:
+    def __init__(self):
+        self.tools = []
+        self.running = set()
+        self.max_together = 0
+
+    async def chat(self, model, messages, stream=True, tools=None, **kwargs):
+        self.tools.append(tools)
+        self.running.add(model)
+        self.max_together = max(self.max_together, len(self.running))
+        await asyncio.sleep(0.02)
+        self.running.discard(model)
+        yield ChatResponse(model=model, created_at="", done=True, message=Message(role="assistant", content="ok"))
+
+
+async def drain(scheduler, model, tools=None):
+    async for _ in scheduler.chat(model=model, messages=[Message(role="user", content="hi")], tools=tools):
+        pass
+
+
+async def test_scheduler_uses_sizes_and_tool_support(tmp_path):
+    registry = configure_model_registry(
+        ShowClient(sizes={"qwen2.5-coder:7b": 5 * GiB, "codellama:7b": 4 * GiB, "llama3.2:3b": 2 * GiB}),
+        str(tmp_path / "models.json"),
+    )
+    for model in ("qwen2.5-coder:7b", "codellama:7b", "llama3.2:3b"):
+        await registry.get(model)
+    config = RegulatorsConfig(max_concurrent_requests=4, max_models_loaded=2, vram_mb=8192,
+                              min_request_interval_ms=0, cooldown_after_error_ms=0)
+
+    client = RecordingClient()
+    scheduler = RequestScheduler(client, config)
+    await asyncio.gather(drain(scheduler, "qwen2.5-coder:7b"), drain(scheduler, "codellama:7b"))
+    assert client.max_together == 1  # 9 GiB of weights don't fit in 8
+
+    client = RecordingClient()
+    scheduler = RequestScheduler(client, config)
+    await asyncio.gather(drain(scheduler, "qwen2.5-coder:7b"), drain(scheduler, "llama3.2:3b"))
+    assert client.max_together == 2
+
+    await drain(scheduler, "codellama:7b", tools=[{"type": "function"}])
+    await drain(scheduler, "llama3.2:3b", tools=[{"type": "function"}])
+    assert client.tools[-2:] == [None, [{"type": "function"}]]
@@ -0,0 +1,99 @@
+"""Tests for concurrent execution of read-only tool calls in the agentic loop."""
+
+import asyncio
+
+from penguincode_cli.agents.base import AgentConfig, Permission
+from penguincode_cli.tools import ToolResult
+from tests.conftest import LoopAgent, ScriptedOllama
+
+
+class TimelineTool:
+    """Records start/end of each call on a shared timeline."""
+
+    def __init__(self, name, timeline, delay=0.05):
+        self.name = name
+        self.timeline = timeline
+        self.delay = delay
+
+    async def execute(self, **kwargs):
+        label = f"{self.name}:{kwargs.get('path') or kwargs.get('pattern') or kwargs.get('command')}"
+        self.timeline.append(("start", label))
+        await asyncio.sleep(self.delay)
+        self.timeline.append(("end", label))
+        return ToolResult(success=True, data=label)
+
+
+def make_agent(client=None, max_parallel_tools=4):
+    config = AgentConfig(
+        name="test",
+        model="m",
+        description="",
+        permissions=[Permission.READ, Permission.SEARCH, Permission.BASH, Permission.WRITE],
+        max_parallel_tools=max_parallel_tools,
+    )
+    agent = LoopAgent(config, client)
+    timeline = []
+    for name in ("read", "grep", "glob", "bash", "write", "edit"):
+        agent.tools[name] = TimelineTool(name, timeline)
+    return agent, timeline
+
+
+def call(name, **arguments):
+    return {"name": name, "arguments": arguments}
+
+
+async def test_reads_overlap_and_writes_are_barriers():
+    agent, timeline = make_agent()
+    calls = [
+        call("read", path="a"), call("grep", pattern="x"), call("glob", pattern="*.py"),
+        call("write", path="a", content="new"),
+        call("read", path="a"), call("bash", command="make"), call("read", path="b"),
+    ]
+
+    results = await agent._execute_tool_calls(calls)
+
+    assert results == ["read:a", "grep:x", "glob:*.py", "write:a", "read:a", "bash:make", "read:b"]
+    # The first three reads all start before any of them ends
+    assert [kind for kind, _ in timeline[:3]] == ["start"] * 3
+    # Each mutating call runs alone, after the reads before it and before the reads after it
+    write = timeline.index(("start", "write:a"))
+    assert timeline[write + 1] == ("end", "write:a")
+    assert timeline[write + 2:write + 6] == [
+        ("start", "read:a"), ("end", "read:a"), ("start", "bash:make"), ("end", "bash:make"),
+    ]
+
+
+async def test_parallel_reads_respect_the_agent_cap():
+    agent, timeline = make_agent(max_parallel_tools=2)
+
+    await agent._execute_tool_calls([call("read", path=str(i)) for i in range(5)])
+
+    running = peak = 0
+    for kind, _ in timeline:
+        running += 1 if kind == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+
+
+async def test_loop_records_calls_in_model_order():
+    """Logs and the follow-up tool message keep the order the model gave."""
+    client = ScriptedOllama(
+        ("", [call("read", path="slow"), call("read", path="fast")]),
+        ("done", None),
+    )
+    agent, _ = make_agent(client)
+    agent.tools["read"].delay = 0
+    slow = TimelineTool("read", [], delay=0.05)
+    fast = agent.tools["read"]
+
+    class Router:
+        async def execute(self, **kwargs):
+            return await (slow if kwargs["path"] == "slow" else fast).execute(**kwargs)
+
+    agent.tools["read"] = Router()
+
+    result = await agent.agentic_loop("look")
+
+    assert result.success and result.output == "done"
+    assert [entry["arguments"]["path"] for entry in result.tool_calls] == ["slow", "fast"]
+    assert [entry["result"] for entry in result.tool_calls] == ["read:slow", "read:fast"]
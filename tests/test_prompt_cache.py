@@ -0,0 +1,95 @@
+"""Tests for cache-friendly prompt layout, keep_alive per role and prefix-cache stats."""
+
+from penguincode_cli.agents import ChatAgent
+from penguincode_cli.config.settings import ModelsConfig, RegulatorsConfig, Settings
+from penguincode_cli.ollama import RequestScheduler
+from penguincode_cli.ollama.prompt_cache import (
+    CONTEXT_HEADER,
+    PrefixCacheTracker,
+    assemble_messages,
+    shared_prefix_chars,
+)
+from penguincode_cli.ollama.scheduler import model_keep_alive
+from penguincode_cli.ollama.types import ChatResponse, Message
+
+
+def test_volatile_context_goes_after_the_history():
+    history = [Message(role="user", content="q1"), Message(role="assistant", content="a1")]
+
+    first = assemble_messages("static", history[:0], "q1", context="memory A")
+    second = assemble_messages("static", history, "q2", context="memory B")
+
+    assert first[0] == second[0] == Message(role="system", content="static")
+    assert second[1:3] == history
+    assert second[-1].content == f"{CONTEXT_HEADER}\nmemory B\n---\n\nq2"
+    assert assemble_messages("static", [], "q")[-1].content == "q"
+
+
+def test_chat_turns_share_the_previous_prompt_as_prefix():
+    agent = ChatAgent(ollama_client=None, settings=Settings(), project_dir="/tmp")
+    first = agent._build_turn_messages("hello", memories=["likes tabs"])
+    agent.conversation_history += [Message(role="user", content="hello"),
+                                   Message(role="assistant", content="hi")]
+
+    second = agent._build_turn_messages("again", memories=["uses poetry"])
+
+    assert first[0] == second[0]
+    assert shared_prefix_chars(first, second) >= len(first[0].content)
+
+
+def test_shared_prefix_stops_at_the_first_difference():
+    old = [Message(role="system", content="abc"), Message(role="user", content="hello")]
+    new = [Message(role="system", content="abc"), Message(role="user", content="help")]
+
+    assert shared_prefix_chars(old, new) == 3 + 3
+    assert shared_prefix_chars(old, [Message(role="user", content="abc")]) == 0
+
+
+def test_tracker_splits_eval_time_by_warm_and_cold():
+    tracker = PrefixCacheTracker()
+    system = Message(role="system", content="s" * 1000)
+    tools = [{"type": "function", "function": {"name": "read"}}]
+
+    tracker.observe("m", [system, Message(role="user", content="a")], tools, 1_000_000_000)
+    tracker.observe("m", [system, Message(role="user", content="b")], tools, 100_000_000)
+    tracker.observe("m", [system, Message(role="user", content="c")], None, 1_000_000_000)
+
+    stats = tracker.stats
+    assert stats.calls == 3 and stats.warm_calls == 1  # Changed tools: cold
+    assert stats.reused_chars == 1000
+    assert round(stats.eval_time_drop, 2) == 0.9
+
+
+def test_keep_alive_per_role_model():
+    models = ModelsConfig(orchestration="llama3.2:3b", exploration="llama3.2:3b",
+                          execution="qwen2.5-coder:7b")
+
+    resolved = model_keep_alive(models, {"orchestration": "30m", "exploration": "1h",
+                                         "execution": "15m", "unknown": "5m"})
+
+    assert resolved == {"llama3.2:3b": "1h", "qwen2.5-coder:7b": "15m"}
+
+
+class RecordingClient:
+    def __init__(self):
+        self.keep_alive = []
+
+    async def chat(self, model, messages, stream=True, tools=None, **kwargs):
+        self.keep_alive.append(kwargs.get("keep_alive"))
+        yield ChatResponse(model=model, created_at="", done=True, prompt_eval_duration=5_000_000,
+                           message=Message(role="assistant", content="ok"))
+
+
+async def test_scheduler_sends_role_keep_alive_and_reports_prefix_reuse():
+    client = RecordingClient()
+    config = RegulatorsConfig(keep_alive={"orchestration": "30m"})
+    scheduler = RequestScheduler(client, config, ModelsConfig(orchestration="chat-model"))
+    messages = [Message(role="system", content="static"), Message(role="user", content="hi")]
+
+    for model, kwargs in (("chat-model", {}), ("chat-model", {}),
+                          ("other", {}), ("chat-model", {"keep_alive": "1m"})):
+        async for _ in scheduler.chat(model=model, messages=messages, **kwargs):
+            pass
+
+    assert client.keep_alive == ["30m", "30m", None, "1m"]
+    assert scheduler.get_stats()["prefix_cache"]["warm_calls"] == 2
@@ -0,0 +1,76 @@
+"""Tests for windowed reads of large files through the line-offset index."""
+
+import pytest
+
+from penguincode_cli.tools import ReadFileTool
+from penguincode_cli.tools import line_index
+from penguincode_cli.tools.line_index import LineIndex, get_line_index
+
+
+@pytest.fixture
+def small_checkpoints(monkeypatch):
+    """Tiny checkpoint blocks so lines straddle many block boundaries."""
+    monkeypatch.setattr(line_index, "CHECKPOINT_BYTES", 7)
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_window_matches_readlines(tmp_path, small_checkpoints, trailing_newline):
+    lines = [f"line {i}" + "x" * (i % 13) for i in range(1, 301)] + ["", "last"]
+    text = "\n".join(lines) + ("\n" if trailing_newline else "")
+    path = tmp_path / "log.txt"
+    path.write_text(text)
+
+    index = LineIndex(str(path))
+
+    assert index.total_lines == len(text.splitlines())
+    for start, end in [(1, 1), (1, 5), (7, 7), (100, 140), (298, 400), (302, 302)]:
+        assert index.read_window(start, end) == text.splitlines()[start - 1:end]
+    assert index.read_window(500, 510) == []
+
+
+def test_long_lines_are_cut(tmp_path):
+    path = tmp_path / "minified.js"
+    path.write_text("a" * (line_index.MAX_LINE_BYTES + 10) + "\nshort\n")
+
+    first, second = LineIndex(str(path)).read_window(1, 2)
+
+    assert first.endswith(f" ... ({line_index.MAX_LINE_BYTES + 10} bytes)")
+    assert second == "short"
+
+
+def test_index_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "a.log"
+    path.write_text("one\ntwo\n")
+
+    first = get_line_index(str(path))
+    assert get_line_index(str(path)) is first
+
+    path.write_text("one\ntwo\nthree\n")
+    assert get_line_index(str(path)).total_lines == 3
+
+
+async def test_large_file_read_returns_window_and_metadata(tmp_path):
+    path = tmp_path / "big.log"
+    path.write_text("".join(f"entry {i}\n" for i in range(1, 50_001)))
+    tool = ReadFileTool(full_read_bytes=1024, max_window_lines=100)
+
+    ranged = await tool.execute(str(path), start_line=10, end_line=12)
+    default = await tool.execute(str(path))
+    capped = await tool.execute(str(path), start_line=49_990, end_line=60_000)
+
+    assert ranged.data.splitlines()[1:] == ["    10→entry 10", "    11→entry 11", "    12→entry 12"]
+    assert ranged.data.startswith("[Large file: 50000 lines")
+    assert ranged.metadata["total_lines"] == 50_000
+    assert ranged.metadata["size_bytes"] == path.stat().st_size
+    assert default.metadata["end_line"] == 100
+    assert capped.data.splitlines()[-1] == " 50000→entry 50000"
+
+
+async def test_small_files_read_whole(tmp_path):
+    path = tmp_path / "small.py"
+    path.write_text("a = 1\nb = 2\n")
+
+    result = await ReadFileTool().execute(str(path))
+
+    assert result.data == "     1→a = 1\n     2→b = 2"
+    assert "windowed" not in result.metadata
@@ -0,0 +1,229 @@
+"""Tests for GPU request scheduler - admission, priority, pacing, cooldown, affinity."""
+
+import asyncio
+import time
+
+import pytest
+
+from penguincode_cli.config.settings import RegulatorsConfig
+from penguincode_cli.ollama import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RequestScheduler,
+    SchedulerQueueFullError,
+    request_priority,
+)
+from penguincode_cli.ollama.types import ChatResponse, Message
+
+
+class FakeClient:
+    """Stand-in for OllamaClient that records concurrency."""
+
+    def __init__(self, delay: float = 0.05, fail_models=()):
+        self.delay = delay
+        self.fail_models = set(fail_models)
+        self.active = 0
+        self.max_active = 0
+        self.active_models = set()
+        self.max_models = 0
+        self.started = []
+        self.keep_alive = []
+
+    async def chat(self, model, messages, stream=True, tools=None, **kwargs):
+        self.active += 1
+        self.active_models.add(model)
+        self.max_active = max(self.max_active, self.active)
+        self.max_models = max(self.max_models, len(self.active_models))
+        self.started.append((model, messages[0].content, time.monotonic()))
+        self.keep_alive.append(kwargs.get("keep_alive"))
+        try:
+            await asyncio.sleep(self.delay)
+            if model in self.fail_models:
+                raise RuntimeError("boom")
+            yield ChatResponse(model=model, created_at="", message=Message(role="assistant", content="ok"), done=True)
+        finally:
+            self.active -= 1
+            self.active_models.discard(model)
+
+    async def list_models(self):
+        return ["delegated"]
+
+
+def make_config(**overrides) -> RegulatorsConfig:
+    values = dict(
+        max_concurrent_requests=2,
+        max_models_loaded=1,
+        request_queue_size=10,
+        min_request_interval_ms=0,
+        cooldown_after_error_ms=0,
+        affinity_max_wait_ms=10_000,
+        affinity_max_run=100,
+    )
+    values.update(overrides)
+    return RegulatorsConfig(**values)
+
+
+async def run_chat(scheduler, model="m1", content="hi"):
+    chunks = []
+    async for chunk in scheduler.chat(model=model, messages=[Message(role="user", content=content)]):
+        chunks.append(chunk)
+    return chunks
+
+
+async def test_concurrency_cap():
+    """Never more than max_concurrent_requests in flight."""
+    client = FakeClient()
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=2))
+
+    await asyncio.gather(*(run_chat(scheduler) for _ in range(6)))
+
+    assert client.max_active == 2
+    stats = scheduler.get_stats()
+    assert stats["completed"] == 6
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+async def test_model_admission():
+    """Only max_models_loaded distinct models run at once."""
+    client = FakeClient()
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=4, max_models_loaded=1))
+
+    await asyncio.gather(*(run_chat(scheduler, model=f"m{i % 2}") for i in range(6)))
+
+    assert client.max_models == 1
+
+
+async def test_priority_order():
+    """Queued requests are admitted highest priority first."""
+    client = FakeClient(delay=0.02)
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=1))
+
+    async def submit(content, priority):
+        with request_priority(priority):
+            await run_chat(scheduler, content=content)
+
+    blocker = asyncio.create_task(run_chat(scheduler, content="first"))
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(submit("background", PRIORITY_BACKGROUND)),
+        asyncio.create_task(submit("interactive", PRIORITY_INTERACTIVE)),
+    ]
+    await asyncio.gather(blocker, *tasks)
+
+    order = [content for _, content, _ in client.started]
+    assert order == ["first", "interactive", "background"]
+
+
+async def test_queue_full_rejects():
+    """Requests beyond request_queue_size fail fast."""
+    client = FakeClient(delay=0.05)
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=1, request_queue_size=2))
+
+    results = await asyncio.gather(*(run_chat(scheduler) for _ in range(5)), return_exceptions=True)
+
+    rejected = [r for r in results if isinstance(r, SchedulerQueueFullError)]
+    assert len(rejected) == 2
+    assert scheduler.get_stats()["rejected"] == 2
+
+
+async def test_min_interval_pacing():
+    """Request starts are spaced by min_request_interval_ms."""
+    client = FakeClient(delay=0)
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=4, min_request_interval_ms=30))
+
+    await asyncio.gather(*(run_chat(scheduler) for _ in range(3)))
+
+    starts = [t for _, _, t in client.started]
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(gap >= 0.025 for gap in gaps)
+
+
+async def test_error_cooldown():
+    """A failed request delays the next admission."""
+    client = FakeClient(delay=0, fail_models={"bad"})
+    scheduler = RequestScheduler(client, make_config(cooldown_after_error_ms=50))
+
+    with pytest.raises(RuntimeError):
+        await run_chat(scheduler, model="bad")
+    failed_at = time.monotonic()
+    await run_chat(scheduler, model="good")
+
+    assert client.started[-1][2] - failed_at >= 0.04
+    assert scheduler.get_stats()["failed"] == 1
+
+
+async def test_cancelled_waiter_releases():
+    """Cancelling a queued request frees its place in line."""
+    client = FakeClient(delay=0.05)
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=1))
+
+    running = asyncio.create_task(run_chat(scheduler))
+    queued = asyncio.create_task(run_chat(scheduler))
+    await asyncio.sleep(0.01)
+    queued.cancel()
+    await running
+
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert scheduler.queue_depth == 0
+    assert scheduler.in_flight == 0
+
+
+async def test_slot_released_when_setup_fails(monkeypatch):
+    """An error between admission and streaming doesn't leak the slot."""
+    client = FakeClient(delay=0)
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=1))
+
+    def broken(model, kwargs):
+        raise ValueError("bad keep_alive")
+
+    monkeypatch.setattr(scheduler, "_apply_keep_alive", broken)
+    with pytest.raises(ValueError):
+        await run_chat(scheduler)
+    monkeypatch.undo()
+
+    assert scheduler.in_flight == 0
+    await asyncio.wait_for(run_chat(scheduler), timeout=1)
+
+
+async def test_delegates_other_methods():
+    """Non-scheduled methods pass through to the wrapped client."""
+    scheduler = RequestScheduler(FakeClient(), make_config())
+    assert await scheduler.list_models() == ["delegated"]
+
+
+async def test_affinity_drains_runs():
+    """Interleaved calls for two models are grouped to minimise swaps."""
+    client = FakeClient(delay=0.01)
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=1))
+
+    await asyncio.gather(*(run_chat(scheduler, model=f"m{i % 2}", content=str(i)) for i in range(8)))
+
+    models = [model for model, _, _ in client.started]
+    assert models == ["m0"] * 4 + ["m1"] * 4
+    assert scheduler.model_swaps == 1
+
+
+async def test_affinity_starvation_bound():
+    """A waiting model gets its turn after affinity_max_run admissions."""
+    client = FakeClient(delay=0.01)
+    scheduler = RequestScheduler(client, make_config(max_concurrent_requests=1, affinity_max_run=2))
+
+    await asyncio.gather(*(run_chat(scheduler, model="m1" if i == 1 else "m0") for i in range(8)))
+
+    models = [model for model, _, _ in client.started]
+    assert models.index("m1") <= 3
+
+
+async def test_affinity_keep_alive():
+    """keep_alive is sent while more calls for the same model are queued."""
+    client = FakeClient(delay=0.01)
+    scheduler = RequestScheduler(
+        client, make_config(max_concurrent_requests=1, affinity_keep_alive="10m")
+    )
+
+    await asyncio.gather(*(run_chat(scheduler) for _ in range(3)))
+
+    # The first call starts before the others are queued
+    assert client.keep_alive == [None, "10m", None]
@@ -0,0 +1,129 @@
+"""Tests for schema-constrained replies (Ollama ``format``)."""
+
+import json
+
+import pytest
+
+from penguincode_cli.agents import ChatAgent
+from penguincode_cli.agents.base import AgentConfig, Permission
+from penguincode_cli.agents.planner import PLAN_SCHEMA, PlannerAgent
+from penguincode_cli.agents.tool_defs import TOOL_DEFINITIONS
+from penguincode_cli.config.settings import Settings, StructuredOutputConfig
+from penguincode_cli.ollama import (
+    StructuredOutput,
+    configure_structured_output,
+    structured_answer,
+    tool_call_schema,
+)
+from penguincode_cli.ollama.types import Message
+from tests.conftest import LoopAgent, ScriptedOllama
+
+
+@pytest.fixture(autouse=True)
+def default_switch():
+    yield
+    configure_structured_output(StructuredOutputConfig())
+
+
+def test_tool_call_schema_allows_each_call_or_an_answer():
+    schema = tool_call_schema([TOOL_DEFINITIONS["read"], TOOL_DEFINITIONS["grep"]])
+
+    names = [option["properties"]["name"]["enum"] for option in schema["anyOf"][:2]]
+    assert names == [["read"], ["grep"]]
+    assert schema["anyOf"][0]["properties"]["arguments"]["required"] == ["path"]
+    assert schema["anyOf"][2]["required"] == ["answer"]
+    assert "anyOf" not in tool_call_schema([TOOL_DEFINITIONS["read"]], answer=False)
+
+
+def test_structured_answer():
+    assert structured_answer('{"answer": "done"}') == "done"
+    assert structured_answer('{"name": "read", "arguments": {}}') is None
+    assert structured_answer("plain text") is None
+
+
+def test_switch_by_model_and_family():
+    switch = StructuredOutput(StructuredOutputConfig(models={"deepseek-coder": False, "codellama:7b": True}))
+
+    assert not switch.constrained("deepseek-coder:6.7b")
+    assert switch.constrained("codellama:7b") and switch.constrained("phi3:mini")
+    switch.configure(StructuredOutputConfig(enabled=False))
+    assert not switch.constrained("phi3:mini")
+
+
+async def test_loop_constrains_models_without_native_tools(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    call = json.dumps({"name": "read", "arguments": {"path": str(tmp_path / "a.py")}})
+    client = ScriptedOllama(call, json.dumps({"answer": "x is 1"}))
+    config = AgentConfig(name="t", model="deepseek-coder:6.7b", description="", permissions=[Permission.READ])
+
+    result = await LoopAgent(config, client, working_dir=str(tmp_path)).agentic_loop("what is x?")
+
+    assert result.success and result.output == "x is 1"
+    assert [tc["tool"] for tc in result.tool_calls] == ["read"]
+    request = client.requests[0]
+    assert request["tools"] is None and request.get("format")["anyOf"][0]["properties"]["name"]["enum"] == ["read"]
+    assert '{"answer"' in request["messages"][0].content
+
+
+async def test_loop_keeps_native_tools_and_honours_the_switch(tmp_path):
+    config = AgentConfig(name="t", model="llama3.1:8b", description="", permissions=[Permission.READ])
+    native = ScriptedOllama("All done.")
+    await LoopAgent(config, native, working_dir=str(tmp_path)).agentic_loop("hi")
+
+    configure_structured_output(StructuredOutputConfig(models={"deepseek-coder": False}))
+    config.model = "deepseek-coder:6.7b"
+    switched_off = ScriptedOllama("All done.")
+    await LoopAgent(config, switched_off, working_dir=str(tmp_path)).agentic_loop("hi")
+
+    for client in (native, switched_off):
+        assert client.requests[0].get("format") is None and client.requests[0]["tools"]
+
+
+async def test_routing_answer_skips_keyword_guessing():
+    settings = Settings()
+    settings.models.orchestration = "deepseek-coder:6.7b"
+    client = ScriptedOllama(json.dumps({"answer": "Let me search my memory: Python is a language."}))
+    agent = ChatAgent(ollama_client=client, settings=settings, project_dir="/tmp")
+
+    text, tool_calls = await agent._call_llm([Message(role="system", content="route"), Message(role="user", content="?")])
+
+    assert text.startswith("Let me search") and tool_calls == []
+    assert client.requests[0].get("format")["anyOf"][0]["properties"]["name"]["enum"] == ["spawn_explorer"]
+
+
+async def test_plan_from_constrained_reply():
+    plan_json = {
+        "analysis": "Add a flag",
+        "steps": [
+            {"agent": "explorer", "description": "Find the CLI parser", "depends_on": []},
+            {"agent": "executor", "description": "Add --verbose", "depends_on": [1]},
+        ],
+        "parallel_groups": [[1], [2, 7]],
+        "complexity": "simple",
+    }
+    client = ScriptedOllama(json.dumps(plan_json))
+
+    plan = await PlannerAgent(client, model="deepseek-coder:6.7b").create_plan("add a verbose flag")
+
+    assert client.requests[0].get("format") is PLAN_SCHEMA
+    assert [(s.step_num, s.agent_type, s.depends_on) for s in plan.steps] == [(1, "explorer", []), (2, "executor", [1])]
+    assert plan.parallel_groups == [[1], [2]] and plan.complexity == "simple"
+
+
+async def test_dropped_plan_step_keeps_the_others_numbers():
+    plan_json = {
+        "analysis": "Fix the bug",
+        "steps": [
+            {"agent": "explorer", "description": "Find the bug", "depends_on": []},
+            {"agent": "executor", "description": "   ", "depends_on": [1]},
+            {"agent": "executor", "description": "Fix it", "depends_on": [1, 2]},
+        ],
+        "parallel_groups": [[1], [2], [3]],
+        "complexity": "simple",
+    }
+    client = ScriptedOllama(json.dumps(plan_json))
+
+    plan = await PlannerAgent(client, model="deepseek-coder:6.7b").create_plan("fix the bug")
+
+    assert [(s.step_num, s.depends_on) for s in plan.steps] == [(1, []), (3, [1])]
+    assert plan.parallel_groups == [[1], [3]]
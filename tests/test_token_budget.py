@@ -0,0 +1,141 @@
+"""Tests for model-aware token budgets and prompt packing."""
+
+import pytest
+
+from penguincode_cli.agents import ChatAgent
+from penguincode_cli.agents.base import AgentConfig, Permission
+from penguincode_cli.config.settings import Settings
+from penguincode_cli.ollama import ContextSection, TokenBudget
+from penguincode_cli.ollama.types import ChatResponse, Message
+from tests.conftest import LoopAgent
+
+
+@pytest.fixture(autouse=True)
+def fresh_models():
+    TokenBudget.forget()
+    yield
+    TokenBudget.forget()
+
+
+class ShowClient:
+    """Answers /api/show with a fixed context length and records chat prompts."""
+
+    def __init__(self, context_length=4096, fail=False, replies=()):
+        self.context_length = context_length
+        self.fail = fail
+        self.shows = 0
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def show_model(self, name):
+        self.shows += 1
+        if self.fail:
+            raise ConnectionError("ollama not running")
+        return {"model_info": {"general.architecture": "llama",
+                               "llama.context_length": self.context_length}}
+
+    async def chat(self, model, messages, tools=None, stream=True, **kwargs):
+        self.prompts.append(list(messages))
+        text, calls = self.replies.pop(0)
+        message = Message(role="assistant", content=text, tool_calls=calls or None)
+        yield ChatResponse(model=model, created_at="", message=message, done=True,
+                           prompt_eval_count=len(self.prompts) * 100)
+
+
+async def test_window_comes_from_the_model_capped_by_settings():
+    client = ShowClient(context_length=2048)
+    budget = TokenBudget(client, max_window=8192)
+
+    await budget.load("small")
+    await budget.load("small")
+
+    large = TokenBudget(ShowClient(context_length=131072), max_window=8192)
+    await large.load("large")
+
+    assert budget.window("small") == 2048 and client.shows == 1
+    assert large.window("large") == 8192
+
+
+async def test_failed_probe_falls_back_and_retries():
+    client = ShowClient(fail=True)
+    budget = TokenBudget(client, max_window=8192)
+
+    await budget.load("offline")
+    assert budget.window("offline") == 8192
+
+    client.fail = False
+    await budget.load("offline")
+    assert budget.window("offline") == 4096 and client.shows == 2
+
+
+def test_calibration_keeps_the_smallest_plausible_ratio():
+    budget = TokenBudget(None)
+    messages = [Message(role="system", content="x" * 600), Message(role="user", content="y" * 400)]
+
+    budget.observe("coder", messages, prompt_tokens=400 + 8)  # 2.5 chars/token
+    budget.observe("coder", messages, prompt_tokens=200 + 8)  # Prefix cached: overstated
+    budget.observe("coder", messages, prompt_tokens=10)  # Implausible
+    budget.observe("coder", [Message(role="user", content="hi")], prompt_tokens=2)  # Too short
+
+    assert budget.estimate("coder", "z" * 250) == 100
+    assert budget.estimate("other", "z" * 250) == 63  # Uncalibrated default
+
+
+def test_pack_fills_by_priority_and_keeps_history_contiguous():
+    budget = TokenBudget(None)
+    packed = budget.pack("m", 60, [
+        ContextSection("docs", ["doc " * 100], priority=3, truncate=True),
+        ContextSection("history", ["a" * 100, "b" * 200, "c"], priority=2),
+        ContextSection("memories", ["likes tabs", "uses poetry"], priority=1),
+    ])
+
+    assert packed.kept("memories") == ["likes tabs", "uses poetry"]
+    assert packed.kept("history") == ["a" * 100]  # "c" would fit but is older than "b"
+    assert packed.dropped == {"history": 2, "docs": 1}  # 29 tokens left: too few to cut to
+    assert packed.used_tokens == 31
+
+
+def test_truncated_items_fit_the_room_left():
+    budget = TokenBudget(None)
+    packed = budget.pack("m", 100, [ContextSection("docs", ["doc " * 400], priority=1, truncate=True)])
+
+    docs = packed.kept("docs")[0]
+    assert docs.endswith("(truncated to fit the context window)")
+    assert packed.truncated == ["docs"] and 90 < budget.estimate("m", docs) <= 100
+
+
+def test_chat_turn_drops_oldest_history_first():
+    settings = Settings()
+    settings.defaults.context_window = 2000
+    agent = ChatAgent(ollama_client=None, settings=settings, project_dir="/tmp")
+    for i in range(40):
+        agent.conversation_history.append(Message(role="user", content=f"question {i} " * 20))
+        agent.conversation_history.append(Message(role="assistant", content=f"answer {i} " * 20))
+
+    messages = agent._build_turn_messages("what now?", memories=["prefers short answers"])
+
+    assert messages[0].content == agent.system_prompt
+    assert "prefers short answers" in messages[-1].content
+    assert messages[-1].content.endswith("what now?")
+    assert messages[-2] is agent.conversation_history[-1]
+    assert 0 < agent.last_context["history_messages"] < 80
+    assert agent.token_budget.estimate_messages(agent.model, messages) <= 2000 * 0.7
+
+
+async def test_agent_loop_prompts_stay_within_the_window(tmp_path):
+    for i in range(6):
+        (tmp_path / f"f{i}.txt").write_text(f"line {i}\n" * 400)
+    reads = [("", [{"name": "read", "arguments": {"path": str(tmp_path / f"f{i}.txt")}}])
+             for i in range(6)]
+    client = ShowClient(context_length=4096, replies=reads + [("done", None)])
+    config = AgentConfig(name="t", model="tiny", description="", permissions=[Permission.READ],
+                         max_tokens=512, history_budget_tokens=None)  # Window guard only
+
+    result = await LoopAgent(config, client).agentic_loop("read everything")
+
+    assert result.success and result.output == "done"
+    budget = TokenBudget(client)
+    for prompt in client.prompts:
+        assert prompt[0].role == "system" and prompt[1].content == "read everything"
+        assert budget.estimate_messages("tiny", prompt) <= 4096 - 512
+    assert len(client.prompts[-1]) < 2 + 2 * 6  # Oldest tool rounds were left out
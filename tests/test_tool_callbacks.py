@@ -0,0 +1,175 @@
+"""Tests for client-side tool execution over the ToolCallbackService stream."""
+
+import asyncio
+import time
+
+import grpc
+import pytest
+
+from penguincode_cli.agents.explorer import ExplorerAgent
+from penguincode_cli.client import GRPCClient, LocalToolExecutor
+from penguincode_cli.config.settings import ClientConfig, ServerConfig
+from penguincode_cli.proto import add_ToolCallbackServiceServicer_to_server
+from penguincode_cli.server.services import RemoteToolExecutor, ToolCallbackServiceImpl
+from penguincode_cli.shared.interfaces import IToolExecutor, ToolResult
+
+SESSION = "session-1"
+
+
+class SlowExecutor(IToolExecutor):
+    """Echoes its arguments after a delay, tracking concurrency."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_available_tools(self):
+        return ["read", "grep", "bash"]
+
+    async def execute(self, tool_name, arguments, timeout=30):
+        self.calls.append((tool_name, arguments))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if tool_name == "bash":
+            return ToolResult(success=False, error="exit 1")
+        return ToolResult(success=True, data=f"{tool_name}:{arguments['path']}")
+
+
+class NullTokens:
+    def get_token(self):
+        return None
+
+
+@pytest.fixture
+async def tool_service():
+    service = ToolCallbackServiceImpl()
+    server = grpc.aio.server()
+    add_ToolCallbackServiceServicer_to_server(service, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    service.port = port
+    yield service
+    await server.stop(None)
+
+
+@pytest.fixture
+async def connect(tool_service):
+    clients = []
+
+    async def factory(executor):
+        client = GRPCClient(
+            ServerConfig(port=tool_service.port),
+            ClientConfig(),
+            token_manager=NullTokens(),
+            tool_executor=executor,
+        )
+        await client.connect()  # Health check fails; the channel is still usable
+        client._current_session_id = SESSION
+        await client._start_tool_callback_handler()
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        await client.disconnect()
+
+
+async def test_outstanding_requests_are_pipelined(tool_service, connect):
+    """Concurrent calls share the stream and each gets its own result."""
+    executor = SlowExecutor()
+    await tool_service.register_session(SESSION)
+    remote = RemoteToolExecutor(tool_service, SESSION, executor.get_available_tools())
+    # Requests made before the client attaches wait in the session queue
+    pending = asyncio.ensure_future(remote.execute("read", {"path": "early.py"}))
+    await connect(executor)
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        pending,
+        *(remote.execute("read", {"path": f"f{i}.py"}) for i in range(4)),
+        remote.execute("bash", {"path": "x", "command": "false"}),
+    )
+
+    assert time.monotonic() - start < 0.6  # One round trip, not six
+    assert executor.max_in_flight == 6
+    assert [r.data for r in results[:5]] == ["read:early.py"] + [f"read:f{i}.py" for i in range(4)]
+    assert not results[5].success and results[5].error == "exit 1"
+
+
+async def test_arguments_keep_their_types(tool_service, connect):
+    executor = SlowExecutor(delay=0)
+    await tool_service.register_session(SESSION)
+    await connect(executor)
+    remote = RemoteToolExecutor(tool_service, SESSION, ["read"])
+
+    await remote.execute("read", {"path": "a.py", "offset": 10, "exact": True, "line": "10"})
+
+    assert executor.calls == [("read", {"path": "a.py", "offset": 10, "exact": True, "line": "10"})]
+
+
+async def test_unregistered_or_closed_session_fails_cleanly(tool_service):
+    remote = RemoteToolExecutor(tool_service, SESSION, ["read"])
+
+    result = await remote.execute("read", {"path": "a.py"})
+    assert not result.success and "not registered" in result.error
+
+    await tool_service.register_session(SESSION)
+    call = asyncio.ensure_future(remote.execute("read", {"path": "a.py"}))
+    await asyncio.sleep(0.01)
+    await tool_service.unregister_session(SESSION)
+
+    result = await call
+    assert not result.success and result.error == "Tool callback channel closed"
+
+
+async def test_agent_tools_run_on_the_client(tool_service, connect, tmp_path):
+    """An agent given a RemoteToolExecutor reads files through the client."""
+    (tmp_path / "hello.py").write_text("print('hi')\n")
+    await tool_service.register_session(SESSION)
+    await connect(LocalToolExecutor(working_dir=str(tmp_path)))
+    agent = ExplorerAgent(
+        ollama_client=None,
+        working_dir="/nonexistent-on-server",
+        tool_executor=RemoteToolExecutor(tool_service, SESSION, ["read", "grep", "glob"]),
+    )
+
+    result = await agent.execute_tool("read", path="hello.py")
+    missing = await agent.execute_tool("bash", command="ls")
+
+    assert result.success and result.data == "     1→print('hi')"
+    assert not missing.success  # Explorer has no bash permission
+
+
+async def test_client_reads_ranges_and_greps_quoted_patterns(tool_service, connect, tmp_path):
+    """Remote reads honor start_line/end_line; grep patterns aren't passed through a shell."""
+    (tmp_path / "big.py").write_text("".join(f"x = {i}  # it's line {i}\n" for i in range(1, 101)))
+    await tool_service.register_session(SESSION)
+    await connect(LocalToolExecutor(working_dir=str(tmp_path)))
+    remote = RemoteToolExecutor(tool_service, SESSION, ["read", "grep"])
+
+    window = await remote.execute("read", {"path": "big.py", "start_line": 40, "end_line": 42})
+    found = await remote.execute("grep", {"pattern": "it's line 77$", "path": "."})
+    injected = await remote.execute("grep", {"pattern": "'; touch pwned; '", "path": "."})
+
+    assert window.data.splitlines() == [f"{i:6d}→x = {i}  # it's line {i}" for i in (40, 41, 42)]
+    assert found.success and "big.py:77" in found.data
+    assert injected.success and not (tmp_path / "pwned").exists()
+
+
+async def test_remote_bash_honors_its_timeout_argument(tool_service, connect, tmp_path):
+    """The call's timeout reaches the client; a command past it is killed."""
+    await tool_service.register_session(SESSION)
+    await connect(LocalToolExecutor(working_dir=str(tmp_path)))
+    remote = RemoteToolExecutor(tool_service, SESSION, ["bash"])
+
+    slow = await remote.execute("bash", {"command": "sleep 1.2 && echo finished", "timeout": 5}, timeout=1)
+    cut = await remote.execute("bash", {"command": "sleep 2 && touch late", "timeout": 1})
+    await asyncio.sleep(1.5)
+
+    assert slow.success and "finished" in slow.data
+    assert not cut.success and "timed out after 1s" in cut.error
+    assert not (tmp_path / "late").exists()
@@ -0,0 +1,161 @@
+"""Tests for the read-through tool result cache."""
+
+import os
+
+from penguincode_cli.agents.base import AgentConfig, CACHED_RESULT_NOTE, Permission
+from penguincode_cli.agents.explorer import ExplorerAgent
+from penguincode_cli.tools import (
+    GrepTool,
+    ReadFileTool,
+    ToolResultCache,
+    WriteFileTool,
+)
+from tests.conftest import LoopAgent, ScriptedOllama
+
+
+class CountingTool:
+    """Wraps a tool and counts real executions."""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.calls = 0
+
+    async def execute(self, **kwargs):
+        self.calls += 1
+        return await self.tool.execute(**kwargs)
+
+
+async def test_reads_hit_until_the_file_changes(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("one\n")
+    cache = ToolResultCache()
+    read = CountingTool(ReadFileTool())
+
+    def run():
+        return cache.run("read", {"path": str(path)}, lambda: read.execute(path=str(path)))
+
+    first = await run()
+    second = await run()
+    assert read.calls == 1 and second.data == first.data and second.metadata["cached"]
+
+    await WriteFileTool().execute(path=str(path), content="two\n")
+    cache.mark_changed(str(path))  # What the agent that ran the write reports
+    assert "two" in (await run()).data
+
+    # Changed outside the tools: caught by mtime/size
+    path.write_text("three!\n")
+    os.utime(path, ns=(1, 1))
+    assert "three" in (await run()).data
+    assert read.calls == 3
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["invalidations"] == 2
+
+
+async def test_searches_are_invalidated_by_any_change(tmp_path):
+    (tmp_path / "a.py").write_text("needle = 1\n")
+    (tmp_path / "b.py").write_text("other = 2\n")
+    cache = ToolResultCache()
+    config = AgentConfig(name="t", model="m", description="", permissions=[Permission.WRITE])
+    writer = LoopAgent(config, None, tool_cache=cache)
+    grep = CountingTool(GrepTool())
+    read = CountingTool(ReadFileTool())
+    a = str(tmp_path / "a.py")
+
+    async def search():
+        args = {"pattern": "needle", "path": str(tmp_path)}
+        return await cache.run("grep", args, lambda: grep.execute(**args))
+
+    async def read_a():
+        return await cache.run("read", {"path": a}, lambda: read.execute(path=a))
+
+    await search()
+    await read_a()
+    await search()
+    await writer.execute_tool("edit", path=str(tmp_path / "b.py"), old_text="other", new_text="needle")
+    result = await search()
+    await read_a()
+
+    assert grep.calls == 2 and result.data.count("needle") == 2
+    assert read.calls == 1  # Editing b.py leaves a.py's read cached
+
+
+async def test_changes_are_tracked_per_session(tmp_path):
+    (tmp_path / "main.py").write_text("x = 1\n")
+    ours, theirs = ToolResultCache(), ToolResultCache()
+    grep = CountingTool(GrepTool())
+    args = {"pattern": "x", "path": str(tmp_path)}
+
+    for cache in (ours, theirs):
+        await cache.run("grep", args, lambda: grep.execute(**args))
+    ours.mark_all_changed()  # e.g. a bash command in our session
+    for cache in (ours, theirs):
+        await cache.run("grep", args, lambda: grep.execute(**args))
+
+    assert grep.calls == 3 and theirs.get_stats()["hits"] == 1
+
+    # Remote clients' relative paths are keyed by their own project dirs
+    one = ToolResultCache(check_files=False, base_dir="/clients/one")
+    two = ToolResultCache(check_files=False, base_dir="/clients/two")
+    assert one.cache_key("read", {"path": "main.py"}) == one.cache_key("read", {"path": "/clients/one/main.py"})
+    assert one.cache_key("read", {"path": "main.py"}) != two.cache_key("read", {"path": "main.py"})
+
+
+async def test_failures_are_not_cached(tmp_path):
+    cache = ToolResultCache()
+    read = CountingTool(ReadFileTool())
+    missing = str(tmp_path / "missing.py")
+
+    for _ in range(2):
+        result = await cache.run("read", {"path": missing}, lambda: read.execute(path=missing))
+
+    assert not result.success and read.calls == 2
+
+
+async def test_agents_share_a_session_cache(tmp_path):
+    path = tmp_path / "shared.py"
+    path.write_text("x = 1\n")
+    cache = ToolResultCache()
+    first = ExplorerAgent(ollama_client=None, tool_cache=cache)
+    second = ExplorerAgent(ollama_client=None, tool_cache=cache)
+
+    await first._execute_tool_call({"name": "read", "arguments": {"path": str(path)}})
+    output = await second._execute_tool_call({"name": "read", "arguments": {"path": str(path)}})
+
+    assert output.startswith(CACHED_RESULT_NOTE)
+    assert cache.get_stats()["hits"] == 1
+
+
+def rereading_client(path, turns, change_file=False):
+    """Asks to read the same file on every turn, optionally changing it first."""
+
+    def read(remaining):
+        def reply(request):
+            if change_file:
+                path.write_text(f"version {remaining}\n" * (remaining + 1))
+            return "", [{"name": "read", "arguments": {"path": str(path)}}]
+        return reply
+
+    return ScriptedOllama(*(read(turns - 1 - i) for i in range(turns)))
+
+
+def loop_agent(client):
+    config = AgentConfig(name="t", model="m", description="", permissions=[Permission.READ])
+    return LoopAgent(config, client, tool_cache=ToolResultCache())
+
+
+async def test_loop_detection_counts_cached_repeats(tmp_path):
+    path = tmp_path / "same.py"
+    path.write_text("unchanged\n")
+
+    result = await loop_agent(rereading_client(path, turns=5)).agentic_loop("go")
+
+    assert result.needs_escalation
+    assert [entry["cached"] for entry in result.tool_calls] == [False, True, True, True]
+
+
+async def test_rereading_a_changing_file_is_not_a_loop(tmp_path):
+    path = tmp_path / "changing.py"
+
+    result = await loop_agent(rereading_client(path, turns=4, change_file=True)).agentic_loop("go")
+
+    assert result.success and result.output == "done"
+    assert not any(entry["cached"] for entry in result.tool_calls)
@@ -0,0 +1,135 @@
+"""Tests for streaming tool-call detection and early stream close."""
+
+import json
+
+from penguincode_cli.agents.base import AgentConfig, Permission
+from penguincode_cli.agents.tool_stream import ToolCallDetector, parse_tool_calls, read_reply
+from penguincode_cli.ollama import ChatAccumulator
+from penguincode_cli.ollama.types import ChatResponse, Message
+from tests.conftest import LoopAgent
+
+
+def named(data):
+    return [data] if isinstance(data, dict) and "name" in data else []
+
+
+def feed_all(detector, pieces):
+    for piece in pieces:
+        detector.feed(piece)
+    return detector.calls
+
+
+def test_call_split_across_chunks_with_braces_in_strings():
+    text = json.dumps({"name": "bash", "arguments": {"command": 'echo "}{" \\ done'}})
+    calls = feed_all(ToolCallDetector(named), [text[i:i + 3] for i in range(0, len(text), 3)])
+
+    assert calls == [json.loads(text)]
+
+
+def test_escape_at_a_chunk_boundary():
+    detector = ToolCallDetector(named)
+
+    feed_all(detector, ['{"name": "a", "arguments": {"s": "x\\', '"}"}}'])
+
+    assert detector.calls == [{"name": "a", "arguments": {"s": 'x"}'}}]
+
+
+def test_unclosed_object_does_not_hang():
+    assert parse_tool_calls('Sure: {"name": "read", "arguments": {', named) == []
+
+
+def test_several_calls_are_kept_and_prose_settles():
+    detector = ToolCallDetector(named, allowed={"read"})
+    feed_all(detector, ['```json\n{"name": "read", "arguments": {}}', ",\n", '{"name": "read", "arguments": {"p": 1}}\n```'])
+
+    assert len(detector.calls) == 2 and not detector.settled
+    detector.feed("\nThis reads")
+    assert detector.settled
+
+
+def test_calls_to_other_tools_do_not_settle():
+    detector = ToolCallDetector(named, allowed={"read"})
+    detector.feed('{"name": "other", "arguments": {}} and then some text')
+
+    assert detector.calls and not detector.settled
+
+
+def chunk(content="", done=False, **counters):
+    return ChatResponse(model="m", created_at="", done=done, **counters,
+                        message=Message(role="assistant", content=content))
+
+
+class TalkativeStream:
+    """A JSON call, then ``chatter`` tokens of explanation, then the done chunk."""
+
+    def __init__(self, call, chatter=50):
+        self.pieces = [call] + [" word"] * chatter
+        self.sent = 0
+        self.closed = False
+
+    async def __call__(self):
+        try:
+            for piece in self.pieces:
+                self.sent += 1
+                yield chunk(piece)
+            yield chunk(done=True, eval_count=len(self.pieces), prompt_eval_count=5)
+        finally:
+            self.closed = True
+
+
+CALL = json.dumps({"name": "read", "arguments": {"path": "a.py"}})
+
+
+async def test_read_reply_closes_the_stream_after_the_call():
+    stream = TalkativeStream(CALL)
+    reply = ChatAccumulator()
+
+    usage = await read_reply(stream(), reply, ToolCallDetector(named, allowed={"read"}))
+
+    assert stream.closed and stream.sent == 2
+    assert usage.early_stops == 1 and usage.wasted_tokens == 1 and usage.completion_tokens == 2
+    assert not reply.done and reply.text.startswith(CALL)
+
+
+async def test_read_reply_to_the_end_counts_the_waste():
+    stream = TalkativeStream(CALL)
+
+    usage = await read_reply(
+        stream(), ChatAccumulator(), ToolCallDetector(named), stop_early=False
+    )
+
+    assert stream.sent == 51 and usage.early_stops == 0
+    assert usage.wasted_tokens == 50 and usage.completion_tokens == 51
+
+
+class CallingClient:
+    """Asks for one read, then answers."""
+
+    def __init__(self, path):
+        self.stream = TalkativeStream(json.dumps({"name": "read", "arguments": {"path": str(path)}}))
+        self.calls = 0
+
+    async def chat(self, model, messages, tools=None, stream=True, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            async for piece in self.stream():
+                yield piece
+        else:
+            yield chunk("done", done=True, eval_count=1)
+
+
+async def test_agentic_loop_stops_generating_after_a_call(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    runs = {}
+    for stop in (False, True):
+        client = CallingClient(tmp_path / "a.py")
+        config = AgentConfig(name="t", model="m", description="",
+                             permissions=[Permission.READ], stop_at_tool_call=stop)
+        result = await LoopAgent(config, client, working_dir=str(tmp_path)).agentic_loop("look")
+        runs[stop] = (result, client.stream.sent)
+
+    for result, _ in runs.values():
+        assert result.success and result.tool_calls[0]["tool"] == "read"
+        assert "x = 1" in result.tool_calls[0]["result"]
+    assert runs[False][1] == 51 and runs[False][0].usage.wasted_tokens == 50
+    assert runs[True][1] == 2 and runs[True][0].usage.early_stops == 1
@@ -0,0 +1,101 @@
+"""Tests for the shared pooled HTTP transport."""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from penguincode_cli.config.settings import HttpConfig
+from penguincode_cli.ollama import Message, OllamaClient
+from penguincode_cli.shared.transport import TransportRegistry, get_transport
+from penguincode_cli.tools.mcp.client import HTTPMCPClient
+from penguincode_cli.tools.web import WebFetchTool
+
+
+async def tags(request):
+    return web.json_response({"models": []})
+
+
+async def chat(request):
+    body = await request.json()
+    response = web.StreamResponse()
+    await response.prepare(request)
+    for done in (False, True):
+        line = {"model": body["model"], "created_at": "", "done": done,
+                "message": {"role": "assistant", "content": "" if done else "hi"}}
+        await response.write((json.dumps(line) + "\n").encode())
+    await response.write_eof()
+    return response
+
+
+async def page(request):
+    return web.Response(text="<html><body><p>docs</p></body></html>", content_type="text/html")
+
+
+async def tools_list(request):
+    return web.json_response({"tools": [{"name": "search"}]})
+
+
+@pytest.fixture
+async def server():
+    app = web.Application()
+    app.router.add_get("/api/tags", tags)
+    app.router.add_post("/api/chat", chat)
+    app.router.add_get("/page", page)
+    app.router.add_get("/tools/list", tools_list)
+    server = TestServer(app)
+    await server.start_server()
+    get_transport().reset_stats()
+    yield server
+    await get_transport().aclose()
+    await server.close()
+
+
+def host_stats(server):
+    return get_transport().get_stats()["hosts"][f"127.0.0.1:{server.port}"]
+
+
+async def test_components_share_keep_alive_connections(server):
+    base = str(server.make_url("")).rstrip("/")
+    ollama = OllamaClient(base_url=base)  # No `async with` needed
+
+    await ollama.list_models()
+    chunks = [c async for c in ollama.chat("m", [Message(role="user", content="hi")])]
+    fetched = await WebFetchTool().fetch(f"{base}/page")
+    tools = await HTTPMCPClient(base).list_tools()
+
+    assert chunks[0].message.content == "hi" and chunks[-1].done
+    assert fetched["status"] == 200 and "docs" in fetched["text"]
+    assert tools == [{"name": "search"}]
+    stats = host_stats(server)
+    assert stats["requests"] == 4 and stats["connections"] == 1 and stats["reused"] == 3
+
+
+async def test_concurrent_requests_open_connections_up_to_the_limit(server):
+    registry = TransportRegistry(HttpConfig(max_connections=2, max_keepalive_connections=2))
+    client = registry.client()
+    url = str(server.make_url("/api/tags"))
+
+    await asyncio.gather(*(client.get(url) for _ in range(6)))
+    await asyncio.gather(*(client.get(url) for _ in range(6)))
+
+    stats = registry.get_stats()
+    assert stats["requests"] == 12 and stats["connections"] == 2
+    assert stats["reuse_rate"] == round(10 / 12, 3)
+    await registry.aclose()
+
+
+def test_each_event_loop_gets_its_own_client():
+    registry = TransportRegistry(HttpConfig(http2=False))
+
+    async def get_client():
+        return registry.client(), registry.client()
+
+    first, same = asyncio.run(get_client())
+    second, _ = asyncio.run(get_client())
+
+    assert first is same and first is not second
+    assert registry.clients_created == 2 and registry.get_stats()["clients"] == 1
+    assert registry.http2 is False
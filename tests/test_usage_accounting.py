@@ -0,0 +1,87 @@
+"""Tests for token/latency accounting - UsageStats, UsageTracker, agent rollups."""
+
+from penguincode_cli.agents import ExplorerAgent
+from penguincode_cli.core.usage import ORCHESTRATOR, UsageTracker
+from penguincode_cli.ollama.types import ChatResponse, Message, UsageStats
+
+
+def final_chunk(prompt=100, completion=50, eval_ns=500_000_000) -> ChatResponse:
+    """A done=true chunk carrying Ollama's counters."""
+    return ChatResponse(
+        model="m",
+        created_at="",
+        message=Message(role="assistant", content=""),
+        done=True,
+        prompt_eval_count=prompt,
+        prompt_eval_duration=200_000_000,
+        eval_count=completion,
+        eval_duration=eval_ns,
+        total_duration=800_000_000,
+    )
+
+
+class FakeClient:
+    """Streams a canned answer followed by a final chunk with usage."""
+
+    async def chat(self, model, messages, stream=True, tools=None, **kwargs):
+        yield ChatResponse(model=model, created_at="", message=Message(role="assistant", content="done"), done=False)
+        yield final_chunk()
+
+
+def test_usage_stats_from_chat_response():
+    """Counters and rates are read from the final chunk."""
+    usage = UsageStats.from_chat_response(final_chunk())
+
+    assert usage.requests == 1
+    assert usage.prompt_tokens == 100
+    assert usage.completion_tokens == 50
+    assert usage.total_tokens == 150
+    assert usage.prompt_eval_duration_ms == 200
+    assert usage.tokens_per_second == 100
+
+
+def test_usage_stats_add():
+    """Adding usage sums counters and durations."""
+    total = UsageStats()
+    total.add(UsageStats.from_chat_response(final_chunk()))
+    total.add(UsageStats.from_chat_response(final_chunk(prompt=10, completion=5)))
+
+    assert total.requests == 2
+    assert total.total_tokens == 165
+    assert total.eval_duration_ms == 1000
+    assert total.to_dict()["completion_tokens"] == 55
+
+
+def test_tracker_rollups():
+    """Usage rolls up per agent, step, turn and session."""
+    tracker = UsageTracker()
+    call = UsageStats.from_chat_response(final_chunk())
+
+    tracker.start_turn()
+    tracker.record(ORCHESTRATOR, call)
+    tracker.start_plan()
+    tracker.record_agent_run("explorer", True, 1200, call, step_num=1)
+    tracker.record_agent_run("executor", True, 900, call, step_num=2)
+    tracker.end_turn()
+
+    tracker.start_turn()
+    tracker.record(ORCHESTRATOR, call)
+
+    summary = tracker.to_dict()
+    assert summary["session"]["total_tokens"] == 600
+    assert summary["turn"]["total_tokens"] == 150
+    assert summary["turns"] == 2
+    assert summary["by_agent"][ORCHESTRATOR]["requests"] == 2
+    assert set(summary["by_step"]) == {1, 2}
+    assert len(tracker.turns[0].agent_runs) == 2
+
+
+async def test_agentic_loop_populates_tokens_used(tmp_path):
+    """AgentResult carries the usage of the agent's LLM calls."""
+    agent = ExplorerAgent(ollama_client=FakeClient(), working_dir=str(tmp_path))
+
+    result = await agent.run("What is here?")
+
+    assert result.success
+    assert result.tokens_used == 150
+    assert result.usage.requests == 1